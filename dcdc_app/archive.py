@@ -0,0 +1,302 @@
+"""SQLite telemetry archive: per-cycle rows, batched writes, time-range queries.
+
+Stores the wide per-cycle rows produced by export.CycleAssembler (one row per
+device and 200ms cycle, one column per numeric PCSState field) in a local
+SQLite database:
+
+- WAL journal with synchronous=NORMAL, so readers (``query``) never block the
+  writer and commits are cheap
+- a writer thread drains a queue and inserts in batched transactions, so the
+  RX thread only pays for a queue put
+- ``cycles`` is a WITHOUT ROWID table keyed by (addr, timestamp): rows are
+  clustered per device in time order, and a secondary index on timestamp
+  serves cross-device time ranges
+
+Example:
+    archive = TelemetryArchive("telemetry.db")
+    ctrl.add_frame_callback(CycleAssembler(archive.write_row).on_frame, unfiltered=True)
+    ...
+    archive.close()
+    query_aggregate("telemetry.db", "dc_inlet_temperature", "max", bucket=3600)
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from dcdc_app.export import COLUMN_NAMES, COLUMN_TYPES, CycleWriter
+
+logger = logging.getLogger(__name__)
+
+TABLE = "cycles"
+AGGREGATES = ("min", "max", "avg", "sum", "count")
+
+_SQL_TYPES = {float: "REAL", int: "INTEGER"}
+_STOP = object()
+
+
+def _create_sql() -> str:
+    cols = ",\n    ".join(
+        f"{name} {_SQL_TYPES[typ]}{' NOT NULL' if name in ('timestamp', 'addr') else ''}"
+        for name, typ in zip(COLUMN_NAMES, COLUMN_TYPES)
+    )
+    return (
+        f"CREATE TABLE IF NOT EXISTS {TABLE} (\n    {cols},\n"
+        f"    PRIMARY KEY (addr, timestamp)\n) WITHOUT ROWID"
+    )
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    """Open an archive database (creating the schema unless read-only)."""
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_create_sql())
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_time ON {TABLE}(timestamp)")
+        conn.commit()
+    return conn
+
+
+class TelemetryArchive(CycleWriter):
+    """Queue-fed SQLite sink with a batching writer thread.
+
+    An export.CycleWriter whose write_row() only queues the row: batching and
+    _write_batch() happen on the writer thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_rows: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 100_000,
+    ):
+        """Open the database and start the writer thread.
+
+        Args:
+            path: SQLite database file.
+            batch_rows: Maximum rows per insert transaction.
+            flush_interval: Commit pending rows at least this often (seconds).
+            max_queue: Rows buffered before new rows are dropped.
+        """
+        super().__init__(path, batch_rows)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._conn = connect(path)
+        self._insert = (
+            f"INSERT OR REPLACE INTO {TABLE} ({', '.join(COLUMN_NAMES)}) "
+            f"VALUES ({', '.join('?' * len(COLUMN_NAMES))})"
+        )
+        # rows, plus flush events and the stop sentinel (never dropped)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True, name="archive-writer")
+        self._thread.start()
+
+    def write_row(self, row: list) -> None:
+        """Queue one cycle row (non-blocking; drops when the queue is full)."""
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is committed.
+
+        Returns:
+            False if the writer did not catch up within ``timeout``.
+        """
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Commit pending rows, stop the writer thread and close the database."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5.0)
+        self._conn.close()
+        if self.dropped:
+            logger.warning("Archive dropped %d rows (writer queue full)", self.dropped)
+
+    def _writer_loop(self) -> None:
+        batch: List[list] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if isinstance(item, list):
+                batch.append(item)
+                if len(batch) < self.batch_rows and time.monotonic() < deadline:
+                    continue
+            self._write_batch(batch)
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write_batch(self, rows: List[list]) -> None:
+        """Insert one batch in a single transaction (writer thread only)."""
+        if not rows:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(self._insert, rows)
+            self.rows_written += len(rows)
+        except sqlite3.Error as e:
+            logger.error("Archive write failed (%d rows lost): %s", len(rows), e)
+
+    def __enter__(self) -> TelemetryArchive:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text: str) -> float:
+    """Parse '30s', '15m', '1h', '2d' or plain seconds."""
+    m = _DURATION.match(text.strip())
+    if m:
+        return float(m.group(1)) * _UNITS[m.group(2)]
+    return float(text)
+
+
+def parse_time(text: str, now: Optional[float] = None) -> float:
+    """Parse epoch seconds, an ISO datetime, 'now' or an age like '15m' / '-1h' (ago)."""
+    text = text.strip()
+    now = time.time() if now is None else now
+    if text == "now":
+        return now
+    if _DURATION.match(text.lstrip("-")):
+        return now - parse_duration(text.lstrip("-"))
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+def _check_column(name: str) -> str:
+    if name not in COLUMN_NAMES:
+        raise ValueError(f"Unknown column '{name}'")
+    return name
+
+
+def _where(start: Optional[float], end: Optional[float], addr: Optional[int]) -> Tuple[str, list]:
+    clauses, params = [], []
+    if addr is not None:
+        clauses.append("addr = ?")
+        params.append(addr)
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(end)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query_range(
+    path: str,
+    columns: Sequence[str],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    addr: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[str], List[tuple]]:
+    """Rows in a time range.
+
+    Returns:
+        (column names, rows) with timestamp and addr first.
+    """
+    cols = ["timestamp", "addr"] + [_check_column(c) for c in columns if c not in ("timestamp", "addr")]
+    where, params = _where(start, end, addr)
+    sql = f"SELECT {', '.join(cols)} FROM {TABLE}{where} ORDER BY timestamp"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    conn = connect(path, readonly=True)
+    try:
+        return cols, conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def query_aggregate(
+    path: str,
+    column: str,
+    func: str = "avg",
+    bucket: Optional[float] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    addr: Optional[int] = None,
+) -> Tuple[List[str], List[tuple]]:
+    """Aggregate one column per device, optionally per time bucket.
+
+    Args:
+        column: Data column, e.g. 'dc_inlet_temperature'.
+        func: One of min/max/avg/sum/count.
+        bucket: Bucket width in seconds (None = whole range).
+
+    Returns:
+        (column names, rows) as (bucket_start, addr, value, samples).
+    """
+    if func not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate '{func}' (use {', '.join(AGGREGATES)})")
+    col = _check_column(column)
+    where, params = _where(start, end, addr)
+    if bucket:
+        bucket_expr = f"CAST(timestamp / {float(bucket)!r} AS INTEGER) * {float(bucket)!r}"
+    else:
+        bucket_expr = "MIN(timestamp)"
+    group = "addr, bucket" if bucket else "addr"
+    sql = (
+        f"SELECT {bucket_expr} AS bucket, addr, {func.upper()}({col}), COUNT(*) "
+        f"FROM {TABLE}{where} GROUP BY {group} ORDER BY bucket, addr"
+    )
+    conn = connect(path, readonly=True)
+    try:
+        return ["bucket", "addr", f"{func}_{col}", "samples"], conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def format_rows(columns: List[str], rows: List[tuple]) -> str:
+    """Plain-text table with ISO times for timestamp/bucket columns."""
+    def cell(name: str, value: Any) -> str:
+        if value is None:
+            return ""
+        if name in ("timestamp", "bucket"):
+            return datetime.fromtimestamp(value).isoformat(sep=" ", timespec="milliseconds")
+        if name == "addr":
+            return f"0x{value:02X}"
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return str(value)
+
+    table = [[cell(c, v) for c, v in zip(columns, row)] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in table]) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(r, widths)) for r in table]
+    return "\n".join(lines)
@@ -0,0 +1,1281 @@
+"""Performance benchmarks for the protocol, logging and controller paths.
+
+Suites:
+  protocol  ns/op, ops/sec and allocations per op for the CAN ID helpers, every
+            frame encoder/decoder, the RX dispatcher and FrameLogger.
+  latency   End-to-end command latency (send_command -> reply waiter returns)
+            and RX-to-callback latency against the simulator on the virtual bus.
+  soak      Sustained RX pipeline throughput: a generator floods the virtual
+            bus with synthetic or replayed frames while the controller decodes,
+            updates state, runs callbacks and logs every frame.
+  startup   Wall time of fresh interpreters importing the package and running
+            offline CLI commands, and which heavy modules each one loads; with
+            PySide6 installed, also console launch to first paint.
+  estop     Click-to-bus latency of the stop frame: the old disable() command
+            path vs the emergency stop, idle and while another command is
+            waiting for its reply.
+  gui       Gaps in the console's UI event loop (offscreen Qt) while idle and
+            during a storm of commands the simulated PCS does not answer.
+
+Results can be saved as a JSON baseline and later compared against it to catch
+regressions.
+
+Usage:
+    python -m dcdc_app bench protocol
+    python -m dcdc_app bench protocol --save-baseline bench_baseline.json
+    python -m dcdc_app bench protocol --baseline bench_baseline.json --threshold 0.2
+    python -m dcdc_app bench latency --iterations 100
+    python -m dcdc_app bench soak --rate 5000 --duration 30
+    python -m dcdc_app bench soak --ramp --replay frames.csv
+    python -m dcdc_app bench startup --iterations 20 --baseline startup.json
+    python -m dcdc_app bench estop --iterations 50
+    python -m dcdc_app bench gui --storm 4
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dcdc_app.logging_utils import FrameLogger
+from dcdc_app.protocol import (
+    CONTROLLER_ADDR,
+    PCS_DEFAULT_ADDR,
+    build_can_id,
+    decode_capacity_energy,
+    decode_dc_data,
+    decode_grid_current,
+    decode_grid_voltage,
+    decode_high_res_dc,
+    decode_io_ad,
+    decode_load_current,
+    decode_load_power,
+    decode_load_voltage,
+    decode_phase_power,
+    decode_protection_params1,
+    decode_protection_params2,
+    decode_protection_params3,
+    decode_rx_message,
+    decode_set_reply,
+    decode_status,
+    decode_system_power,
+    decode_version,
+    encode_heartbeat,
+    encode_read_protection_params,
+    encode_read_special_data,
+    encode_set_bus_voltage_reactive,
+    encode_set_grid_mode,
+    encode_set_inverter_phase,
+    encode_set_io,
+    encode_set_mode_params12,
+    encode_set_mode_params34,
+    encode_set_module_parallel,
+    encode_set_phase_power,
+    encode_set_protection_params1,
+    encode_set_protection_params2,
+    encode_set_protection_params3,
+    encode_set_reactive_control,
+    encode_set_split_phase_enable,
+    encode_set_time,
+    encode_set_working_mode,
+    encode_start_stop,
+    make_rx_id,
+    make_tx_id,
+    parse_can_id,
+)
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.25  # fail when ops/sec drops by more than 25%
+
+
+@dataclass
+class BenchResult:
+    """Timing and allocation figures for one benchmark case."""
+    name: str
+    ops: int
+    seconds: float
+    allocs_per_op: float
+    peak_bytes_per_op: float
+
+    @property
+    def ns_per_op(self) -> float:
+        return self.seconds / self.ops * 1e9 if self.ops else 0.0
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "ns_per_op": round(self.ns_per_op, 2),
+            "ops_per_sec": round(self.ops_per_sec, 1),
+            "allocs_per_op": round(self.allocs_per_op, 2),
+            "peak_bytes_per_op": round(self.peak_bytes_per_op, 1),
+        }
+
+
+@dataclass
+class Regression:
+    """A benchmark whose throughput fell below the allowed threshold."""
+    name: str
+    baseline_ops_per_sec: float
+    current_ops_per_sec: float
+
+    @property
+    def change(self) -> float:
+        """Relative throughput change (negative = slower)."""
+        return self.current_ops_per_sec / self.baseline_ops_per_sec - 1.0
+
+
+# ---------------------------------------------------------------------------
+# Measurement core
+# ---------------------------------------------------------------------------
+
+def _time_loop(func: Callable, args: tuple, n: int) -> float:
+    """Call func(*args) n times and return elapsed seconds."""
+    rng = range(n)
+    start = time.perf_counter()
+    for _ in rng:
+        func(*args)
+    return time.perf_counter() - start
+
+
+def _count_allocs(func: Callable, args: tuple, n: int = 200) -> float:
+    """Memory blocks per call still alive when the call returns.
+
+    Results are kept referenced so that the objects a call hands back (the
+    dominant allocation cost of encoders and decoders) are counted.
+    """
+    keep: List[Any] = [None] * n
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        before = sys.getallocatedblocks()
+        for i in range(n):
+            keep[i] = func(*args)
+        after = sys.getallocatedblocks()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    del keep
+    return max(0.0, (after - before) / n)
+
+
+def _peak_bytes(func: Callable, args: tuple, n: int = 50) -> float:
+    """Average tracemalloc peak (bytes) of a single call, transients included."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(n):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            total += max(0, peak - current)
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return total / n
+
+
+def measure(
+    name: str,
+    func: Callable,
+    args: tuple = (),
+    batch: int = 1,
+    min_time: float = 0.2,
+    repeat: int = 3,
+) -> BenchResult:
+    """Benchmark func(*args).
+
+    Args:
+        name: Benchmark case name.
+        func: Callable under test.
+        args: Positional arguments passed on every call.
+        batch: Number of logical operations performed by one call.
+        min_time: Minimum duration of one timed run in seconds.
+        repeat: Number of timed runs; the fastest one is reported.
+
+    Returns:
+        BenchResult with per-operation figures.
+    """
+    func(*args)  # warm up caches / lazy state
+
+    # Calibrate the iteration count so one run lasts at least min_time
+    n = 1
+    while True:
+        elapsed = _time_loop(func, args, n)
+        if elapsed >= min_time or n >= 10_000_000:
+            break
+        n = n * 10 if elapsed < min_time / 10 else max(n + 1, int(n * min_time / max(elapsed, 1e-9) * 1.1))
+
+    best = elapsed
+    for _ in range(max(0, repeat - 1)):
+        best = min(best, _time_loop(func, args, n))
+
+    return BenchResult(
+        name=name,
+        ops=n * batch,
+        seconds=best,
+        allocs_per_op=_count_allocs(func, args) / batch,
+        peak_bytes_per_op=_peak_bytes(func, args) / batch,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Protocol / logging benchmark cases
+# ---------------------------------------------------------------------------
+
+# Realistic RX traffic per 200ms cycle from one PCS (simulator frame set)
+# plus an occasional command reply and version frame.
+_RX_MIX: List[Tuple[int, bytes]] = [
+    (0x11, struct.pack(">HHHH", 4000, 10500, 200, 850)),
+    (0x12, struct.pack(">HIH", 123, 45678, 900)),
+    (0x13, struct.pack(">BxHxxxx", 11, 0)),
+    (0x14, struct.pack(">HHHxx", 2300, 2301, 2299)),
+    (0x15, struct.pack(">HHHh", 150, 151, 149, 9)),
+    (0x16, struct.pack(">HHHH", 485, 12, 495, 500)),
+    (0x39, struct.pack(">II", 400123, 1050456)),
+    (0x10, b"\x01" + b"\x00" * 7),
+    (0x23, struct.pack(">HHHxx", 100, 5, 101)),
+    (0x34, bytes([1, 2, 3, 2, 1, 38, 0, 0])),
+]
+
+RX_MIX_FRAMES: List[Tuple[int, bytes]] = [(make_rx_id(pf), data) for pf, data in _RX_MIX]
+
+
+def _decode_mix(frames: List[Tuple[int, bytes]]) -> None:
+    for can_id, data in frames:
+        decode_rx_message(can_id, data)
+
+
+def protocol_cases() -> List[Tuple[str, Callable, tuple, int]]:
+    """Return (name, func, args, batch) for every protocol benchmark case."""
+    rx_dc = struct.pack(">HHHH", 4000, 10500, 200, 850)
+    rx_cap = struct.pack(">HIH", 123, 45678, 900)
+    rx_status = struct.pack(">BxHxxxx", 11, 0)
+    rx_3ph = struct.pack(">HHHxx", 2300, 2301, 2299)
+    rx_grid_i = struct.pack(">HHHh", 150, 151, 149, 9)
+    rx_sys = struct.pack(">HHHH", 485, 12, 495, 500)
+    rx_hires = struct.pack(">II", 400123, 1050456)
+    rx_io = struct.pack(">BBBBHH", 1, 0, 1, 0, 3300, 1200)
+    rx_prot = struct.pack(">HHHH", 8000, 500, 1500, 1500)
+    rx_freq = struct.pack(">HHBBxx", 550, 450, 55, 45)
+    rx_reply = b"\x01" + b"\x00" * 7
+    rx_version = bytes([1, 2, 3, 2, 1, 38, 0, 0])
+    can_id = build_can_id(0x11, CONTROLLER_ADDR, PCS_DEFAULT_ADDR)
+
+    return [
+        # CAN ID helpers
+        ("build_can_id", build_can_id, (0x11, CONTROLLER_ADDR, PCS_DEFAULT_ADDR), 1),
+        ("parse_can_id", parse_can_id, (can_id,), 1),
+        # Encoders
+        ("encode_read_protection_params", encode_read_protection_params, (0x01,), 1),
+        ("encode_set_protection_params1", encode_set_protection_params1, (800.0, 50.0, 150.0, 150.0), 1),
+        ("encode_set_protection_params2", encode_set_protection_params2, (120.0, 120.0, 264.0, 176.0), 1),
+        ("encode_set_protection_params3", encode_set_protection_params3, (55.0, 45.0, 55, 45), 1),
+        ("encode_set_time", encode_set_time, (2024, 1, 15, 12, 30, 45), 1),
+        ("encode_set_working_mode", encode_set_working_mode, (0x29,), 1),
+        ("encode_set_mode_params12", encode_set_mode_params12, (400.0, 50.0, 0x29), 1),
+        ("encode_set_mode_params34", encode_set_mode_params34, (5.0, 0.0, 0x29), 1),
+        ("encode_start_stop", encode_start_stop, (True,), 1),
+        ("encode_heartbeat", encode_heartbeat, (400.0, 50.0, 0x02), 1),
+        ("encode_set_bus_voltage_reactive", encode_set_bus_voltage_reactive, (750.0, 10.0), 1),
+        ("encode_set_io", encode_set_io, (1, 0, 1, 0), 1),
+        ("encode_set_split_phase_enable", encode_set_split_phase_enable, (True,), 1),
+        ("encode_set_inverter_phase", encode_set_inverter_phase, (7,), 1),
+        ("encode_set_reactive_control", encode_set_reactive_control, (1, 0.95), 1),
+        ("encode_set_grid_mode", encode_set_grid_mode, (1,), 1),
+        ("encode_set_module_parallel", encode_set_module_parallel, (1, 4, 1000), 1),
+        ("encode_set_phase_power", encode_set_phase_power, (10.0, 10.0, 10.0), 1),
+        ("encode_read_special_data", encode_read_special_data, (0x0A,), 1),
+        # Decoders
+        ("decode_protection_params1", decode_protection_params1, (rx_prot,), 1),
+        ("decode_protection_params2", decode_protection_params2, (rx_prot,), 1),
+        ("decode_protection_params3", decode_protection_params3, (rx_freq,), 1),
+        ("decode_dc_data", decode_dc_data, (rx_dc,), 1),
+        ("decode_capacity_energy", decode_capacity_energy, (rx_cap,), 1),
+        ("decode_status", decode_status, (rx_status,), 1),
+        ("decode_grid_voltage", decode_grid_voltage, (rx_3ph,), 1),
+        ("decode_grid_current", decode_grid_current, (rx_grid_i,), 1),
+        ("decode_system_power", decode_system_power, (rx_sys,), 1),
+        ("decode_load_voltage", decode_load_voltage, (rx_3ph,), 1),
+        ("decode_load_current", decode_load_current, (rx_3ph,), 1),
+        ("decode_load_power", decode_load_power, (rx_3ph,), 1),
+        ("decode_phase_power", decode_phase_power, (rx_3ph, "A"), 1),
+        ("decode_high_res_dc", decode_high_res_dc, (rx_hires,), 1),
+        ("decode_io_ad", decode_io_ad, (rx_io,), 1),
+        ("decode_set_reply", decode_set_reply, (rx_reply,), 1),
+        ("decode_version", decode_version, (rx_version,), 1),
+        # Dispatcher over a realistic PF mix (one op = one frame)
+        ("decode_rx_message[mix]", _decode_mix, (RX_MIX_FRAMES,), len(RX_MIX_FRAMES)),
+    ]
+
+
+def _logger_cases(tmpdir: str) -> List[Tuple[str, Callable, tuple, int, FrameLogger]]:
+    """Build FrameLogger cases (one per output format)."""
+    can_id = make_rx_id(0x11)
+    data = struct.pack(">HHHH", 4000, 10500, 200, 850)
+    decoded = decode_dc_data(data)
+    cases = []
+    for fmt in ("csv", "jsonl"):
+        fl = FrameLogger(filepath=os.path.join(tmpdir, f"bench.{fmt}"), fmt=fmt, console=False)
+        fl.open()
+        cases.append((f"log_frame[{fmt}]", fl.log_frame, (can_id, data, "RX", decoded), 1, fl))
+    fl = FrameLogger(filepath=None, console=True)
+    cases.append(("log_frame[console]", fl.log_frame, (can_id, data, "RX", decoded), 1, fl))
+    return cases
+
+
+class _NullBus:
+    """Bus stand-in that accepts every frame, so only CANInterface's own cost is timed."""
+
+    def send(self, msg: Any, timeout: Optional[float] = None) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _rx_path(can_if: Any, msg: Any) -> None:
+    can_if._deliver(msg)   # what the reader thread does per frame
+    can_if.recv(timeout=0)
+
+
+def _path_cases() -> List[Tuple[str, Callable, tuple, int]]:
+    """CANInterface TX/RX and controller batch-processing cases (no real bus)."""
+    try:
+        import can
+    except ImportError:
+        return []
+    from dcdc_app.can_iface import CANInterface
+    from dcdc_app.controller import ControllerConfig, PCSController
+    from dcdc_app.metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    can_if = CANInterface(simulated=True, metrics=metrics)
+    can_if._bus = _NullBus()
+    can_if._connected = True
+    data = struct.pack(">HHHH", 4000, 10500, 200, 850)
+    msg = can.Message(arbitration_id=make_rx_id(0x11), data=data, is_extended_id=True)
+    batch = [
+        can.Message(arbitration_id=can_id, data=d, is_extended_id=True)
+        for can_id, d in RX_MIX_FRAMES
+    ]
+    ctrl = PCSController(can_if, ControllerConfig(auto_heartbeat=False), metrics=metrics)
+    tx_id = build_can_id(0x0F, PCS_DEFAULT_ADDR, CONTROLLER_ADDR)
+    return [
+        ("can_send", can_if.send, (tx_id, data), 1),
+        ("can_rx", _rx_path, (can_if, msg), 1),
+        ("controller_rx[mix]", ctrl._process_batch, (batch,), len(batch)),
+    ]
+
+
+def run_protocol_benchmarks(
+    min_time: float = 0.2,
+    repeat: int = 3,
+    name_filter: Optional[str] = None,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> List[BenchResult]:
+    """Run every protocol and FrameLogger benchmark case.
+
+    Args:
+        min_time: Minimum duration of one timed run per case.
+        repeat: Timed runs per case (fastest reported).
+        name_filter: Only run cases whose name contains this substring.
+        progress: Optional callback invoked with each finished result.
+    """
+    results: List[BenchResult] = []
+
+    def _run(name: str, func: Callable, args: tuple, batch: int) -> None:
+        if name_filter and name_filter not in name:
+            return
+        res = measure(name, func, args, batch=batch, min_time=min_time, repeat=repeat)
+        results.append(res)
+        if progress:
+            progress(res)
+
+    for name, func, args, batch in protocol_cases() + _path_cases():
+        _run(name, func, args, batch)
+
+    with tempfile.TemporaryDirectory(prefix="dcdc-bench-") as tmpdir:
+        loggers = _logger_cases(tmpdir)
+        try:
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                for name, func, args, batch, _ in loggers:
+                    _run(name, func, args, batch)
+        finally:
+            for *_, fl in loggers:
+                fl.close()
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def save_baseline(path: str, results: List[BenchResult]) -> None:
+    """Write results as a JSON baseline file."""
+    payload = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {r.name: r.to_dict() for r in results},
+    }
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    """Load a JSON baseline file and return its results mapping."""
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    if payload.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported baseline version: {payload.get('version')}")
+    return payload["results"]
+
+
+def compare_to_baseline(
+    results: List[BenchResult],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Regression]:
+    """Return every case whose ops/sec dropped more than threshold vs baseline.
+
+    Cases missing from the baseline are ignored.
+    """
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if not base or base.get("ops_per_sec", 0) <= 0:
+            continue
+        if r.ops_per_sec < base["ops_per_sec"] * (1.0 - threshold):
+            regressions.append(Regression(r.name, base["ops_per_sec"], r.ops_per_sec))
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+RESULT_HEADER = f"{'Benchmark':<34} {'ns/op':>10} {'ops/sec':>13} {'allocs/op':>10} {'peak B/op':>10}"
+
+
+def format_result(r: BenchResult, baseline: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """Format one result row, with the change vs baseline when available."""
+    line = (
+        f"{r.name:<34} {r.ns_per_op:>10.1f} {r.ops_per_sec:>13,.0f} "
+        f"{r.allocs_per_op:>10.1f} {r.peak_bytes_per_op:>10.0f}"
+    )
+    if baseline and r.name in baseline and baseline[r.name].get("ops_per_sec"):
+        change = r.ops_per_sec / baseline[r.name]["ops_per_sec"] - 1.0
+        line += f"  {change:+7.1%}"
+    return line
+
+
+# ---------------------------------------------------------------------------
+# End-to-end latency (controller + simulator on the virtual bus)
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(-(-pct * len(sorted_samples) // 100)))  # ceil
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+@dataclass
+class LatencyStats:
+    """Latency distribution of one measured path (samples in seconds)."""
+    name: str
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, name: str, samples: List[float]) -> LatencyStats:
+        s = sorted(samples)
+        return cls(
+            name=name,
+            count=len(s),
+            mean=sum(s) / len(s) if s else 0.0,
+            p50=percentile(s, 50),
+            p95=percentile(s, 95),
+            p99=percentile(s, 99),
+            max=s[-1] if s else 0.0,
+        )
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean * 1e3, 4),
+            "p50_ms": round(self.p50 * 1e3, 4),
+            "p95_ms": round(self.p95 * 1e3, 4),
+            "p99_ms": round(self.p99 * 1e3, 4),
+            "max_ms": round(self.max * 1e3, 4),
+        }
+
+
+LATENCY_HEADER = (
+    f"{'Path':<38} {'n':>6} {'mean ms':>9} {'p50 ms':>9} "
+    f"{'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+)
+
+
+def format_latency(st: LatencyStats, baseline: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """Format one latency row, with the p50 change vs baseline when available."""
+    line = (
+        f"{st.name:<38} {st.count:>6d} {st.mean * 1e3:>9.3f} {st.p50 * 1e3:>9.3f} "
+        f"{st.p95 * 1e3:>9.3f} {st.p99 * 1e3:>9.3f} {st.max * 1e3:>9.3f}"
+    )
+    if baseline and baseline.get(st.name, {}).get("p50_ms"):
+        change = st.p50 * 1e3 / baseline[st.name]["p50_ms"] - 1.0
+        line += f"  {change:+7.1%}"
+    return line
+
+
+def compare_latency_to_baseline(
+    stats: List[LatencyStats],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """Return the names of paths whose p50 latency grew more than threshold."""
+    worse = []
+    for st in stats:
+        base = baseline.get(st.name, {}).get("p50_ms", 0.0)
+        if base > 0 and st.p50 * 1e3 > base * (1.0 + threshold):
+            worse.append(st.name)
+    return worse
+
+
+def save_latency_baseline(path: str, stats: List[LatencyStats]) -> None:
+    """Write latency results as a JSON baseline file."""
+    payload = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {st.name: st.to_dict() for st in stats},
+    }
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def run_latency_benchmark(
+    iterations: int = 50,
+    pcs_addr: int = PCS_DEFAULT_ADDR,
+) -> List[LatencyStats]:
+    """Measure command and RX latencies against the simulated PCS.
+
+    Each iteration runs enable(), disable(), set_working_mode() and
+    read_protection_params(). For every command two figures are recorded:
+    the full call time and the reply handoff (reply frame on the bus ->
+    waiting caller resumes). RX-to-callback latency is collected for every
+    frame delivered while the benchmark runs.
+
+    Args:
+        iterations: Number of rounds of the command sequence.
+        pcs_addr: Simulated PCS address.
+
+    Returns:
+        LatencyStats per measured path.
+    """
+    from dcdc_app.can_iface import CANInterface
+    from dcdc_app.controller import ControllerConfig, PCSController
+    from dcdc_app.protocol import WorkingMode
+    from dcdc_app.simulator import SimulatedPCS
+
+    rx_to_callback: List[float] = []
+    reply_times: Dict[int, float] = {}
+
+    def on_frame(sa: int, pf: int, name: str, decoded: Any, timestamp: float) -> None:
+        now = time.time()
+        if timestamp:
+            rx_to_callback.append(max(0.0, now - timestamp))
+            reply_times[pf] = timestamp
+
+    commands: List[Tuple[str, int, Callable[[PCSController], Any]]] = [
+        ("enable", 0x10, lambda c: c.enable(clear_faults=False)),
+        ("disable", 0x10, lambda c: c.disable()),
+        ("set_working_mode", 0x0E, lambda c: c.set_working_mode(WorkingMode.DC_CONSTANT_VOLTAGE)),
+        ("read_protection_params", 0x02, lambda c: c.read_protection_params(0x01)),
+    ]
+    totals: Dict[str, List[float]] = {name: [] for name, _, _ in commands}
+    handoffs: Dict[str, List[float]] = {name: [] for name, _, _ in commands}
+
+    sim = SimulatedPCS(pcs_addr=pcs_addr)
+    sim.start()
+    can_if = CANInterface(simulated=True)
+    ctrl = PCSController(can_if, ControllerConfig(pcs_addr=pcs_addr))
+    ctrl.add_frame_callback(on_frame)
+    try:
+        ctrl.start()
+        ctrl.wait_for_cycle(timeout=2.0)
+        for _ in range(iterations):
+            for name, reply_pf, call in commands:
+                reply_times.pop(reply_pf, None)
+                start = time.perf_counter()
+                result = call(ctrl)
+                elapsed = time.perf_counter() - start
+                returned = time.time()
+                if result is None or result is False:
+                    continue
+                totals[name].append(elapsed)
+                # Frame callbacks run just after the waiter is released
+                deadline = returned + 0.1
+                while reply_pf not in reply_times and time.time() < deadline:
+                    time.sleep(0.0005)
+                if reply_pf in reply_times:
+                    handoffs[name].append(max(0.0, returned - reply_times[reply_pf]))
+    finally:
+        ctrl.stop()
+        can_if.disconnect()
+        sim.stop()
+
+    stats = []
+    for name, _, _ in commands:
+        stats.append(LatencyStats.from_samples(f"{name}", totals[name]))
+        stats.append(LatencyStats.from_samples(f"{name}[reply->return]", handoffs[name]))
+    stats.append(LatencyStats.from_samples("rx->callback", rx_to_callback))
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Emergency stop: click -> stop frame on the bus
+# ---------------------------------------------------------------------------
+
+ESTOP_BUSY_COMMAND_TIMEOUT = 0.2   # how long the pending command blocks (no reply)
+
+
+def run_estop_benchmark(
+    iterations: int = 50,
+    pcs_addr: int = PCS_DEFAULT_ADDR,
+) -> List[LatencyStats]:
+    """Measure click-to-bus latency of disable() vs the emergency stop.
+
+    A listener on the virtual bus timestamps each StartStop(stop) frame for
+    ``pcs_addr``; the sample is that bus timestamp minus the time the "click"
+    handler was entered. In the "command pending" cases the GUI's serial
+    command path is busy with a command that gets no reply
+    (``ESTOP_BUSY_COMMAND_TIMEOUT``), and the click lands at a random point
+    while it waits. At most 20 rounds of the pending cases are run.
+
+    Returns:
+        LatencyStats per path, plus the emergency stop's click-to-confirmation time.
+    """
+    import queue
+    import random
+
+    import can
+
+    from dcdc_app.can_iface import CANInterface
+    from dcdc_app.controller import ControllerConfig, PCSController
+    from dcdc_app.simulator import SimulatedPCS
+
+    stop_id = make_tx_id(0x0F, pcs_addr)
+    stop_frames: "queue.SimpleQueue[float]" = queue.SimpleQueue()
+    listening = threading.Event()
+    listening.set()
+    listener = can.Bus(interface="virtual", channel=SOAK_CHANNEL, receive_own_messages=False)
+
+    def listen() -> None:
+        while listening.is_set():
+            msg = listener.recv(0.05)
+            if msg is not None and msg.arbitration_id == stop_id and msg.data[:2] == b"\x00\x00":
+                stop_frames.put(msg.timestamp)
+
+    # Serial command path: what the GUI runs commands on (one at a time)
+    commands: "queue.Queue[Optional[Callable[[], Any]]]" = queue.Queue()
+
+    def command_loop() -> None:
+        while True:
+            func = commands.get()
+            if func is None:
+                return
+            func()
+            commands.task_done()
+
+    sim = SimulatedPCS(pcs_addr=pcs_addr)
+    sim.start()
+    can_if = CANInterface(simulated=True)
+    config = ControllerConfig(pcs_addr=pcs_addr, command_timeout=ESTOP_BUSY_COMMAND_TIMEOUT)
+    ctrl = PCSController(can_if, config)
+    threads = [threading.Thread(target=listen, daemon=True),
+               threading.Thread(target=command_loop, daemon=True)]
+    for t in threads:
+        t.start()
+
+    def sample(click: Callable[[], Any], busy: bool) -> Optional[float]:
+        while not stop_frames.empty():
+            stop_frames.get()
+        if busy:
+            # Protection params type 9 does not exist: no reply, full timeout
+            commands.put(lambda: ctrl.read_protection_params(0x09))
+            time.sleep(random.uniform(0.02, ESTOP_BUSY_COMMAND_TIMEOUT * 0.8))
+        t_click = time.time()
+        click()
+        try:
+            on_bus = stop_frames.get(timeout=ESTOP_BUSY_COMMAND_TIMEOUT + 2.0)
+        except queue.Empty:
+            return None
+        commands.join()
+        ctrl.estop.wait(2.0)
+        return max(0.0, on_bus - t_click)
+
+    cases: List[Tuple[str, bool, Callable[[], Any]]] = [
+        ("disable (idle)", False, lambda: commands.put(ctrl.disable)),
+        ("disable (command pending)", True, lambda: commands.put(ctrl.disable)),
+        ("estop (idle)", False, ctrl.emergency_stop),
+        ("estop (command pending)", True, ctrl.emergency_stop),
+    ]
+    samples: Dict[str, List[float]] = {name: [] for name, _, _ in cases}
+    confirm: List[float] = []
+    try:
+        ctrl.start()
+        ctrl.wait_for_cycle(timeout=2.0)
+        for name, busy, click in cases:
+            for _ in range(min(iterations, 20) if busy else iterations):
+                latency = sample(click, busy)
+                if latency is not None:
+                    samples[name].append(latency)
+                if name == "estop (idle)":
+                    result = ctrl.estop.wait(2.0)
+                    if result is not None and result.confirm_s is not None:
+                        confirm.append(result.confirm_s)
+    finally:
+        commands.put(None)
+        listening.clear()
+        ctrl.stop()
+        can_if.disconnect()
+        sim.stop()
+        for t in threads:
+            t.join(1.0)
+        listener.shutdown()
+
+    stats = [LatencyStats.from_samples(name, samples[name]) for name, _, _ in cases]
+    stats.append(LatencyStats.from_samples("estop[click->all confirmed]", confirm))
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# GUI responsiveness (offscreen Qt unless QT_QPA_PLATFORM is set)
+# ---------------------------------------------------------------------------
+
+GUI_PROBE_INTERVAL_MS = 10   # probe timer period; longer gaps are UI stalls
+
+
+def _qt_spin(seconds: float, until: Optional[Callable[[], bool]] = None) -> None:
+    """Run the Qt event loop for up to ``seconds`` or until ``until()`` is true."""
+    from PySide6.QtCore import QEventLoop, QTimer
+
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    poll = QTimer()
+    if until is not None:
+        poll.timeout.connect(lambda: until() and loop.quit())
+        poll.start(20)
+    loop.exec()
+    poll.stop()
+
+
+def run_gui_benchmark(storm: int = 4, idle_s: float = 2.0) -> List[LatencyStats]:
+    """Measure how long the console's UI thread goes without processing events.
+
+    A probe timer fires every ``GUI_PROBE_INTERVAL_MS`` on the UI thread and
+    each sample is the gap between two firings, so anything that blocks the
+    event loop shows up as one long gap. Samples are taken connected to the
+    simulator while idle, and during a storm of ``storm`` Disable / Reset
+    Faults clicks made back-to-back while the simulated PCS does not answer
+    (every command waits for the full command timeout).
+
+    Returns:
+        LatencyStats of the frame gaps idle and during the storm, how long
+        each click handler took to return, click-to-result time, the
+        UI-thread time per telemetry update while idle, and UI-thread CPU
+        seconds per second with the console active, behind another window
+        and minimized (``idle_s`` each).
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QEvent, Qt, QTimer
+    from PySide6.QtWidgets import QApplication, QWidget
+
+    from dcdc_app.gui.main_window import MainWindow
+    from dcdc_app.metrics import REGISTRY
+
+    app = QApplication.instance() or QApplication([])
+    win = MainWindow()
+    win.show()
+
+    gaps: List[float] = []
+    last = [0.0]
+
+    def probe() -> None:
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+
+    probe_timer = QTimer()
+    probe_timer.setTimerType(Qt.TimerType.PreciseTimer)
+    probe_timer.timeout.connect(probe)
+
+    def start_probe() -> None:
+        gaps.clear()
+        last[0] = time.perf_counter()
+        probe_timer.start(GUI_PROBE_INTERVAL_MS)
+
+    results: List[float] = []
+    win._backend.command_result.connect(lambda cmd, ok: results.append(time.perf_counter()))
+    clicks = [win._on_disable, win._on_reset_faults]
+    click_s: List[float] = []
+    click_to_result: List[float] = []
+    try:
+        win._cmb_interface.setCurrentText("simulator")
+        win._on_connect()
+        _qt_spin(10.0, lambda: win._connection_state == "online")
+        if win._connection_state != "online":
+            raise RuntimeError("console did not connect to the simulator")
+        _qt_spin(0.5)
+
+        updates = REGISTRY.histogram("gui_telemetry_seconds")
+        updates.reset()
+        start_probe()
+        _qt_spin(idle_s)
+        probe_timer.stop()
+        idle = list(gaps)
+        update_stats = LatencyStats(
+            "telemetry update (idle)", updates.count, updates.mean, updates.percentile(50),
+            updates.percentile(95), updates.percentile(99), updates.max,
+        )
+
+        def ui_cpu(seconds: float) -> List[float]:
+            # UI-thread CPU per wall second, in quarter-second windows
+            samples = []
+            for _ in range(max(1, round(seconds / 0.25))):
+                c0, w0 = time.thread_time(), time.perf_counter()
+                _qt_spin(0.25)
+                samples.append((time.thread_time() - c0) / (time.perf_counter() - w0))
+            return samples
+
+        cpu_active = ui_cpu(idle_s)
+        other = QWidget()
+        other.show()
+        other.activateWindow()
+        _qt_spin(0.1)
+        cpu_background = ui_cpu(idle_s)
+        other.close()
+        win.showMinimized()
+        _qt_spin(0.1)
+        cpu_minimized = ui_cpu(idle_s)
+        win.showNormal()
+        win.activateWindow()
+        _qt_spin(0.2)
+
+        win._backend.worker._sim.answer_commands = False
+        start_probe()
+        clicked: List[float] = []
+        for i in range(storm):
+            t0 = time.perf_counter()
+            clicks[i % len(clicks)]()
+            clicked.append(t0)
+            click_s.append(time.perf_counter() - t0)
+        _qt_spin(storm * 3.0 + 5.0, lambda: len(results) >= storm)
+        _qt_spin(0.2)
+        probe_timer.stop()
+        busy = list(gaps)
+        click_to_result = [r - c for r, c in zip(results, clicked)]
+    finally:
+        probe_timer.stop()
+        win.close()
+        # Delete the widget tree now rather than whenever the garbage
+        # collector reaches it, possibly inside a later processEvents()
+        win.deleteLater()
+        app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    return [
+        LatencyStats.from_samples("ui frame gap (idle)", idle),
+        LatencyStats.from_samples("ui frame gap (command storm)", busy),
+        LatencyStats.from_samples("click handler", click_s),
+        LatencyStats.from_samples("click->result", click_to_result),
+        update_stats,
+        LatencyStats.from_samples("ui cpu per s (active)", cpu_active),
+        LatencyStats.from_samples("ui cpu per s (background)", cpu_background),
+        LatencyStats.from_samples("ui cpu per s (minimized)", cpu_minimized),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Startup time (fresh interpreter per sample)
+# ---------------------------------------------------------------------------
+
+# (name, interpreter arguments); "python" is the floor every command pays
+STARTUP_CASES: List[Tuple[str, List[str]]] = [
+    ("python", ["-c", "pass"]),
+    ("import dcdc_app.cli", ["-c", "import dcdc_app.cli"]),
+    ("cli --help", ["-m", "dcdc_app", "--help"]),
+    ("cli dump-faults", ["-m", "dcdc_app", "dump-faults"]),
+    ("import dcdc_app.protocol", ["-c", "import dcdc_app.protocol"]),
+    ("import dcdc_app.controller", ["-c", "import dcdc_app.controller"]),
+]
+
+# Console launch to first paint: the child patches QApplication.exec() so that
+# the first completed paint pass exits the process (spawn-to-exit = launch to
+# first paint). Offscreen unless a platform is set.
+_FIRST_PAINT_PROBE = (
+    "import os\n"
+    "os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')\n"
+    "from PySide6.QtCore import QEvent, QObject, QTimer\n"
+    "from PySide6.QtWidgets import QApplication\n"
+    "class _FirstPaint(QObject):\n"
+    "    def eventFilter(self, obj, event):\n"
+    "        if event.type() == QEvent.Type.Paint:\n"
+    "            QTimer.singleShot(0, lambda: os._exit(0))\n"
+    "        return False\n"
+    "_exec = QApplication.exec\n"
+    "def _exec_until_painted(*args):\n"
+    "    app = QApplication.instance()\n"
+    "    app.installEventFilter(_FirstPaint(app))\n"
+    "    return _exec()\n"
+    "QApplication.exec = staticmethod(_exec_until_painted)\n"
+    "from dcdc_app.gui.app import launch\n"
+    "launch(['dcdc-gui'])\n"
+)
+GUI_STARTUP_CASE: Tuple[str, List[str]] = ("gui launch->first paint", ["-c", _FIRST_PAINT_PROBE])
+
+# Modules an offline command should never pay for
+HEAVY_MODULES = ("can", "dcdc_app.protocol", "dcdc_app.controller", "PySide6", "pyqtgraph")
+
+_MODULES_PROBE = (
+    "import json, sys\n"
+    "from dcdc_app.cli import main\n"
+    "try:\n"
+    "    main(sys.argv[1:])\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "sys.stderr.write('\\n' + json.dumps(sorted(sys.modules)))\n"
+)
+
+
+def _package_env() -> Dict[str, str]:
+    """Environment in which a child interpreter imports this checkout of dcdc_app."""
+    env = dict(os.environ)
+    root = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def loaded_modules(argv: List[str]) -> List[str]:
+    """HEAVY_MODULES that ``dcdc-pcs <argv>`` imports, checked in a fresh interpreter."""
+    import subprocess
+
+    proc = subprocess.run(
+        [sys.executable, "-c", _MODULES_PROBE, *argv],
+        capture_output=True, text=True, env=_package_env(), check=False,
+    )
+    modules = set(json.loads(proc.stderr.rstrip().rsplit("\n", 1)[-1]))
+    return [m for m in HEAVY_MODULES if m in modules]
+
+
+def run_startup_benchmark(
+    iterations: int = 20,
+    name_filter: Optional[str] = None,
+) -> List[LatencyStats]:
+    """Time STARTUP_CASES, each in ``iterations`` fresh interpreters.
+
+    Samples are process wall times (spawn to exit), so they include the
+    interpreter's own startup; compare against the "python" row. With
+    PySide6 and pyqtgraph installed GUI_STARTUP_CASE runs too.
+    """
+    import importlib.util
+    import subprocess
+
+    cases = list(STARTUP_CASES)
+    if all(importlib.util.find_spec(m) is not None for m in ("PySide6", "pyqtgraph")):
+        cases.append(GUI_STARTUP_CASE)
+    env = _package_env()
+    stats = []
+    for name, argv in cases:
+        if name_filter and name_filter not in name:
+            continue
+        samples = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, *argv], env=env, check=False,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append(time.perf_counter() - t0)
+        stats.append(LatencyStats.from_samples(name, samples))
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Sustained-throughput soak (generator -> virtual bus -> controller RX loop)
+# ---------------------------------------------------------------------------
+
+SOAK_CHANNEL = "virtual_pcs"
+SOAK_SUSTAINED_RATIO = 0.99  # processed/generated needed to call a rate sustained
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def load_replay_frames(filepath: str) -> List[Tuple[int, bytes]]:
+    """Load the RX frames of a FrameLogger CSV/JSONL recording for replay."""
+    from dcdc_app.logging_utils import iter_frame_log
+
+    frames = [(can_id, data) for _, direction, can_id, data in iter_frame_log(filepath)
+              if direction == "RX"]
+    if not frames:
+        raise ValueError(f"No RX frames found in {filepath}")
+    return frames
+
+
+@dataclass
+class SoakSample:
+    """Periodic progress sample taken while a soak run is in progress."""
+    elapsed: float
+    generated: int
+    processed: int
+    queue_depth: int
+    rss_bytes: int
+
+
+@dataclass
+class SoakResult:
+    """Outcome of one soak run at a fixed target rate."""
+    target_rate: float
+    duration: float
+    generated: int
+    received: int
+    processed: int
+    processed_in_window: int
+    backlog: int              # generated but still unprocessed after the drain timeout
+    dropped: int              # frames lost: discarded by the full CAN inbox
+    max_queue_depth: int
+    rx_cpu_per_frame: float
+    process_cpu_per_frame: float
+    rss_start: int
+    rss_end: int
+
+    @property
+    def throughput(self) -> float:
+        """Frames/sec fully processed during the generation window."""
+        return self.processed_in_window / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def queued_at_stop(self) -> int:
+        """Frames still queued when generation stopped."""
+        return self.generated - self.processed_in_window
+
+    @property
+    def sustained(self) -> bool:
+        return self.generated > 0 and (
+            self.processed_in_window >= self.generated * SOAK_SUSTAINED_RATIO
+        )
+
+    @property
+    def memory_growth(self) -> int:
+        return self.rss_end - self.rss_start
+
+
+def _bus_queue_depth(can_if: Any) -> int:
+    """Frames received but not yet processed by the controller."""
+    return can_if.rx_queue_depth
+
+
+def run_soak(
+    rate: float,
+    duration: float,
+    frames: Optional[List[Tuple[int, bytes]]] = None,
+    with_logger: bool = True,
+    drain_timeout: float = 2.0,
+    sample_interval: float = 1.0,
+    progress: Optional[Callable[[SoakSample], None]] = None,
+) -> SoakResult:
+    """Flood the RX pipeline at a fixed rate and measure what it sustains.
+
+    Args:
+        rate: Target frames/sec (0 = as fast as the generator can send).
+        duration: Generation window in seconds.
+        frames: Frames to cycle through (default: realistic periodic PF mix).
+        with_logger: Attach a CSV FrameLogger (to a temp file) to the controller.
+        drain_timeout: Seconds to wait for the backlog after generation stops.
+        sample_interval: Seconds between progress samples.
+        progress: Optional callback receiving each SoakSample.
+
+    Returns:
+        SoakResult with throughput, backlog, drops, CPU per frame and memory growth.
+    """
+    import can
+
+    from dcdc_app.can_iface import CANInterface
+    from dcdc_app.controller import ControllerConfig, PCSController
+
+    messages = [
+        can.Message(arbitration_id=can_id, data=data, is_extended_id=True)
+        for can_id, data in (frames or RX_MIX_FRAMES)
+    ]
+
+    processed = [0]
+    rx_cpu = [0.0, 0.0]  # thread CPU time at first / last processed frame
+
+    def on_frame(sa: int, pf: int, name: str, decoded: Any, timestamp: float) -> None:
+        if processed[0] == 0:
+            rx_cpu[0] = time.thread_time()
+        processed[0] += 1
+        rx_cpu[1] = time.thread_time()
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="dcdc-soak-")
+    frame_logger = None
+    if with_logger:
+        frame_logger = FrameLogger(os.path.join(tmpdir.name, "soak.csv"), fmt="csv", console=False)
+        frame_logger.open()
+
+    can_if = CANInterface(simulated=True)
+    ctrl = PCSController(can_if, ControllerConfig(auto_heartbeat=False), frame_logger)
+    ctrl.add_frame_callback(on_frame)
+    gen_bus = can.Bus(interface="virtual", channel=SOAK_CHANNEL, receive_own_messages=False)
+
+    generated = [0]
+    stop_gen = threading.Event()
+
+    def generator() -> None:
+        n_msgs = len(messages)
+        start = time.perf_counter()
+        while not stop_gen.is_set():
+            elapsed = time.perf_counter() - start
+            target = int(elapsed * rate) if rate > 0 else generated[0] + n_msgs
+            while generated[0] < target:
+                gen_bus.send(messages[generated[0] % n_msgs])
+                generated[0] += 1
+            if rate > 0:
+                time.sleep(0.001)
+
+    max_depth = 0
+    rss_start = _rss_bytes()
+    cpu_start = time.process_time()
+    try:
+        ctrl.start()
+        gen_thread = threading.Thread(target=generator, daemon=True, name="soak-gen")
+        t0 = time.perf_counter()
+        gen_thread.start()
+        next_sample = t0 + sample_interval
+        while True:
+            now = time.perf_counter()
+            if now - t0 >= duration:
+                break
+            time.sleep(min(0.05, max(0.0, duration - (now - t0))))
+            max_depth = max(max_depth, _bus_queue_depth(can_if))
+            if now >= next_sample:
+                next_sample += sample_interval
+                if progress:
+                    progress(SoakSample(now - t0, generated[0], processed[0],
+                                        _bus_queue_depth(can_if), _rss_bytes()))
+        stop_gen.set()
+        gen_thread.join(timeout=2.0)
+        window = time.perf_counter() - t0
+        processed_in_window = processed[0]
+
+        deadline = time.perf_counter() + drain_timeout
+        while (processed[0] + can_if.rx_dropped < generated[0]
+               and time.perf_counter() < deadline):
+            time.sleep(0.01)
+        cpu_total = time.process_time() - cpu_start
+        rss_end = _rss_bytes()
+        received = can_if.stats["rx_count"]
+        dropped = can_if.rx_dropped
+    finally:
+        ctrl.stop()
+        can_if.disconnect()
+        gen_bus.shutdown()
+        if frame_logger:
+            frame_logger.close()
+        tmpdir.cleanup()
+
+    n = max(1, processed[0])
+    return SoakResult(
+        target_rate=rate,
+        duration=window,
+        generated=generated[0],
+        received=received,
+        processed=processed[0],
+        processed_in_window=processed_in_window,
+        backlog=max(0, generated[0] - processed[0] - dropped),
+        dropped=dropped,
+        max_queue_depth=max_depth,
+        rx_cpu_per_frame=(rx_cpu[1] - rx_cpu[0]) / n,
+        process_cpu_per_frame=cpu_total / n,
+        rss_start=rss_start,
+        rss_end=rss_end,
+    )
+
+
+def run_soak_ramp(
+    start_rate: float,
+    duration: float,
+    frames: Optional[List[Tuple[int, bytes]]] = None,
+    with_logger: bool = True,
+    max_steps: int = 10,
+    progress: Optional[Callable[[SoakResult], None]] = None,
+) -> List[SoakResult]:
+    """Double the target rate until the pipeline can no longer keep up."""
+    results = []
+    rate = start_rate
+    for _ in range(max_steps):
+        res = run_soak(rate, duration, frames, with_logger=with_logger)
+        results.append(res)
+        if progress:
+            progress(res)
+        if not res.sustained:
+            break
+        rate *= 2
+    return results
+
+
+SOAK_HEADER = (
+    f"{'target/s':>9} {'achieved/s':>11} {'generated':>10} {'processed':>10} "
+    f"{'at stop':>8} {'backlog':>8} {'dropped':>8} {'max q':>7} {'rx us/fr':>9} {'cpu us/fr':>10} {'mem +KiB':>9}"
+)
+
+
+def format_soak(res: SoakResult) -> str:
+    """Format one soak result row."""
+    target = f"{res.target_rate:,.0f}" if res.target_rate > 0 else "max"
+    return (
+        f"{target:>9} {res.throughput:>11,.0f} {res.generated:>10d} {res.processed:>10d} "
+        f"{res.queued_at_stop:>8d} {res.backlog:>8d} {res.dropped:>8d} {res.max_queue_depth:>7d} "
+        f"{res.rx_cpu_per_frame * 1e6:>9.1f} {res.process_cpu_per_frame * 1e6:>10.1f} "
+        f"{res.memory_growth / 1024:>9.0f}"
+        + ("" if res.sustained else "  (not sustained)")
+    )
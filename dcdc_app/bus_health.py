@@ -0,0 +1,228 @@
+"""Per-(SA, PF) bus health: arrival rate, jitter, gaps and stale-signal detection.
+
+The controller keeps a single last-RX time for the whole bus, so a device that
+stops sending one status frame (e.g. 0x13) while 0x11 keeps arriving looks
+healthy. BusHealthMonitor tracks every (source address, PF) pair separately:
+
+- last arrival time and frame count
+- smoothed inter-arrival interval (-> observed rate vs the 200ms period)
+- inter-arrival jitter (smoothed |interval - expected period|)
+- gap count (intervals longer than ``gap_factor`` periods)
+- stale flag for periodic status PFs (no frame for ``stale_periods`` periods)
+
+Per-frame updates are O(1) writes into arrays preallocated per source address
+and indexed by PF. Stale/fresh transitions are reported to listeners as
+StaleEvent objects so callers can flag stale fields instead of showing frozen
+values.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from dcdc_app.protocol import HEARTBEAT_INTERVAL_MS, STATE_PFS, pf_name
+
+logger = logging.getLogger(__name__)
+
+# Smoothing factor for interval/jitter EWMAs (RFC 3550 uses 1/16)
+_ALPHA = 1.0 / 16.0
+
+
+@dataclass
+class StaleEvent:
+    """Transition of one periodic signal between fresh and stale."""
+    sa: int
+    pf: int
+    section: str     # PCSState section fed by this PF
+    stale: bool      # True = went stale, False = recovered
+    age: float       # seconds since the last frame at detection time
+    timestamp: float
+
+
+@dataclass
+class SignalHealth:
+    """Health figures for one (SA, PF) pair."""
+    sa: int
+    pf: int
+    name: str
+    count: int
+    last_seen: float
+    age: float
+    interval: float   # smoothed inter-arrival time, seconds
+    rate_hz: float
+    jitter: float     # smoothed |interval - expected|, seconds
+    gaps: int
+    stale: bool
+
+
+class _SourceStats:
+    """Preallocated per-PF arrays for one source address."""
+
+    __slots__ = ("last", "count", "interval", "jitter", "gaps", "stale", "seen")
+
+    def __init__(self):
+        self.last = array("d", bytes(8 * 256))
+        self.count = array("Q", bytes(8 * 256))
+        self.interval = array("d", bytes(8 * 256))
+        self.jitter = array("d", bytes(8 * 256))
+        self.gaps = array("Q", bytes(8 * 256))
+        self.stale = bytearray(256)
+        self.seen: List[int] = []  # PFs in first-seen order
+
+
+class BusHealthMonitor:
+    """Tracks frame timing per (SA, PF) and raises stale-signal events."""
+
+    def __init__(
+        self,
+        expected_period: float = HEARTBEAT_INTERVAL_MS / 1000.0,
+        stale_periods: float = 5.0,
+        gap_factor: float = 1.5,
+    ):
+        """Initialize the monitor.
+
+        Args:
+            expected_period: Nominal period of status frames in seconds (200ms).
+            stale_periods: A periodic signal is stale after this many periods
+                without a frame.
+            gap_factor: An inter-arrival time above this many periods counts
+                as a gap (i.e. at least one frame was missed).
+        """
+        self.expected_period = expected_period
+        self.stale_after = stale_periods * expected_period
+        self.gap_after = gap_factor * expected_period
+        self._sources: Dict[int, _SourceStats] = {}
+        self._listeners: List[Callable[[StaleEvent], None]] = []
+
+    def add_listener(self, callback: Callable[[StaleEvent], None]) -> None:
+        """Register a callback for stale/fresh transitions."""
+        self._listeners.append(callback)
+
+    def update(self, sa: int, pf: int, timestamp: float) -> None:
+        """Record the arrival of one frame."""
+        src = self._sources.get(sa)
+        if src is None:
+            src = self._sources[sa] = _SourceStats()
+        prev = src.last[pf]
+        src.last[pf] = timestamp
+        n = src.count[pf]
+        src.count[pf] = n + 1
+        if n == 0:
+            src.seen.append(pf)
+            return
+        dt = timestamp - prev
+        if dt > self.gap_after:
+            src.gaps[pf] += 1
+        if n == 1:
+            src.interval[pf] = dt
+        else:
+            src.interval[pf] += (dt - src.interval[pf]) * _ALPHA
+        src.jitter[pf] += (abs(dt - self.expected_period) - src.jitter[pf]) * _ALPHA
+        if src.stale[pf]:
+            src.stale[pf] = 0
+            self._emit(StaleEvent(sa, pf, STATE_PFS.get(pf, ""), False, dt, timestamp))
+
+    def check(self, now: float) -> List[StaleEvent]:
+        """Flag periodic signals that have gone quiet; returns new stale events."""
+        events = []
+        # update() runs on the RX thread and may add sources meanwhile
+        for sa, src in list(self._sources.items()):
+            for pf in src.seen:
+                if src.stale[pf] or pf not in STATE_PFS:
+                    continue
+                age = now - src.last[pf]
+                if age > self.stale_after:
+                    src.stale[pf] = 1
+                    events.append(StaleEvent(sa, pf, STATE_PFS[pf], True, age, now))
+        for event in events:
+            self._emit(event)
+        return events
+
+    def next_deadline(self) -> float:
+        """Earliest time a currently fresh periodic signal could go stale (inf if none)."""
+        deadline = math.inf
+        for src in list(self._sources.values()):
+            for pf in src.seen:
+                if not src.stale[pf] and pf in STATE_PFS:
+                    deadline = min(deadline, src.last[pf] + self.stale_after)
+        return deadline
+
+    def _emit(self, event: StaleEvent) -> None:
+        if event.stale:
+            logger.warning(
+                "Stale signal: SA=0x%02X PF=0x%02X (%s) no frame for %.1fs",
+                event.sa, event.pf, pf_name(event.pf), event.age,
+            )
+        else:
+            logger.info("Signal recovered: SA=0x%02X PF=0x%02X (%s)", event.sa, event.pf, pf_name(event.pf))
+        for cb in self._listeners:
+            try:
+                cb(event)
+            except Exception as e:
+                logger.debug("Stale listener error: %s", e)
+
+    def is_stale(self, sa: int, pf: int) -> bool:
+        src = self._sources.get(sa)
+        return bool(src and src.stale[pf])
+
+    def stale_sections(self, sa: Optional[int] = None) -> Set[str]:
+        """PCSState section names whose frames are currently stale.
+
+        Args:
+            sa: Limit to one source address (default: any device).
+        """
+        result = set()
+        for addr, src in list(self._sources.items()):
+            if sa is not None and addr != sa:
+                continue
+            for pf in src.seen:
+                if src.stale[pf]:
+                    result.add(STATE_PFS[pf])
+        return result
+
+    def snapshot(self, now: float) -> List[SignalHealth]:
+        """Health figures for every (SA, PF) seen so far, sorted by SA then PF."""
+        rows = []
+        for sa in sorted(self._sources):
+            src = self._sources[sa]
+            for pf in sorted(src.seen):
+                interval = src.interval[pf]
+                rows.append(SignalHealth(
+                    sa=sa,
+                    pf=pf,
+                    name=pf_name(pf),
+                    count=src.count[pf],
+                    last_seen=src.last[pf],
+                    age=now - src.last[pf],
+                    interval=interval,
+                    rate_hz=1.0 / interval if interval > 0 else 0.0,
+                    jitter=src.jitter[pf],
+                    gaps=src.gaps[pf],
+                    stale=bool(src.stale[pf]),
+                ))
+        return rows
+
+    def reset(self) -> None:
+        """Forget all sources (listeners are kept)."""
+        self._sources.clear()
+
+
+def format_health(rows: List[SignalHealth], expected_period: float) -> str:
+    """Render a health table for the CLI."""
+    expected_rate = 1.0 / expected_period
+    lines = [
+        f"  {'SA':<5} {'PF':<5} {'Name':<24} {'Count':>7} {'Rate Hz':>8} {'Exp':>5} "
+        f"{'Jitter ms':>9} {'Gaps':>5} {'Age s':>6}  State",
+    ]
+    for r in rows:
+        periodic = r.pf in STATE_PFS
+        lines.append(
+            f"  0x{r.sa:02X}  0x{r.pf:02X}  {r.name:<24} {r.count:>7d} {r.rate_hz:>8.2f} "
+            f"{expected_rate if periodic else 0:>5.1f} {r.jitter * 1000:>9.1f} {r.gaps:>5d} "
+            f"{r.age:>6.1f}  {'STALE' if r.stale else ('ok' if periodic else '-')}"
+        )
+    return "\n".join(lines)
@@ -2,11 +2,32 @@
 
 Provides a unified interface for sending/receiving CAN messages using python-can
 with PCAN backend (Windows/Linux) or a virtual/simulated bus for dry-run mode.
+
+Reception is event-driven: while connected, a reader thread moves frames from
+the bus into an inbox queue as they arrive, and ``recv()`` blocks on that
+queue. Where the backend exposes a file descriptor (SocketCAN, PCAN on Linux)
+the reader sleeps in ``select()`` on it together with a wakeup socket, so it
+stops immediately on disconnect. Other backends (virtual, PCAN on Windows)
+block in ``bus.recv()``, which wakes on arrival; the short timeout there only
+bounds how long disconnect() waits for the reader. ``interrupt()`` releases a
+consumer blocked in ``recv(timeout=None)`` at once.
+
+The inbox holds at most ``inbox_size`` frames: when the consumer falls that
+far behind, newly received frames are dropped and counted (``rx_dropped``,
+``can_rx_dropped_total``) instead of growing memory without limit.
+
+Per-frame diagnostics go to a FrameTrace ring (raw tuples, formatted only when
+read) rather than being formatted into debug log lines on every frame.
 """
 
 from __future__ import annotations
 
 import logging
+import queue
+import select
+import socket
+import sys
+import threading
 import time
 from typing import Callable, List, Optional
 
@@ -17,10 +38,21 @@ try:
 except ImportError:
     CAN_AVAILABLE = False
 
+from dcdc_app.metrics import REGISTRY, MetricsRegistry
 from dcdc_app.protocol import CAN_BITRATE
+from dcdc_app.trace import DEFAULT_TRACE_SIZE, FrameTrace
 
 logger = logging.getLogger(__name__)
 
+# Reader thread bus.recv() timeout for backends without a file descriptor
+READER_TIMEOUT = 0.5
+
+# Most frames held in the inbox before new ones are dropped (~1 min of a
+# 10-device fleet's periodic traffic)
+DEFAULT_INBOX_SIZE = 20000
+
+_WAKE = object()  # inbox sentinel: return None from a blocked recv()
+
 # Common PCAN channel names
 PCAN_CHANNELS = [
     "PCAN_USBBUS1",
@@ -42,6 +74,9 @@ class CANInterface:
         bitrate: int = CAN_BITRATE,
         simulated: bool = False,
         receive_own_messages: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        trace_size: int = DEFAULT_TRACE_SIZE,
+        inbox_size: int = DEFAULT_INBOX_SIZE,
     ):
         """Initialize CAN interface.
 
@@ -51,6 +86,10 @@ class CANInterface:
             bitrate: CAN bus bitrate (default 250000 from protocol spec).
             simulated: If True, use virtual bus instead of real hardware.
             receive_own_messages: If True, receive messages sent by this node.
+            metrics: Metrics registry (default: process-wide REGISTRY).
+            trace_size: Frames kept in the TX/RX trace ring (0 = no trace).
+            inbox_size: Received frames queued for recv() before new ones
+                are dropped.
         """
         self.interface = interface
         self.channel = channel
@@ -62,6 +101,34 @@ class CANInterface:
         self._tx_count = 0
         self._rx_count = 0
         self._error_count = 0
+        self._rx_dropped = 0
+        self._dropping = False
+        self._inbox_size = inbox_size
+        self._inbox: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._reader: Optional[threading.Thread] = None
+        self._reading = False
+        self._wake_pair: Optional[tuple] = None
+        # Raw TX/RX frames, formatted only when read (dump on demand or fault)
+        self.trace: Optional[FrameTrace] = FrameTrace(trace_size) if trace_size > 0 else None
+        self._trace_record = self.trace.record if self.trace is not None else None
+
+        self.metrics = metrics or REGISTRY
+        # TX instruments are written by the heartbeat thread, command callers
+        # and the e-stop thread; RX ones by the reader thread only
+        self._m_tx = self.metrics.counter("can_tx_frames_total", "CAN frames sent", shared=True)
+        self._m_rx = self.metrics.counter("can_rx_frames_total", "CAN frames received")
+        self._m_errors = self.metrics.counter(
+            "can_errors_total", "CAN send/receive/connect errors", shared=True,
+        )
+        self._m_tx_time = self.metrics.histogram(
+            "can_tx_seconds", "Time spent in bus.send()", shared=True,
+        )
+        self._m_queue = self.metrics.gauge(
+            "can_rx_queue_depth", "Frames received but not yet consumed by recv()",
+        )
+        self._m_dropped = self.metrics.counter(
+            "can_rx_dropped_total", "Received frames dropped because the inbox was full",
+        )
 
     @property
     def connected(self) -> bool:
@@ -73,8 +140,26 @@ class CANInterface:
             "tx_count": self._tx_count,
             "rx_count": self._rx_count,
             "error_count": self._error_count,
+            "rx_dropped": self._rx_dropped,
         }
 
+    @property
+    def rx_dropped(self) -> int:
+        """Received frames dropped because the inbox was full."""
+        return self._rx_dropped
+
+    @property
+    def rx_queue_depth(self) -> int:
+        """Frames received from the bus but not yet returned by recv()."""
+        depth = self._inbox.qsize()
+        bus_queue = getattr(self._bus, "queue", None)  # virtual bus backlog
+        if bus_queue is not None:
+            try:
+                depth += bus_queue.qsize()
+            except NotImplementedError:
+                pass
+        return depth
+
     def connect(self) -> None:
         """Open the CAN bus connection."""
         if not CAN_AVAILABLE:
@@ -87,33 +172,42 @@ class CANInterface:
             self.disconnect()
 
         try:
-            if self.simulated:
-                self._bus = can.Bus(
-                    interface="virtual",
-                    channel="virtual_pcs",
-                    bitrate=self.bitrate,
-                    receive_own_messages=self._receive_own,
-                )
-                logger.info("Connected to simulated (virtual) CAN bus")
-            else:
-                self._bus = can.Bus(
-                    interface=self.interface,
-                    channel=self.channel,
-                    bitrate=self.bitrate,
-                    receive_own_messages=self._receive_own,
-                )
-                logger.info(
-                    "Connected to %s on %s at %d bps",
-                    self.interface, self.channel, self.bitrate,
-                )
+            self._bus = self._open_bus()
             self._connected = True
         except Exception as e:
             self._error_count += 1
+            self._m_errors.inc()
             logger.error("Failed to connect: %s", e)
             raise
+        self._inbox = queue.SimpleQueue()  # drop frames left from a previous connection
+        self._start_reader()
+
+    def _open_bus(self) -> Bus:
+        if self.simulated:
+            bus = can.Bus(
+                interface="virtual",
+                channel="virtual_pcs",
+                bitrate=self.bitrate,
+                receive_own_messages=self._receive_own,
+            )
+            logger.info("Connected to simulated (virtual) CAN bus")
+        else:
+            bus = can.Bus(
+                interface=self.interface,
+                channel=self.channel,
+                bitrate=self.bitrate,
+                receive_own_messages=self._receive_own,
+            )
+            logger.info(
+                "Connected to %s on %s at %d bps",
+                self.interface, self.channel, self.bitrate,
+            )
+        return bus
 
     def disconnect(self) -> None:
         """Close the CAN bus connection."""
+        self._stop_reader()
+        self.interrupt()
         if self._bus is not None:
             try:
                 self._bus.shutdown()
@@ -139,52 +233,211 @@ class CANInterface:
             logger.error("Cannot send: not connected")
             return False
 
+        payload = data[:8]
         msg = can.Message(
             arbitration_id=can_id,
-            data=data[:8],
+            data=payload,
             is_extended_id=is_extended,
-            dlc=len(data[:8]),
+            dlc=len(payload),
         )
 
         try:
+            t0 = time.perf_counter()
             self._bus.send(msg)
+            self._m_tx_time.observe(time.perf_counter() - t0)
             self._tx_count += 1
-            logger.debug(
-                "TX  ID=0x%08X DLC=%d Data=%s",
-                can_id, msg.dlc, data[:8].hex(" "),
-            )
+            self._m_tx.inc()
+            if self._trace_record is not None:
+                self._trace_record(time.time(), "TX", can_id, msg.data)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("TX  ID=0x%08X DLC=%d Data=%s", can_id, msg.dlc, msg.data.hex(" "))
             return True
         except can.CanError as e:
             self._error_count += 1
+            self._m_errors.inc()
             logger.error("TX error: %s", e)
             return False
 
-    def recv(self, timeout: float = 1.0) -> Optional[can.Message]:
+    def send_messages(self, msgs: List[can.Message]) -> int:
+        """Send pre-built messages back to back (emergency stop path).
+
+        Skips per-frame Message construction, send timing and debug logging;
+        the frames are added to the trace only after the last one is sent.
+
+        Returns:
+            Number of messages the bus accepted.
+        """
+        bus = self._bus
+        if not self._connected or bus is None:
+            return 0
+        sent = []
+        for msg in msgs:
+            try:
+                bus.send(msg)
+                sent.append(msg)
+            except can.CanError as e:
+                self._error_count += 1
+                self._m_errors.inc()
+                logger.error("TX error: %s", e)
+        self._tx_count += len(sent)
+        self._m_tx.inc(len(sent))
+        if self._trace_record is not None:
+            now = time.time()
+            for msg in sent:
+                self._trace_record(now, "TX", msg.arbitration_id, msg.data)
+        return len(sent)
+
+    def recv(self, timeout: Optional[float] = 1.0) -> Optional[can.Message]:
         """Receive a CAN message.
 
         Args:
-            timeout: Receive timeout in seconds (None for blocking).
+            timeout: Receive timeout in seconds (None blocks until a frame
+                arrives, interrupt() is called or the bus is disconnected).
 
         Returns:
-            Received Message or None on timeout.
+            Received Message or None on timeout/interrupt.
         """
-        if not self._connected or self._bus is None:
+        if not self._connected:
+            return None
+        try:
+            msg = self._inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if msg is _WAKE:
             return None
+        self._m_queue.set(self._inbox.qsize())
+        return msg
 
+    def recv_batch(
+        self, max_frames: int = 256, timeout: Optional[float] = 1.0,
+    ) -> List[can.Message]:
+        """Receive every frame already queued, up to ``max_frames``.
+
+        Blocks like recv() for the first frame only, then drains what has
+        arrived since without waiting again, so a burst is handed over in one
+        call instead of one wakeup per frame.
+
+        Args:
+            max_frames: Upper bound on the batch size.
+            timeout: Wait for the first frame (None blocks until a frame
+                arrives, interrupt() is called or the bus is disconnected).
+
+        Returns:
+            Received messages in arrival order (empty on timeout/interrupt).
+        """
+        if not self._connected:
+            return []
+        inbox = self._inbox
+        try:
+            msg = inbox.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        if msg is _WAKE:
+            return []
+        batch = [msg]
+        get = inbox.get_nowait
+        while len(batch) < max_frames:
+            try:
+                msg = get()
+            except queue.Empty:
+                break
+            if msg is _WAKE:
+                break  # the caller is returning anyway
+            batch.append(msg)
+        self._m_queue.set(inbox.qsize())
+        return batch
+
+    def interrupt(self) -> None:
+        """Make a recv() blocked in another thread return None now."""
+        self._inbox.put(_WAKE)
+
+    # -- Reader thread ---------------------------------------------------------
+
+    def _start_reader(self) -> None:
+        fd = None
+        if sys.platform != "win32":
+            try:
+                fd = self._bus.fileno()
+            except (NotImplementedError, AttributeError, OSError):
+                fd = None
+            if fd is not None and fd < 0:
+                fd = None
+        if fd is not None:
+            self._wake_pair = socket.socketpair()
+        self._reading = True
+        self._reader = threading.Thread(
+            target=self._reader_loop, args=(self._bus, fd), daemon=True, name="can-reader",
+        )
+        self._reader.start()
+
+    def _stop_reader(self) -> None:
+        self._reading = False
+        if self._wake_pair is not None:
+            try:
+                self._wake_pair[1].send(b"\0")
+            except OSError:
+                pass
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join(timeout=READER_TIMEOUT + 1.0)
+        self._reader = None
+        if self._wake_pair is not None:
+            for sock in self._wake_pair:
+                sock.close()
+            self._wake_pair = None
+
+    def _reader_loop(self, bus: Bus, fd: Optional[int]) -> None:
+        """Move frames from the bus into the inbox as they arrive."""
+        if fd is not None:
+            wake = self._wake_pair[0]
+            while self._reading:
+                try:
+                    readable, _, _ = select.select([fd, wake], [], [])
+                except (OSError, ValueError):
+                    break
+                if wake in readable:
+                    break
+                msg = self._bus_recv(bus, 0.0)
+                while msg is not None:
+                    self._deliver(msg)
+                    msg = self._bus_recv(bus, 0.0)
+        else:
+            while self._reading:
+                msg = self._bus_recv(bus, READER_TIMEOUT)
+                if msg is not None:
+                    self._deliver(msg)
+
+    def _bus_recv(self, bus: Bus, timeout: float) -> Optional[can.Message]:
         try:
-            msg = self._bus.recv(timeout=timeout)
-            if msg is not None:
-                self._rx_count += 1
-                logger.debug(
-                    "RX  ID=0x%08X DLC=%d Data=%s",
-                    msg.arbitration_id, msg.dlc, msg.data.hex(" "),
-                )
-            return msg
+            return bus.recv(timeout=timeout)
         except can.CanError as e:
             self._error_count += 1
+            self._m_errors.inc()
             logger.error("RX error: %s", e)
+            time.sleep(0.1)  # don't spin on a persistent bus error
             return None
 
+    def _deliver(self, msg: can.Message) -> None:
+        self._rx_count += 1
+        self._m_rx.inc()
+        if self._trace_record is not None:
+            self._trace_record(msg.timestamp, "RX", msg.arbitration_id, msg.data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "RX  ID=0x%08X DLC=%d Data=%s",
+                msg.arbitration_id, msg.dlc, msg.data.hex(" "),
+            )
+        inbox = self._inbox
+        if inbox.qsize() >= self._inbox_size:
+            self._rx_dropped += 1
+            self._m_dropped.inc()
+            if not self._dropping:
+                self._dropping = True
+                logger.warning("RX inbox full (%d frames), dropping received frames",
+                               self._inbox_size)
+            return
+        self._dropping = False
+        inbox.put(msg)
+
     def set_filters(self, filters: Optional[List[dict]] = None) -> None:
         """Set CAN message filters.
 
@@ -10,20 +10,25 @@ Examples:
     python -m dcdc_app.cli --dry-run monitor
     python -m dcdc_app.cli --channel PCAN_USBBUS1 enable
     python -m dcdc_app.cli --dry-run record --duration 10 --out data.csv
+
+Only the standard library and constants.py are imported up front; each
+command imports the subsystems it uses (python-can, controller, simulator,
+GUI, ...) when it runs, so offline commands such as ``dump-faults`` and
+``--help`` start without loading the CAN stack.
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import os
 import signal
 import sys
 import time
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
-from dcdc_app.can_iface import CANInterface, list_pcan_interfaces
-from dcdc_app.controller import ControllerConfig, PCSController
-from dcdc_app.logging_utils import FrameLogger, setup_logging
-from dcdc_app.protocol import (
+from dcdc_app.constants import (
+    ACTIVE_STATES,
     CAN_BITRATE,
     FAULT_CODES,
     MODE_PARAMS,
@@ -32,7 +37,12 @@ from dcdc_app.protocol import (
     WorkingMode,
     fault_description,
 )
-from dcdc_app.simulator import SimulatedPCS
+
+if TYPE_CHECKING:
+    from dcdc_app.can_iface import CANInterface
+    from dcdc_app.controller import PCSController
+    from dcdc_app.logging_utils import FrameLogger
+    from dcdc_app.simulator import SimulatedPCS
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -46,9 +56,12 @@ Reference: YSTECH CAN communication protocol v1.11 (2023-11-27)
 
 Examples:
   %(prog)s --dry-run monitor                  Monitor PCS in simulation mode
+  %(prog)s monitor --tui --refresh 2          Full-screen dashboard, 2 redraws/s
   %(prog)s --channel PCAN_USBBUS1 enable      Start the PCS device
   %(prog)s --dry-run set cv 400               Set DC constant voltage to 400V
   %(prog)s record --duration 60 --out log.csv Record 60 seconds to CSV
+  %(prog)s daemon &                           Keep one connection open; later
+                                              commands go through it
 """,
     )
 
@@ -82,9 +95,55 @@ Examples:
         "--log-file", default=None,
         help="Application log file path",
     )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Print internal metrics (counters, latency histograms) on exit",
+    )
+    parser.add_argument(
+        "--trace-dir", default=None, metavar="DIR",
+        help="Flight recorder: write the last TX/RX frames to DIR on a fault, a command "
+             "timeout or SIGUSR1 (monitor)",
+    )
+    parser.add_argument(
+        "--trace-seconds", type=float, default=30.0,
+        help="Flight recorder: seconds of lead-up per dump (default: 30)",
+    )
+    parser.add_argument(
+        "--trace-format", default="bin", choices=["bin", "csv", "jsonl"],
+        help="Flight recorder: dump format (default: bin)",
+    )
+    parser.add_argument(
+        "--ready-timeout", type=float, default=2.0, metavar="SEC",
+        help="Longest wait for the first full status cycle after connecting, and for "
+             "the state change after enable/disable (default: 2)",
+    )
+    parser.add_argument(
+        "--socket", default=None, metavar="PATH",
+        help="Daemon socket (default: per-user path for --pcs-addr). One-shot commands "
+             "use a running daemon instead of opening the bus themselves",
+    )
+    parser.add_argument(
+        "--no-daemon", action="store_true",
+        help="Always open the bus directly, even if a daemon is running",
+    )
 
     sub = parser.add_subparsers(dest="command", help="Available commands")
 
+    def add_filter_args(p: argparse.ArgumentParser) -> None:
+        p.add_argument(
+            "--changes-only", action="store_true",
+            help="Only log/report status frames whose values changed",
+        )
+        p.add_argument(
+            "--deadband", action="append", default=[], metavar="[SIGNAL=]ABS[,REL%]",
+            help="Deadband for change detection, e.g. 0.5, dc.current=1%%, "
+                 "grid_voltage=0.5,0.2%% (repeatable; implies --changes-only)",
+        )
+        p.add_argument(
+            "--keepalive", type=float, default=5.0,
+            help="With change detection, still report each frame every N seconds (default: 5)",
+        )
+
     # list-interfaces
     sub.add_parser("list-interfaces", help="List available PCAN interfaces")
 
@@ -98,6 +157,23 @@ Examples:
         "--raw", action="store_true",
         help="Show raw hex data without decoding",
     )
+    mon.add_argument(
+        "--tui", action="store_true",
+        help="Full-screen dashboard of every device instead of printing each frame",
+    )
+    mon.add_argument(
+        "--refresh", type=float, default=4.0, metavar="HZ",
+        help="Dashboard refreshes per second with --tui (default: 4)",
+    )
+    mon.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve OpenMetrics on http://127.0.0.1:PORT/metrics while running",
+    )
+    mon.add_argument(
+        "--archive", default=None, metavar="DB",
+        help="Also append per-cycle telemetry to a SQLite archive (see 'query')",
+    )
+    add_filter_args(mon)
 
     # enable
     sub.add_parser("enable", help="Enable (start) the PCS device")
@@ -105,6 +181,12 @@ Examples:
     # disable
     sub.add_parser("disable", help="Disable (stop) the PCS device")
 
+    # estop
+    sub.add_parser(
+        "estop",
+        help="Emergency stop: stop every known device and broadcast, retransmit until confirmed",
+    )
+
     # set
     set_cmd = sub.add_parser("set", help="Set PCS parameter or working mode")
     set_cmd.add_argument(
@@ -132,9 +214,115 @@ Examples:
         "--out", "-o", required=True,
         help="Output file path (.csv or .jsonl)",
     )
+    rec.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve OpenMetrics on http://127.0.0.1:PORT/metrics while running",
+    )
+    rec.add_argument(
+        "--archive", default=None, metavar="DB",
+        help="Also append per-cycle telemetry to a SQLite archive (see 'query')",
+    )
+    add_filter_args(rec)
 
     # status
-    sub.add_parser("status", help="Read and display current PCS status")
+    st = sub.add_parser("status", help="Read and display current PCS status")
+    st.add_argument(
+        "--stats", action="store_true",
+        help="Also print rolling min/max/mean/std/RMS per signal",
+    )
+    st.add_argument(
+        "--window", default=None, choices=["1m", "1h", "session"],
+        help="Statistics window for --stats (default: 1m, as for the API and daemon)",
+    )
+    st.add_argument(
+        "--wait", type=float, default=1.5,
+        help="Longest wait for a full status cycle before printing (default: 1.5)",
+    )
+
+    # export
+    exp = sub.add_parser(
+        "export", help="Write one wide row per 200 ms cycle (CSV/Parquet/Arrow/NPZ/SQLite)",
+    )
+    exp.add_argument(
+        "source", nargs="?", default=None,
+        help="Frame log (CSV/JSONL) to convert; omit to capture live from the bus",
+    )
+    exp.add_argument(
+        "--out", "-o", required=True,
+        help="Output file (.csv, .parquet, .arrow, .npz or .db)",
+    )
+    exp.add_argument(
+        "--format", default="auto", choices=["auto", "csv", "parquet", "arrow", "npz", "sqlite"],
+        help="Output format (default: from the file extension)",
+    )
+    exp.add_argument(
+        "--duration", "-d", type=float, default=10.0,
+        help="Live capture duration in seconds (default: 10)",
+    )
+    exp.add_argument(
+        "--batch-rows", type=int, default=1000,
+        help="Rows per written batch/chunk (default: 1000)",
+    )
+
+    # query
+    qry = sub.add_parser("query", help="Query a SQLite telemetry archive")
+    qry.add_argument("db", help="Archive database written by --archive or 'export -o X.db'")
+    qry.add_argument(
+        "--since", default=None,
+        help="Start time: epoch seconds, ISO datetime or an age (15m, 1h, 2d ago)",
+    )
+    qry.add_argument("--until", default=None, help="End time (same formats as --since)")
+    qry.add_argument(
+        "--addr", type=lambda x: int(x, 0), default=None,
+        help="Only this device source address (e.g. 0xFA)",
+    )
+    qry.add_argument(
+        "--columns", "-c", default="dc_voltage,dc_current,dc_power",
+        help="Comma-separated columns for row queries (default: dc_voltage,dc_current,dc_power)",
+    )
+    qry.add_argument(
+        "--agg", choices=["min", "max", "avg", "sum", "count"], default=None,
+        help="Aggregate --field instead of listing rows",
+    )
+    qry.add_argument("--field", "-f", default=None, help="Column to aggregate, e.g. dc_inlet_temperature")
+    qry.add_argument(
+        "--every", default=None,
+        help="Aggregate per time bucket: 30s, 15m, 1h, 1d (default: whole range)",
+    )
+    qry.add_argument("--limit", type=int, default=None, help="Maximum rows for row queries")
+    qry.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+
+    # integrate
+    integ = sub.add_parser(
+        "integrate", help="Integrate Ah/Wh from hi-res DC frames and compare with the PCS counters",
+    )
+    integ.add_argument(
+        "source", nargs="?", default=None,
+        help="Frame log (CSV/JSONL) to integrate; omit to integrate live from the bus",
+    )
+    integ.add_argument(
+        "--checkpoint", default=None, metavar="FILE",
+        help="JSON checkpoint: totals are restored from it and saved back periodically",
+    )
+    integ.add_argument(
+        "--reset", action="store_true",
+        help="Start from zero instead of restoring the checkpoint",
+    )
+    integ.add_argument(
+        "--duration", "-d", type=float, default=60.0,
+        help="Live integration time in seconds (default: 60)",
+    )
+    integ.add_argument(
+        "--max-gap", type=float, default=1.0,
+        help="Do not integrate across sample gaps longer than this (seconds, default: 1)",
+    )
+
+    # health
+    health = sub.add_parser("health", help="Per-PF frame rate, jitter, gap and stale report")
+    health.add_argument(
+        "--duration", "-d", type=float, default=5.0,
+        help="Observation window in seconds (default: 5)",
+    )
 
     # version
     sub.add_parser("version", help="Read PCS firmware version")
@@ -146,14 +334,107 @@ Examples:
         help="Parameter type: 1=V/I limits, 2=power/AC limits, 3=frequency limits",
     )
 
+    # run-profile
+    prof = sub.add_parser(
+        "run-profile",
+        help="Run a battery test profile (JSON steps with until/abort conditions)",
+    )
+    prof.add_argument("profile", help="Profile JSON file")
+    prof.add_argument(
+        "--repeat", type=int, default=None,
+        help="Override the profile's repeat count",
+    )
+    prof.add_argument(
+        "--step-log", default=None, metavar="CSV",
+        help="Write one row per executed step (timing, end condition, Ah/Wh)",
+    )
+
     # gui
-    sub.add_parser("gui", help="Launch the graphical Mission Console (requires PySide6)")
+    gui = sub.add_parser("gui", help="Launch the graphical Mission Console (requires PySide6)")
+    gui.add_argument(
+        "--background-refresh", type=float, default=1.0, metavar="HZ",
+        help="Card and plot refreshes per second while another window is active "
+             "(default: 1; nothing is drawn while minimized)",
+    )
+
+    # daemon
+    dmn = sub.add_parser(
+        "daemon",
+        help="Keep a controller connected and serve commands over a local socket",
+    )
+    dmn.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve OpenMetrics on http://127.0.0.1:PORT/metrics while running",
+    )
+
+    # bench
+    bench = sub.add_parser("bench", help="Run performance benchmarks")
+    bench.add_argument(
+        "suite", choices=["protocol", "latency", "soak", "startup", "estop", "gui"],
+        help="Benchmark suite: protocol = encode/decode/logging hot paths, "
+             "latency = command/RX latency against the simulator, "
+             "soak = sustained RX pipeline throughput, "
+             "startup = interpreter + import + offline command time, "
+             "estop = click-to-bus latency of disable vs emergency stop, "
+             "gui = console UI-thread stalls during a command storm (needs PySide6)",
+    )
+    bench.add_argument(
+        "--baseline", default=None,
+        help="Compare against this JSON baseline; exit 1 on regression",
+    )
+    bench.add_argument(
+        "--save-baseline", default=None,
+        help="Write results to this JSON baseline file",
+    )
+    bench.add_argument(
+        "--threshold", type=float, default=None,
+        help="Allowed throughput drop vs baseline as a fraction "
+             "(default: bench.DEFAULT_THRESHOLD)",
+    )
+    bench.add_argument(
+        "--min-time", type=float, default=0.2,
+        help="Minimum seconds per timed run (default: 0.2)",
+    )
+    bench.add_argument(
+        "--filter", default=None,
+        help="Only run benchmarks whose name contains this text",
+    )
+    bench.add_argument(
+        "--iterations", type=int, default=50,
+        help="Command rounds for the latency and estop suites, fresh interpreters "
+             "per case for the startup suite (default: 50)",
+    )
+    bench.add_argument(
+        "--rate", type=float, default=2000.0,
+        help="Soak: generated frames/sec, 0 = as fast as possible (default: 2000)",
+    )
+    bench.add_argument(
+        "--duration", type=float, default=10.0,
+        help="Soak: generation window per run in seconds (default: 10)",
+    )
+    bench.add_argument(
+        "--replay", default=None,
+        help="Soak: replay RX frames from a recorded CSV/JSONL log instead of synthetic frames",
+    )
+    bench.add_argument(
+        "--ramp", action="store_true",
+        help="Soak: double the rate until the pipeline stops keeping up",
+    )
+    bench.add_argument(
+        "--no-logger", action="store_true",
+        help="Soak: run without a FrameLogger attached",
+    )
+    bench.add_argument(
+        "--storm", type=int, default=4,
+        help="GUI: commands clicked back-to-back while the PCS does not answer (default: 4)",
+    )
 
     return parser
 
 
 def _make_can(args) -> CANInterface:
     """Create CAN interface from parsed args."""
+    from dcdc_app.can_iface import CANInterface
     return CANInterface(
         interface=args.interface,
         channel=args.channel,
@@ -162,11 +443,118 @@ def _make_can(args) -> CANInterface:
     )
 
 
+def _make_change_filter(args):
+    """Create a ChangeFilter if --changes-only/--deadband were given."""
+    specs = getattr(args, "deadband", None) or []
+    if not specs and not getattr(args, "changes_only", False):
+        return None
+    from dcdc_app.deadband import ChangeFilter, parse_rule
+    rules = dict(parse_rule(spec) for spec in specs)
+    return ChangeFilter(rules, max_silence=args.keepalive)
+
+
 def _make_controller(args, frame_logger: Optional[FrameLogger] = None) -> PCSController:
     """Create PCS controller from parsed args."""
+    from dcdc_app.controller import ControllerConfig, PCSController
     can_if = _make_can(args)
-    config = ControllerConfig(pcs_addr=args.pcs_addr)
-    return PCSController(can_if, config, frame_logger)
+    config = ControllerConfig(
+        pcs_addr=args.pcs_addr,
+        trace_dir=getattr(args, "trace_dir", None),
+        trace_seconds=getattr(args, "trace_seconds", 30.0),
+        trace_format=getattr(args, "trace_format", "bin"),
+    )
+    return PCSController(can_if, config, frame_logger, change_filter=_make_change_filter(args))
+
+
+def _start_exporter(args, ctrl: PCSController):
+    """Start the OpenMetrics exporter if --metrics-port was given."""
+    port = getattr(args, "metrics_port", None)
+    if port is None:
+        return None
+    from dcdc_app.exporter import OpenMetricsExporter
+    exporter = OpenMetricsExporter(ctrl, port=port)
+    exporter.start()
+    print(f"Serving metrics on {exporter.url}")
+    return exporter
+
+
+def _start_archive(args, ctrl: PCSController):
+    """Feed per-cycle rows into a SQLite archive if --archive was given.
+
+    Returns:
+        (archive, assembler) or None.
+    """
+    path = getattr(args, "archive", None)
+    if not path:
+        return None
+    from dcdc_app.archive import TelemetryArchive
+    from dcdc_app.export import CycleAssembler
+    archive = TelemetryArchive(path)
+    assembler = CycleAssembler(archive.write_row)
+    ctrl.add_frame_callback(assembler.on_frame, unfiltered=True)
+    print(f"Archiving cycles to {path}")
+    return archive, assembler
+
+
+def _close_archive(sink) -> None:
+    if sink:
+        archive, assembler = sink
+        assembler.flush()
+        archive.close()
+
+
+def _start_simulator(args) -> Optional[SimulatedPCS]:
+    """Start the simulated PCS for --dry-run (None on real hardware)."""
+    if not args.dry_run:
+        return None
+    from dcdc_app.simulator import SimulatedPCS
+    sim = SimulatedPCS(pcs_addr=args.pcs_addr)
+    sim.start()
+    return sim
+
+
+def _socket_path(args) -> str:
+    from dcdc_app.daemon import default_socket_path
+    return args.socket or default_socket_path(args.pcs_addr, args.interface, args.channel)
+
+
+@contextlib.contextmanager
+def _controller_session(args, timeout: Optional[float] = None) -> Iterator[Any]:
+    """Controller for a one-shot command: the daemon's if one is running.
+
+    Yields a RemoteController when a daemon for this PCS (address, interface,
+    channel and bitrate) is listening (no
+    bus setup, state already warm), otherwise starts the simulator (with
+    --dry-run) and a local controller and waits until the first full status
+    cycle has arrived, or ``timeout`` (default --ready-timeout) has passed.
+    """
+    if not args.no_daemon:
+        from dcdc_app.daemon import connect
+        remote = connect(_socket_path(args), args.pcs_addr, args.dry_run,
+                         args.interface, args.channel, args.bitrate)
+        if remote is not None:
+            try:
+                yield remote
+            finally:
+                remote.close()
+            return
+
+    sim = _start_simulator(args)
+
+    ctrl = _make_controller(args)
+    try:
+        ctrl.start()
+        if timeout is None:
+            timeout = args.ready_timeout
+        if not ctrl.wait_for_cycle(timeout):
+            print(f"Warning: no complete status cycle from PCS 0x{args.pcs_addr:02X} "
+                  f"within {timeout:g}s", file=sys.stderr)
+        yield ctrl
+    finally:
+        ctrl.stop()
+        ctrl.can.disconnect()
+        if sim:
+            sim.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -175,6 +563,7 @@ def _make_controller(args, frame_logger: Optional[FrameLogger] = None) -> PCSCon
 
 def cmd_list_interfaces(args) -> int:
     print("Scanning for PCAN interfaces...")
+    from dcdc_app.can_iface import list_pcan_interfaces
     interfaces = list_pcan_interfaces()
     for iface in interfaces:
         print(f"  {iface}")
@@ -182,91 +571,109 @@ def cmd_list_interfaces(args) -> int:
 
 
 def cmd_monitor(args) -> int:
+    from dcdc_app.logging_utils import FrameLogger
+
     log_path = getattr(args, "log_frames", None)
     fmt = "jsonl" if log_path and log_path.endswith(".jsonl") else "csv"
-    frame_logger = FrameLogger(filepath=log_path, fmt=fmt, console=True)
+    # The dashboard redraws on a timer; per-frame console lines would tear it
+    frame_logger = FrameLogger(filepath=log_path, fmt=fmt, console=not args.tui)
+    if args.tui and args.refresh <= 0:
+        print("--refresh must be positive")
+        return 1
 
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
+    sim = _start_simulator(args)
 
     ctrl = _make_controller(args, frame_logger)
+    exporter = None
+    dashboard = None
     stop_event = [False]
 
     def on_signal(sig, frame):
         stop_event[0] = True
-        print("\nStopping monitor...")
+        if dashboard is None:
+            print("\nStopping monitor...")
 
     signal.signal(signal.SIGINT, on_signal)
+    if ctrl.recorder is not None and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda sig, frame: ctrl.trigger_dump("operator"))
+
+    archive = _start_archive(args, ctrl)
 
     try:
         frame_logger.open()
         ctrl.start()
+        exporter = _start_exporter(args, ctrl)
         print(f"Monitoring PCS (addr=0x{args.pcs_addr:02X})... Press Ctrl+C to stop.\n")
-
-        while not stop_event[0]:
-            time.sleep(0.5)
+        if ctrl.recorder is not None and hasattr(signal, "SIGUSR1"):
+            print(f"Flight recorder on: 'kill -USR1 {os.getpid()}' dumps the last "
+                  f"{args.trace_seconds:g}s to {args.trace_dir}\n")
+
+        if args.tui:
+            from dcdc_app.tui import Dashboard
+            dashboard = Dashboard(ctrl, refresh_hz=args.refresh)
+            dashboard.run(lambda: stop_event[0])
+        else:
+            while not stop_event[0]:
+                time.sleep(0.5)
     finally:
+        if exporter:
+            exporter.stop()
         ctrl.stop()
         ctrl.can.disconnect()
         frame_logger.close()
+        _close_archive(archive)
         if sim:
             sim.stop()
 
+    if dashboard is not None and dashboard.frames:
+        print(f"Dashboard: {dashboard.frames} refreshes, "
+              f"{dashboard.bytes_written / dashboard.frames:.0f} chars/refresh")
     return 0
 
 
 def cmd_enable(args) -> int:
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-        time.sleep(0.3)
-
-    ctrl = _make_controller(args)
-    try:
-        ctrl.start()
-        time.sleep(0.5)  # Let heartbeat establish
+    with _controller_session(args) as ctrl:
         success = ctrl.enable()
-        time.sleep(0.5)
         if success:
+            # Report the state the PCS moves to, not the one before the command
+            ctrl.wait_for_state(ACTIVE_STATES | {RunningState.FAULT}, args.ready_timeout)
             print("PCS enabled successfully")
             print(f"  State: {ctrl.state.status.state_name}")
         else:
             print("PCS enable FAILED - check connection and fault status")
             return 1
-    finally:
-        ctrl.stop()
-        ctrl.can.disconnect()
-        if sim:
-            sim.stop()
     return 0
 
 
 def cmd_disable(args) -> int:
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-        time.sleep(0.3)
-
-    ctrl = _make_controller(args)
-    try:
-        ctrl.start()
-        time.sleep(0.5)
+    with _controller_session(args) as ctrl:
         success = ctrl.disable()
-        time.sleep(0.5)
         if success:
+            ctrl.wait_for_state(set(RunningState) - ACTIVE_STATES, args.ready_timeout)
             print("PCS disabled successfully")
         else:
             print("PCS disable FAILED")
             return 1
-    finally:
-        ctrl.stop()
-        ctrl.can.disconnect()
-        if sim:
-            sim.stop()
+    return 0
+
+
+def cmd_estop(args) -> int:
+    # A direct connection listens for one status cycle to learn the fleet;
+    # the broadcast frame covers devices it has not heard from
+    with _controller_session(args, timeout=0.3) as ctrl:
+        result = ctrl.emergency_stop(wait=2.0)
+    addrs = ", ".join(f"0x{a:02X}" for a in result.targets)
+    if not result.on_bus:
+        print(f"EMERGENCY STOP NOT SENT to {addrs}: the CAN interface accepted no frames",
+              file=sys.stderr)
+    else:
+        print(f"Emergency stop sent to {addrs} + broadcast ({result.attempts} bursts, "
+              f"first on bus after {result.first_tx_s * 1e3:.2f} ms)")
+    if not result.complete:
+        missing = ", ".join(f"0x{a:02X}" for a in sorted(set(result.targets) - set(result.stopped)))
+        print(f"NOT confirmed by: {missing}")
+        return 1
+    print(f"Confirmed by all devices after {result.confirm_s * 1e3:.0f} ms")
     return 0
 
 
@@ -274,17 +681,7 @@ def cmd_set(args) -> int:
     param = args.parameter.lower()
     values = args.value
 
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-        time.sleep(0.3)
-
-    ctrl = _make_controller(args)
-    try:
-        ctrl.start()
-        time.sleep(0.5)
-
+    with _controller_session(args) as ctrl:
         if param == "mode":
             if not values:
                 print("Usage: set mode <MODE_NAME_OR_HEX>")
@@ -363,12 +760,6 @@ def cmd_set(args) -> int:
             print("Available: mode, cv, cc, cp, cccv")
             return 1
 
-    finally:
-        ctrl.stop()
-        ctrl.can.disconnect()
-        if sim:
-            sim.stop()
-
     return 0
 
 
@@ -385,42 +776,28 @@ def cmd_dump_faults(args) -> int:
 
 
 def cmd_reset_faults(args) -> int:
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-        time.sleep(0.3)
-
-    ctrl = _make_controller(args)
-    try:
-        ctrl.start()
-        time.sleep(0.5)
+    with _controller_session(args) as ctrl:
         success = ctrl.reset_faults()
         if success:
             print("Faults cleared successfully")
         else:
             print("Fault clear FAILED")
             return 1
-    finally:
-        ctrl.stop()
-        ctrl.can.disconnect()
-        if sim:
-            sim.stop()
     return 0
 
 
 def cmd_record(args) -> int:
+    from dcdc_app.logging_utils import FrameLogger
+
     duration = args.duration
     out_path = args.out
     fmt = "jsonl" if out_path.endswith(".jsonl") else "csv"
     frame_logger = FrameLogger(filepath=out_path, fmt=fmt, console=False)
 
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
+    sim = _start_simulator(args)
 
     ctrl = _make_controller(args, frame_logger)
+    exporter = None
     stop_event = [False]
 
     def on_signal(sig, frame):
@@ -428,9 +805,12 @@ def cmd_record(args) -> int:
 
     signal.signal(signal.SIGINT, on_signal)
 
+    archive = _start_archive(args, ctrl)
+
     try:
         frame_logger.open()
         ctrl.start()
+        exporter = _start_exporter(args, ctrl)
         print(f"Recording to {out_path} for {duration}s... Press Ctrl+C to stop early.")
 
         start_time = time.time()
@@ -443,30 +823,29 @@ def cmd_record(args) -> int:
 
         print()
     finally:
+        if exporter:
+            exporter.stop()
         ctrl.stop()
         ctrl.can.disconnect()
         frame_logger.close()
+        _close_archive(archive)
         if sim:
             sim.stop()
 
     print(f"Recording complete: {out_path}")
     print(f"  TX: {ctrl.can.stats['tx_count']}, RX: {ctrl.can.stats['rx_count']}")
+    if ctrl.can.rx_dropped:
+        print(f"  RX dropped (inbox full): {ctrl.can.rx_dropped}")
+    if ctrl.change_filter:
+        cf = ctrl.change_filter
+        print(f"  Change filter: {cf.passed} reported ({cf.keepalives} keepalives), "
+              f"{cf.suppressed} suppressed ({cf.reduction:.0%})")
     return 0
 
 
 def cmd_status(args) -> int:
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-
-    ctrl = _make_controller(args)
-    try:
-        ctrl.start()
-        # Wait for a few status frames
-        print("Reading PCS status...")
-        time.sleep(1.5)
-
+    print("Reading PCS status...")
+    with _controller_session(args, timeout=args.wait) as ctrl:
         s = ctrl.state
         print(f"\n{'='*50}")
         print(f"YSTECH PCS Status (addr=0x{args.pcs_addr:02X})")
@@ -493,52 +872,174 @@ def cmd_status(args) -> int:
             print(f"  Hi-Res DC I   : {s.dc_hires.current:.3f} A")
         print(f"{'='*50}")
 
+        if args.stats:
+            from dcdc_app.rolling import DEFAULT_WINDOW, format_stats
+            window = args.window or DEFAULT_WINDOW
+            print(f"\nRolling statistics ({window})")
+            print(format_stats(ctrl.stats_snapshot(window)))
+
+    return 0
+
+
+def cmd_export(args) -> int:
+    from dcdc_app.export import CycleAssembler, export_log, open_writer
+
+    writer = open_writer(args.out, args.format, batch_rows=args.batch_rows)
+    if args.source:
+        try:
+            rows = export_log(args.source, writer)
+        finally:
+            writer.close()
+        print(f"Exported {rows} cycles from {args.source} to {args.out}")
+        return 0
+
+    sim = _start_simulator(args)
+
+    ctrl = _make_controller(args)
+    assembler = CycleAssembler(writer.write_row)
+    ctrl.add_frame_callback(assembler.on_frame, unfiltered=True)
+    stop_event = [False]
+
+    def on_signal(sig, frame):
+        stop_event[0] = True
+
+    signal.signal(signal.SIGINT, on_signal)
+
+    try:
+        ctrl.start()
+        print(f"Exporting cycles to {args.out} for {args.duration}s... Press Ctrl+C to stop early.")
+        start_time = time.time()
+        while not stop_event[0] and (time.time() - start_time) < args.duration:
+            print(f"\r  Cycles: {assembler.rows}", end="")
+            time.sleep(0.5)
+        print()
     finally:
         ctrl.stop()
         ctrl.can.disconnect()
+        assembler.flush()
+        writer.close()
         if sim:
             sim.stop()
+
+    print(f"Exported {assembler.rows} cycles to {args.out}")
     return 0
 
 
-def cmd_version(args) -> int:
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-        time.sleep(0.3)
+def cmd_query(args) -> int:
+    from dcdc_app import archive
+
+    start = archive.parse_time(args.since) if args.since else None
+    end = archive.parse_time(args.until) if args.until else None
+    if args.agg or args.field:
+        if not args.field:
+            print("--agg requires --field")
+            return 1
+        bucket = archive.parse_duration(args.every) if args.every else None
+        columns, rows = archive.query_aggregate(
+            args.db, args.field, args.agg or "avg", bucket, start, end, args.addr,
+        )
+    else:
+        wanted = [c.strip() for c in args.columns.split(",") if c.strip()]
+        columns, rows = archive.query_range(args.db, wanted, start, end, args.addr, args.limit)
+
+    if args.csv:
+        import csv
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    else:
+        print(archive.format_rows(columns, rows))
+        print(f"({len(rows)} rows)")
+    return 0
+
+
+def cmd_integrate(args) -> int:
+    from dcdc_app.coulomb import CoulombCounter, format_report, integrate_log
+
+    if args.reset and args.checkpoint and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    counter = CoulombCounter(args.checkpoint, max_gap=args.max_gap)
+    if args.source:
+        print(f"Integrating {args.source}")
+        integrate_log(args.source, counter)
+        counter.close()
+        print(format_report(counter.report()))
+        return 0
 
+    sim = _start_simulator(args)
+
+    counter.sa = args.pcs_addr
     ctrl = _make_controller(args)
+    ctrl.add_frame_callback(counter.on_frame, unfiltered=True)
+    stop_event = [False]
+
+    def on_signal(sig, frame):
+        stop_event[0] = True
+
+    signal.signal(signal.SIGINT, on_signal)
+
     try:
         ctrl.start()
-        time.sleep(0.5)
-        version = ctrl.read_version()
-        if version:
-            print(f"ARM Version: HW={version.hw_v}.{version.hw_b}.{version.hw_d}  "
-                  f"SW={version.sw_v}.{version.sw_b}.{version.sw_d}")
-        else:
-            print("Failed to read version (no reply)")
-            return 1
+        print(f"Integrating for {args.duration}s... Press Ctrl+C to stop early.")
+        start_time = time.time()
+        while not stop_event[0] and (time.time() - start_time) < args.duration:
+            rep = counter.report()
+            print(f"\r  {rep.ah_net:+.4f} Ah  {rep.wh_net:+.3f} Wh  samples={rep.samples}", end="")
+            time.sleep(0.5)
+        print()
     finally:
         ctrl.stop()
         ctrl.can.disconnect()
+        counter.close()
         if sim:
             sim.stop()
+
+    print(format_report(counter.report()))
+    if args.checkpoint:
+        print(f"Checkpoint: {args.checkpoint}")
     return 0
 
 
-def cmd_read_params(args) -> int:
-    param_type = getattr(args, "type", 1)
-    sim = None
-    if args.dry_run:
-        sim = SimulatedPCS(pcs_addr=args.pcs_addr)
-        sim.start()
-        time.sleep(0.3)
+def cmd_health(args) -> int:
+    from dcdc_app.bus_health import format_health
+
+    sim = _start_simulator(args)
 
     ctrl = _make_controller(args)
     try:
         ctrl.start()
-        time.sleep(0.5)
+        print(f"Observing bus for {args.duration:.1f}s...")
+        time.sleep(args.duration)
+        rows = ctrl.bus_health.snapshot(time.time())
+        print(f"\nBus health (expected period {ctrl.bus_health.expected_period * 1000:.0f} ms)")
+        print(format_health(rows, ctrl.bus_health.expected_period))
+        stale = ctrl.bus_health.stale_sections()
+        if stale:
+            print(f"\n  Stale: {', '.join(sorted(stale))}")
+            return 1
+    finally:
+        ctrl.stop()
+        ctrl.can.disconnect()
+        if sim:
+            sim.stop()
+    return 0
+
+
+def cmd_version(args) -> int:
+    with _controller_session(args) as ctrl:
+        version = ctrl.read_version()
+        if version:
+            print(f"ARM Version: HW={version.hw_v}.{version.hw_b}.{version.hw_d}  "
+                  f"SW={version.sw_v}.{version.sw_b}.{version.sw_d}")
+        else:
+            print("Failed to read version (no reply)")
+            return 1
+    return 0
+
+
+def cmd_read_params(args) -> int:
+    param_type = getattr(args, "type", 1)
+    with _controller_session(args) as ctrl:
         result = ctrl.read_protection_params(param_type)
         if result:
             print(f"Protection Parameters (type {param_type}):")
@@ -550,11 +1051,54 @@ def cmd_read_params(args) -> int:
         else:
             print("Failed to read parameters (no reply)")
             return 1
+    return 0
+
+
+def cmd_run_profile(args) -> int:
+    from dcdc_app.profiles import ProfileError, ProfileRunner, load_profile
+
+    try:
+        profile = load_profile(args.profile)
+    except (OSError, ProfileError) as e:
+        print(f"Cannot load profile: {e}")
+        return 1
+    if args.repeat is not None:
+        profile.repeat = max(1, args.repeat)
+
+    sim = _start_simulator(args)
+    # Direct controller: step conditions are evaluated on every received batch
+    ctrl = _make_controller(args)
+    runner = ProfileRunner(ctrl, profile, step_log=args.step_log)
+
+    def on_signal(sig, frame):
+        print("\nStopping profile (output will be switched off)...")
+        runner.stop()
+
+    signal.signal(signal.SIGINT, on_signal)
+    try:
+        ctrl.start()
+        if not ctrl.wait_for_cycle(args.ready_timeout):
+            print("No status frames from the PCS - not starting the profile")
+            return 1
+        print(f"Running profile '{profile.name}': {len(profile.steps)} steps x {profile.repeat}")
+        try:
+            records = runner.run()
+        except ProfileError as e:
+            print(f"Profile FAILED: {e}")
+            return 1
     finally:
         ctrl.stop()
         ctrl.can.disconnect()
         if sim:
             sim.stop()
+
+    print(f"\n{'Cyc':>3} {'Step':<20} {'Mode':<22} {'Time (s)':>9} {'Ah':>8}  End")
+    for rec in records:
+        print(f"{rec.cycle:>3} {rec.name[:20]:<20} {rec.mode[:22]:<22} "
+              f"{rec.duration_s:>9.1f} {rec.ah:>8.3f}  {rec.reason}")
+    if runner.aborted:
+        print(f"\nProfile ABORTED: {runner.aborted}")
+        return 1
     return 0
 
 
@@ -562,9 +1106,200 @@ def cmd_read_params(args) -> int:
 # Main
 # ---------------------------------------------------------------------------
 
+def cmd_daemon(args) -> int:
+    from dcdc_app.daemon import UNIX_SOCKETS, ControllerDaemon
+
+    if not UNIX_SOCKETS:
+        print("Daemon mode needs Unix domain sockets, which this platform lacks", file=sys.stderr)
+        return 1
+
+    sim = _start_simulator(args)
+
+    ctrl = _make_controller(args)
+    path = _socket_path(args)
+    daemon = ControllerDaemon(ctrl, path, info={
+        "dry_run": args.dry_run, "interface": args.interface, "channel": args.channel,
+        "bitrate": args.bitrate,
+    })
+    exporter = None
+
+    def on_signal(sig, frame):
+        daemon.shutdown_requested.set()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    if ctrl.recorder is not None and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda sig, frame: ctrl.trigger_dump("operator"))
+
+    try:
+        ctrl.start()
+        daemon.start()
+        exporter = _start_exporter(args, ctrl)
+        print(f"PCS daemon (addr=0x{args.pcs_addr:02X}, pid {os.getpid()}) listening on {path}")
+        print("One-shot commands now go through this connection. Ctrl+C to stop.")
+        while not daemon.shutdown_requested.wait(0.5):
+            pass
+        print("\nStopping daemon...")
+    finally:
+        daemon.stop()
+        if exporter:
+            exporter.stop()
+        ctrl.stop()
+        ctrl.can.disconnect()
+        if sim:
+            sim.stop()
+    return 0
+
+
 def cmd_gui(args) -> int:
+    if args.background_refresh <= 0:
+        print("--background-refresh must be positive")
+        return 1
     from dcdc_app.gui.app import launch
-    return launch()
+    return launch(background_hz=args.background_refresh)
+
+
+def cmd_bench(args) -> int:
+    from dcdc_app import bench
+
+    if args.threshold is None:   # bench is not imported while the parser is built
+        args.threshold = bench.DEFAULT_THRESHOLD
+    if args.suite in ("latency", "estop", "gui"):
+        return _bench_latency(args)
+    if args.suite == "soak":
+        return _bench_soak(args)
+    if args.suite == "startup":
+        return _bench_startup(args)
+
+    baseline = bench.load_baseline(args.baseline) if args.baseline else None
+
+    print(bench.RESULT_HEADER + ("  vs base" if baseline else ""))
+    print("-" * (len(bench.RESULT_HEADER) + (9 if baseline else 0)))
+    results = bench.run_protocol_benchmarks(
+        min_time=args.min_time,
+        name_filter=args.filter,
+        progress=lambda r: print(bench.format_result(r, baseline), flush=True),
+    )
+
+    if args.save_baseline:
+        bench.save_baseline(args.save_baseline, results)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = bench.compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}:")
+            for reg in regressions:
+                print(f"  {reg.name:<34} {reg.baseline_ops_per_sec:>13,.0f} -> "
+                      f"{reg.current_ops_per_sec:>13,.0f} ops/sec ({reg.change:+.1%})")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def _bench_latency(args) -> int:
+    from dcdc_app import bench
+
+    baseline = bench.load_baseline(args.baseline) if args.baseline else None
+
+    if args.suite == "estop":
+        print(f"Measuring click-to-bus latency of the stop frame ({args.iterations} rounds)...")
+        stats = bench.run_estop_benchmark(iterations=args.iterations, pcs_addr=args.pcs_addr)
+    elif args.suite == "gui":
+        print(f"Measuring console UI-thread gaps, idle and during {args.storm} unanswered commands...")
+        try:
+            stats = bench.run_gui_benchmark(storm=args.storm)
+        except ImportError as e:
+            print(f"GUI benchmark needs PySide6 and pyqtgraph: {e}")
+            return 1
+    else:
+        print(f"Measuring command latency against the simulator ({args.iterations} rounds)...")
+        stats = bench.run_latency_benchmark(iterations=args.iterations, pcs_addr=args.pcs_addr)
+
+    print()
+    print(bench.LATENCY_HEADER + ("  p50 vs base" if baseline else ""))
+    print("-" * (len(bench.LATENCY_HEADER) + (13 if baseline else 0)))
+    for st in stats:
+        if args.filter and args.filter not in st.name:
+            continue
+        print(bench.format_latency(st, baseline))
+
+    if args.save_baseline:
+        bench.save_latency_baseline(args.save_baseline, stats)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        worse = bench.compare_latency_to_baseline(stats, baseline, args.threshold)
+        if worse:
+            print(f"\np50 latency grew more than {args.threshold:.0%} for: {', '.join(worse)}")
+            return 1
+        print(f"\nNo latency regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def _bench_startup(args) -> int:
+    from dcdc_app import bench
+
+    baseline = bench.load_baseline(args.baseline) if args.baseline else None
+
+    print(f"Timing {args.iterations} fresh interpreters per case...")
+    stats = bench.run_startup_benchmark(iterations=args.iterations, name_filter=args.filter)
+
+    print()
+    print(bench.LATENCY_HEADER + ("  p50 vs base" if baseline else ""))
+    print("-" * (len(bench.LATENCY_HEADER) + (13 if baseline else 0)))
+    for st in stats:
+        print(bench.format_latency(st, baseline))
+
+    heavy = {cmd: bench.loaded_modules(cmd.split()) for cmd in ("--help", "dump-faults")}
+    print()
+    for cmd, modules in heavy.items():
+        print(f"Heavy modules loaded by '{cmd}': {', '.join(modules) or 'none'}")
+
+    if args.save_baseline:
+        bench.save_latency_baseline(args.save_baseline, stats)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        worse = bench.compare_latency_to_baseline(stats, baseline, args.threshold)
+        if worse:
+            print(f"\np50 startup time grew more than {args.threshold:.0%} for: {', '.join(worse)}")
+            return 1
+        print(f"\nNo startup regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+def _bench_soak(args) -> int:
+    from dcdc_app import bench
+
+    frames = bench.load_replay_frames(args.replay) if args.replay else None
+    source = f"replay of {args.replay} ({len(frames)} frames)" if frames else "synthetic PF mix"
+    print(f"Soaking RX pipeline with {source}, logger {'off' if args.no_logger else 'on'}")
+
+    if args.ramp:
+        print(bench.SOAK_HEADER)
+        results = bench.run_soak_ramp(
+            args.rate, args.duration, frames,
+            with_logger=not args.no_logger,
+            progress=lambda r: print(bench.format_soak(r), flush=True),
+        )
+        sustained = [r for r in results if r.sustained]
+        if sustained:
+            print(f"\nMax sustained rate: {sustained[-1].throughput:,.0f} frames/sec")
+        else:
+            print("\nPipeline did not sustain the starting rate")
+        return 0
+
+    def on_sample(smp) -> None:
+        print(f"  t={smp.elapsed:6.1f}s  generated={smp.generated:<9d} processed={smp.processed:<9d} "
+              f"queue={smp.queue_depth:<7d} rss={smp.rss_bytes / 1048576:.1f} MiB", flush=True)
+
+    res = bench.run_soak(args.rate, args.duration, frames,
+                         with_logger=not args.no_logger, progress=on_sample)
+    print()
+    print(bench.SOAK_HEADER)
+    print(bench.format_soak(res))
+    return 0
 
 
 COMMANDS = {
@@ -572,16 +1307,27 @@ COMMANDS = {
     "monitor": cmd_monitor,
     "enable": cmd_enable,
     "disable": cmd_disable,
+    "estop": cmd_estop,
     "set": cmd_set,
     "dump-faults": cmd_dump_faults,
     "reset-faults": cmd_reset_faults,
     "record": cmd_record,
     "status": cmd_status,
+    "health": cmd_health,
+    "export": cmd_export,
+    "query": cmd_query,
+    "integrate": cmd_integrate,
     "version": cmd_version,
     "read-params": cmd_read_params,
+    "run-profile": cmd_run_profile,
+    "daemon": cmd_daemon,
     "gui": cmd_gui,
+    "bench": cmd_bench,
 }
 
+# Commands that only print built-in tables: skip logging setup (and its imports)
+STATIC_COMMANDS = {"dump-faults"}
+
 
 def main(argv: Optional[list] = None) -> int:
     parser = create_parser()
@@ -591,7 +1337,9 @@ def main(argv: Optional[list] = None) -> int:
         parser.print_help()
         return 1
 
-    setup_logging(level=args.log_level, logfile=args.log_file)
+    if args.command not in STATIC_COMMANDS:
+        from dcdc_app.logging_utils import setup_logging
+        setup_logging(level=args.log_level, logfile=args.log_file)
 
     handler = COMMANDS.get(args.command)
     if handler is None:
@@ -609,6 +1357,11 @@ def main(argv: Optional[list] = None) -> int:
             import traceback
             traceback.print_exc()
         return 1
+    finally:
+        if args.metrics:
+            from dcdc_app.metrics import format_snapshot
+            print("\nMetrics:")
+            print(format_snapshot())
 
 
 if __name__ == "__main__":
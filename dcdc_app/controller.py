@@ -14,14 +14,21 @@ import logging
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+from dcdc_app.bus_health import BusHealthMonitor, StaleEvent
 from dcdc_app.can_iface import CANInterface
+from dcdc_app.deadband import ChangeFilter
+from dcdc_app.estop import EmergencyStop, EStopResult
+from dcdc_app.flight_recorder import FlightRecorder
 from dcdc_app.logging_utils import FrameLogger
+from dcdc_app.metrics import REGISTRY, Histogram, MetricsRegistry
 from dcdc_app.protocol import (
+    ACTIVE_STATES,
     CAN_TIMEOUT_S,
     HEARTBEAT_INTERVAL_MS,
     PCS_DEFAULT_ADDR,
+    STATUS_CYCLE_PFS,
     PCSState,
     RunningState,
     WorkingMode,
@@ -35,9 +42,9 @@ from dcdc_app.protocol import (
     encode_set_working_mode,
     encode_start_stop,
     fault_description,
-    parse_can_id,
     pf_name,
 )
+from dcdc_app.rolling import DEFAULT_WINDOW, RollingStats, WindowStats
 
 logger = logging.getLogger(__name__)
 
@@ -51,10 +58,15 @@ class ControllerConfig:
     """Configuration for the PCS controller."""
     pcs_addr: int = PCS_DEFAULT_ADDR
     heartbeat_interval: float = HEARTBEAT_INTERVAL_MS / 1000.0  # seconds
-    rx_timeout: float = 1.0  # seconds per recv call
+    no_data_warn_interval: float = 1.0  # seconds between "no data" warnings while the bus is silent
     command_timeout: float = 3.0  # seconds to wait for command reply
+    ready_timeout: float = 2.0  # default longest wait in wait_for_cycle/pf/state
     auto_heartbeat: bool = True
     auto_reconnect: bool = True
+    rx_batch_size: int = 256  # most frames decoded per RX wakeup
+    trace_dir: Optional[str] = None  # flight recorder dump directory (None = off)
+    trace_seconds: float = 30.0  # lead-up written per flight recorder dump
+    trace_format: str = "bin"  # flight recorder dump format: bin, csv or jsonl
 
 
 class PCSController:
@@ -65,25 +77,80 @@ class PCSController:
         can_iface: CANInterface,
         config: Optional[ControllerConfig] = None,
         frame_logger: Optional[FrameLogger] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        change_filter: Optional[ChangeFilter] = None,
     ):
         self.can = can_iface
         self.config = config or ControllerConfig()
         self.frame_logger = frame_logger
+        # Optional deadband stage: state is always updated, but frames the
+        # filter rejects skip the frame logger and callbacks.
+        self.change_filter = change_filter
         self.state = PCSState()
+        self.device_states: Dict[int, PCSState] = {}  # per source address
 
         self._running = False
         self._rx_thread: Optional[threading.Thread] = None
         self._hb_thread: Optional[threading.Thread] = None
+        self._watchdog_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
         self._lock = threading.Lock()
+        # Notified after each batch's state update; readiness waits sleep on it
+        self._ready = threading.Condition(self._lock)
+        self._pf_counts: Dict[int, int] = {}   # frames per PF from the configured PCS
         self._last_rx_time: float = 0.0
         self._callbacks: List[Callable[[str, Any], None]] = []
+        self._frame_callbacks: List[Callable[[int, int, str, Any, float], None]] = []
+        self._unfiltered_callbacks: List[Callable[[int, int, str, Any, float], None]] = []
+        self._batch_callbacks: List[Callable[[List[Tuple[int, int, str, Any, float]]], None]] = []
         self._pending_replies: Dict[int, threading.Event] = {}
         self._last_reply_data: Dict[int, Any] = {}
+        self.bus_health = BusHealthMonitor(expected_period=HEARTBEAT_INTERVAL_MS / 1000.0)
+        self._next_timeout_warning = 0.0
+        self._last_fault: Tuple[bool, int] = (False, 0)   # (is_fault, fault_code)
+        # Flight recorder: dumps the frame trace lead-up on faults/timeouts
+        self.recorder: Optional[FlightRecorder] = None
+        if self.config.trace_dir and self.can.trace is not None:
+            self.recorder = FlightRecorder(
+                self.can.trace, self.config.trace_dir,
+                seconds=self.config.trace_seconds, fmt=self.config.trace_format,
+            )
+        # Rolling min/max/mean/RMS per signal (last minute, last hour, session)
+        self.stats = RollingStats()
+        # Emergency stop: stop frames pre-encoded for every device seen, sent
+        # outside send_command (no frame logger, no reply wait)
+        self.estop = EmergencyStop(self.can, self.config.pcs_addr)
+        self._unfiltered_callbacks.append(self.estop.on_frame)
+
+        # Metrics (instruments looked up once; per-PF histograms created on first use)
+        self.metrics = metrics or REGISTRY
+        self._m_decode: List[Optional[Histogram]] = [None] * 256
+        self._m_reply: Dict[int, Histogram] = {}
+        self._m_decode_errors = self.metrics.counter(
+            "controller_decode_errors_total", "Frames that failed to decode",
+        )
+        self._m_callback = self.metrics.histogram(
+            "controller_callback_seconds", "Time spent in user callbacks per received batch",
+        )
+        self._m_reply_timeouts = self.metrics.counter(
+            "controller_reply_timeouts_total", "Commands that got no reply in time", shared=True,
+        )
+        self._m_hb_late = self.metrics.histogram(
+            "controller_heartbeat_lateness_seconds", "Heartbeat send time past its schedule",
+        )
+        self._m_suppressed = self.metrics.counter(
+            "controller_suppressed_frames_total", "Frames held back by the change filter",
+        )
 
     @property
     def connected(self) -> bool:
         return self.can.connected
 
+    @property
+    def running(self) -> bool:
+        """Whether the RX/heartbeat loops are running (between start() and stop())."""
+        return self._running
+
     @property
     def seconds_since_last_rx(self) -> float:
         if self._last_rx_time == 0:
@@ -97,15 +164,78 @@ class PCSController:
         """
         self._callbacks.append(callback)
 
+    def add_frame_callback(
+        self,
+        callback: Callable[[int, int, str, Any, float], None],
+        unfiltered: bool = False,
+    ) -> None:
+        """Register a callback for decoded frames with addressing and timing.
+
+        Callback receives (sa, pf, field_name, decoded_data, timestamp) for each
+        received frame, where timestamp is the bus receive time of the frame.
+        With ``unfiltered=True`` the callback also sees frames held back by the
+        change filter (for consumers such as integrators that need every sample).
+        """
+        if unfiltered:
+            self._unfiltered_callbacks.append(callback)
+        else:
+            self._frame_callbacks.append(callback)
+
+    def add_batch_callback(
+        self, callback: Callable[[List[Tuple[int, int, str, Any, float]]], None],
+    ) -> None:
+        """Register a callback for decoded frames, called once per received batch.
+
+        Callback receives a list of (sa, pf, field_name, decoded_data, timestamp)
+        tuples in arrival order, after the state has been updated for all of
+        them. Frames held back by the change filter are not included.
+        """
+        self._batch_callbacks.append(callback)
+
+    def add_stale_callback(self, callback: Callable[[StaleEvent], None]) -> None:
+        """Register a callback for stale/recovered periodic signals.
+
+        Callback receives a StaleEvent when a (SA, PF) status frame stops
+        arriving for several periods, and again when it resumes.
+        """
+        self.bus_health.add_listener(callback)
+
+    @property
+    def stale_sections(self) -> set:
+        """PCSState sections of the configured device whose frames are stale."""
+        return self.bus_health.stale_sections(self.config.pcs_addr)
+
+    def signal_stats(self, signal: str, window: str = DEFAULT_WINDOW) -> WindowStats:
+        """Rolling statistics of one signal of the configured device.
+
+        Args:
+            signal: "section.field", e.g. "dc.current" or "grid_voltage.u_voltage".
+            window: "1m", "1h" or "session".
+        """
+        return self.stats.get(signal, window, sa=self.config.pcs_addr)
+
+    def stats_snapshot(self, window: str = DEFAULT_WINDOW) -> Dict[str, WindowStats]:
+        """Rolling statistics of every signal of the configured device."""
+        return self.stats.snapshot(window, sa=self.config.pcs_addr)
+
     def start(self) -> None:
         """Start the controller (RX loop + heartbeat loop)."""
         if not self.can.connected:
             self.can.connect()
 
         self._running = True
+        self._stop_event.clear()
+        if self.recorder is not None:
+            self.recorder.open()   # stop() closed it
+        with self._lock:
+            self._pf_counts.clear()   # readiness refers to this session's frames
 
         self._rx_thread = threading.Thread(target=self._rx_loop, daemon=True, name="pcs-rx")
         self._rx_thread.start()
+        self._watchdog_thread = threading.Thread(
+            target=self._watchdog_loop, daemon=True, name="pcs-watchdog",
+        )
+        self._watchdog_thread.start()
 
         if self.config.auto_heartbeat:
             self._hb_thread = threading.Thread(target=self._heartbeat_loop, daemon=True, name="pcs-hb")
@@ -114,14 +244,76 @@ class PCSController:
         logger.info("PCS Controller started (PCS addr=0x%02X)", self.config.pcs_addr)
 
     def stop(self) -> None:
-        """Stop the controller gracefully."""
+        """Stop the controller; all loops wake up and exit immediately."""
         self._running = False
-        if self._rx_thread:
-            self._rx_thread.join(timeout=3.0)
-        if self._hb_thread:
-            self._hb_thread.join(timeout=1.0)
+        self._stop_event.set()
+        with self._ready:
+            self._ready.notify_all()   # release readiness waits
+        self.can.interrupt()
+        for thread in (self._rx_thread, self._hb_thread, self._watchdog_thread):
+            if thread and thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+        if self.recorder is not None:
+            self.recorder.close()   # finish dumps already triggered
         logger.info("PCS Controller stopped")
 
+    # -----------------------------------------------------------------------
+    # Readiness
+    # -----------------------------------------------------------------------
+
+    def wait_until(self, predicate: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        """Block until ``predicate()`` is true, re-checking after every received batch.
+
+        The predicate runs with the state lock held, so it may read ``state``
+        directly but must not call back into the controller.
+
+        Args:
+            predicate: Condition on the controller state.
+            timeout: Seconds to wait (default ``config.ready_timeout``).
+
+        Returns:
+            Whether the predicate held before the timeout (or stop()).
+        """
+        if timeout is None:
+            timeout = self.config.ready_timeout
+        with self._ready:
+            return self._ready.wait_for(
+                lambda: predicate() or not self._running, timeout,
+            ) and predicate()
+
+    def wait_for_pf(self, pf: int, timeout: Optional[float] = None, fresh: bool = False) -> bool:
+        """Wait until a frame with ``pf`` has arrived from the configured PCS.
+
+        Args:
+            pf: PF code, e.g. 0x13 for the running state/fault frame.
+            timeout: Seconds to wait (default ``config.ready_timeout``).
+            fresh: Only count frames received after this call.
+        """
+        with self._lock:
+            seen = self._pf_counts.get(pf, 0) if fresh else 0
+        return self.wait_until(lambda: self._pf_counts.get(pf, 0) > seen, timeout)
+
+    def wait_for_cycle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every frame of a status cycle (STATUS_CYCLE_PFS) has arrived.
+
+        This is the point where ``state`` is fully populated; with a running
+        PCS it is reached one 200 ms cycle after start().
+        """
+        counts = self._pf_counts
+        return self.wait_until(lambda: all(pf in counts for pf in STATUS_CYCLE_PFS), timeout)
+
+    def wait_for_state(
+        self,
+        states: Union[RunningState, Iterable[RunningState]],
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until the reported running state is ``states`` (or one of them)."""
+        wanted = {states} if isinstance(states, RunningState) else set(states)
+        return self.wait_until(
+            lambda: 0x13 in self._pf_counts and self.state.status.running_state in wanted,
+            timeout,
+        )
+
     def send_command(self, can_id: int, data: bytes) -> bool:
         """Send a raw CAN command and log it."""
         success = self.can.send(can_id, data)
@@ -129,16 +321,37 @@ class PCSController:
             self.frame_logger.log_frame(can_id, data, direction="TX")
         return success
 
+    def _decode_histogram(self, pf: int) -> Histogram:
+        hist = self._m_decode[pf]
+        if hist is None:
+            hist = self.metrics.histogram(
+                "controller_decode_seconds", "decode_rx_message() time", pf=f"0x{pf:02X}",
+            )
+            self._m_decode[pf] = hist
+        return hist
+
     def _wait_for_reply(self, pf: int, timeout: Optional[float] = None) -> Optional[Any]:
         """Wait for a reply with a specific PF code."""
         timeout = timeout or self.config.command_timeout
         event = threading.Event()
         self._pending_replies[pf] = event
+        t0 = time.perf_counter()
         try:
             if event.wait(timeout):
+                hist = self._m_reply.get(pf)
+                if hist is None:
+                    hist = self.metrics.histogram(
+                        "controller_reply_seconds", "Command reply latency", shared=True,
+                        pf=f"0x{pf:02X}",
+                    )
+                    self._m_reply[pf] = hist
+                hist.observe(time.perf_counter() - t0)
                 return self._last_reply_data.get(pf)
             else:
+                self._m_reply_timeouts.inc()
                 logger.warning("Timeout waiting for reply PF=0x%02X", pf)
+                if self.recorder is not None:
+                    self.recorder.trigger(f"timeout_{pf:02X}")
                 return None
         finally:
             self._pending_replies.pop(pf, None)
@@ -155,7 +368,7 @@ class PCSController:
         if clear_faults and self.state.status.is_fault:
             logger.info("Clearing faults before enable...")
             self.reset_faults()
-            time.sleep(0.5)
+            self.wait_until(lambda: not self.state.status.is_fault, timeout=0.5)
 
         can_id, data = encode_start_stop(start=True, pcs_addr=self.config.pcs_addr)
         self.send_command(can_id, data)
@@ -177,6 +390,20 @@ class PCSController:
         logger.warning("PCS disable failed or no reply")
         return False
 
+    def emergency_stop(self, wait: Optional[float] = None) -> EStopResult:
+        """Stop every known device (and broadcast) through the e-stop path.
+
+        Returns as soon as the stop frames are on the bus; they are
+        retransmitted in the background until each device confirms.
+
+        Args:
+            wait: Also wait up to this many seconds for the confirmations.
+        """
+        result = self.estop.trigger()
+        if wait:
+            self.estop.wait(wait)
+        return result
+
     def reset_faults(self) -> bool:
         """Clear fault state on PCS device."""
         can_id, data = encode_start_stop(
@@ -252,6 +479,28 @@ class PCSController:
         self.send_command(can_id, data)
         return self._wait_for_reply(0x36)
 
+    def dump_trace(self, path: str, last: Optional[int] = None) -> int:
+        """Write the recent TX/RX frame trace to ``path`` (CSV, or JSONL by extension).
+
+        Returns:
+            Number of frames written.
+        """
+        if self.can.trace is None:
+            raise ControllerError("Frame trace is disabled (trace_size=0)")
+        return self.can.trace.dump(path, last)
+
+    def trigger_dump(self, reason: str = "operator") -> Optional[str]:
+        """Ask the flight recorder for a dump now (operator request).
+
+        Returns:
+            Path being written in the background, or None if the flight
+            recorder is off or closed, or a dump for ``reason`` was just
+            written.
+        """
+        if self.recorder is None:
+            return None
+        return self.recorder.trigger(reason)
+
     def get_faults(self) -> Tuple[int, str]:
         """Get current fault code and description from cached state."""
         code = self.state.status.fault_code
@@ -274,65 +523,168 @@ class PCSController:
     def _rx_loop(self) -> None:
         """Receive and decode CAN messages continuously."""
         while self._running:
-            msg = self.can.recv(timeout=self.config.rx_timeout)
-            if msg is None:
-                # Check for RX timeout
-                if self.seconds_since_last_rx > CAN_TIMEOUT_S and self._last_rx_time > 0:
-                    logger.warning(
-                        "No data from PCS for %.1fs (timeout=%ds)",
-                        self.seconds_since_last_rx, CAN_TIMEOUT_S,
-                    )
+            # Blocks until frames arrive or stop() interrupts the wait
+            batch = self.can.recv_batch(self.config.rx_batch_size, timeout=None)
+            if not batch:
+                if not self.can.connected:
+                    self._stop_event.wait(0.1)  # don't spin while disconnected
                 continue
+            self._process_batch(batch)
+
+    def _process_batch(self, batch: List[Any]) -> None:
+        """Decode a batch of frames and hand it on in bulk.
 
+        Decoding, bus health and the change filter run per frame, on each
+        frame's own bus timestamp (a backlog drained in one batch keeps its
+        spacing); the state update takes the lock once, the frame logger
+        flushes once, and batch callbacks get one call with every reported
+        frame.
+        """
+        self._last_rx_time = time.time()
+        frames = []   # (sa, pf, name, decoded, timestamp, report)
+        log = []      # (can_id, data, direction, decoded, timestamp) for reported frames
+        for msg in batch:
             if not msg.is_extended_id:
                 continue
-
-            self._last_rx_time = time.time()
-
-            # Decode the message
+            can_id = msg.arbitration_id
+            sa, pf = can_id & 0xFF, (can_id >> 16) & 0xFF  # no parse_can_id dict per frame
+            data = bytes(msg.data)
+            ts = msg.timestamp
+            t0 = time.perf_counter()
             try:
-                name, decoded = decode_rx_message(msg.arbitration_id, bytes(msg.data))
+                name, decoded = decode_rx_message(can_id, data)
             except Exception as e:
-                logger.debug("Decode error for ID=0x%08X: %s", msg.arbitration_id, e)
+                self._m_decode_errors.inc()
+                logger.debug("Decode error for ID=0x%08X: %s", can_id, e)
                 name, decoded = None, None
-
-            # Log the frame
-            if self.frame_logger:
-                self.frame_logger.log_frame(
-                    msg.arbitration_id, bytes(msg.data),
-                    direction="RX", decoded=decoded,
-                )
-
-            if name is None:
-                continue
-
-            # Update aggregated state
-            with self._lock:
-                if hasattr(self.state, name) and decoded is not None:
+            self._decode_histogram(pf).observe(time.perf_counter() - t0)
+            self.bus_health.update(sa, pf, ts)
+
+            report = (
+                name is None
+                or self.change_filter is None
+                or self.change_filter.should_report(sa, pf, name, decoded, ts)
+            )
+            if not report:
+                self._m_suppressed.inc()
+            elif self.frame_logger:
+                log.append((can_id, data, "RX", decoded, ts))
+            if name is not None:
+                frames.append((sa, pf, name, decoded, ts, report))
+
+        if log:
+            self.frame_logger.log_frames(log)
+        if not frames:
+            return
+
+        # Update aggregated state
+        pcs_addr = self.config.pcs_addr
+        counts = self._pf_counts
+        with self._lock:
+            for sa, pf, name, decoded, ts, report in frames:
+                if sa == pcs_addr:
+                    counts[pf] = counts.get(pf, 0) + 1
+                if decoded is not None and hasattr(self.state, name):
                     setattr(self.state, name, decoded)
-
+                    device = self.device_states.get(sa)
+                    if device is None:
+                        device = self.device_states[sa] = PCSState()
+                    setattr(device, name, decoded)
+            self._ready.notify_all()
+
+        for sa, pf, name, decoded, ts, report in frames:
+            self.stats.update(sa, name, decoded, ts)
+            for fcb in self._unfiltered_callbacks:
+                try:
+                    fcb(sa, pf, name, decoded, ts)
+                except Exception as e:
+                    logger.debug("Frame callback error: %s", e)
+            if name == "status" and sa == self.config.pcs_addr:
+                self._check_fault_transition(decoded)
             # Check for pending reply waiters
-            fields = parse_can_id(msg.arbitration_id)
-            pf = fields["pf"]
             if pf in self._pending_replies:
                 self._last_reply_data[pf] = decoded
                 self._pending_replies[pf].set()
 
-            # Notify callbacks
-            for cb in self._callbacks:
-                try:
-                    cb(name, decoded)
-                except Exception as e:
-                    logger.debug("Callback error: %s", e)
+        # Notify callbacks
+        reported = [f[:5] for f in frames if f[5]]
+        if not reported:
+            return
+        t0 = time.perf_counter()
+        if self._callbacks or self._frame_callbacks:
+            for sa, pf, name, decoded, ts in reported:
+                for cb in self._callbacks:
+                    try:
+                        cb(name, decoded)
+                    except Exception as e:
+                        logger.debug("Callback error: %s", e)
+                for fcb in self._frame_callbacks:
+                    try:
+                        fcb(sa, pf, name, decoded, ts)
+                    except Exception as e:
+                        logger.debug("Frame callback error: %s", e)
+        for bcb in self._batch_callbacks:
+            try:
+                bcb(reported)
+            except Exception as e:
+                logger.debug("Batch callback error: %s", e)
+        self._m_callback.observe(time.perf_counter() - t0)
+
+    def _check_fault_transition(self, status: Any) -> None:
+        """Trigger the flight recorder when the PCS enters a fault or the code changes."""
+        was_fault, previous = self._last_fault
+        code = status.fault_code
+        is_fault = status.is_fault
+        self._last_fault = (is_fault, code)
+        if self.recorder is None:
+            return
+        if (is_fault and not was_fault) or (code and code != previous):
+            self.recorder.trigger(f"fault_{code:04X}")
+
+    def _watchdog_loop(self) -> None:
+        """Timer for checks that must run while the bus is silent.
+
+        Sleeps until the next moment a periodic signal could go stale (or the
+        next "no data from PCS" warning is due) instead of ticking, so steady
+        traffic costs about one wakeup per stale window and detection is not
+        tied to frame arrival.
+        """
+        slack = 0.01
+        timeout = self.bus_health.stale_after
+        while not self._stop_event.wait(timeout):
+            now = time.time()
+            try:
+                self.bus_health.check(now)
+            except Exception as e:
+                logger.debug("Bus health check error: %s", e)
+            deadline = now + self.bus_health.stale_after   # catches signals seen later
+            deadline = min(deadline, self.bus_health.next_deadline() + slack)
+            if self._last_rx_time > 0:
+                if now - self._last_rx_time > CAN_TIMEOUT_S and now >= self._next_timeout_warning:
+                    self._next_timeout_warning = now + self.config.no_data_warn_interval
+                    logger.warning(
+                        "No data from PCS for %.1fs (timeout=%ds)",
+                        now - self._last_rx_time, CAN_TIMEOUT_S,
+                    )
+                deadline = min(deadline, max(
+                    self._last_rx_time + CAN_TIMEOUT_S + slack, self._next_timeout_warning,
+                ))
+            timeout = max(deadline - time.time(), slack)
 
     def _heartbeat_loop(self) -> None:
         """Send heartbeat frames at the configured interval."""
+        due = 0.0
         while self._running:
+            now = time.perf_counter()
+            if due:
+                self._m_hb_late.observe(now - due)
+            due = now + self.config.heartbeat_interval
             try:
                 self.send_heartbeat()
             except Exception as e:
                 logger.debug("Heartbeat error: %s", e)
-            time.sleep(self.config.heartbeat_interval)
+            if self._stop_event.wait(self.config.heartbeat_interval):
+                break
 
     # -----------------------------------------------------------------------
     # Context manager
@@ -345,15 +697,12 @@ class PCSController:
     def __exit__(self, *args) -> None:
         # Try graceful shutdown
         try:
-            if self.state.status.running_state in (
-                RunningState.CONSTANT_VOLTAGE,
-                RunningState.CONSTANT_CURRENT,
-                RunningState.AC_CONSTANT_POWER,
-                RunningState.OFF_GRID_INVERTER,
-            ):
+            if self.state.status.running_state in ACTIVE_STATES:
                 logger.info("Graceful shutdown: disabling PCS...")
                 self.disable()
-                time.sleep(0.5)
+                self.wait_until(
+                    lambda: self.state.status.running_state not in ACTIVE_STATES, timeout=0.5,
+                )
         except Exception:
             pass
         self.stop()
@@ -0,0 +1,324 @@
+"""Host-side charge and energy integration from high-resolution DC frames.
+
+CapacityEnergy (PF 0x12) counts ampere-hours and watt-hours with 0.1 Ah /
+0.1 Wh resolution and restarts from zero when the PCS resets. HighResDC
+(PF 0x39) carries 1 mV / 1 mA samples every 200 ms. CoulombCounter integrates
+those samples on the host:
+
+- trapezoidal integration of I and V*I over the real frame timestamps, with
+  segments that cross zero split at the crossing so positive and negative
+  flow are accumulated separately
+- spacing longer than ``max_gap`` (missed frames, bus outage, restart) is not
+  integrated across; it is reported as uncovered time instead
+- the device counters are tracked alongside (resets detected and bridged) and
+  the difference to the host throughput is reported as drift
+- totals are checkpointed to a JSON file (atomic replace) and restored on
+  start, so a long test survives host restarts; periodic checkpoints are
+  snapshotted on the feeding (RX) thread and written by a background thread
+
+Current sign follows the PCS convention: ``*_in`` is positive current/power,
+``*_out`` negative. The device counters count magnitude, so drift compares
+them with the host throughput (in + out).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from dcdc_app.logging_utils import iter_frame_log
+from dcdc_app.protocol import decode_rx_message, parse_can_id
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+_STOP = object()
+
+
+@dataclass
+class CoulombReport:
+    """Integrated totals and drift against the PCS counters."""
+    ah_in: float = 0.0
+    ah_out: float = 0.0
+    wh_in: float = 0.0
+    wh_out: float = 0.0
+    samples: int = 0
+    integrated_s: float = 0.0      # time covered by integrated segments
+    gap_s: float = 0.0             # time skipped because samples were too far apart
+    gaps: int = 0
+    device_ah: float = 0.0         # PCS counter increase over the same period
+    device_wh: float = 0.0
+    device_resets: int = 0
+
+    @property
+    def ah_net(self) -> float:
+        return self.ah_in - self.ah_out
+
+    @property
+    def wh_net(self) -> float:
+        return self.wh_in - self.wh_out
+
+    @property
+    def ah_throughput(self) -> float:
+        return self.ah_in + self.ah_out
+
+    @property
+    def wh_throughput(self) -> float:
+        return self.wh_in + self.wh_out
+
+    @property
+    def drift_ah(self) -> float:
+        """Host throughput minus PCS counter increase (Ah)."""
+        return self.ah_throughput - self.device_ah
+
+    @property
+    def drift_wh(self) -> float:
+        return self.wh_throughput - self.device_wh
+
+
+def _split(y0: float, y1: float, dt: float) -> Tuple[float, float]:
+    """Trapezoid area of a linear segment as (positive part, negative part magnitude)."""
+    if y0 >= 0.0 and y1 >= 0.0:
+        return 0.5 * (y0 + y1) * dt, 0.0
+    if y0 <= 0.0 and y1 <= 0.0:
+        return 0.0, -0.5 * (y0 + y1) * dt
+    # Crosses zero: two triangles meeting at the crossing
+    t0 = dt * y0 / (y0 - y1)
+    a0 = 0.5 * y0 * t0
+    a1 = 0.5 * y1 * (dt - t0)
+    return (a0, -a1) if y0 > 0.0 else (a1, -a0)
+
+
+class CoulombCounter:
+    """Integrates HighResDC samples into Ah/Wh and tracks the PCS counters."""
+
+    def __init__(
+        self,
+        checkpoint_path: Optional[str] = None,
+        max_gap: float = 1.0,
+        checkpoint_interval: float = 60.0,
+        sa: Optional[int] = None,
+    ):
+        """Initialize the counter, restoring totals from ``checkpoint_path`` if it exists.
+
+        Args:
+            checkpoint_path: JSON file for persisted totals (None = in memory only).
+            max_gap: Longest sample spacing (seconds) integrated across.
+            checkpoint_interval: Save at most this often while feeding (seconds).
+            sa: Only count frames from this source address (None = any).
+        """
+        self.checkpoint_path = checkpoint_path
+        self.max_gap = max_gap
+        self.checkpoint_interval = checkpoint_interval
+        self.sa = sa
+        self._lock = threading.Lock()
+        self._as_in = self._as_out = 0.0   # ampere-seconds
+        self._ws_in = self._ws_out = 0.0   # watt-seconds
+        self._report = CoulombReport()
+        self._last: Optional[Tuple[float, float, float]] = None   # (t, current, power)
+        self._device_last: Optional[Tuple[float, float]] = None   # (Ah, Wh) counters
+        self._next_save = time.monotonic() + checkpoint_interval
+        self._save_queue: "queue.Queue" = queue.Queue()   # the current writer's queue
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()   # writer start/stop and enqueueing
+        if checkpoint_path and Path(checkpoint_path).exists():
+            self.load(checkpoint_path)
+
+    # -- Input ---------------------------------------------------------------
+
+    def feed(self, sa: int, name: str, decoded: Any, timestamp: float) -> None:
+        """Add one decoded frame (only dc_hires and capacity_energy are used)."""
+        if self.sa is not None and sa != self.sa:
+            return
+        if name == "dc_hires":
+            with self._lock:
+                self._add_sample(timestamp, decoded.current, decoded.voltage * decoded.current)
+        elif name == "capacity_energy":
+            with self._lock:
+                self._add_device(decoded.capacity, decoded.energy)
+        else:
+            return
+        if self.checkpoint_path and time.monotonic() >= self._next_save:
+            self._next_save = time.monotonic() + self.checkpoint_interval
+            self._submit(self.checkpoint_path)   # written on the checkpoint thread
+
+    def on_frame(self, sa: int, pf: int, name: str, decoded: Any, timestamp: float) -> None:
+        """PCSController frame-callback adapter (register with unfiltered=True)."""
+        self.feed(sa, name, decoded, timestamp)
+
+    def _add_sample(self, t: float, current: float, power: float) -> None:
+        rep = self._report
+        rep.samples += 1
+        last = self._last
+        self._last = (t, current, power)
+        if last is None:
+            return
+        dt = t - last[0]
+        if dt <= 0.0:
+            return
+        if dt > self.max_gap:
+            rep.gaps += 1
+            rep.gap_s += dt
+            return
+        a_in, a_out = _split(last[1], current, dt)
+        w_in, w_out = _split(last[2], power, dt)
+        self._as_in += a_in
+        self._as_out += a_out
+        self._ws_in += w_in
+        self._ws_out += w_out
+        rep.integrated_s += dt
+
+    def _add_device(self, ah: float, wh: float) -> None:
+        last = self._device_last
+        self._device_last = (ah, wh)
+        if last is None:
+            return
+        d_ah, d_wh = ah - last[0], wh - last[1]
+        if d_ah < 0.0 or d_wh < 0.0:
+            # Counter restarted (PCS reset): it counted up from zero since
+            self._report.device_resets += 1
+            d_ah, d_wh = ah, wh
+        self._report.device_ah += d_ah
+        self._report.device_wh += d_wh
+
+    # -- Output --------------------------------------------------------------
+
+    def report(self) -> CoulombReport:
+        """Current totals (a copy)."""
+        with self._lock:
+            rep = CoulombReport(**asdict(self._report))
+            rep.ah_in = self._as_in / 3600.0
+            rep.ah_out = self._as_out / 3600.0
+            rep.wh_in = self._ws_in / 3600.0
+            rep.wh_out = self._ws_out / 3600.0
+        return rep
+
+    def reset(self) -> None:
+        """Zero all totals (the checkpoint is overwritten on the next save)."""
+        with self._lock:
+            self._as_in = self._as_out = self._ws_in = self._ws_out = 0.0
+            self._report = CoulombReport()
+            self._last = None
+            self._device_last = None
+
+    # -- Persistence -----------------------------------------------------------
+
+    def save(self, path: Optional[str] = None, timeout: float = 5.0) -> None:
+        """Write a checkpoint (temp file + atomic rename) and wait for it.
+
+        The write goes through the checkpoint thread, so it cannot be
+        overtaken by an older periodic checkpoint still queued there.
+        """
+        path = path or self.checkpoint_path
+        if not path:
+            return
+        self._next_save = time.monotonic() + self.checkpoint_interval
+        done = threading.Event()
+        self._submit(path, done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write a final checkpoint and stop the checkpoint thread."""
+        self.save(timeout=timeout)
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._save_queue.put(_STOP)
+        if writer is not None:
+            writer.join(timeout)
+
+    def _submit(self, path: str, done: Optional[threading.Event] = None) -> None:
+        """Snapshot the totals and queue them for the checkpoint thread."""
+        with self._writer_lock:
+            if self._writer is None:
+                self._save_queue = queue.Queue()
+                self._writer = threading.Thread(
+                    target=self._writer_loop, args=(self._save_queue,), daemon=True,
+                    name="coulomb-checkpoint",
+                )
+                self._writer.start()
+            data = {"version": CHECKPOINT_VERSION, "saved_at": time.time()}
+            data.update(asdict(self.report()))
+            self._save_queue.put((path, data, done))
+
+    def _writer_loop(self, q: "queue.Queue") -> None:
+        while True:
+            item = q.get()
+            if item is _STOP:
+                return
+            path, data, done = item
+            self._write(path, data)
+            if done is not None:
+                done.set()
+
+    def _write(self, path: str, data: dict) -> None:
+        tmp = f"{path}.tmp"
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error("Coulomb checkpoint to %s failed: %s", path, e)
+
+    def load(self, path: str) -> None:
+        """Restore totals from a checkpoint.
+
+        The first sample after a restore starts a new segment, and the PCS
+        counter baseline is taken afresh, so the downtime is counted by neither
+        side (it does not show up as drift).
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported coulomb checkpoint version in {path}")
+        fields = {k: v for k, v in data.items() if k in CoulombReport.__dataclass_fields__}
+        with self._lock:
+            self._report = CoulombReport(**fields)
+            self._as_in = self._report.ah_in * 3600.0
+            self._as_out = self._report.ah_out * 3600.0
+            self._ws_in = self._report.wh_in * 3600.0
+            self._ws_out = self._report.wh_out * 3600.0
+            self._last = None
+            self._device_last = None
+        logger.info("Restored coulomb totals from %s (saved %s)", path,
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(data.get("saved_at", 0))))
+
+
+def integrate_log(source: str, counter: CoulombCounter) -> CoulombReport:
+    """Feed the RX frames of a FrameLogger CSV/JSONL log through ``counter``."""
+    for ts, direction, can_id, data in iter_frame_log(source):
+        if direction != "RX":
+            continue
+        try:
+            name, decoded = decode_rx_message(can_id, data)
+        except Exception:
+            continue
+        if name is not None:
+            counter.feed(parse_can_id(can_id)["sa"], name, decoded, ts)
+    return counter.report()
+
+
+def format_report(rep: CoulombReport) -> str:
+    """Human-readable totals and drift."""
+    def pct(drift: float, ref: float) -> str:
+        return f" ({drift / ref:+.2%})" if ref else ""
+
+    return "\n".join([
+        f"  Charge   in {rep.ah_in:12.4f} Ah   out {rep.ah_out:12.4f} Ah   net {rep.ah_net:+12.4f} Ah",
+        f"  Energy   in {rep.wh_in:12.3f} Wh   out {rep.wh_out:12.3f} Wh   net {rep.wh_net:+12.3f} Wh",
+        f"  Samples  {rep.samples}  integrated {rep.integrated_s:.1f}s  "
+        f"gaps {rep.gaps} ({rep.gap_s:.1f}s uncovered)",
+        f"  PCS counters  +{rep.device_ah:.1f} Ah  +{rep.device_wh:.1f} Wh"
+        + (f"  ({rep.device_resets} resets)" if rep.device_resets else ""),
+        f"  Drift    {rep.drift_ah:+.4f} Ah{pct(rep.drift_ah, rep.device_ah)}   "
+        f"{rep.drift_wh:+.3f} Wh{pct(rep.drift_wh, rep.device_wh)}",
+    ])
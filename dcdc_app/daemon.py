@@ -0,0 +1,436 @@
+"""Persistent controller daemon with a local Unix-socket RPC.
+
+One-shot CLI commands used to open the bus, start a controller, wait for the
+heartbeat and first status frames, run one command and tear everything down
+again, which costs about a second per command and means only one program can
+use the PCAN channel at a time. ``daemon`` keeps a single PCSController
+connected (heartbeat running, state warm) and serves commands over a Unix
+socket, so commands answer in milliseconds and several scripts can share one
+bus connection.
+
+Wire format: one JSON object per line in each direction.
+
+    -> {"id": 1, "method": "enable", "params": {"clear_faults": true}}
+    <- {"id": 1, "result": true}
+    <- {"id": 2, "error": "Unknown method 'foo'"}
+
+Commands that wait for a PCS reply are serialized (reply waiters are keyed by
+PF), reads such as ``status`` are not. The socket is created owner-only
+(0600); anyone who can open it can command the PCS.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from dataclasses import asdict, fields, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from dcdc_app.estop import EStopResult
+from dcdc_app.protocol import (
+    PCSState,
+    ProtectionParams1,
+    ProtectionParams2,
+    ProtectionParams3,
+    RunningState,
+    VersionInfo,
+    WorkingMode,
+)
+from dcdc_app.rolling import DEFAULT_WINDOW, WindowStats
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+CLIENT_TIMEOUT = 15.0   # longest command: enable with fault clear, 2 x command_timeout
+PROBE_TIMEOUT = 1.0     # ping in connect(): a hung daemon must not stall every command
+
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+_PROTECTION_PARAMS = {0x01: ProtectionParams1, 0x02: ProtectionParams2, 0x03: ProtectionParams3}
+
+
+class DaemonError(Exception):
+    """Raised by DaemonClient when the daemon reports an error or is unreachable."""
+
+
+def default_socket_path(pcs_addr: int, interface: str, channel: str) -> str:
+    """Per-user socket path for the daemon serving ``pcs_addr`` on ``interface``/``channel``.
+
+    Units at the same address on different buses get separate daemons.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    bus = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{interface}-{channel}")
+    return os.path.join(base, f"dcdc-pcs-{uid}-{bus}-{pcs_addr:02X}.sock")
+
+
+def _to_jsonable(value: Any) -> Any:
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_jsonable(v) for v in value]
+    return value
+
+
+def state_from_dict(data: Dict[str, Dict[str, Any]]) -> PCSState:
+    """Rebuild a PCSState from its asdict() form."""
+    state = PCSState()
+    for section in fields(PCSState):
+        values = data.get(section.name)
+        if values is not None:
+            cls = type(getattr(state, section.name))
+            setattr(state, section.name, cls(**values))
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        daemon: ControllerDaemon = self.server.daemon  # type: ignore[attr-defined]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                req_id = request.get("id")
+            except (ValueError, AttributeError) as e:
+                self._reply({"id": None, "error": f"Bad request: {e}"})
+                continue
+            try:
+                result = daemon.dispatch(request.get("method", ""), request.get("params") or {})
+                self._reply({"id": req_id, "result": _to_jsonable(result)})
+            except Exception as e:
+                self._reply({"id": req_id, "error": str(e) or type(e).__name__})
+
+    def _reply(self, message: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+
+if UNIX_SOCKETS:
+    class _Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        allow_reuse_address = True
+
+
+class ControllerDaemon:
+    """Serves one running PCSController over a Unix socket."""
+
+    def __init__(self, ctrl: Any, path: str, info: Optional[Dict[str, Any]] = None):
+        """Initialize the daemon (call start() to listen).
+
+        Args:
+            ctrl: Started PCSController to serve.
+            path: Unix socket path.
+            info: Extra fields returned by ``ping`` (e.g. dry_run, interface).
+        """
+        if not UNIX_SOCKETS:
+            raise RuntimeError("daemon mode needs Unix domain sockets (not available here)")
+        self.ctrl = ctrl
+        self.path = path
+        self.info = dict(info or {})
+        self.started_at = time.time()
+        self.shutdown_requested = threading.Event()
+        self._command_lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._methods: Dict[str, Callable[..., Any]] = {
+            "ping": self._ping,
+            "status": self._status,
+            "stats": self._stats,
+            "health": self._health,
+            "enable": self._command(ctrl.enable),
+            "disable": self._command(ctrl.disable),
+            "reset_faults": self._command(ctrl.reset_faults),
+            "set_working_mode": self._command(lambda mode: ctrl.set_working_mode(WorkingMode(mode))),
+            "set_mode_parameters": self._command(
+                lambda mode, params: ctrl.set_mode_parameters(WorkingMode(mode), params)
+            ),
+            "read_version": self._command(ctrl.read_version),
+            "read_working_mode": self._command(ctrl.read_working_mode),
+            "read_protection_params": self._command(ctrl.read_protection_params),
+            "wait_for_cycle": ctrl.wait_for_cycle,
+            "wait_for_pf": ctrl.wait_for_pf,
+            "wait_for_state": lambda states, timeout=None: ctrl.wait_for_state(
+                [RunningState(s) for s in states], timeout,
+            ),
+            "trigger_dump": ctrl.trigger_dump,
+            # Not behind the command lock: must not wait for a running command
+            "emergency_stop": lambda wait=None: asdict(ctrl.emergency_stop(wait)),
+            "shutdown": self._shutdown,
+        }
+
+    def start(self) -> None:
+        """Bind the socket and serve requests on a background thread."""
+        if os.path.exists(self.path):
+            if _socket_alive(self.path):
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            os.unlink(self.path)   # left over from a daemon that did not exit cleanly
+        old_umask = os.umask(0o177)   # socket file created as 0600
+        try:
+            self._server = _Server(self.path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon = self  # type: ignore[attr-defined]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True, name="pcs-daemon",
+        )
+        self._thread.start()
+        logger.info("Daemon listening on %s", self.path)
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket file."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        handler = self._methods.get(method)
+        if handler is None:
+            raise ValueError(f"Unknown method {method!r}")
+        return handler(**params)
+
+    def _command(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        def call(**params: Any) -> Any:
+            with self._command_lock:
+                return func(**params)
+        return call
+
+    def _ping(self) -> Dict[str, Any]:
+        return dict(
+            self.info,
+            protocol=PROTOCOL_VERSION,
+            pid=os.getpid(),
+            uptime=time.time() - self.started_at,
+            pcs_addr=self.ctrl.config.pcs_addr,
+        )
+
+    def _status(self) -> Dict[str, Any]:
+        ctrl = self.ctrl
+        since = ctrl.seconds_since_last_rx
+        return {
+            "state": asdict(ctrl.state),
+            "connected": ctrl.connected,
+            "seconds_since_last_rx": None if since == float("inf") else since,
+            "stale": sorted(ctrl.stale_sections),
+        }
+
+    def _stats(self, window: str = DEFAULT_WINDOW) -> Dict[str, Any]:
+        return {name: asdict(st) for name, st in self.ctrl.stats_snapshot(window).items()}
+
+    def _health(self) -> Dict[str, Any]:
+        health = self.ctrl.bus_health
+        return {
+            "expected_period": health.expected_period,
+            "rows": _to_jsonable(health.snapshot(time.time())),
+            "stale": sorted(health.stale_sections()),
+        }
+
+    def _shutdown(self) -> bool:
+        self.shutdown_requested.set()
+        return True
+
+
+def _socket_alive(path: str) -> bool:
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.settimeout(0.5)
+        s.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        s.close()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class DaemonClient:
+    """Blocking JSON-RPC client for a ControllerDaemon socket."""
+
+    def __init__(self, path: str, timeout: float = CLIENT_TIMEOUT):
+        """Connect to the daemon.
+
+        Raises:
+            DaemonError: No daemon is listening on ``path``.
+        """
+        if not UNIX_SOCKETS:
+            raise DaemonError("Unix domain sockets are not available")
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(path)
+        except OSError as e:
+            self._sock.close()
+            raise DaemonError(f"No daemon on {path}: {e}") from e
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def settimeout(self, timeout: float) -> None:
+        """Change the per-call socket timeout."""
+        self._sock.settimeout(timeout)
+
+    def call(self, method: str, **params: Any) -> Any:
+        """Invoke ``method`` and return its result.
+
+        Raises:
+            DaemonError: The daemon returned an error or the connection failed.
+        """
+        with self._lock:
+            self._next_id += 1
+            req_id = self._next_id
+            try:
+                self._file.write(json.dumps(
+                    {"id": req_id, "method": method, "params": params}
+                ).encode() + b"\n")
+                self._file.flush()
+                line = self._file.readline()
+            except OSError as e:
+                raise DaemonError(f"Daemon connection failed: {e}") from e
+        if not line:
+            raise DaemonError("Daemon closed the connection")
+        reply = json.loads(line)
+        if reply.get("error") is not None:
+            raise DaemonError(reply["error"])
+        return reply.get("result")
+
+    def close(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            self._sock.close()
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class RemoteController:
+    """PCSController look-alike backed by a daemon, for one-shot commands.
+
+    Covers what the CLI commands use: the command methods, readiness waits,
+    ``state`` (fetched on each access) and ``stats_snapshot``.
+    """
+
+    def __init__(self, client: DaemonClient, info: Dict[str, Any]):
+        self.client = client
+        self.info = info
+
+    @property
+    def state(self) -> PCSState:
+        return state_from_dict(self.client.call("status")["state"])
+
+    def enable(self, clear_faults: bool = True) -> bool:
+        return self.client.call("enable", clear_faults=clear_faults)
+
+    def disable(self) -> bool:
+        return self.client.call("disable")
+
+    def reset_faults(self) -> bool:
+        return self.client.call("reset_faults")
+
+    def set_working_mode(self, mode: WorkingMode) -> bool:
+        return self.client.call("set_working_mode", mode=int(mode))
+
+    def set_mode_parameters(self, mode: WorkingMode, params: list) -> bool:
+        return self.client.call("set_mode_parameters", mode=int(mode), params=list(params))
+
+    def read_version(self) -> Optional[VersionInfo]:
+        data = self.client.call("read_version")
+        return VersionInfo(**data) if data else None
+
+    def read_protection_params(self, param_type: int = 0x01) -> Optional[Any]:
+        data = self.client.call("read_protection_params", param_type=param_type)
+        if not isinstance(data, dict):
+            return data
+        cls = _PROTECTION_PARAMS.get(param_type, ProtectionParams1)
+        return cls(**data)
+
+    def wait_for_cycle(self, timeout: Optional[float] = None) -> bool:
+        return self.client.call("wait_for_cycle", timeout=timeout)
+
+    def wait_for_pf(self, pf: int, timeout: Optional[float] = None, fresh: bool = False) -> bool:
+        return self.client.call("wait_for_pf", pf=pf, timeout=timeout, fresh=fresh)
+
+    def wait_for_state(self, states: Any, timeout: Optional[float] = None) -> bool:
+        states = [states] if isinstance(states, RunningState) else states
+        return self.client.call("wait_for_state", states=[int(s) for s in states], timeout=timeout)
+
+    def stats_snapshot(self, window: str = DEFAULT_WINDOW) -> Dict[str, WindowStats]:
+        data = self.client.call("stats", window=window)
+        return {name: WindowStats(**st) for name, st in data.items()}
+
+    def trigger_dump(self, reason: str = "operator") -> Optional[str]:
+        return self.client.call("trigger_dump", reason=reason)
+
+    def emergency_stop(self, wait: Optional[float] = None) -> EStopResult:
+        return EStopResult(**self.client.call("emergency_stop", wait=wait))
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def connect(
+    path: str,
+    pcs_addr: int,
+    dry_run: bool,
+    interface: str,
+    channel: str,
+    bitrate: int,
+) -> Optional[RemoteController]:
+    """Return a RemoteController if a matching daemon is listening on ``path``.
+
+    A daemon serving another PCS address, another interface, channel or
+    bitrate, or real hardware when ``dry_run`` is set (and vice versa), is
+    not used: the caller falls back to a local connection rather than
+    commanding the wrong device.
+    """
+    if not UNIX_SOCKETS or not os.path.exists(path):
+        return None
+    client = None
+    try:
+        client = DaemonClient(path, timeout=PROBE_TIMEOUT)
+        info = client.call("ping")
+        client.settimeout(CLIENT_TIMEOUT)
+    except (DaemonError, OSError, ValueError) as e:
+        logger.debug("Daemon not usable: %s", e)
+        if client is not None:
+            client.close()
+        return None
+    wanted = {"interface": interface, "channel": channel, "bitrate": bitrate}
+    if (info.get("pcs_addr") != pcs_addr or bool(info.get("dry_run")) != dry_run
+            or any(info.get(k) != v for k, v in wanted.items())):
+        logger.warning(
+            "Daemon on %s serves PCS 0x%02X on %s/%s at %s bps (dry_run=%s); connecting directly instead",
+            path, info.get("pcs_addr", 0), info.get("interface"), info.get("channel"),
+            info.get("bitrate"), info.get("dry_run"),
+        )
+        client.close()
+        return None
+    return RemoteController(client, info)
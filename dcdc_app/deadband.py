@@ -0,0 +1,152 @@
+"""Change detection / deadband filtering between decode and callbacks/logging.
+
+At steady state most 200ms status frames repeat the previous cycle within
+measurement noise. ChangeFilter decides per (source address, frame) whether a
+decoded frame is worth reporting:
+
+- a numeric field moved further than its deadband from the last *reported*
+  value (absolute and/or relative threshold), or any integer/status field
+  changed at all
+- the frame has been silent for ``max_silence`` seconds (keepalive), so
+  downstream consumers can tell "unchanged" from "gone"
+- the frame is the first of its kind, or is not a periodic status frame
+  (command replies always pass)
+
+Comparing against the last reported value (not the last received one) means
+slow drifts are reported once they accumulate past the deadband, and a
+transient spike passes on the way up and again on the way back.
+
+Rules are keyed by "section.field" (e.g. "dc.voltage"), "section" (e.g.
+"grid_voltage") or "" for the default, most specific first.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
+from dcdc_app.protocol import STATE_PFS
+
+
+@dataclass
+class DeadbandRule:
+    """Thresholds for one signal; a change must exceed both to be reported."""
+    abs_threshold: float = 0.0   # engineering units
+    rel_threshold: float = 0.0   # fraction of |last reported value|
+
+    def exceeded(self, last: float, value: float) -> bool:
+        delta = abs(value - last)
+        return delta > self.abs_threshold and delta > self.rel_threshold * abs(last)
+
+
+def parse_rule(spec: str) -> Tuple[str, DeadbandRule]:
+    """Parse a CLI deadband spec.
+
+    Formats: ``ABS``, ``REL%``, ``ABS,REL%`` optionally prefixed with
+    ``SIGNAL=`` (e.g. ``0.5``, ``dc.current=1%``, ``grid_voltage=0.5,0.2%``).
+
+    Returns:
+        (signal key, rule); the key is "" for the default rule.
+    """
+    key, _, values = spec.rpartition("=")
+    rule = DeadbandRule()
+    for part in values.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part.endswith("%"):
+            rule.rel_threshold = float(part[:-1]) / 100.0
+        else:
+            rule.abs_threshold = float(part)
+    return key.strip(), rule
+
+
+class ChangeFilter:
+    """Per-signal deadband filter with max-silence keepalives."""
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, DeadbandRule]] = None,
+        max_silence: float = 5.0,
+    ):
+        """Initialize the filter.
+
+        Args:
+            rules: Deadbands keyed by "section.field", "section" or "" (default).
+                With no rules every numeric change is reported (pure change
+                detection).
+            max_silence: Report a frame at least this often even if unchanged
+                (seconds, 0 to disable keepalives).
+        """
+        self.rules = dict(rules or {})
+        self.max_silence = max_silence
+        # (sa, section) -> (last reported object, report time)
+        self._last: Dict[Tuple[int, str], Tuple[Any, float]] = {}
+        # (section, dataclass type) -> per-field (name, rule or None for exact match)
+        self._plans: Dict[Tuple[str, type], Tuple[Tuple[str, Optional[DeadbandRule]], ...]] = {}
+        self.passed = 0
+        self.suppressed = 0
+        self.keepalives = 0
+
+    def _plan(self, section: str, obj: Any) -> Tuple[Tuple[str, Optional[DeadbandRule]], ...]:
+        key = (section, type(obj))
+        plan = self._plans.get(key)
+        if plan is None:
+            default = self.rules.get(section) or self.rules.get("")
+            items = []
+            for f in fields(obj):
+                value = getattr(obj, f.name)
+                if isinstance(value, float):
+                    items.append((f.name, self.rules.get(f"{section}.{f.name}") or default or DeadbandRule()))
+                else:
+                    items.append((f.name, None))
+            plan = self._plans[key] = tuple(items)
+        return plan
+
+    def should_report(self, sa: int, pf: int, name: str, decoded: Any, now: float) -> bool:
+        """Return True if this decoded frame should reach callbacks/logging."""
+        if pf not in STATE_PFS or not hasattr(decoded, "__dataclass_fields__"):
+            self.passed += 1
+            return True
+
+        key = (sa, name)
+        prev = self._last.get(key)
+        if prev is None:
+            self._last[key] = (decoded, now)
+            self.passed += 1
+            return True
+
+        last, last_time = prev
+        changed = False
+        for field_name, rule in self._plan(name, decoded):
+            old = getattr(last, field_name)
+            new = getattr(decoded, field_name)
+            if rule is None:
+                if new != old:
+                    changed = True
+                    break
+            elif rule.exceeded(old, new):
+                changed = True
+                break
+
+        if not changed:
+            if self.max_silence and now - last_time >= self.max_silence:
+                self.keepalives += 1
+            else:
+                self.suppressed += 1
+                return False
+
+        self._last[key] = (decoded, now)
+        self.passed += 1
+        return True
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of frames suppressed so far."""
+        total = self.passed + self.suppressed
+        return self.suppressed / total if total else 0.0
+
+    def reset(self) -> None:
+        """Forget reported values (next frame of each kind passes)."""
+        self._last.clear()
+        self.passed = self.suppressed = self.keepalives = 0
@@ -0,0 +1,247 @@
+"""Emergency stop: pre-encoded stop frames on a dedicated TX path.
+
+The normal disable path builds a frame, logs it and then blocks the caller
+in a reply wait, behind whatever command is already in progress. The
+emergency stop instead:
+
+- keeps a ready-made stop frame (StartStop, start=0) for every known device
+  plus one to the broadcast address, built once when a device is first seen
+- hands them straight to the bus from the calling thread
+  (CANInterface.send_messages: no frame logger, no per-frame formatting, no
+  command lock or reply wait)
+- retransmits to every device that has not confirmed from a background
+  thread every ``retry_interval`` until all have, or ``timeout`` expires
+
+A device counts as stopped only when it reports a non-running state (PF
+0x13) after the trigger: the frame must be processed after the trigger and
+carry a later bus timestamp than any frame seen before it. Only frame
+timestamps are compared with each other, so this holds whatever clock the
+adapter stamps frames with (PCAN: time since driver start). A PF 0x10 acknowledgement is not enough: it does
+not say which StartStop it answers, and may belong to a start command that
+was still in flight.
+
+Example:
+    ctrl.estop.trigger(on_done=lambda r: print(r.complete))
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from dcdc_app.constants import ACTIVE_STATES, BROADCAST_ADDR
+from dcdc_app.protocol import encode_start_stop
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_INTERVAL = 0.05   # seconds between retransmits to unconfirmed devices
+DEFAULT_TIMEOUT = 2.0           # give up retransmitting after this long
+
+
+@dataclass
+class EStopResult:
+    """Outcome of one emergency stop."""
+    targets: List[int]                        # device addresses to stop
+    stopped: List[int] = field(default_factory=list)   # confirmed, in order
+    attempts: int = 0                         # bursts sent (first + retransmits)
+    first_tx_s: float = 0.0                   # trigger() call to first burst handed to the bus
+    confirm_s: Optional[float] = None         # trigger() call to last confirmation
+    first_sent: int = 0                       # frames the bus accepted in the first burst
+    frames_sent: int = 0                      # frames accepted over all bursts
+
+    @property
+    def complete(self) -> bool:
+        return set(self.stopped) >= set(self.targets)
+
+    @property
+    def on_bus(self) -> bool:
+        """Whether the first burst put any stop frame on the bus."""
+        return self.first_sent > 0
+
+
+class EmergencyStop:
+    """Pre-encoded stop frames for the fleet, sent and retransmitted off the command path."""
+
+    def __init__(
+        self,
+        can_iface,
+        pcs_addr: int,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        timeout: float = DEFAULT_TIMEOUT,
+        broadcast: bool = True,
+    ):
+        """
+        Args:
+            can_iface: CANInterface the frames go out on.
+            pcs_addr: Configured PCS address (always a target).
+            retry_interval: Seconds between retransmits.
+            timeout: Seconds to keep retransmitting after a trigger.
+            broadcast: Also send the stop frame to the broadcast address.
+        """
+        self.can = can_iface
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.broadcast = broadcast
+        self._lock = threading.Lock()
+        self._frames: Dict[int, Any] = {}      # device address -> can.Message
+        self._broadcast_frame = None
+        self._pending: Set[int] = set()
+        self._result: Optional[EStopResult] = None
+        self._t0 = 0.0
+        self._last_ts = float("-inf")   # newest frame timestamp seen (bus clock)
+        self._trigger_ts = float("-inf")   # _last_ts when the current stop started
+        self._deadline = 0.0
+        self._wake = threading.Event()
+        self._done = threading.Event()
+        self._done.set()
+        self._on_done: List[Callable[[EStopResult], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self.add_device(pcs_addr)
+
+    @staticmethod
+    def _encode(addr: int):
+        import can
+        can_id, data = encode_start_stop(start=False, pcs_addr=addr)
+        return can.Message(arbitration_id=can_id, data=data, is_extended_id=True)
+
+    @property
+    def devices(self) -> List[int]:
+        return sorted(self._frames)
+
+    @property
+    def active(self) -> bool:
+        """Whether a stop is still being retransmitted."""
+        return not self._done.is_set()
+
+    def add_device(self, addr: int) -> None:
+        """Pre-encode the stop frame for a device (no-op if already known)."""
+        if addr in self._frames or addr == BROADCAST_ADDR:
+            return
+        try:
+            msg = self._encode(addr)
+        except ImportError:
+            return   # python-can missing: nothing can be sent anyway
+        with self._lock:
+            frames = dict(self._frames)
+            frames[addr] = msg
+            self._frames = frames   # replaced, never mutated: trigger() reads it lock-free
+            if self.broadcast and self._broadcast_frame is None:
+                self._broadcast_frame = self._encode(BROADCAST_ADDR)
+            if self._result is not None and not self._done.is_set():
+                # Seen for the first time during a stop: stop it too
+                self._pending.add(addr)
+                self._result.targets.append(addr)
+
+    def on_frame(self, sa: int, pf: int, name: str, decoded: Any, timestamp: float) -> None:
+        """PCSController frame-callback adapter (register with unfiltered=True).
+
+        Learns device addresses and collects stop confirmations.
+        """
+        if timestamp > self._last_ts:
+            self._last_ts = timestamp   # before the pending check: see trigger()
+        if sa not in self._frames:
+            self.add_device(sa)
+        if pf != 0x13 or not self._pending or sa not in self._pending:
+            return
+        if timestamp > self._trigger_ts and decoded.running_state not in ACTIVE_STATES:
+            with self._lock:
+                if sa in self._pending:
+                    self._pending.discard(sa)
+                    self._result.stopped.append(sa)
+                    if not self._pending:
+                        self._result.confirm_s = time.perf_counter() - self._t0
+                        self._wake.set()
+
+    def _burst(self, addrs) -> Tuple[int, int]:
+        """Send the stop frames for ``addrs`` (+ broadcast); returns (accepted, attempted)."""
+        frames = self._frames
+        msgs = [frames[a] for a in addrs if a in frames]
+        if self._broadcast_frame is not None:
+            msgs.append(self._broadcast_frame)
+        return self.can.send_messages(msgs), len(msgs)
+
+    def trigger(self, on_done: Optional[Callable[[EStopResult], None]] = None) -> EStopResult:
+        """Send the stop frames now and keep retransmitting in the background.
+
+        Returns once the first burst has been handed to the bus. A trigger
+        while a stop is still in progress re-sends at once and extends it.
+
+        Args:
+            on_done: Called (from the retransmit thread) with the final result.
+
+        Returns:
+            The live result object, completed in the background. Its
+            ``on_bus`` is False if the bus accepted none of the first frames
+            (disconnected, bus-off); retransmission keeps trying regardless.
+        """
+        t0 = time.perf_counter()
+        frames = self._frames
+        sent, attempted = self._burst(frames)
+        first = time.perf_counter() - t0
+        with self._lock:
+            if on_done is not None:
+                self._on_done.append(on_done)
+            self._deadline = time.monotonic() + self.timeout
+            if self._done.is_set():
+                self._t0 = t0
+                # Frames stamped up to here were on the bus before the trigger
+                self._trigger_ts = self._last_ts
+                self._pending = set(frames)
+                self._result = EStopResult(targets=sorted(frames), attempts=1, first_tx_s=first,
+                                           first_sent=sent, frames_sent=sent)
+                self._wake.clear()
+                self._done.clear()
+                self._thread = threading.Thread(target=self._retransmit_loop, daemon=True, name="pcs-estop")
+                self._thread.start()
+            else:
+                self._result.attempts += 1
+                self._result.frames_sent += sent
+            result = self._result
+        targets = [f"0x{a:02X}" for a in sorted(frames)]
+        if sent == 0:
+            logger.error("EMERGENCY STOP NOT SENT to %s: the bus accepted none of %d frames",
+                         targets, attempted)
+        else:
+            logger.warning("EMERGENCY STOP sent to %s%s in %.3f ms (%d/%d frames)", targets,
+                           " + broadcast" if self.broadcast else "", first * 1e3, sent, attempted)
+        return result
+
+    def _retransmit_loop(self) -> None:
+        while True:
+            self._wake.wait(self.retry_interval)
+            with self._lock:
+                pending = set(self._pending)
+                expired = time.monotonic() >= self._deadline
+            if not pending or expired:
+                break
+            sent, _ = self._burst(pending)
+            self._result.attempts += 1
+            self._result.frames_sent += sent
+        with self._lock:
+            result, callbacks = self._result, self._on_done
+            self._on_done = []
+            self._pending = set()
+            self._done.set()
+        if result.complete:
+            logger.warning("Emergency stop confirmed by all %d device(s) in %.1f ms (%d bursts)",
+                           len(result.targets), result.confirm_s * 1e3, result.attempts)
+        else:
+            missing = sorted(set(result.targets) - set(result.stopped))
+            logger.error("Emergency stop NOT confirmed by %s after %d bursts",
+                         [f"0x{a:02X}" for a in missing], result.attempts)
+        for cb in callbacks:
+            try:
+                cb(result)
+            except Exception as e:
+                logger.debug("E-stop callback error: %s", e)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[EStopResult]:
+        """Block until the current stop is confirmed or given up; returns its result.
+
+        The on_done callbacks run after this is released, on the retransmit thread.
+        """
+        self._done.wait(timeout)
+        return self._result
@@ -0,0 +1,318 @@
+"""Wide-table telemetry export: one row per 200ms status cycle.
+
+FrameLogger writes one row per CAN frame with decoded fields packed into a
+JSON column. This module aligns the periodic status frames of each cycle into
+a single row with one typed column per numeric PCSState field
+(``dc_voltage``, ``grid_current_power_factor``, ...), plus ``timestamp``
+(cycle start, epoch seconds) and ``addr`` (source address).
+
+Rows are streamed to a writer in batches, so memory stays bounded for any
+capture length:
+- CSV (always available)
+- Parquet or Arrow IPC (requires pyarrow)
+- NumPy ``.npz`` chunks (requires numpy): ``out.npz`` is written as
+  ``out.00000.npz``, ``out.00001.npz``, ... one file per batch
+- SQLite archive (``.db``/``.sqlite``, see archive.TelemetryArchive)
+
+Sources: a live controller (``CycleAssembler.on_frame`` as a frame callback)
+or an existing CSV/JSONL frame log (``export_log``).
+"""
+
+from __future__ import annotations
+
+import abc
+import csv
+import importlib
+import importlib.util
+import logging
+import operator
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from dcdc_app.logging_utils import iter_frame_log
+from dcdc_app.protocol import PCSState, STATE_PFS, decode_rx_message, parse_can_id, state_fields
+
+logger = logging.getLogger(__name__)
+
+# (column name, python type, getter on PCSState)
+COLUMNS: List[Tuple[str, type, Callable[[PCSState], Any]]] = [
+    (f"{section}_{name}", typ, operator.attrgetter(f"{section}.{name}"))
+    for section, name, typ in state_fields()
+]
+COLUMN_NAMES = ["timestamp", "addr"] + [c[0] for c in COLUMNS]
+COLUMN_TYPES = [float, int] + [c[1] for c in COLUMNS]
+_SECTIONS = frozenset(STATE_PFS.values())
+
+FORMATS = ("csv", "parquet", "arrow", "npz", "sqlite")
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".npz": "npz",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+}
+
+
+# ---------------------------------------------------------------------------
+# Cycle alignment
+# ---------------------------------------------------------------------------
+
+class _DeviceCycle:
+    __slots__ = ("state", "start", "seen")
+
+    def __init__(self):
+        self.state = PCSState()
+        self.start: Optional[float] = None
+        self.seen: set = set()
+
+
+class CycleAssembler:
+    """Groups periodic status frames into one row per device and cycle.
+
+    A cycle closes when a section already present in it arrives again, or
+    when a frame arrives more than half a period after the cycle start.
+    Sections missing from a cycle keep their last value (sample and hold).
+    """
+
+    def __init__(self, on_row: Callable[[list], None], period: float = 0.2):
+        self.on_row = on_row
+        self.period = period
+        self._devices: Dict[int, _DeviceCycle] = {}
+        self.rows = 0
+
+    def feed(self, sa: int, name: str, decoded: Any, timestamp: float) -> None:
+        """Add one decoded frame (non-status frames are ignored)."""
+        if name not in _SECTIONS:
+            return
+        dev = self._devices.get(sa)
+        if dev is None:
+            dev = self._devices[sa] = _DeviceCycle()
+        if dev.start is not None and (
+            name in dev.seen or timestamp - dev.start > self.period / 2
+        ):
+            self._emit(sa, dev)
+        if dev.start is None:
+            dev.start = timestamp
+        setattr(dev.state, name, decoded)
+        dev.seen.add(name)
+
+    def on_frame(self, sa: int, pf: int, name: str, decoded: Any, timestamp: float) -> None:
+        """PCSController frame-callback adapter (register with unfiltered=True)."""
+        self.feed(sa, name, decoded, timestamp)
+
+    def flush(self) -> None:
+        """Emit the open cycle of every device."""
+        for sa, dev in self._devices.items():
+            if dev.start is not None:
+                self._emit(sa, dev)
+
+    def _emit(self, sa: int, dev: _DeviceCycle) -> None:
+        state = dev.state
+        self.on_row([dev.start, sa] + [get(state) for _, _, get in COLUMNS])
+        self.rows += 1
+        dev.start = None
+        dev.seen.clear()
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+class CycleWriter(abc.ABC):
+    """Base class: buffers rows and flushes them in batches."""
+
+    def __init__(self, path: str, batch_rows: int = 1000):
+        self.path = path
+        self.batch_rows = batch_rows
+        self._pending: List[list] = []
+        self.rows_written = 0
+
+    def write_row(self, row: list) -> None:
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._write_batch(self._pending)
+            self.rows_written += len(self._pending)
+            self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: List[list]) -> None:
+        """Write one batch of rows to the output."""
+
+    def _columns(self, rows: List[list]) -> List[list]:
+        return [list(col) for col in zip(*rows)]
+
+    def __enter__(self) -> CycleWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class CsvCycleWriter(CycleWriter):
+    """Wide CSV, one header row, floats rounded to 6 decimals."""
+
+    def __init__(self, path: str, batch_rows: int = 1000):
+        super().__init__(path, batch_rows)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMN_NAMES)
+        self._float_cols = [i for i, t in enumerate(COLUMN_TYPES) if t is float and i > 0]
+
+    def _write_batch(self, rows: List[list]) -> None:
+        for row in rows:
+            for i in self._float_cols:
+                row[i] = round(row[i], 6)
+            row[0] = f"{row[0]:.3f}"
+            self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self) -> None:
+        super().close()
+        self._file.close()
+
+
+class ArrowCycleWriter(CycleWriter):
+    """Parquet (``parquet=True``) or Arrow IPC file via pyarrow, one record batch per flush."""
+
+    def __init__(self, path: str, batch_rows: int = 1000, parquet: bool = True):
+        super().__init__(path, batch_rows)
+        pa = importlib.import_module("pyarrow")
+        self._pa = pa
+        arrow_types = {float: pa.float64(), int: pa.int64()}
+        self._schema = pa.schema(
+            [(name, arrow_types[typ]) for name, typ in zip(COLUMN_NAMES, COLUMN_TYPES)]
+        )
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if parquet:
+            pq = importlib.import_module("pyarrow.parquet")
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            ipc = importlib.import_module("pyarrow.ipc")
+            self._writer = ipc.new_file(path, self._schema)
+
+    def _write_batch(self, rows: List[list]) -> None:
+        batch = self._pa.RecordBatch.from_arrays(
+            [self._pa.array(col, type=f.type) for col, f in zip(self._columns(rows), self._schema)],
+            schema=self._schema,
+        )
+        self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        super().close()
+        self._writer.close()
+
+
+class NpzCycleWriter(CycleWriter):
+    """Numbered .npz chunks (one array per column) next to ``path``."""
+
+    def __init__(self, path: str, batch_rows: int = 1000):
+        super().__init__(path, batch_rows)
+        self._np = importlib.import_module("numpy")
+        self._dtypes = [self._np.float64 if t is float else self._np.int64 for t in COLUMN_TYPES]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.chunks: List[str] = []
+
+    def _write_batch(self, rows: List[list]) -> None:
+        chunk = npz_chunk_path(self.path, len(self.chunks))
+        arrays = {
+            name: self._np.asarray(col, dtype=dtype)
+            for name, dtype, col in zip(COLUMN_NAMES, self._dtypes, self._columns(rows))
+        }
+        self._np.savez_compressed(chunk, **arrays)
+        self.chunks.append(chunk)
+
+
+def npz_chunk_path(path: str, index: int) -> str:
+    """Path of chunk ``index`` for an .npz export target."""
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}.{index:05d}.npz"))
+
+
+def iter_npz_chunks(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield {column: array} for each chunk written by NpzCycleWriter."""
+    np = importlib.import_module("numpy")
+    index = 0
+    while True:
+        chunk = Path(npz_chunk_path(path, index))
+        if not chunk.exists():
+            return
+        with np.load(chunk) as data:
+            yield {name: data[name] for name in data.files}
+        index += 1
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve_format(path: str, fmt: str = "auto") -> str:
+    """Pick the output format from ``fmt`` or the file extension.
+
+    Parquet/Arrow fall back to .npz chunks when pyarrow is missing.
+
+    Raises:
+        RuntimeError: If no installed library can write the requested format.
+    """
+    if fmt == "auto":
+        fmt = _EXTENSIONS.get(Path(path).suffix.lower(), "csv")
+    if fmt in ("parquet", "arrow") and not _available("pyarrow"):
+        if _available("numpy"):
+            logger.warning("pyarrow not installed; writing %s as .npz chunks instead", fmt)
+            return "npz"
+        raise RuntimeError(
+            f"{fmt} export requires pyarrow (pip install pyarrow) or numpy for .npz chunks"
+        )
+    if fmt == "npz" and not _available("numpy"):
+        raise RuntimeError("npz export requires numpy (pip install numpy)")
+    return fmt
+
+
+def open_writer(path: str, fmt: str = "auto", batch_rows: int = 1000) -> CycleWriter:
+    """Create the writer for ``path`` (see resolve_format)."""
+    fmt = resolve_format(path, fmt)
+    if fmt == "csv":
+        return CsvCycleWriter(path, batch_rows)
+    if fmt == "parquet":
+        return ArrowCycleWriter(path, batch_rows, parquet=True)
+    if fmt == "arrow":
+        return ArrowCycleWriter(path, batch_rows, parquet=False)
+    if fmt == "sqlite":
+        from dcdc_app.archive import TelemetryArchive
+        return TelemetryArchive(path, batch_rows=batch_rows)
+    return NpzCycleWriter(path, batch_rows)
+
+
+# ---------------------------------------------------------------------------
+# Offline conversion
+# ---------------------------------------------------------------------------
+
+def export_log(source: str, writer: CycleWriter, period: float = 0.2) -> int:
+    """Convert a FrameLogger CSV/JSONL log into wide cycle rows.
+
+    Returns:
+        Number of rows written.
+    """
+    assembler = CycleAssembler(writer.write_row, period=period)
+    for ts, direction, can_id, data in iter_frame_log(source):
+        if direction != "RX":
+            continue
+        try:
+            name, decoded = decode_rx_message(can_id, data)
+        except Exception:
+            continue
+        if name is not None:
+            assembler.feed(parse_can_id(can_id)["sa"], name, decoded, ts)
+    assembler.flush()
+    writer.flush()
+    return assembler.rows
@@ -0,0 +1,272 @@
+"""OpenMetrics (Prometheus) exporter for PCS telemetry and tool internals.
+
+Serves ``GET /metrics`` on localhost from a small HTTP server thread:
+- latest decoded PCSState values per device (``pcs_<section>_<field>{addr=...}``)
+- controller/bus internals from the metrics registry (TX/RX/error counters,
+  queue depth, decode/reply/logger latency histograms)
+- per-PF receive rates derived from the decode counters
+
+A refresh thread renders the page every ``refresh_interval`` seconds and the
+request handler only returns the cached bytes, so a scrape never touches the
+controller lock or the RX thread. State sections whose decoded object has not
+been replaced since the last render reuse their formatted values.
+
+Example:
+    exporter = OpenMetricsExporter(ctrl, port=9464)
+    exporter.start()
+    # curl http://127.0.0.1:9464/metrics
+    exporter.stop()
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from dcdc_app.metrics import REGISTRY, Counter, Histogram, LabelKey, MetricsRegistry
+from dcdc_app.protocol import state_fields
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9464
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Fixed "le" bounds (seconds) so bucket series stay stable between scrapes
+HISTOGRAM_BOUNDS = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _fmt(value: Any) -> str:
+    """Format a sample value in OpenMetrics syntax."""
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value == float("inf"):
+            return "+Inf"
+        if value == float("-inf"):
+            return "-Inf"
+        return repr(value)
+    return str(int(value))
+
+
+def _labels(pairs: LabelKey) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+class OpenMetricsExporter:
+    """Localhost HTTP endpoint rendering cached telemetry in OpenMetrics text format."""
+
+    def __init__(
+        self,
+        controller: Optional[Any] = None,
+        registry: Optional[MetricsRegistry] = None,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        refresh_interval: float = 1.0,
+    ):
+        """Initialize the exporter.
+
+        Args:
+            controller: PCSController to read device states from (may be set
+                or replaced later via the ``controller`` attribute).
+            registry: Metrics registry to export (default: process-wide REGISTRY).
+            host: Bind address (default: localhost only).
+            port: TCP port, 0 to pick a free one.
+            refresh_interval: Seconds between page renders.
+        """
+        self.controller = controller
+        self.registry = registry or REGISTRY
+        self.host = host
+        self.refresh_interval = refresh_interval
+        self._requested_port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._body = b"# EOF\n"
+
+        self._sections: Dict[str, List[str]] = {}
+        for section, name, _ in state_fields():
+            self._sections.setdefault(section, []).append(name)
+        self._value_cache: Dict[Tuple[int, str], Tuple[Any, Dict[str, str]]] = {}
+        self._rate_prev: Dict[LabelKey, Tuple[int, float]] = {}
+
+    @property
+    def port(self) -> int:
+        """Bound TCP port (the requested port until started)."""
+        if self._server is not None:
+            return self._server.server_address[1]
+        return self._requested_port
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> None:
+        """Bind the socket and start the HTTP and refresh threads."""
+        handler = type("_BoundHandler", (_MetricsHandler,), {"exporter": self})
+        self._server = ThreadingHTTPServer((self.host, self._requested_port), handler)
+        self._server.daemon_threads = True
+        self._stop.clear()
+        self._body = self.render()
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True, name="metrics-http"),
+            threading.Thread(target=self._refresh_loop, daemon=True, name="metrics-refresh"),
+        ]
+        for t in self._threads:
+            t.start()
+        logger.info("OpenMetrics exporter listening on %s", self.url)
+
+    def stop(self) -> None:
+        """Stop serving and join the threads."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads = []
+
+    def body(self) -> bytes:
+        """Last rendered page."""
+        return self._body
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self._body = self.render()
+            except Exception as e:
+                logger.debug("Metrics render error: %s", e)
+
+    # -----------------------------------------------------------------------
+    # Rendering
+    # -----------------------------------------------------------------------
+
+    def render(self) -> bytes:
+        """Render the full page from current snapshots."""
+        lines: List[str] = []
+        self._render_devices(lines)
+        self._render_controller(lines)
+        self._render_registry(lines)
+        lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _section_values(self, addr: int, section: str, obj: Any) -> Dict[str, str]:
+        key = (addr, section)
+        cached = self._value_cache.get(key)
+        if cached is not None and cached[0] is obj:
+            return cached[1]
+        values = {name: _fmt(getattr(obj, name)) for name in self._sections[section]}
+        self._value_cache[key] = (obj, values)
+        return values
+
+    def _render_devices(self, lines: List[str]) -> None:
+        ctrl = self.controller
+        if ctrl is None:
+            return
+        # Decoded sections are replaced, never mutated, by the RX thread, so
+        # reading them without the controller lock yields consistent values.
+        devices = sorted(dict(getattr(ctrl, "device_states", {})).items())
+        if not devices:
+            return
+        per_device = [
+            (f"0x{addr:02X}", {
+                section: self._section_values(addr, section, getattr(state, section))
+                for section in self._sections
+            }, state)
+            for addr, state in devices
+        ]
+        for section, names in self._sections.items():
+            for name in names:
+                family = f"pcs_{section}_{name}"
+                lines.append(f"# TYPE {family} gauge")
+                for addr_label, values, _ in per_device:
+                    lines.append(f'{family}{{addr="{addr_label}"}} {values[section][name]}')
+        lines.append("# TYPE pcs_status_fault gauge")
+        lines.append("# HELP pcs_status_fault 1 if the device reports a fault state or code")
+        for addr_label, _, state in per_device:
+            lines.append(f'pcs_status_fault{{addr="{addr_label}"}} {int(state.status.is_fault)}')
+
+    def _render_controller(self, lines: List[str]) -> None:
+        ctrl = self.controller
+        if ctrl is None:
+            return
+        lines.append("# TYPE dcdc_connected gauge")
+        lines.append(f"dcdc_connected {int(bool(ctrl.connected))}")
+        lines.append("# TYPE dcdc_seconds_since_last_rx gauge")
+        lines.append(f"dcdc_seconds_since_last_rx {_fmt(ctrl.seconds_since_last_rx)}")
+
+        # Per-PF receive rate from the decode histogram counts
+        now = time.monotonic()
+        rates = []
+        for m in self.registry.metrics():
+            if m.name != "controller_decode_seconds":
+                continue
+            prev = self._rate_prev.get(m.labels)
+            count = m.count
+            rate = 0.0
+            if prev is not None and now > prev[1]:
+                rate = (count - prev[0]) / (now - prev[1])
+            self._rate_prev[m.labels] = (count, now)
+            rates.append((m.labels, rate))
+        if rates:
+            lines.append("# TYPE dcdc_rx_frame_rate_hz gauge")
+            lines.append("# HELP dcdc_rx_frame_rate_hz Received frames per second since the previous render")
+            for labels, rate in rates:
+                lines.append(f"dcdc_rx_frame_rate_hz{_labels(labels)} {_fmt(round(rate, 3))}")
+
+    def _render_registry(self, lines: List[str]) -> None:
+        family = None
+        for m in self.registry.metrics():
+            if m.name != family:
+                family = m.name
+                base = m.name[:-6] if isinstance(m, Counter) and m.name.endswith("_total") else m.name
+                lines.append(f"# TYPE {base} {m.kind}")
+                if m.help:
+                    lines.append(f"# HELP {base} {_help(m.help)}")
+                if isinstance(m, Histogram):
+                    lines.append(f"# UNIT {base} seconds")
+            if isinstance(m, Histogram):
+                cumulative, total = m.cumulative(HISTOGRAM_BOUNDS)
+                for bound, count in zip(HISTOGRAM_BOUNDS, cumulative):
+                    lines.append(f"{m.name}_bucket{_labels(m.labels + (('le', repr(bound)),))} {count}")
+                lines.append(f"{m.name}_bucket{_labels(m.labels + (('le', '+Inf'),))} {total}")
+                lines.append(f"{m.name}_count{_labels(m.labels)} {total}")
+                lines.append(f"{m.name}_sum{_labels(m.labels)} {_fmt(float(m.sum))}")
+            elif isinstance(m, Counter):
+                name = m.name if m.name.endswith("_total") else m.name + "_total"
+                lines.append(f"{name}{_labels(m.labels)} {_fmt(m.value)}")
+            else:
+                lines.append(f"{m.name}{_labels(m.labels)} {_fmt(m.value)}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Returns the exporter's cached page; never renders on the request path."""
+
+    exporter: OpenMetricsExporter
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.exporter.body()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("metrics %s - %s", self.address_string(), format % args)
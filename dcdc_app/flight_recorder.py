@@ -0,0 +1,153 @@
+"""Flight recorder: dump the lead-up to a fault from the always-on frame trace.
+
+The CAN interface keeps every TX/RX frame in a fixed-memory FrameTrace ring
+(see trace.py), so there is always a recording of the recent past even when
+no ``record`` or ``--log-frames`` session is running. FlightRecorder turns
+that ring into files when something goes wrong:
+
+- a fault transition (``StatusData.is_fault`` becomes true, or the fault code
+  changes to another non-zero value, e.g. 0x800D heartbeat timeout)
+- a command that got no reply in time
+- an operator request (``trigger("operator")``, SIGUSR1 in ``monitor``)
+
+A trigger only copies the raw ring buffers (tens of microseconds); selecting
+the last ``seconds``, formatting and writing happen on a background thread, so the
+RX thread that detected the fault is not held up. Repeated triggers with the
+same reason within ``min_interval`` are coalesced into the first dump.
+``close()`` writes every dump triggered before it; triggers after it are
+refused until ``open()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dcdc_app.trace import FrameTrace, TraceRecord, default_dump_name, write_records
+
+logger = logging.getLogger(__name__)
+
+DUMP_FORMATS = ("bin", "csv", "jsonl")
+
+_STOP = object()
+
+
+class FlightRecorder:
+    """Writes the last N seconds of the frame trace to ``out_dir`` on demand."""
+
+    def __init__(
+        self,
+        trace: FrameTrace,
+        out_dir: str,
+        seconds: float = 30.0,
+        fmt: str = "bin",
+        min_interval: float = 5.0,
+    ):
+        """Initialize the recorder (no thread is started until the first dump).
+
+        Args:
+            trace: Frame ring to dump (normally ``CANInterface.trace``).
+            out_dir: Directory for dump files (created on first dump).
+            seconds: Lead-up captured per dump.
+            fmt: 'bin' (compact, see trace.py), 'csv' or 'jsonl'.
+            min_interval: Ignore repeats of the same reason within this many seconds.
+        """
+        if fmt not in DUMP_FORMATS:
+            raise ValueError(f"Unknown dump format {fmt!r} (expected one of {DUMP_FORMATS})")
+        self.trace = trace
+        self.out_dir = out_dir
+        self.seconds = seconds
+        self.fmt = fmt
+        self.min_interval = min_interval
+        self.dumps: List[str] = []        # files written so far
+        self._last_trigger: Dict[str, float] = {}
+        self._queue: "queue.Queue" = queue.Queue()   # the current writer's queue
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        self._lock = threading.Lock()   # writer start/stop, _closed and enqueueing
+
+    def open(self) -> None:
+        """Accept triggers again after close()."""
+        with self._lock:
+            self._closed = False
+
+    def trigger(self, reason: str) -> Optional[str]:
+        """Snapshot the lead-up now and write it in the background.
+
+        Args:
+            reason: Short tag used in the file name (e.g. 'fault_800D').
+
+        Returns:
+            Path the dump will be written to, or None if coalesced with a
+            recent dump for the same reason or the recorder is closed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._closed:
+                logger.debug("Flight recorder closed, ignoring trigger %r", reason)
+                return None
+            last = self._last_trigger.get(reason)
+            if last is not None and now - last < self.min_interval:
+                return None
+            self._last_trigger[reason] = now
+            if self._writer is None:
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(
+                    target=self._writer_loop, args=(self._queue,), daemon=True,
+                    name="flight-recorder",
+                )
+                self._writer.start()
+            snapshot = self.trace.snapshot()   # frames are decoded on the writer thread
+            path = str(Path(self.out_dir) / default_dump_name(reason, self.fmt))
+            self._queue.put((path, reason, snapshot, time.time()))
+        return path
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every triggered dump has been written."""
+        with self._lock:
+            if self._writer is None:
+                return True
+            done = threading.Event()
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write every dump triggered so far and stop the writer thread.
+
+        Later triggers are refused (return None) until open().
+        """
+        with self._lock:
+            self._closed = True
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._queue.put(_STOP)   # after every dump queued so far
+        if writer is not None:
+            writer.join(timeout)
+
+    def _writer_loop(self, q: "queue.Queue") -> None:
+        while True:
+            item = q.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            path, reason, snapshot, at = item
+            records = self.trace.records(seconds=self.seconds, now=at, snapshot=snapshot)
+            self._write(path, reason, records)
+
+    def _write(self, path: str, reason: str, records: List[TraceRecord]) -> None:
+        try:
+            write_records(path, records)
+        except OSError as e:
+            logger.error("Flight recorder dump to %s failed: %s", path, e)
+            return
+        self.dumps.append(path)
+        span = records[-1].timestamp - records[0].timestamp if records else 0.0
+        logger.warning(
+            "Flight recorder (%s): wrote %d frames / %.1fs to %s", reason, len(records), span, path,
+        )
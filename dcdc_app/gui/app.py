@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import importlib.util
 import sys
 from typing import Optional
 
 
-def launch(argv: Optional[list] = None) -> int:
-    """Create and run the Qt application."""
+def launch(argv: Optional[list] = None, background_hz: float = 1.0) -> int:
+    """Create and run the Qt application.
+
+    Args:
+        argv: Qt arguments (default: sys.argv).
+        background_hz: Low-power refresh rate while another window is active.
+    """
     try:
         from PySide6.QtWidgets import QApplication
         from PySide6.QtCore import Qt
@@ -20,9 +26,8 @@ def launch(argv: Optional[list] = None) -> int:
         )
         return 1
 
-    try:
-        import pyqtgraph  # noqa: F401
-    except ImportError:
+    # Only checked here: main_window imports pyqtgraph with the first plot tab
+    if importlib.util.find_spec("pyqtgraph") is None:
         print(
             "ERROR: pyqtgraph is not installed.\n"
             "Install with:  pip install pyqtgraph numpy",
@@ -43,7 +48,7 @@ def launch(argv: Optional[list] = None) -> int:
     app.setOrganizationName("YSTECH PCS")
     app.setStyleSheet(AEROSPACE_QSS)
 
-    window = MainWindow()
+    window = MainWindow(background_hz=background_hz)
     window.show()
 
     return app.exec()
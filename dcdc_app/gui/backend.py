@@ -1,22 +1,28 @@
 """GUI backend adapter – wraps PCSController for thread-safe Qt integration.
 
 Bridges the existing CAN/controller layer with Qt signals/slots so the UI
-thread never touches CAN I/O directly. All heavy work runs in a QThread.
+thread never touches CAN I/O directly. ``BackendWorker`` lives in its own
+QThread and runs connect/disconnect and every command there; ``Backend`` is
+the UI-side handle that posts them as queued signals and re-emits the
+worker's results, so a command waiting for its reply never blocks the event
+loop. Commands run one at a time in the order they were posted.
 """
 
 from __future__ import annotations
 
+import threading
 import time
 import traceback
 from collections import deque
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from PySide6.QtCore import QMutex, QMutexLocker, QObject, QThread, Signal
+from PySide6.QtCore import QMutex, QMutexLocker, QObject, QThread, QTimer, Signal, Slot
 
 from dcdc_app.can_iface import CANInterface, PCAN_CHANNELS
 from dcdc_app.controller import ControllerConfig, PCSController
 from dcdc_app.logging_utils import FrameLogger
+from dcdc_app.metrics import REGISTRY
 from dcdc_app.protocol import (
     CAN_BITRATE,
     FAULT_CODES,
@@ -35,7 +41,11 @@ from dcdc_app.simulator import SimulatedPCS
 
 @dataclass
 class TelemetrySnapshot:
-    """Thread-safe snapshot of all PCS telemetry for the UI."""
+    """All PCS telemetry as the UI shows it.
+
+    The backend publishes only the fields that changed ({field: value});
+    the window applies them to its own TelemetrySnapshot.
+    """
     # DC side
     dc_voltage: float = 0.0
     dc_current: float = 0.0
@@ -91,6 +101,41 @@ class TelemetrySnapshot:
     tx_count: int = 0
     rx_count: int = 0
     error_count: int = 0
+    # PCSState sections whose periodic frames stopped arriving
+    stale_sections: frozenset = frozenset()
+    # Rolling statistics: {window: {"section.field": WindowStats}}
+    stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+# PCSState section -> ((TelemetrySnapshot field, section attribute), ...)
+SNAPSHOT_FIELDS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "dc": (("dc_voltage", "voltage"), ("dc_current", "current"), ("dc_power", "power"),
+           ("inlet_temp", "inlet_temperature")),
+    "dc_hires": (("dc_voltage_hr", "voltage"), ("dc_current_hr", "current")),
+    "capacity_energy": (("capacity_ah", "capacity"), ("energy_wh", "energy"),
+                        ("outlet_temp", "outlet_temperature")),
+    "status": (("running_state", "running_state"), ("running_state_name", "state_name"),
+               ("fault_code", "fault_code"), ("fault_description", "fault_description"),
+               ("is_fault", "is_fault")),
+    "grid_voltage": (("grid_v_u", "u_voltage"), ("grid_v_v", "v_voltage"), ("grid_v_w", "w_voltage")),
+    "grid_current": (("grid_i_u", "u_current"), ("grid_i_v", "v_current"), ("grid_i_w", "w_current"),
+                     ("power_factor", "power_factor")),
+    "system_power": (("frequency", "frequency"), ("active_power", "active_power"),
+                     ("reactive_power", "reactive_power"), ("apparent_power", "apparent_power")),
+    "load_voltage": (("load_v_u", "u_voltage"), ("load_v_v", "v_voltage"), ("load_v_w", "w_voltage")),
+    "load_current": (("load_i_u", "u_current"), ("load_i_v", "v_current"), ("load_i_w", "w_current")),
+    "load_power": (("load_active_power", "active_power"), ("load_reactive_power", "reactive_power"),
+                   ("load_apparent_power", "apparent_power")),
+    "phase_a_power": (("phase_a_active", "active_power"), ("phase_a_reactive", "reactive_power")),
+    "phase_b_power": (("phase_b_active", "active_power"), ("phase_b_reactive", "reactive_power")),
+    "phase_c_power": (("phase_c_active", "active_power"), ("phase_c_reactive", "reactive_power")),
+}
+
+_UNSET = object()
+
+# A status cycle arrives as a burst of frames within a few ms; wait this long
+# after its first batch so the whole burst goes out as one update
+PUBLISH_SETTLE_MS = 20
 
 
 @dataclass
@@ -107,10 +152,10 @@ class RawCANFrame:
 # ── Worker thread ────────────────────────────────────────────────────────────
 
 class BackendWorker(QObject):
-    """Runs in a QThread; manages CAN + controller lifecycle."""
+    """Runs in a QThread (see Backend); manages CAN + controller lifecycle."""
 
     # Signals → UI
-    telemetry_updated = Signal(TelemetrySnapshot)
+    cycle_arrived = Signal()                # new frames since the last telemetry_changes()
     raw_frame = Signal(RawCANFrame)
     connection_state = Signal(str)          # "disconnected" | "connecting" | "online" | "error"
     event_log = Signal(str)                 # timestamped log messages
@@ -125,9 +170,16 @@ class BackendWorker(QObject):
         self._frame_logger: Optional[FrameLogger] = None
         self._mutex = QMutex()
         self._connected = False
+        self._cycle_pending = threading.Event()
+        self._sent_sections: Dict[str, Any] = {}
+        self._sent_values: Dict[str, Any] = {}
+        self._m_publish = REGISTRY.histogram(
+            "gui_publish_seconds", "BackendWorker.telemetry_changes() time",
+        )
 
     # ── Connection management ────────────────────────────────────────────
 
+    @Slot(str, str, int, int, bool)
     def connect_pcs(
         self,
         interface: str,
@@ -136,7 +188,7 @@ class BackendWorker(QObject):
         pcs_addr: int,
         simulated: bool,
     ) -> None:
-        """Connect to PCS (called from UI thread via signal)."""
+        """Connect to PCS (posted from the UI thread via Backend)."""
         self.connection_state.emit("connecting")
         self._log("Connecting...")
 
@@ -148,7 +200,6 @@ class BackendWorker(QObject):
             if simulated:
                 self._sim = SimulatedPCS(pcs_addr=pcs_addr)
                 self._sim.start()
-                time.sleep(0.3)
                 self._log("Simulator started")
 
             # Create CAN interface
@@ -163,11 +214,16 @@ class BackendWorker(QObject):
             config = ControllerConfig(pcs_addr=pcs_addr)
             self._ctrl = PCSController(self._can, config, self._frame_logger)
 
-            # Register callback for raw frames
-            self._ctrl.add_callback(self._on_frame_decoded)
+            # Push telemetry to the UI when frames arrive
+            self._sent_sections, self._sent_values = {}, {}
+            self._cycle_pending.clear()
+            self._ctrl.add_batch_callback(self._on_batch)
 
-            # Start controller (opens CAN + starts RX/HB threads)
+            # Start controller (opens CAN + starts RX/HB threads) and go
+            # online as soon as the first full status cycle is in
             self._ctrl.start()
+            if not self._ctrl.wait_for_cycle():
+                self._log("No status frames yet - check PCS address and wiring")
 
             with QMutexLocker(self._mutex):
                 self._connected = True
@@ -181,6 +237,7 @@ class BackendWorker(QObject):
             self._log(f"Connection failed: {e}")
             self._disconnect_internal()
 
+    @Slot()
     def disconnect_pcs(self) -> None:
         """Disconnect from PCS."""
         self._disconnect_internal()
@@ -209,70 +266,77 @@ class BackendWorker(QObject):
         self._can = None
         self._sim = None
 
-    # ── Telemetry polling (called by QTimer on UI side) ──────────────────
+    # ── Telemetry diff (called on the UI thread by Backend) ──────────────
 
-    def poll_telemetry(self) -> None:
-        """Build a snapshot from the current controller state."""
+    def telemetry_changes(self, new_cycle: bool) -> Optional[Dict[str, Any]]:
+        """Snapshot fields that changed since the last call.
+
+        Runs on the UI thread: it only reads in-memory state, no CAN I/O.
+        Sections are compared by identity first (decoded sections are
+        replaced, never mutated), so an unchanged section costs one lookup.
+
+        Args:
+            new_cycle: A new status cycle arrived: include the CAN counters.
+                Otherwise (the housekeeping tick) include the rolling
+                statistics instead.
+
+        Returns:
+            {TelemetrySnapshot field: value}, or None while not connected.
+        """
         with QMutexLocker(self._mutex):
             if not self._connected or self._ctrl is None:
-                return
+                return None
 
+        t0 = time.perf_counter()
+        if new_cycle:
+            self._cycle_pending.clear()   # frames from here on schedule the next one
+        changes: Dict[str, Any] = {}
         try:
             ctrl = self._ctrl
             s = ctrl.state
-            snap = TelemetrySnapshot(
-                dc_voltage=s.dc.voltage,
-                dc_current=s.dc.current,
-                dc_power=s.dc.power,
-                inlet_temp=s.dc.inlet_temperature,
-                outlet_temp=s.capacity_energy.outlet_temperature,
-                dc_voltage_hr=s.dc_hires.voltage,
-                dc_current_hr=s.dc_hires.current,
-                capacity_ah=s.capacity_energy.capacity,
-                energy_wh=s.capacity_energy.energy,
-                running_state=s.status.running_state,
-                running_state_name=s.status.state_name,
-                fault_code=s.status.fault_code,
-                fault_description=s.status.fault_description,
-                is_fault=s.status.is_fault,
-                grid_v_u=s.grid_voltage.u_voltage,
-                grid_v_v=s.grid_voltage.v_voltage,
-                grid_v_w=s.grid_voltage.w_voltage,
-                grid_i_u=s.grid_current.u_current,
-                grid_i_v=s.grid_current.v_current,
-                grid_i_w=s.grid_current.w_current,
-                power_factor=s.grid_current.power_factor,
-                frequency=s.system_power.frequency,
-                active_power=s.system_power.active_power,
-                reactive_power=s.system_power.reactive_power,
-                apparent_power=s.system_power.apparent_power,
-                load_v_u=s.load_voltage.u_voltage,
-                load_v_v=s.load_voltage.v_voltage,
-                load_v_w=s.load_voltage.w_voltage,
-                load_i_u=s.load_current.u_current,
-                load_i_v=s.load_current.v_current,
-                load_i_w=s.load_current.w_current,
-                load_active_power=s.load_power.active_power,
-                load_reactive_power=s.load_power.reactive_power,
-                load_apparent_power=s.load_power.apparent_power,
-                phase_a_active=s.phase_a_power.active_power,
-                phase_a_reactive=s.phase_a_power.reactive_power,
-                phase_b_active=s.phase_b_power.active_power,
-                phase_b_reactive=s.phase_b_power.reactive_power,
-                phase_c_active=s.phase_c_power.active_power,
-                phase_c_reactive=s.phase_c_power.reactive_power,
-                seconds_since_rx=ctrl.seconds_since_last_rx,
-                timestamp=time.time(),
-                tx_count=ctrl.can.stats["tx_count"] if ctrl.can else 0,
-                rx_count=ctrl.can.stats["rx_count"] if ctrl.can else 0,
-                error_count=ctrl.can.stats["error_count"] if ctrl.can else 0,
-            )
-            self.telemetry_updated.emit(snap)
+            sections, values = self._sent_sections, self._sent_values
+            for name, pairs in SNAPSHOT_FIELDS.items():
+                section = getattr(s, name)
+                if section is sections.get(name):
+                    continue
+                sections[name] = section
+                for key, attr in pairs:
+                    value = getattr(section, attr)
+                    if values.get(key, _UNSET) != value:
+                        values[key] = changes[key] = value
+
+            link: Dict[str, Any] = {
+                "seconds_since_rx": ctrl.seconds_since_last_rx,
+                "stale_sections": frozenset(ctrl.stale_sections),
+            }
+            if new_cycle:
+                stats = ctrl.can.stats
+                link.update(tx_count=stats["tx_count"], rx_count=stats["rx_count"],
+                            error_count=stats["error_count"])
+                changes["timestamp"] = time.time()
+            for key, value in link.items():
+                if values.get(key, _UNSET) != value:
+                    values[key] = changes[key] = value
+            if not new_cycle:
+                changes["stats"] = {w: ctrl.stats_snapshot(w) for w in ctrl.stats.window_names}
         except Exception:
-            pass  # Controller might be shutting down
+            return None  # Controller might be shutting down
+        self._m_publish.observe(time.perf_counter() - t0)
+        return changes
+
+    def _on_batch(self, frames: list) -> None:
+        """Controller batch callback – runs in the RX thread.
+
+        Signals the UI side once per burst of frames; the flag is cleared
+        when Backend collects the changes.
+        """
+        if not self._cycle_pending.is_set():
+            self._cycle_pending.set()
+            self.cycle_arrived.emit()
 
     # ── Commands (run in worker thread context) ──────────────────────────
 
+    @Slot()
     def cmd_enable(self) -> None:
         if not self._ctrl:
             return
@@ -284,6 +348,7 @@ class BackendWorker(QObject):
             self.command_result.emit("enable", False)
             self.error_occurred.emit(str(e))
 
+    @Slot()
     def cmd_disable(self) -> None:
         if not self._ctrl:
             return
@@ -295,6 +360,37 @@ class BackendWorker(QObject):
             self.command_result.emit("disable", False)
             self.error_occurred.emit(str(e))
 
+    def emergency_stop(self) -> None:
+        """Send the stop frames at once, bypassing the command path.
+
+        Called directly from the UI thread, not queued behind the worker's
+        commands. Returns as soon as the first burst is on the bus; the
+        confirmation result arrives later as command_result("estop", ok).
+        """
+        if not self._ctrl:
+            return
+
+        def done(result) -> None:
+            self.command_result.emit("estop", result.complete)
+            if result.complete:
+                self._log(f"Emergency stop confirmed in {result.confirm_s * 1e3:.1f} ms")
+            else:
+                missing = sorted(set(result.targets) - set(result.stopped))
+                self._log(f"Emergency stop NOT confirmed by "
+                          f"{', '.join(f'0x{a:02X}' for a in missing)}")
+
+        try:
+            result = self._ctrl.estop.trigger(on_done=done)
+            if result.on_bus:
+                self._log(f"EMERGENCY STOP sent ({result.first_tx_s * 1e3:.2f} ms)")
+            else:
+                self.error_occurred.emit("EMERGENCY STOP NOT SENT: the CAN interface accepted no "
+                                         "frames. Retrying; use the hardware stop.")
+        except Exception as e:
+            self.command_result.emit("estop", False)
+            self.error_occurred.emit(str(e))
+
+    @Slot()
     def cmd_reset_faults(self) -> None:
         if not self._ctrl:
             return
@@ -306,6 +402,7 @@ class BackendWorker(QObject):
             self.command_result.emit("reset_faults", False)
             self.error_occurred.emit(str(e))
 
+    @Slot(object, list)
     def cmd_set_mode(self, mode: WorkingMode, params: List[float]) -> None:
         if not self._ctrl:
             return
@@ -321,12 +418,14 @@ class BackendWorker(QObject):
 
     # ── Frame logging ────────────────────────────────────────────────────
 
+    @Slot(str)
     def start_recording(self, filepath: str) -> None:
         fmt = "jsonl" if filepath.endswith(".jsonl") else "csv"
         self._frame_logger = FrameLogger(filepath=filepath, fmt=fmt, console=False)
         self._frame_logger.open()
         self._log(f"Recording to {filepath}")
 
+    @Slot()
     def stop_recording(self) -> None:
         if self._frame_logger:
             self._frame_logger.close()
@@ -335,16 +434,117 @@ class BackendWorker(QObject):
 
     # ── Internal helpers ─────────────────────────────────────────────────
 
-    def _on_frame_decoded(self, name: str, decoded: Any) -> None:
-        """Controller callback – runs in the RX thread."""
-        try:
-            # We don't emit raw frames from here since the controller
-            # callback doesn't give us the raw CAN data. Raw frames
-            # will be captured differently if needed.
-            pass
-        except Exception:
-            pass
-
     def _log(self, msg: str) -> None:
         ts = time.strftime("%H:%M:%S")
         self.event_log.emit(f"[{ts}] {msg}")
+
+
+# ── UI-side handle ───────────────────────────────────────────────────────────
+
+class Backend(QObject):
+    """Owns the worker thread; the UI calls this, never BackendWorker directly.
+
+    Every method returns immediately: connect/disconnect and commands are
+    posted to the worker as queued signals and their outcome arrives later
+    through the re-emitted worker signals (connection_state, command_result,
+    ...). Only the emergency stop and telemetry collection run on the calling
+    thread, as neither waits on the bus.
+
+    Telemetry is pushed: when the RX thread reports new frames, the changed
+    fields are collected once the burst has settled and emitted as
+    telemetry_changed({field: value}, True). poll_telemetry() is the slow
+    housekeeping tick for what changes without new frames (message age,
+    stale sections, rolling statistics) and emits with False.
+    """
+
+    # Delivered on the UI thread
+    telemetry_changed = Signal(dict, bool)  # ({snapshot field: value}, new cycle)
+    raw_frame = Signal(RawCANFrame)
+    connection_state = Signal(str)
+    event_log = Signal(str)
+    command_result = Signal(str, bool)
+    error_occurred = Signal(str)
+
+    # Requests → worker (queued)
+    _post_connect = Signal(str, str, int, int, bool)
+    _post_disconnect = Signal()
+    _post_enable = Signal()
+    _post_disable = Signal()
+    _post_reset_faults = Signal()
+    _post_set_mode = Signal(object, list)
+    _post_start_recording = Signal(str)
+    _post_stop_recording = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = QThread()
+        self._thread.setObjectName("pcs-backend")
+        self.worker = BackendWorker()
+        self.worker.moveToThread(self._thread)
+
+        for name in ("raw_frame", "connection_state",
+                     "event_log", "command_result", "error_occurred"):
+            getattr(self.worker, name).connect(getattr(self, name))
+
+        self._settle = QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(PUBLISH_SETTLE_MS)
+        self._settle.timeout.connect(lambda: self._publish(True))
+        self.worker.cycle_arrived.connect(self._settle.start)
+
+        self._post_connect.connect(self.worker.connect_pcs)
+        self._post_disconnect.connect(self.worker.disconnect_pcs)
+        self._post_enable.connect(self.worker.cmd_enable)
+        self._post_disable.connect(self.worker.cmd_disable)
+        self._post_reset_faults.connect(self.worker.cmd_reset_faults)
+        self._post_set_mode.connect(self.worker.cmd_set_mode)
+        self._post_start_recording.connect(self.worker.start_recording)
+        self._post_stop_recording.connect(self.worker.stop_recording)
+
+        self._thread.start()
+
+    def connect_pcs(self, interface: str, channel: str, bitrate: int,
+                    pcs_addr: int, simulated: bool) -> None:
+        self._post_connect.emit(interface, channel, bitrate, pcs_addr, simulated)
+
+    def disconnect_pcs(self) -> None:
+        self._post_disconnect.emit()
+
+    def cmd_enable(self) -> None:
+        self._post_enable.emit()
+
+    def cmd_disable(self) -> None:
+        self._post_disable.emit()
+
+    def cmd_reset_faults(self) -> None:
+        self._post_reset_faults.emit()
+
+    def cmd_set_mode(self, mode: WorkingMode, params: List[float]) -> None:
+        self._post_set_mode.emit(mode, params)
+
+    def start_recording(self, filepath: str) -> None:
+        self._post_start_recording.emit(filepath)
+
+    def stop_recording(self) -> None:
+        self._post_stop_recording.emit()
+
+    def emergency_stop(self) -> None:
+        self.worker.emergency_stop()
+
+    def poll_telemetry(self) -> None:
+        self._publish(False)
+
+    def _publish(self, new_cycle: bool) -> None:
+        changes = self.worker.telemetry_changes(new_cycle)
+        if changes:
+            self.telemetry_changed.emit(changes, new_cycle)
+
+    def shutdown(self) -> None:
+        """Stop the worker thread and disconnect.
+
+        Commands still queued are dropped; one already running is allowed to
+        finish (at most one command timeout).
+        """
+        self._thread.quit()
+        self._thread.wait()
+        self.worker.disconnect_pcs()
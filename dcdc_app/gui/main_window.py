@@ -5,6 +5,16 @@ Implements the full GUI with:
 - Centre: fixed telemetry dashboard + bottom tabs
 - Right: faults, events, heartbeat
 - Bottom tabs: Trends | DC Side | AC Grid | Power & Energy | Thermal | Setpoints | Raw CAN
+
+Rendering follows the window's visibility: cards update as telemetry arrives
+and plots redraw at _PLOT_HZ while it is the active window, both refresh at a
+low-power rate while another window is active, and nothing is drawn while it
+is minimized or hidden. Trend buffers keep filling throughout, and the first
+refresh after a restore catches up in one pass.
+
+Tabs are built the first time they are shown (the visible one right after
+the window's first paint), and pyqtgraph/numpy are imported with the first
+plot tab, so startup does not pay for plots of tabs that are never opened.
 """
 
 from __future__ import annotations
@@ -12,12 +22,10 @@ from __future__ import annotations
 import time
 from collections import deque
 from functools import partial
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
-
-from PySide6.QtCore import QSize, Qt, QTimer, Slot
-from PySide6.QtGui import QCloseEvent
+from PySide6.QtCore import QEvent, QSize, Qt, QTimer, Slot
+from PySide6.QtGui import QCloseEvent, QColor, QHideEvent, QPaintEvent, QShowEvent
 from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
@@ -43,9 +51,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-import pyqtgraph as pg
-
-from dcdc_app.gui.backend import BackendWorker, RawCANFrame, TelemetrySnapshot
+from dcdc_app.gui.backend import Backend, RawCANFrame, TelemetrySnapshot
 from dcdc_app.gui.theme import (
     ACCENT_CYAN,
     ACCENT_GREEN,
@@ -76,83 +82,97 @@ from dcdc_app.protocol import (
     WorkingMode,
 )
 from dcdc_app.can_iface import PCAN_CHANNELS
+from dcdc_app.metrics import REGISTRY
 
 
 # ── Constants ────────────────────────────────────────────────────────────────
 
 _PLOT_WINDOW_S = 60       # Seconds of data to show in trend plots
-_PLOT_POINTS   = 300      # Data points in sliding window
-_UI_REFRESH_HZ = 10       # Telemetry poll rate
+_PLOT_POINTS   = 300      # Data points in sliding window (one per 200 ms status cycle)
+_HOUSEKEEPING_HZ = 1      # Message age / stale / rolling-stats refresh (telemetry is pushed)
+_PLOT_HZ       = 4        # Plot redraws per second while the console is the active window
+_BACKGROUND_HZ = 1.0      # Card + plot refreshes per second while another window is active
 _RAW_CAN_MAX   = 500      # Max rows in raw CAN table
 
+# pyqtgraph (~0.4 s) and numpy are imported by _load_pyqtgraph() when the
+# first plot tab is built, not at startup
+pg: Any = None
+np: Any = None
+
+
+def _load_pyqtgraph() -> None:
+    """Import pyqtgraph and numpy on first use and apply the plot theme once."""
+    global pg, np
+    if pg is not None:
+        return
+    import numpy
+    import pyqtgraph
+
+    theme = pyqtgraph_theme()
+    pyqtgraph.setConfigOptions(
+        background=theme["background"],
+        foreground=theme["foreground"],
+        antialias=True,
+    )
+    np, pg = numpy, pyqtgraph
+
 
 class MainWindow(QMainWindow):
     """Aerospace-themed PCS Mission Console."""
 
-    def __init__(self):
+    def __init__(self, background_hz: float = _BACKGROUND_HZ):
+        """
+        Args:
+            background_hz: Low-power refresh rate (cards and plots) while
+                another window is active.
+        """
         super().__init__()
         self.setWindowTitle("DC/DC Mission Console — YSTECH PCS")
         self.setMinimumSize(1280, 800)
         self.resize(1500, 900)
 
-        # Backend worker
-        self._backend = BackendWorker()
-        self._backend.telemetry_updated.connect(self._on_telemetry)
+        # Backend (worker runs on its own thread; calls here never block)
+        self._backend = Backend(self)
+        self._backend.telemetry_changed.connect(self._on_telemetry)
         self._backend.connection_state.connect(self._on_connection_state)
         self._backend.event_log.connect(self._on_event_log)
         self._backend.command_result.connect(self._on_command_result)
         self._backend.error_occurred.connect(self._on_error)
 
-        # ── All trend data buffers ──
+        # ── Trend data buffers ──
         self._trend_time: deque = deque(maxlen=_PLOT_POINTS)
         self._trend_start_time: float = time.time()
+        # TelemetrySnapshot field -> samples; a buffer is created when the
+        # first tab plotting that field is built (see _trend_curve)
+        self._trend_bufs: Dict[str, deque] = {}
 
-        # Trends (overview)
-        self._buf_dc_voltage: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_dc_current: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_dc_power: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_inlet_temp: deque = deque(maxlen=_PLOT_POINTS)
-
-        # DC Side
-        self._buf_dc_voltage_hr: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_dc_current_hr: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_capacity: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_energy: deque = deque(maxlen=_PLOT_POINTS)
-
-        # AC Grid
-        self._buf_grid_v_u: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_grid_v_v: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_grid_v_w: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_grid_i_u: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_grid_i_v: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_grid_i_w: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_frequency: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_power_factor: deque = deque(maxlen=_PLOT_POINTS)
-
-        # Power & Energy
-        self._buf_active_power: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_reactive_power: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_apparent_power: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_load_active: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_load_reactive: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_load_apparent: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_phase_a: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_phase_b: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_phase_c: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_phase_a_q: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_phase_b_q: deque = deque(maxlen=_PLOT_POINTS)
-        self._buf_phase_c_q: deque = deque(maxlen=_PLOT_POINTS)
-
-        # Thermal
-        self._buf_outlet_temp: deque = deque(maxlen=_PLOT_POINTS)
+        # Lazily built tabs: index -> [(curve, snapshot field)] once built
+        self._tab_curves: Dict[int, List[Tuple[Any, str]]] = {}
+        self._new_curves: List[Tuple[Any, str]] = []   # filled by _trend_curve() during a build
+        self._painted = False
+
+        # Built with their tabs
+        self._btn_apply: Optional[QPushButton] = None
+        self._tbl_raw: Optional[QTableWidget] = None
 
         # Raw CAN frame buffer
         self._raw_frames: deque = deque(maxlen=_RAW_CAN_MAX)
 
         # State
         self._connection_state = "disconnected"
+        self._snap = TelemetrySnapshot()      # latest values (shown once _dirty is flushed)
+        self._fault_shown = False
+
+        # Rendering: "foreground", "background" (low-power) or "hidden"
+        self._render_state = "hidden"
+        self._background_hz = background_hz
+        self._dirty: set = set()              # snapshot fields the widgets do not show yet
+        self._m_telemetry = REGISTRY.histogram(
+            "gui_telemetry_seconds", "MainWindow._on_telemetry() time (widgets + trend buffers)",
+        )
 
         self._build_ui()
+        self._build_telemetry_updaters()
         self._setup_timers()
 
     # =====================================================================
@@ -303,19 +323,59 @@ class MainWindow(QMainWindow):
         # Telemetry cards – fixed at top, no scroll
         layout.addWidget(self._build_telemetry_grid(), 0)
 
-        # Bottom tabs
+        # Bottom tabs: empty pages, filled by _ensure_tab() on first view
+        self._tab_builders = [
+            ("Trends", self._build_trends_tab),
+            ("DC Side", self._build_dc_side_tab),
+            ("AC Grid", self._build_ac_grid_tab),
+            ("Power & Energy", self._build_power_tab),
+            ("Thermal", self._build_thermal_tab),
+            ("Setpoints", self._build_setpoints_tab),
+            ("Raw CAN", self._build_raw_can_tab),
+        ]
         self._tabs = QTabWidget()
-        self._tabs.addTab(self._build_trends_tab(), "Trends")
-        self._tabs.addTab(self._build_dc_side_tab(), "DC Side")
-        self._tabs.addTab(self._build_ac_grid_tab(), "AC Grid")
-        self._tabs.addTab(self._build_power_tab(), "Power & Energy")
-        self._tabs.addTab(self._build_thermal_tab(), "Thermal")
-        self._tabs.addTab(self._build_setpoints_tab(), "Setpoints")
-        self._tabs.addTab(self._build_raw_can_tab(), "Raw CAN")
+        for title, _ in self._tab_builders:
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self._tabs.addTab(page, title)
+        self._tabs.currentChanged.connect(self._ensure_tab)
         layout.addWidget(self._tabs, 1)
 
         return centre
 
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+        if not self._painted:
+            # Let the frame, cards and controls show first, then build the visible tab
+            self._painted = True
+            QTimer.singleShot(0, lambda: self._ensure_tab(self._tabs.currentIndex()))
+
+    @Slot(int)
+    def _ensure_tab(self, index: int) -> None:
+        """Build a tab's contents the first time it is shown."""
+        page = self._tabs.widget(index)
+        if page is None or page.layout().count():
+            return
+        self._new_curves = []
+        page.layout().addWidget(self._tab_builders[index][1]())
+        if self._new_curves:
+            self._tab_curves[index] = self._new_curves
+            self._update_plots()
+
+    def _trend_curve(self, plot, key: str, color: str, name: Optional[str] = None,
+                     dashed: bool = False):
+        """Add a curve plotting TelemetrySnapshot field ``key`` to the tab being built.
+
+        Allocates the field's trend buffer if no earlier tab did.
+        """
+        style = Qt.PenStyle.DashLine if dashed else Qt.PenStyle.SolidLine
+        curve = plot.plot(pen=pg.mkPen(color, width=2, style=style), name=name)
+        if key not in self._trend_bufs:
+            self._trend_bufs[key] = deque(maxlen=_PLOT_POINTS)
+        self._new_curves.append((curve, key))
+        return curve
+
     def _build_telemetry_grid(self) -> QWidget:
         container = QWidget()
         grid = QGridLayout(container)
@@ -374,6 +434,41 @@ class MainWindow(QMainWindow):
         self._card_hires_i = TelemetryCard("Hi-Res I", "A", ".3f", large=False)
         grid.addWidget(self._card_hires_i, 3, 3)
 
+        # PCSState section feeding each card (for stale-signal flagging)
+        self._card_sections = [
+            (self._card_dc_voltage, "dc"),
+            (self._card_dc_current, "dc"),
+            (self._card_dc_power, "dc"),
+            (self._card_state, "status"),
+            (self._card_inlet_temp, "dc"),
+            (self._card_outlet_temp, "capacity_energy"),
+            (self._card_frequency, "system_power"),
+            (self._card_pf, "grid_current"),
+            (self._card_active_p, "system_power"),
+            (self._card_reactive_p, "system_power"),
+            (self._card_grid_v, "grid_voltage"),
+            (self._card_grid_i, "grid_current"),
+            (self._card_capacity, "capacity_energy"),
+            (self._card_energy, "capacity_energy"),
+            (self._card_hires_v, "dc_hires"),
+            (self._card_hires_i, "dc_hires"),
+        ]
+
+        # Signal behind each single-value card (for rolling min/mean/max)
+        self._card_signals = [
+            (self._card_dc_voltage, "dc.voltage"),
+            (self._card_dc_current, "dc.current"),
+            (self._card_dc_power, "dc.power"),
+            (self._card_inlet_temp, "dc.inlet_temperature"),
+            (self._card_outlet_temp, "capacity_energy.outlet_temperature"),
+            (self._card_frequency, "system_power.frequency"),
+            (self._card_pf, "grid_current.power_factor"),
+            (self._card_active_p, "system_power.active_power"),
+            (self._card_reactive_p, "system_power.reactive_power"),
+            (self._card_hires_v, "dc_hires.voltage"),
+            (self._card_hires_i, "dc_hires.current"),
+        ]
+
         return container
 
     # ── Tab: Trends (Overview) ───────────────────────────────────────────
@@ -383,14 +478,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 2, 0, 0)
 
-        theme = pyqtgraph_theme()
-        pg.setConfigOptions(
-            background=theme["background"],
-            foreground=theme["foreground"],
-            antialias=True,
-        )
-        colors = theme["accent_colors"]
-        pw = 2  # pen width
+        _load_pyqtgraph()
+        colors = pyqtgraph_theme()["accent_colors"]
 
         self._plot_trends = pg.GraphicsLayoutWidget()
         layout.addWidget(self._plot_trends)
@@ -398,22 +487,22 @@ class MainWindow(QMainWindow):
         self._plot_v = self._plot_trends.addPlot(row=0, col=0, title="DC Voltage (V)")
         self._plot_v.showGrid(x=True, y=True, alpha=0.15)
         self._plot_v.setLabel("bottom", "Time", "s")
-        self._curve_v = self._plot_v.plot(pen=pg.mkPen(colors[0], width=pw))
+        self._trend_curve(self._plot_v, "dc_voltage", colors[0])
 
         self._plot_i = self._plot_trends.addPlot(row=0, col=1, title="DC Current (A)")
         self._plot_i.showGrid(x=True, y=True, alpha=0.15)
         self._plot_i.setLabel("bottom", "Time", "s")
-        self._curve_i = self._plot_i.plot(pen=pg.mkPen(colors[1], width=pw))
+        self._trend_curve(self._plot_i, "dc_current", colors[1])
 
         self._plot_p = self._plot_trends.addPlot(row=1, col=0, title="DC Power (kW)")
         self._plot_p.showGrid(x=True, y=True, alpha=0.15)
         self._plot_p.setLabel("bottom", "Time", "s")
-        self._curve_p = self._plot_p.plot(pen=pg.mkPen(colors[2], width=pw))
+        self._trend_curve(self._plot_p, "dc_power", colors[2])
 
         self._plot_t = self._plot_trends.addPlot(row=1, col=1, title="Inlet Temp (°C)")
         self._plot_t.showGrid(x=True, y=True, alpha=0.15)
         self._plot_t.setLabel("bottom", "Time", "s")
-        self._curve_t = self._plot_t.plot(pen=pg.mkPen(colors[3], width=pw))
+        self._trend_curve(self._plot_t, "inlet_temp", colors[3])
 
         return widget
 
@@ -424,8 +513,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 2, 0, 0)
 
+        _load_pyqtgraph()
         colors = pyqtgraph_theme()["accent_colors"]
-        pw = 2
 
         self._plot_dc = pg.GraphicsLayoutWidget()
         layout.addWidget(self._plot_dc)
@@ -435,30 +524,30 @@ class MainWindow(QMainWindow):
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._dc_curve_v = p.plot(pen=pg.mkPen(colors[0], width=pw), name="Standard")
-        self._dc_curve_v_hr = p.plot(pen=pg.mkPen(colors[4], width=pw, style=Qt.PenStyle.DashLine), name="Hi-Res")
+        self._trend_curve(p, "dc_voltage", colors[0], name="Standard")
+        self._trend_curve(p, "dc_voltage_hr", colors[4], name="Hi-Res", dashed=True)
 
         # Row 0: Current (standard + hi-res overlaid)
         p = self._plot_dc.addPlot(row=0, col=1, title="DC Current (A)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._dc_curve_i = p.plot(pen=pg.mkPen(colors[1], width=pw), name="Standard")
-        self._dc_curve_i_hr = p.plot(pen=pg.mkPen(colors[4], width=pw, style=Qt.PenStyle.DashLine), name="Hi-Res")
+        self._trend_curve(p, "dc_current", colors[1], name="Standard")
+        self._trend_curve(p, "dc_current_hr", colors[4], name="Hi-Res", dashed=True)
 
         # Row 1: Power
         p = self._plot_dc.addPlot(row=1, col=0, title="DC Power (kW)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
-        self._dc_curve_power = p.plot(pen=pg.mkPen(colors[2], width=pw))
+        self._trend_curve(p, "dc_power", colors[2])
 
         # Row 1: Capacity & Energy (dual axis)
         p = self._plot_dc.addPlot(row=1, col=1, title="Capacity (Ah) & Energy (Wh)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._dc_curve_cap = p.plot(pen=pg.mkPen(colors[3], width=pw), name="Capacity Ah")
-        self._dc_curve_energy = p.plot(pen=pg.mkPen(colors[6], width=pw), name="Energy Wh")
+        self._trend_curve(p, "capacity_ah", colors[3], name="Capacity Ah")
+        self._trend_curve(p, "energy_wh", colors[6], name="Energy Wh")
 
         return widget
 
@@ -469,8 +558,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 2, 0, 0)
 
+        _load_pyqtgraph()
         colors = pyqtgraph_theme()["accent_colors"]
-        pw = 2
 
         self._plot_ac = pg.GraphicsLayoutWidget()
         layout.addWidget(self._plot_ac)
@@ -480,30 +569,30 @@ class MainWindow(QMainWindow):
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._ac_curve_vu = p.plot(pen=pg.mkPen(colors[0], width=pw), name="U")
-        self._ac_curve_vv = p.plot(pen=pg.mkPen(colors[1], width=pw), name="V")
-        self._ac_curve_vw = p.plot(pen=pg.mkPen(colors[2], width=pw), name="W")
+        self._trend_curve(p, "grid_v_u", colors[0], name="U")
+        self._trend_curve(p, "grid_v_v", colors[1], name="V")
+        self._trend_curve(p, "grid_v_w", colors[2], name="W")
 
         # Row 0: Grid Current U/V/W
         p = self._plot_ac.addPlot(row=0, col=1, title="Grid Current (A)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._ac_curve_iu = p.plot(pen=pg.mkPen(colors[0], width=pw), name="U")
-        self._ac_curve_iv = p.plot(pen=pg.mkPen(colors[1], width=pw), name="V")
-        self._ac_curve_iw = p.plot(pen=pg.mkPen(colors[2], width=pw), name="W")
+        self._trend_curve(p, "grid_i_u", colors[0], name="U")
+        self._trend_curve(p, "grid_i_v", colors[1], name="V")
+        self._trend_curve(p, "grid_i_w", colors[2], name="W")
 
         # Row 1: Frequency
         p = self._plot_ac.addPlot(row=1, col=0, title="Frequency (Hz)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
-        self._ac_curve_freq = p.plot(pen=pg.mkPen(colors[3], width=pw))
+        self._trend_curve(p, "frequency", colors[3])
 
         # Row 1: Power Factor
         p = self._plot_ac.addPlot(row=1, col=1, title="Power Factor")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
-        self._ac_curve_pf = p.plot(pen=pg.mkPen(colors[6], width=pw))
+        self._trend_curve(p, "power_factor", colors[6])
 
         return widget
 
@@ -514,8 +603,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 2, 0, 0)
 
+        _load_pyqtgraph()
         colors = pyqtgraph_theme()["accent_colors"]
-        pw = 2
 
         self._plot_power = pg.GraphicsLayoutWidget()
         layout.addWidget(self._plot_power)
@@ -525,36 +614,36 @@ class MainWindow(QMainWindow):
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._pwr_curve_active = p.plot(pen=pg.mkPen(colors[0], width=pw), name="Active kW")
-        self._pwr_curve_reactive = p.plot(pen=pg.mkPen(colors[2], width=pw), name="Reactive kVar")
-        self._pwr_curve_apparent = p.plot(pen=pg.mkPen(colors[3], width=pw), name="Apparent kVA")
+        self._trend_curve(p, "active_power", colors[0], name="Active kW")
+        self._trend_curve(p, "reactive_power", colors[2], name="Reactive kVar")
+        self._trend_curve(p, "apparent_power", colors[3], name="Apparent kVA")
 
         # Row 0: Load Power (Active/Reactive/Apparent)
         p = self._plot_power.addPlot(row=0, col=1, title="Load Power")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._pwr_curve_load_active = p.plot(pen=pg.mkPen(colors[0], width=pw), name="Active kW")
-        self._pwr_curve_load_reactive = p.plot(pen=pg.mkPen(colors[2], width=pw), name="Reactive kVar")
-        self._pwr_curve_load_apparent = p.plot(pen=pg.mkPen(colors[3], width=pw), name="Apparent kVA")
+        self._trend_curve(p, "load_active_power", colors[0], name="Active kW")
+        self._trend_curve(p, "load_reactive_power", colors[2], name="Reactive kVar")
+        self._trend_curve(p, "load_apparent_power", colors[3], name="Apparent kVA")
 
         # Row 1: Per-phase Active Power (A/B/C)
         p = self._plot_power.addPlot(row=1, col=0, title="Per-Phase Active Power (kW)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._pwr_curve_ph_a = p.plot(pen=pg.mkPen(colors[0], width=pw), name="Phase A")
-        self._pwr_curve_ph_b = p.plot(pen=pg.mkPen(colors[1], width=pw), name="Phase B")
-        self._pwr_curve_ph_c = p.plot(pen=pg.mkPen(colors[2], width=pw), name="Phase C")
+        self._trend_curve(p, "phase_a_active", colors[0], name="Phase A")
+        self._trend_curve(p, "phase_b_active", colors[1], name="Phase B")
+        self._trend_curve(p, "phase_c_active", colors[2], name="Phase C")
 
         # Row 1: Per-phase Reactive Power (A/B/C)
         p = self._plot_power.addPlot(row=1, col=1, title="Per-Phase Reactive Power (kVar)")
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._pwr_curve_ph_a_q = p.plot(pen=pg.mkPen(colors[0], width=pw), name="Phase A")
-        self._pwr_curve_ph_b_q = p.plot(pen=pg.mkPen(colors[1], width=pw), name="Phase B")
-        self._pwr_curve_ph_c_q = p.plot(pen=pg.mkPen(colors[2], width=pw), name="Phase C")
+        self._trend_curve(p, "phase_a_reactive", colors[0], name="Phase A")
+        self._trend_curve(p, "phase_b_reactive", colors[1], name="Phase B")
+        self._trend_curve(p, "phase_c_reactive", colors[2], name="Phase C")
 
         return widget
 
@@ -565,8 +654,8 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 2, 0, 0)
 
+        _load_pyqtgraph()
         colors = pyqtgraph_theme()["accent_colors"]
-        pw = 2
 
         self._plot_thermal = pg.GraphicsLayoutWidget()
         layout.addWidget(self._plot_thermal)
@@ -576,8 +665,8 @@ class MainWindow(QMainWindow):
         p.showGrid(x=True, y=True, alpha=0.15)
         p.setLabel("bottom", "Time", "s")
         p.addLegend(offset=(60, 10))
-        self._therm_curve_inlet = p.plot(pen=pg.mkPen(colors[0], width=pw), name="Inlet")
-        self._therm_curve_outlet = p.plot(pen=pg.mkPen(colors[5], width=pw), name="Outlet")
+        self._trend_curve(p, "inlet_temp", colors[0], name="Inlet")
+        self._trend_curve(p, "outlet_temp", colors[5], name="Outlet")
 
         # Add warning threshold lines
         p.addLine(y=60, pen=pg.mkPen(ACCENT_YELLOW, width=1, style=Qt.PenStyle.DashLine))
@@ -679,7 +768,7 @@ class MainWindow(QMainWindow):
 
         self._btn_apply = QPushButton("Apply Setpoints")
         self._btn_apply.setObjectName("btnConnect")
-        self._btn_apply.setEnabled(False)
+        self._btn_apply.setEnabled(self._connection_state == "online")
         self._btn_apply.clicked.connect(self._on_apply_setpoints)
         form_layout.addWidget(self._btn_apply)
 
@@ -756,6 +845,11 @@ class MainWindow(QMainWindow):
         self._tbl_raw.verticalHeader().setVisible(False)
         layout.addWidget(self._tbl_raw)
 
+        # Frames that arrived before the tab was first opened
+        for frame in self._raw_frames:
+            self._insert_raw_row(frame)
+        self._update_can_count()
+
         return widget
 
     # ── Right Panel: Faults + Events ─────────────────────────────────────
@@ -811,12 +905,67 @@ class MainWindow(QMainWindow):
 
     def _setup_timers(self) -> None:
         self._poll_timer = QTimer(self)
-        self._poll_timer.setInterval(int(1000 / _UI_REFRESH_HZ))
+        self._poll_timer.setInterval(int(1000 / _HOUSEKEEPING_HZ))
         self._poll_timer.timeout.connect(self._backend.poll_telemetry)
 
+        # Plot redraws; in the background also flushes deferred card updates
         self._plot_timer = QTimer(self)
-        self._plot_timer.setInterval(250)
-        self._plot_timer.timeout.connect(self._update_plots)
+        self._plot_timer.timeout.connect(self._refresh)
+
+    def _apply_timers(self) -> None:
+        """Run the timers at the rate the connection and render state call for."""
+        if self._connection_state != "online" or self._render_state == "hidden":
+            self._poll_timer.stop()
+            self._plot_timer.stop()
+            return
+        if not self._poll_timer.isActive():
+            self._poll_timer.start()
+        hz = _PLOT_HZ if self._render_state == "foreground" else self._background_hz
+        interval = int(1000 / hz)
+        if not self._plot_timer.isActive() or self._plot_timer.interval() != interval:
+            self._plot_timer.start(interval)
+
+    # =====================================================================
+    #  Visibility-aware rendering
+    # =====================================================================
+
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self._update_render_state()
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        super().hideEvent(event)
+        self._update_render_state()
+
+    def changeEvent(self, event: QEvent) -> None:
+        super().changeEvent(event)
+        if event.type() in (QEvent.Type.WindowStateChange, QEvent.Type.ActivationChange):
+            self._update_render_state()
+
+    def _update_render_state(self) -> None:
+        if not self.isVisible() or self.isMinimized():
+            state = "hidden"
+        elif self.isActiveWindow():
+            state = "foreground"
+        else:
+            state = "background"
+        if state == self._render_state:
+            return
+        was_hidden = self._render_state == "hidden"
+        self._render_state = state
+        self._apply_timers()
+        if state == "hidden":
+            return
+        if was_hidden and self._connection_state == "online":
+            self._backend.poll_telemetry()   # message age / stale / stats skipped while hidden
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Bring widgets up to date with everything received, then redraw the plots."""
+        if self._dirty:
+            self._apply_updaters(self._dirty)
+            self._dirty = set()
+        self._update_plots()
 
     # =====================================================================
     #  Event handlers – Connection
@@ -862,31 +1011,93 @@ class MainWindow(QMainWindow):
         self._btn_enable.setEnabled(online)
         self._btn_disable.setEnabled(online)
         self._btn_estop.setEnabled(online)
-        self._btn_apply.setEnabled(online)
+        if self._btn_apply is not None:
+            self._btn_apply.setEnabled(online)
         self._btn_reset_faults.setEnabled(online)
 
+        self._apply_timers()
         if online:
-            self._poll_timer.start()
-            self._plot_timer.start()
             self._trend_start_time = time.time()
             self._status_bar.showMessage("Connected to PCS")
         else:
-            self._poll_timer.stop()
-            self._plot_timer.stop()
             self._status_bar.showMessage(f"Status: {state}")
 
     # =====================================================================
     #  Event handlers – Telemetry updates
     # =====================================================================
 
-    @Slot(TelemetrySnapshot)
-    def _on_telemetry(self, snap: TelemetrySnapshot) -> None:
-        # DC readouts
-        self._card_dc_voltage.set_value(snap.dc_voltage)
-        self._card_dc_current.set_value(snap.dc_current)
-        self._card_dc_power.set_value(snap.dc_power)
-
-        # State card
+    def _build_telemetry_updaters(self) -> None:
+        """Map each TelemetrySnapshot field to the widget update(s) that show it."""
+        def value(card: TelemetryCard, key: str):
+            return lambda s: card.set_value(getattr(s, key))
+
+        def temp(card: TelemetryCard, key: str, warn: float, crit: float):
+            def update(s: TelemetrySnapshot) -> None:
+                val = getattr(s, key)
+                card.set_value(val)
+                self._color_by_range(card, val, warn, crit)
+            return update
+
+        grid_v = lambda s: self._card_grid_v.set_values(s.grid_v_u, s.grid_v_v, s.grid_v_w)
+        grid_i = lambda s: self._card_grid_i.set_values(s.grid_i_u, s.grid_i_v, s.grid_i_w)
+        can_stats = lambda s: self._lbl_can_stats.setText(
+            f"TX: {s.tx_count}  RX: {s.rx_count}  ERR: {s.error_count}"
+        )
+        updaters = {
+            "dc_voltage": value(self._card_dc_voltage, "dc_voltage"),
+            "dc_current": value(self._card_dc_current, "dc_current"),
+            "dc_power": value(self._card_dc_power, "dc_power"),
+            "running_state_name": self._update_state_card,
+            "inlet_temp": temp(self._card_inlet_temp, "inlet_temp", 60, 80),
+            "outlet_temp": temp(self._card_outlet_temp, "outlet_temp", 65, 85),
+            "frequency": value(self._card_frequency, "frequency"),
+            "power_factor": value(self._card_pf, "power_factor"),
+            "active_power": value(self._card_active_p, "active_power"),
+            "reactive_power": value(self._card_reactive_p, "reactive_power"),
+            "grid_v_u": grid_v, "grid_v_v": grid_v, "grid_v_w": grid_v,
+            "grid_i_u": grid_i, "grid_i_v": grid_i, "grid_i_w": grid_i,
+            "capacity_ah": value(self._card_capacity, "capacity_ah"),
+            "energy_wh": value(self._card_energy, "energy_wh"),
+            "dc_voltage_hr": value(self._card_hires_v, "dc_voltage_hr"),
+            "dc_current_hr": value(self._card_hires_i, "dc_current_hr"),
+            "stale_sections": self._update_stale,
+            "stats": self._update_stats,
+            "seconds_since_rx": lambda s: self._heartbeat.update_age(s.seconds_since_rx),
+            "tx_count": can_stats, "rx_count": can_stats, "error_count": can_stats,
+            "fault_code": self._update_fault, "fault_description": self._update_fault,
+        }
+        # A fault flag change recolours the state card and the fault panel
+        updaters["is_fault"] = lambda s: (self._update_state_card(s), self._update_fault(s))
+        self._telemetry_updaters = updaters
+
+    @Slot(dict, bool)
+    def _on_telemetry(self, changes: dict, new_cycle: bool) -> None:
+        t0 = time.perf_counter()
+        snap = self._snap
+        for key, value in changes.items():
+            setattr(snap, key, value)
+
+        if self._render_state == "foreground":
+            self._apply_updaters(changes)
+        else:
+            self._dirty.update(changes)   # shown by the next _refresh()
+
+        if new_cycle:
+            self._append_trends(snap)     # history keeps filling while hidden
+        self._m_telemetry.observe(time.perf_counter() - t0)
+
+    def _apply_updaters(self, fields) -> None:
+        # Each affected widget once, however many of its fields changed
+        snap = self._snap
+        updaters = self._telemetry_updaters
+        done = set()
+        for key in fields:
+            update = updaters.get(key)
+            if update is not None and update not in done:
+                done.add(update)
+                update(snap)
+
+    def _update_state_card(self, snap: TelemetrySnapshot) -> None:
         self._card_state.set_text(snap.running_state_name)
         if snap.is_fault:
             self._card_state.set_color(ACCENT_RED)
@@ -897,96 +1108,36 @@ class MainWindow(QMainWindow):
         else:
             self._card_state.set_color(TEXT_PRIMARY)
 
-        # Temps
-        self._card_inlet_temp.set_value(snap.inlet_temp)
-        self._color_by_range(self._card_inlet_temp, snap.inlet_temp, 60, 80)
-        self._card_outlet_temp.set_value(snap.outlet_temp)
-        self._color_by_range(self._card_outlet_temp, snap.outlet_temp, 65, 85)
-
-        # Frequency, PF
-        self._card_frequency.set_value(snap.frequency)
-        self._card_pf.set_value(snap.power_factor)
+    def _update_stale(self, snap: TelemetrySnapshot) -> None:
+        # Dim cards whose source frame stopped arriving
+        for card, section in self._card_sections:
+            card.set_stale(section in snap.stale_sections)
 
-        # System power
-        self._card_active_p.set_value(snap.active_power)
-        self._card_reactive_p.set_value(snap.reactive_power)
+    def _update_stats(self, snap: TelemetrySnapshot) -> None:
+        # Rolling statistics (last minute inline, all windows on hover)
+        if snap.stats:
+            for card, signal in self._card_signals:
+                card.set_stats({w: st.get(signal) for w, st in snap.stats.items()})
 
-        # 3-phase
-        self._card_grid_v.set_values(snap.grid_v_u, snap.grid_v_v, snap.grid_v_w)
-        self._card_grid_i.set_values(snap.grid_i_u, snap.grid_i_v, snap.grid_i_w)
-
-        # Capacity / energy / hi-res
-        self._card_capacity.set_value(snap.capacity_ah)
-        self._card_energy.set_value(snap.energy_wh)
-        self._card_hires_v.set_value(snap.dc_voltage_hr)
-        self._card_hires_i.set_value(snap.dc_current_hr)
-
-        # Heartbeat
-        self._heartbeat.update_age(snap.seconds_since_rx)
-
-        # CAN stats
-        self._lbl_can_stats.setText(
-            f"TX: {snap.tx_count}  RX: {snap.rx_count}  ERR: {snap.error_count}"
-        )
-
-        # Faults
+    def _update_fault(self, snap: TelemetrySnapshot) -> None:
         if snap.is_fault:
             self._lbl_fault_code.setText(
                 f"⚠ FAULT 0x{snap.fault_code:04X}\n{snap.fault_description}"
             )
-            self._lbl_fault_code.setStyleSheet(
-                f"color: {ACCENT_RED}; font-family: {FONT_MONO}; "
-                f"font-size: 12px; font-weight: 700;"
-            )
         else:
             self._lbl_fault_code.setText("No fault")
+        if snap.is_fault != self._fault_shown:
+            self._fault_shown = snap.is_fault
             self._lbl_fault_code.setStyleSheet(
-                f"color: {ACCENT_GREEN}; font-family: {FONT_MONO}; "
-                f"font-size: 12px; font-weight: 700;"
+                f"color: {ACCENT_RED if snap.is_fault else ACCENT_GREEN}; "
+                f"font-family: {FONT_MONO}; font-size: 12px; font-weight: 700;"
             )
 
-        # ── Fill ALL trend buffers ──
-        t = snap.timestamp - self._trend_start_time
-        self._trend_time.append(t)
-
-        # Overview trends
-        self._buf_dc_voltage.append(snap.dc_voltage)
-        self._buf_dc_current.append(snap.dc_current)
-        self._buf_dc_power.append(snap.dc_power)
-        self._buf_inlet_temp.append(snap.inlet_temp)
-
-        # DC Side
-        self._buf_dc_voltage_hr.append(snap.dc_voltage_hr)
-        self._buf_dc_current_hr.append(snap.dc_current_hr)
-        self._buf_capacity.append(snap.capacity_ah)
-        self._buf_energy.append(snap.energy_wh)
-
-        # AC Grid
-        self._buf_grid_v_u.append(snap.grid_v_u)
-        self._buf_grid_v_v.append(snap.grid_v_v)
-        self._buf_grid_v_w.append(snap.grid_v_w)
-        self._buf_grid_i_u.append(snap.grid_i_u)
-        self._buf_grid_i_v.append(snap.grid_i_v)
-        self._buf_grid_i_w.append(snap.grid_i_w)
-        self._buf_frequency.append(snap.frequency)
-        self._buf_power_factor.append(snap.power_factor)
-
-        # Power & Energy
-        self._buf_active_power.append(snap.active_power)
-        self._buf_reactive_power.append(snap.reactive_power)
-        self._buf_apparent_power.append(snap.apparent_power)
-        self._buf_load_active.append(snap.load_active_power)
-        self._buf_load_reactive.append(snap.load_reactive_power)
-        self._buf_load_apparent.append(snap.load_apparent_power)
-        self._buf_phase_a.append(snap.phase_a_active)
-        self._buf_phase_b.append(snap.phase_b_active)
-        self._buf_phase_c.append(snap.phase_c_active)
-        self._buf_phase_a_q.append(snap.phase_a_reactive)
-        self._buf_phase_b_q.append(snap.phase_b_reactive)
-        self._buf_phase_c_q.append(snap.phase_c_reactive)
-
-        # Thermal
-        self._buf_outlet_temp.append(snap.outlet_temp)
+    def _append_trends(self, snap: TelemetrySnapshot) -> None:
+        """Add one sample per status cycle to every allocated trend buffer."""
+        self._trend_time.append(snap.timestamp - self._trend_start_time)
+        for key, buf in self._trend_bufs.items():
+            buf.append(getattr(snap, key))
 
     @staticmethod
     def _color_by_range(card: TelemetryCard, val: float, warn: float, crit: float) -> None:
@@ -1002,61 +1153,29 @@ class MainWindow(QMainWindow):
     # =====================================================================
 
     def _update_plots(self) -> None:
-        if not self._trend_time:
+        # Only the currently visible tab is redrawn, to save CPU
+        curves = self._tab_curves.get(self._tabs.currentIndex())
+        if not curves or not self._trend_time:
             return
         t = np.array(self._trend_time)
-
-        # Only update the currently visible tab to save CPU
-        current_tab = self._tabs.currentIndex()
-
-        if current_tab == 0:  # Trends (overview)
-            self._curve_v.setData(t, np.array(self._buf_dc_voltage))
-            self._curve_i.setData(t, np.array(self._buf_dc_current))
-            self._curve_p.setData(t, np.array(self._buf_dc_power))
-            self._curve_t.setData(t, np.array(self._buf_inlet_temp))
-
-        elif current_tab == 1:  # DC Side
-            self._dc_curve_v.setData(t, np.array(self._buf_dc_voltage))
-            self._dc_curve_v_hr.setData(t, np.array(self._buf_dc_voltage_hr))
-            self._dc_curve_i.setData(t, np.array(self._buf_dc_current))
-            self._dc_curve_i_hr.setData(t, np.array(self._buf_dc_current_hr))
-            self._dc_curve_power.setData(t, np.array(self._buf_dc_power))
-            self._dc_curve_cap.setData(t, np.array(self._buf_capacity))
-            self._dc_curve_energy.setData(t, np.array(self._buf_energy))
-
-        elif current_tab == 2:  # AC Grid
-            self._ac_curve_vu.setData(t, np.array(self._buf_grid_v_u))
-            self._ac_curve_vv.setData(t, np.array(self._buf_grid_v_v))
-            self._ac_curve_vw.setData(t, np.array(self._buf_grid_v_w))
-            self._ac_curve_iu.setData(t, np.array(self._buf_grid_i_u))
-            self._ac_curve_iv.setData(t, np.array(self._buf_grid_i_v))
-            self._ac_curve_iw.setData(t, np.array(self._buf_grid_i_w))
-            self._ac_curve_freq.setData(t, np.array(self._buf_frequency))
-            self._ac_curve_pf.setData(t, np.array(self._buf_power_factor))
-
-        elif current_tab == 3:  # Power & Energy
-            self._pwr_curve_active.setData(t, np.array(self._buf_active_power))
-            self._pwr_curve_reactive.setData(t, np.array(self._buf_reactive_power))
-            self._pwr_curve_apparent.setData(t, np.array(self._buf_apparent_power))
-            self._pwr_curve_load_active.setData(t, np.array(self._buf_load_active))
-            self._pwr_curve_load_reactive.setData(t, np.array(self._buf_load_reactive))
-            self._pwr_curve_load_apparent.setData(t, np.array(self._buf_load_apparent))
-            self._pwr_curve_ph_a.setData(t, np.array(self._buf_phase_a))
-            self._pwr_curve_ph_b.setData(t, np.array(self._buf_phase_b))
-            self._pwr_curve_ph_c.setData(t, np.array(self._buf_phase_c))
-            self._pwr_curve_ph_a_q.setData(t, np.array(self._buf_phase_a_q))
-            self._pwr_curve_ph_b_q.setData(t, np.array(self._buf_phase_b_q))
-            self._pwr_curve_ph_c_q.setData(t, np.array(self._buf_phase_c_q))
-
-        elif current_tab == 4:  # Thermal
-            self._therm_curve_inlet.setData(t, np.array(self._buf_inlet_temp))
-            self._therm_curve_outlet.setData(t, np.array(self._buf_outlet_temp))
+        for curve, key in curves:
+            buf = self._trend_bufs[key]
+            # A buffer allocated after sampling began covers only the newest times
+            curve.setData(t[len(t) - len(buf):], np.array(buf))
 
     # =====================================================================
     #  Raw CAN table
     # =====================================================================
 
     def _add_raw_frame(self, frame: RawCANFrame) -> None:
+        self._raw_frames.append(frame)
+        if self._tbl_raw is None:
+            return   # shown when the tab is built
+        self._insert_raw_row(frame)
+        self._tbl_raw.scrollToBottom()
+        self._update_can_count()
+
+    def _insert_raw_row(self, frame: RawCANFrame) -> None:
         row = self._tbl_raw.rowCount()
         if row >= _RAW_CAN_MAX:
             self._tbl_raw.removeRow(0)
@@ -1075,10 +1194,10 @@ class MainWindow(QMainWindow):
         for col, text in enumerate(items):
             item = QTableWidgetItem(text)
             if frame.direction == "TX":
-                item.setForeground(pg.mkColor(ACCENT_CYAN))
+                item.setForeground(QColor(ACCENT_CYAN))
             self._tbl_raw.setItem(row, col, item)
 
-        self._tbl_raw.scrollToBottom()
+    def _update_can_count(self) -> None:
         self._lbl_can_count.setText(f"{self._tbl_raw.rowCount()} frames")
 
     def _apply_can_filter(self, text: str) -> None:
@@ -1096,6 +1215,7 @@ class MainWindow(QMainWindow):
             self._tbl_raw.setRowHidden(row, not match)
 
     def _clear_raw_can(self) -> None:
+        self._raw_frames.clear()
         self._tbl_raw.setRowCount(0)
         self._lbl_can_count.setText("0 frames")
 
@@ -1117,7 +1237,7 @@ class MainWindow(QMainWindow):
         self._backend.cmd_disable()
 
     def _on_emergency_stop(self) -> None:
-        self._backend.cmd_disable()
+        self._backend.emergency_stop()
 
     def _on_reset_faults(self) -> None:
         self._backend.cmd_reset_faults()
@@ -1218,5 +1338,5 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event: QCloseEvent) -> None:
         self._poll_timer.stop()
         self._plot_timer.stop()
-        self._backend.disconnect_pcs()
+        self._backend.shutdown()
         super().closeEvent(event)
@@ -112,6 +112,12 @@ QMainWindow {{
     font-size: 11px;
 }}
 
+.CardStats {{
+    color: {TEXT_DIM};
+    font-family: {FONT_MONO};
+    font-size: 9px;
+}}
+
 .CardValueSmall {{
     color: {TEXT_PRIMARY};
     font-family: {FONT_MONO};
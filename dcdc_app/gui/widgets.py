@@ -6,6 +6,7 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QColor, QFont
 from PySide6.QtWidgets import (
     QFrame,
+    QGraphicsOpacityEffect,
     QGridLayout,
     QHBoxLayout,
     QLabel,
@@ -30,6 +31,20 @@ from dcdc_app.gui.theme import (
 )
 
 
+def _apply_stale(card: QFrame, label: QLabel, title: str, stale: bool) -> None:
+    """Shared stale styling for telemetry cards: dimmed frame + STALE tag."""
+    if stale:
+        effect = QGraphicsOpacityEffect(card)
+        effect.setOpacity(0.4)
+        card.setGraphicsEffect(effect)
+        label.setText(f"{title}  · STALE")
+        card.setToolTip("No frame received for this signal recently; value is the last known")
+    else:
+        card.setGraphicsEffect(None)
+        label.setText(title)
+        card.setToolTip("")
+
+
 class TelemetryCard(QFrame):
     """A single telemetry readout card with label, value, and unit."""
 
@@ -45,13 +60,17 @@ class TelemetryCard(QFrame):
         self.setProperty("class", "TelemetryCard")
         self._fmt = fmt
         self._value = 0.0
+        self._title = label.upper()
+        self._stale = False
+        self._text = "—"
+        self._color: str | None = None   # None: stylesheet default
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(8, 6, 8, 6)
         layout.setSpacing(1)
 
         # Label
-        self._label = QLabel(label.upper())
+        self._label = QLabel(self._title)
         self._label.setProperty("class", "CardLabel")
         self._label.setAlignment(Qt.AlignmentFlag.AlignLeft)
         layout.addWidget(self._label)
@@ -75,19 +94,64 @@ class TelemetryCard(QFrame):
 
         layout.addLayout(val_row)
 
+        # Rolling min / mean / max line (hidden until statistics arrive)
+        self._stats_label = QLabel("")
+        self._stats_label.setProperty("class", "CardStats")
+        self._stats_label.setVisible(False)
+        layout.addWidget(self._stats_label)
+        self._stats_text = ""
+
     def set_value(self, value: float) -> None:
         self._value = value
-        txt = f"{value:{self._fmt}}"
-        self._val_label.setText(txt)
+        self.set_text(f"{value:{self._fmt}}")
 
     def set_text(self, text: str) -> None:
-        self._val_label.setText(text)
+        if text != self._text:
+            self._text = text
+            self._val_label.setText(text)
 
-    def set_color(self, color: str) -> None:
-        self._val_label.setStyleSheet(f"color: {color};")
+    def set_color(self, color: str | None) -> None:
+        # Restyling makes Qt re-polish the label: only on a real colour change
+        if color == self._color:
+            return
+        self._color = color
+        self._val_label.setStyleSheet(f"color: {color};" if color else "")
 
     def reset_color(self) -> None:
-        self._val_label.setStyleSheet("")
+        self.set_color(None)
+
+    def set_stale(self, stale: bool) -> None:
+        """Dim the card and tag its label while its source frame is missing."""
+        if stale == self._stale:
+            return
+        self._stale = stale
+        _apply_stale(self, self._label, self._title, stale)
+
+    def set_stats(self, by_window: dict) -> None:
+        """Show rolling statistics: first window inline, all windows in the tooltip.
+
+        Args:
+            by_window: {window name: WindowStats}, e.g. {"1m": ..., "1h": ..., "session": ...}.
+        """
+        fmt = self._fmt
+        rows = [
+            (name, st) for name, st in by_window.items() if st is not None and st.count
+        ]
+        if not rows:
+            text = ""
+        else:
+            name, st = rows[0]
+            text = f"{name}  ▾{st.min:{fmt}}  μ{st.mean:{fmt}}  ▴{st.max:{fmt}}"
+        if text == self._stats_text:
+            return
+        self._stats_text = text
+        self._stats_label.setText(text)
+        self._stats_label.setVisible(bool(text))
+        self._stats_label.setToolTip("\n".join(
+            f"{name:>8}: min {st.min:{fmt}}  mean {st.mean:{fmt}}  max {st.max:{fmt}}  "
+            f"rms {st.rms:{fmt}}  σ {st.std:.3g}  (n={st.count})"
+            for name, st in rows
+        ))
 
     @property
     def value(self) -> float:
@@ -158,6 +222,7 @@ class HeartbeatIndicator(QFrame):
 
         self._dot = QLabel("●")
         self._dot.setStyleSheet(f"color: {TEXT_DIM}; font-size: 16px;")
+        self._color = TEXT_DIM
         layout.addWidget(self._dot)
 
         self._age_label = QLabel("No data")
@@ -169,24 +234,27 @@ class HeartbeatIndicator(QFrame):
 
     def update_age(self, seconds: float) -> None:
         if seconds > 100:
-            self._dot.setStyleSheet(f"color: {TEXT_DIM}; font-size: 16px;")
-            self._age_label.setText("No data")
-            return
-
-        if seconds < 1.0:
+            color = TEXT_DIM
+            text = "No data"
+        elif seconds < 1.0:
             color = ACCENT_GREEN
-            text = "< 1s"
+            text = "Last RX: < 1s"
         elif seconds < 3.0:
             color = ACCENT_YELLOW
-            text = f"{seconds:.1f}s"
+            text = f"Last RX: {seconds:.1f}s"
         else:
             color = ACCENT_RED
-            text = f"{seconds:.1f}s  STALE"
+            text = f"Last RX: {seconds:.1f}s  STALE"
 
+        if text != self._age_label.text():
+            self._age_label.setText(text)
+        if color == self._color:
+            return
+        self._color = color
         self._dot.setStyleSheet(f"color: {color}; font-size: 16px;")
-        self._age_label.setText(f"Last RX: {text}")
+        label_color = TEXT_SECONDARY if color == TEXT_DIM else color
         self._age_label.setStyleSheet(
-            f"color: {color}; font-family: {FONT_MONO}; font-size: 11px;"
+            f"color: {label_color}; font-family: {FONT_MONO}; font-size: 11px;"
         )
 
 
@@ -202,9 +270,11 @@ class ThreePhaseCard(QFrame):
         layout.setContentsMargins(8, 6, 8, 6)
         layout.setSpacing(2)
 
-        header = QLabel(label.upper())
-        header.setProperty("class", "CardLabel")
-        layout.addWidget(header)
+        self._title = label.upper()
+        self._stale = False
+        self._header = QLabel(self._title)
+        self._header.setProperty("class", "CardLabel")
+        layout.addWidget(self._header)
 
         grid = QGridLayout()
         grid.setSpacing(2)
@@ -231,6 +301,15 @@ class ThreePhaseCard(QFrame):
         layout.addLayout(grid)
 
     def set_values(self, u: float, v: float, w: float, fmt: str = ".1f") -> None:
-        self._values["U"].setText(f"{u:{fmt}}")
-        self._values["V"].setText(f"{v:{fmt}}")
-        self._values["W"].setText(f"{w:{fmt}}")
+        for phase, value in (("U", u), ("V", v), ("W", w)):
+            text = f"{value:{fmt}}"
+            label = self._values[phase]
+            if text != label.text():
+                label.setText(text)
+
+    def set_stale(self, stale: bool) -> None:
+        """Dim the card and tag its label while its source frame is missing."""
+        if stale == self._stale:
+            return
+        self._stale = stale
+        _apply_stale(self, self._header, self._title, stale)
@@ -14,9 +14,10 @@ import time
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, TextIO
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
 
-from dcdc_app.protocol import PF_NAMES, parse_can_id
+from dcdc_app.metrics import REGISTRY, MetricsRegistry
+from dcdc_app.protocol import PF_NAMES
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +74,7 @@ class FrameLogger:
         filepath: Optional[str] = None,
         fmt: str = "csv",
         console: bool = True,
+        metrics: Optional[MetricsRegistry] = None,
     ):
         """Initialize frame logger.
 
@@ -80,6 +82,7 @@ class FrameLogger:
             filepath: Output file path. None to disable file logging.
             fmt: Output format - 'csv' or 'jsonl'.
             console: If True, also log decoded frames to console.
+            metrics: Metrics registry (default: process-wide REGISTRY).
         """
         self.filepath = filepath
         self.fmt = fmt.lower()
@@ -88,6 +91,12 @@ class FrameLogger:
         self._csv_writer = None
         self._record_count = 0
 
+        registry = metrics or REGISTRY
+        # TX frames are logged from the sending thread, RX batches from the RX thread
+        self._m_write = registry.histogram(
+            "logger_write_seconds", "FrameLogger.log_frame() time", shared=True, format=self.fmt,
+        )
+
     def open(self) -> None:
         """Open the log file."""
         if self.filepath:
@@ -113,6 +122,7 @@ class FrameLogger:
         data: bytes,
         direction: str = "RX",
         decoded: Optional[Any] = None,
+        timestamp: Optional[float] = None,
     ) -> None:
         """Log a CAN frame.
 
@@ -121,9 +131,50 @@ class FrameLogger:
             data: Frame data bytes.
             direction: "TX" or "RX".
             decoded: Decoded data object (dataclass or dict).
+            timestamp: Bus receive time of the frame (default: now).
+        """
+        t0 = time.perf_counter()
+        record = self._make_record(can_id, data, direction, decoded, timestamp)
+
+        # Write to file
+        if self._file:
+            self._write(record)
+            self._file.flush()
+
+        # Console output
+        if self.console:
+            self._print_console(record)
+
+        self._m_write.observe(time.perf_counter() - t0)
+
+    def log_frames(
+        self, frames: Iterable[Tuple[int, bytes, str, Optional[Any], Optional[float]]],
+    ) -> None:
+        """Log several frames with a single flush.
+
+        Args:
+            frames: (can_id, data, direction, decoded, timestamp) tuples, as for
+                log_frame(). Pass each frame's bus timestamp: the frames of a
+                batch are logged together, well after the first one arrived.
         """
-        fields = parse_can_id(can_id)
-        pf = fields["pf"]
+        t0 = time.perf_counter()
+        records = [self._make_record(*frame) for frame in frames]
+        if not records:
+            return
+        if self._file:
+            for record in records:
+                self._write(record)
+            self._file.flush()
+        if self.console:
+            for record in records:
+                self._print_console(record)
+        self._m_write.observe(time.perf_counter() - t0)
+
+    def _make_record(
+        self, can_id: int, data: bytes, direction: str, decoded: Optional[Any],
+        timestamp: Optional[float] = None,
+    ) -> FrameRecord:
+        pf = (can_id >> 16) & 0xFF
         pf_name = PF_NAMES.get(pf, f"Unknown_0x{pf:02X}")
 
         decoded_dict = None
@@ -135,8 +186,8 @@ class FrameLogger:
             elif isinstance(decoded, bool):
                 decoded_dict = {"success": decoded}
 
-        record = FrameRecord(
-            timestamp=time.time(),
+        return FrameRecord(
+            timestamp=time.time() if timestamp is None else timestamp,
             direction=direction,
             can_id=can_id,
             dlc=len(data),
@@ -146,18 +197,12 @@ class FrameLogger:
             decoded=decoded_dict,
         )
 
-        # Write to file
-        if self._file:
-            if self.fmt == "csv" and self._csv_writer:
-                self._csv_writer.writerow(record.to_csv_row())
-            else:
-                self._file.write(record.to_jsonl() + "\n")
-            self._file.flush()
-            self._record_count += 1
-
-        # Console output
-        if self.console:
-            self._print_console(record)
+    def _write(self, record: FrameRecord) -> None:
+        if self.fmt == "csv" and self._csv_writer:
+            self._csv_writer.writerow(record.to_csv_row())
+        else:
+            self._file.write(record.to_jsonl() + "\n")
+        self._record_count += 1
 
     def _print_console(self, record: FrameRecord) -> None:
         """Print a frame record to console in a readable format."""
@@ -187,6 +232,36 @@ class FrameLogger:
         self.close()
 
 
+def iter_frame_log(filepath: str) -> Iterator[Tuple[float, str, int, bytes]]:
+    """Read back a CSV or JSONL frame log written by FrameLogger.
+
+    Binary frame-trace dumps (``.bin``, see trace.py) are read as well.
+
+    Yields:
+        (timestamp, direction, can_id, data) for each record. Rows that
+        cannot be parsed are skipped.
+    """
+    if filepath.lower().endswith(".bin"):
+        from dcdc_app.trace import read_binary
+        for rec in read_binary(filepath):
+            yield rec.timestamp, rec.direction, rec.can_id, bytes(rec.data)
+        return
+    is_jsonl = filepath.lower().endswith(".jsonl")
+    with open(filepath, "r", newline="", encoding="utf-8") as f:
+        if is_jsonl:
+            rows: Iterator[Dict[str, Any]] = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            try:
+                ts = datetime.fromisoformat(row["timestamp"]).timestamp()
+                can_id = int(row["can_id"], 16)
+                data = bytes.fromhex(row["data_hex"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            yield ts, row.get("direction", "RX"), can_id, data
+
+
 def setup_logging(level: str = "INFO", logfile: Optional[str] = None) -> None:
     """Configure application-wide logging.
 
@@ -0,0 +1,317 @@
+"""Lightweight in-process metrics: counters, gauges and latency histograms.
+
+Shared by the CAN interface, controller, frame logger and GUI backend.
+Instruments are plain Python objects, updated by default without locks: the
+cost per update is a few attribute operations, so the registry can stay
+enabled in production, but ``inc()`` and ``observe()`` are then only safe
+from one thread (the RX thread's counters and decode histograms). Instruments
+written from several threads (TX counters and send time: heartbeat thread,
+command callers, e-stop retransmits) are registered with ``shared=True``,
+which serializes their updates with a per-instrument lock. Asking for
+``shared=True`` on an instrument already registered without it upgrades it.
+
+Histograms use an HDR-style log-linear bucket layout over integer
+microseconds: values below 64 us get exact buckets, larger values keep ~3%
+relative precision up to ~12 days.
+
+Example:
+    from dcdc_app.metrics import REGISTRY
+    h = REGISTRY.histogram("controller_decode_seconds", "Decode time", pf="0x11")
+    h.observe(12e-6)
+    REGISTRY.snapshot()
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Histogram layout: 2**_SUB_BITS sub-buckets per power of two
+_SUB_BITS = 5
+_SUB_COUNT = 1 << _SUB_BITS          # 32
+_LINEAR_LIMIT = _SUB_COUNT << 1      # values below this (us) are exact
+_MAX_BITS = 40                       # 2**40 us ~= 12.7 days
+_BUCKETS = _LINEAR_LIMIT + (_MAX_BITS - _SUB_BITS - 1) * _SUB_COUNT
+_MAX_VALUE = (1 << _MAX_BITS) - 1
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _bucket_index(v: int) -> int:
+    """Map a non-negative integer (us) to its bucket index."""
+    if v < _LINEAR_LIMIT:
+        return v
+    shift = v.bit_length() - _SUB_BITS - 1
+    return _LINEAR_LIMIT + (shift - 1) * _SUB_COUNT + ((v >> shift) - _SUB_COUNT)
+
+
+def _bucket_upper(idx: int) -> int:
+    """Highest integer value (us) that falls into bucket idx."""
+    if idx < _LINEAR_LIMIT:
+        return idx
+    shift = (idx - _LINEAR_LIMIT) // _SUB_COUNT + 1
+    mantissa = (idx - _LINEAR_LIMIT) % _SUB_COUNT + _SUB_COUNT
+    return ((mantissa + 1) << shift) - 1
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    __slots__ = ("name", "help", "labels", "value", "_lock")
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "", labels: LabelKey = (), shared: bool = False):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock() if shared else None
+
+    def inc(self, n: int = 1) -> None:
+        lock = self._lock
+        if lock is None:
+            self.value += n
+        else:
+            with lock:
+                self.value += n
+
+    def reset(self) -> None:
+        self.value = 0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"value": self.value}
+
+
+class Gauge:
+    """Value that can go up and down (queue depth, age, rate)."""
+
+    __slots__ = ("name", "help", "labels", "value", "_lock")
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str = "", labels: LabelKey = (), shared: bool = False):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock() if shared else None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, n: float = 1.0) -> None:
+        lock = self._lock
+        if lock is None:
+            self.value += n
+        else:
+            with lock:
+                self.value += n
+
+    def dec(self, n: float = 1.0) -> None:
+        self.inc(-n)
+
+    def reset(self) -> None:
+        self.value = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Latency histogram with HDR-style log-linear buckets (seconds in, us resolution)."""
+
+    __slots__ = ("name", "help", "labels", "counts", "count", "sum", "min", "max", "_lock")
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", labels: LabelKey = (), shared: bool = False):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.counts: List[int] = [0] * _BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self._lock = threading.Lock() if shared else None
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration in seconds (negative values count as 0)."""
+        lock = self._lock
+        if lock is None:
+            self._observe(seconds)
+        else:
+            with lock:
+                self._observe(seconds)
+
+    def _observe(self, seconds: float) -> None:
+        us = int(seconds * 1e6)
+        if us < 0:
+            us = 0
+            seconds = 0.0
+        elif us > _MAX_VALUE:
+            us = _MAX_VALUE
+        self.counts[_bucket_index(us)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def reset(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Value (seconds) at the given percentile, bucket upper bound."""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(-(-pct * self.count // 100)))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    return min(_bucket_upper(idx) / 1e6, self.max)
+        return self.max
+
+    def buckets(self) -> Iterator[Tuple[float, int]]:
+        """Yield (upper_bound_seconds, cumulative_count) for non-empty buckets."""
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            if c:
+                seen += c
+                yield _bucket_upper(idx) / 1e6, seen
+
+    def cumulative(self, bounds: Sequence[float]) -> Tuple[List[int], int]:
+        """Cumulative counts at or below each bound (seconds, ascending) and the total.
+
+        Counts are taken from the buckets themselves, so the result is
+        self-consistent even while another thread keeps observing.
+        """
+        limits = [b * 1e6 for b in bounds]
+        out = [0] * len(limits)
+        seen = 0
+        j = 0
+        for idx, c in enumerate(self.counts):
+            if c:
+                upper = _bucket_upper(idx)
+                while j < len(limits) and upper > limits[j]:
+                    out[j] = seen
+                    j += 1
+                seen += c
+        while j < len(limits):
+            out[j] = seen
+            j += 1
+        return out, seen
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+def format_labels(labels: LabelKey) -> str:
+    """Render labels as {k="v",...} (empty string when there are none)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class MetricsRegistry:
+    """Named collection of metrics with snapshot and reset.
+
+    Instrument lookup takes a lock; hot paths should look an instrument up once
+    and keep the returned object. Pass ``shared=True`` for instruments updated
+    from more than one thread.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelKey], Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labels: Dict[str, str], shared: bool) -> Metric:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, help, key[1], shared=shared)
+                    self._metrics[key] = metric
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric {name} already registered as {metric.kind}")
+        if shared and metric._lock is None:
+            with self._lock:
+                if metric._lock is None:
+                    metric._lock = threading.Lock()
+        return metric
+
+    def counter(self, name: str, help: str = "", shared: bool = False, **labels: str) -> Counter:
+        return self._get(Counter, name, help, labels, shared)  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str = "", shared: bool = False, **labels: str) -> Gauge:
+        return self._get(Gauge, name, help, labels, shared)  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str = "", shared: bool = False,
+                  **labels: str) -> Histogram:
+        return self._get(Histogram, name, help, labels, shared)  # type: ignore[return-value]
+
+    def metrics(self) -> List[Metric]:
+        """All registered instruments, sorted by name and labels."""
+        with self._lock:
+            items = sorted(self._metrics.items(), key=lambda kv: kv[0])
+        return [m for _, m in items]
+
+    def get(self, name: str, **labels: str) -> Optional[Metric]:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        return self._metrics.get(key)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Point-in-time values keyed by 'name{labels}'."""
+        return {m.name + format_labels(m.labels): m.snapshot() for m in self.metrics()}
+
+    def reset(self) -> None:
+        """Zero every instrument (instruments stay registered)."""
+        for m in self.metrics():
+            m.reset()
+
+
+# Process-wide default registry
+REGISTRY = MetricsRegistry()
+
+
+def format_snapshot(registry: Optional[MetricsRegistry] = None) -> str:
+    """Human-readable multi-line summary of a registry."""
+    registry = registry or REGISTRY
+    lines = []
+    for m in registry.metrics():
+        label = m.name + format_labels(m.labels)
+        if isinstance(m, Histogram):
+            if m.count == 0:
+                continue
+            lines.append(
+                f"  {label:<58} n={m.count:<8d} mean={m.mean * 1e6:8.1f}us "
+                f"p50={m.percentile(50) * 1e6:8.1f}us p99={m.percentile(99) * 1e6:8.1f}us "
+                f"max={m.max * 1e6:8.1f}us"
+            )
+        else:
+            lines.append(f"  {label:<58} {m.value:g}")
+    return "\n".join(lines)
@@ -0,0 +1,461 @@
+"""Test-profile runner: sequences PCS modes through condition-based steps.
+
+A profile is a JSON file with a list of steps, repeated ``repeat`` times:
+
+    {
+      "name": "1C cycle",
+      "repeat": 3,
+      "abort": ["temperature >= 60", "voltage >= 850"],
+      "steps": [
+        {"name": "CC charge", "mode": "cc", "params": [50], "until": ["voltage >= 420"]},
+        {"name": "CV hold", "mode": "cv", "params": [420], "until": ["abs_current <= 2.5"]},
+        {"name": "rest", "until": ["time >= 600"]},
+        {"name": "CP discharge", "mode": "cp", "params": [10000],
+         "until": ["voltage <= 300", "ah >= 50"]}
+      ]
+    }
+
+``mode`` is a WorkingMode name, its value (e.g. "0x21") or one of the
+``set`` command shorthands (cv, cc, cp, cccv); a step without a mode is a
+rest step with the output off. A step ends when any of its ``until``
+conditions holds; any ``abort`` condition stops the whole profile. Conditions
+are ``<signal> <op> <number>`` where the signal is one of SIGNALS, ``time``
+(seconds in the step), ``ah``/``wh`` (throughput in the step, host-integrated
+from hi-res DC frames) or a PCSState field as ``section.field``.
+
+Conditions read the configured PCS's own state (``device_states``), never
+frames from other units on the bus, and are evaluated through
+PCSController.wait_until, i.e. right after each received frame batch, so a
+step ends within the telemetry cycle that meets its condition. After a
+step's commands, its telemetry conditions wait until the PCS has reported
+the new state (a status frame showing it running, or stopped for a rest
+step) and a DC frame after that, so they never see the frames of the mode
+being left. ``time``/``ah``/``wh`` and abort conditions are not held back.
+The output is always switched off when the run ends.
+
+Example:
+    runner = ProfileRunner(ctrl, load_profile("cycle.json"), step_log="steps.csv")
+    records = runner.run()
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import operator
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dcdc_app.constants import ACTIVE_STATES, MODE_PARAMS, WorkingMode
+from dcdc_app.coulomb import CoulombCounter
+
+logger = logging.getLogger(__name__)
+
+MODE_ALIASES = {
+    "cv": WorkingMode.DC_CONSTANT_VOLTAGE,
+    "cc": WorkingMode.DC_CONSTANT_CURRENT,
+    "cp": WorkingMode.DC_CONSTANT_POWER,
+    "cccv": WorkingMode.DC_CC_CV,
+}
+
+OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _hires(state) -> bool:
+    return state.dc_hires.voltage > 0
+
+
+# Named signals on the aggregated PCSState; hi-res DC frames win when present
+SIGNALS: Dict[str, Callable[[Any], float]] = {
+    "voltage": lambda s: s.dc_hires.voltage if _hires(s) else s.dc.voltage,
+    "current": lambda s: s.dc_hires.current if _hires(s) else s.dc.current,
+    "abs_current": lambda s: abs(s.dc_hires.current if _hires(s) else s.dc.current),
+    "power": lambda s: s.dc.power,
+    "temperature": lambda s: max(s.dc.inlet_temperature, s.capacity_energy.outlet_temperature),
+    "inlet_temperature": lambda s: s.dc.inlet_temperature,
+    "outlet_temperature": lambda s: s.capacity_energy.outlet_temperature,
+}
+STEP_SIGNALS = ("time", "ah", "wh")
+
+_CONDITION_RE = re.compile(r"^\s*([A-Za-z_][\w.]*)\s*(<=|>=|<|>)\s*(-?[\d.]+(?:[eE][-+]?\d+)?)\s*$")
+
+STEP_LOG_FIELDS = [
+    "cycle", "step", "name", "mode", "started", "duration_s", "reason",
+    "ah", "wh", "voltage", "current",
+]
+
+
+class ProfileError(Exception):
+    """Invalid profile file, or a command the PCS rejected during a run."""
+
+
+class _StepContext:
+    """Step-relative signals (elapsed time, Ah/Wh since the step started)."""
+
+    def __init__(self, counter: CoulombCounter):
+        self.counter = counter
+        self.t0 = time.monotonic()
+        start = counter.report()
+        self._ah0, self._wh0 = start.ah_throughput, start.wh_throughput
+
+    @property
+    def time(self) -> float:
+        return time.monotonic() - self.t0
+
+    @property
+    def ah(self) -> float:
+        return self.counter.report().ah_throughput - self._ah0
+
+    @property
+    def wh(self) -> float:
+        return self.counter.report().wh_throughput - self._wh0
+
+
+class _FreshTelemetry:
+    """Whether the PCS has reported its new state since a step's commands.
+
+    Ready once a status frame received after the commands shows the expected
+    running state and a DC frame has followed it. Decoded sections are
+    replaced, never mutated, so identity tells a new frame from an old one.
+    """
+
+    def __init__(self, device, active: bool):
+        self.active = active
+        self._status = device.status if device is not None else None
+        self._dc = None   # DC section current when the new state was confirmed
+        self.ready = False
+
+    def check(self, device) -> bool:
+        """Update from the device state (under the controller lock)."""
+        if self.ready:
+            return True
+        if device is None:
+            return False
+        if self._dc is None:
+            status = device.status
+            if status is not self._status and (status.running_state in ACTIVE_STATES) == self.active:
+                self._dc = device.dc
+            return False
+        self.ready = device.dc is not self._dc
+        return self.ready
+
+
+@dataclass
+class Condition:
+    """``signal op value``, e.g. ``voltage >= 420``."""
+    signal: str
+    op: str
+    value: float
+    read: Callable[[Any, _StepContext], float] = field(repr=False, compare=False, default=None)
+
+    def __str__(self) -> str:
+        return f"{self.signal} {self.op} {self.value:g}"
+
+    @property
+    def telemetry(self) -> bool:
+        """Whether the condition reads PCS telemetry (not just the step context)."""
+        return self.signal not in STEP_SIGNALS
+
+    def check(self, state, ctx: _StepContext) -> Tuple[bool, float]:
+        """Evaluate against the state and step; returns (holds, signal value)."""
+        value = self.read(state, ctx)
+        return OPERATORS[self.op](value, self.value), value
+
+
+@dataclass
+class Step:
+    """One profile step; ``mode`` None is a rest step (output off)."""
+    name: str
+    mode: Optional[WorkingMode]
+    params: List[float]
+    until: List[Condition]
+
+
+@dataclass
+class Profile:
+    name: str
+    steps: List[Step]
+    repeat: int = 1
+    abort: List[Condition] = field(default_factory=list)
+
+
+@dataclass
+class StepRecord:
+    """Timing and end values of one executed step."""
+    cycle: int
+    step: int
+    name: str
+    mode: str
+    started: float        # wall-clock time the step began (before its commands)
+    duration_s: float     # until the ending condition was seen
+    reason: str           # ending condition, "abort: ..." or "stopped"
+    ah: float
+    wh: float
+    voltage: float
+    current: float
+
+
+def parse_condition(text: str) -> Condition:
+    """Parse ``<signal> <op> <number>`` into a Condition.
+
+    Raises:
+        ProfileError: On bad syntax or an unknown signal.
+    """
+    m = _CONDITION_RE.match(text)
+    if not m:
+        raise ProfileError(f"Bad condition {text!r} (expected '<signal> <op> <number>')")
+    signal, op, value = m.group(1), m.group(2), float(m.group(3))
+    if signal in SIGNALS:
+        fn = SIGNALS[signal]
+        read = lambda state, ctx: fn(state)  # noqa: E731
+    elif signal in STEP_SIGNALS:
+        read = lambda state, ctx: getattr(ctx, signal)  # noqa: E731
+    elif "." in signal:
+        section, attr = signal.split(".", 1)
+        from dcdc_app.protocol import PCSState
+        probe = getattr(PCSState(), section, None)
+        if probe is None or not isinstance(getattr(probe, attr, None), (int, float)):
+            raise ProfileError(f"Unknown PCSState field {signal!r}")
+        read = lambda state, ctx: getattr(getattr(state, section), attr)  # noqa: E731
+    else:
+        known = ", ".join(list(SIGNALS) + list(STEP_SIGNALS))
+        raise ProfileError(f"Unknown signal {signal!r} (known: {known}, or section.field)")
+    return Condition(signal, op, value, read)
+
+
+def _parse_mode(value: Any) -> WorkingMode:
+    if isinstance(value, int):
+        return WorkingMode(value)
+    text = str(value)
+    if text.lower() in MODE_ALIASES:
+        return MODE_ALIASES[text.lower()]
+    if text.upper() in WorkingMode.__members__:
+        return WorkingMode[text.upper()]
+    return WorkingMode(int(text, 0))
+
+
+def _parse_step(raw: Dict[str, Any], index: int) -> Step:
+    name = raw.get("name") or f"step {index}"
+    mode = None
+    if raw.get("mode") is not None:
+        try:
+            mode = _parse_mode(raw["mode"])
+        except (ValueError, KeyError):
+            raise ProfileError(f"{name}: unknown mode {raw['mode']!r}") from None
+    params = [float(p) for p in raw.get("params", [])]
+    if mode is None:
+        if params:
+            raise ProfileError(f"{name}: params given without a mode")
+    else:
+        limit = len(MODE_PARAMS.get(mode, ()))
+        if len(params) > limit:
+            if limit == 0:
+                raise ProfileError(f"{name}: {mode.name} takes no params")
+            raise ProfileError(f"{name}: {mode.name} takes at most {limit} params")
+    until = [parse_condition(c) for c in raw.get("until", [])]
+    if not until:
+        raise ProfileError(f"{name}: needs at least one 'until' condition")
+    return Step(name, mode, params, until)
+
+
+def parse_profile(data: Dict[str, Any]) -> Profile:
+    """Build a Profile from its decoded JSON form (see module docstring)."""
+    steps = data.get("steps")
+    if not steps:
+        raise ProfileError("Profile has no steps")
+    repeat = int(data.get("repeat", 1))
+    if repeat < 1:
+        raise ProfileError("repeat must be at least 1")
+    return Profile(
+        name=data.get("name", "profile"),
+        steps=[_parse_step(raw, i) for i, raw in enumerate(steps, 1)],
+        repeat=repeat,
+        abort=[parse_condition(c) for c in data.get("abort", [])],
+    )
+
+
+def load_profile(path: str) -> Profile:
+    """Load and validate a JSON profile file."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ProfileError(f"{path}: {e}") from None
+    return parse_profile(data)
+
+
+class ProfileRunner:
+    """Executes a Profile on a PCSController."""
+
+    def __init__(self, ctrl, profile: Profile, step_log: Optional[str] = None):
+        """
+        Args:
+            ctrl: A started PCSController.
+            profile: Steps to run.
+            step_log: Optional CSV file with one row per executed step.
+        """
+        self.ctrl = ctrl
+        self.profile = profile
+        self.step_log = step_log
+        self.records: List[StepRecord] = []
+        self.aborted: Optional[str] = None
+        self.counter = CoulombCounter(sa=ctrl.config.pcs_addr)
+        ctrl.add_frame_callback(self.counter.on_frame, unfiltered=True)
+        self._stop = threading.Event()
+        self._mode: Optional[WorkingMode] = None
+        self._output_on = False
+
+    def stop(self) -> None:
+        """End the current step and the run (safe from a signal handler)."""
+        self._stop.set()
+
+    def _command(self, ok: bool, step: Step, what: str) -> None:
+        if not ok:
+            raise ProfileError(f"{step.name}: {what} failed - PCS did not acknowledge")
+
+    def _apply(self, step: Step) -> bool:
+        """Send the commands that put the PCS into the step's mode.
+
+        Returns:
+            Whether any command was sent.
+        """
+        ctrl = self.ctrl
+        if step.mode is None:
+            if self._output_on:
+                self._command(ctrl.disable(), step, "disable")
+                self._output_on = False
+                return True
+            return False
+        if step.mode != self._mode:
+            # The PCS only accepts a mode change while stopped
+            if self._output_on:
+                self._command(ctrl.disable(), step, "disable")
+                self._output_on = False
+            self._command(ctrl.set_working_mode(step.mode), step, "set_working_mode")
+            self._mode = step.mode
+        if step.params:
+            self._command(ctrl.set_mode_parameters(step.mode, step.params), step, "set_mode_parameters")
+        if not self._output_on:
+            # Never clear faults on a battery behind the operator's back
+            self._command(ctrl.enable(clear_faults=False), step, "enable")
+            self._output_on = True
+        return True
+
+    def _device(self):
+        return self.ctrl.device_states.get(self.ctrl.config.pcs_addr)
+
+    def _wait(self, step: Step, ctx: _StepContext, fresh: Optional[_FreshTelemetry]) -> str:
+        """Block until a condition of ``step`` or an abort condition holds.
+
+        Telemetry conditions of ``step`` wait for ``fresh`` (None: no commands
+        were sent, the current telemetry already belongs to this step).
+        """
+        abort, until = self.profile.abort, step.until
+        hit: List[str] = []
+
+        def check() -> bool:
+            # Runs under the controller lock after every received batch
+            device = self._device()
+            settled = device is not None and (fresh is None or fresh.check(device))
+            for cond in abort:
+                if cond.telemetry and device is None:
+                    continue   # no frame from the PCS yet
+                ok, value = cond.check(device, ctx)
+                if ok:
+                    hit.append(f"abort: {cond} ({value:g})")
+                    return True
+            for cond in until:
+                if cond.telemetry and not settled:
+                    continue
+                ok, value = cond.check(device, ctx)
+                if ok:
+                    hit.append(f"{cond} ({value:g})")
+                    return True
+            return self._stop.is_set()
+
+        # Time conditions need a wakeup even if no frame arrives at that moment
+        deadlines = [c.value for c in until if c.signal == "time" and c.op in (">", ">=")]
+        while True:
+            timeout = 1.0
+            if deadlines:
+                timeout = max(0.0, min(timeout, min(deadlines) - ctx.time))
+            if self.ctrl.wait_until(check, timeout) or self._stop.is_set():
+                return hit[0] if hit else "stopped"
+            if not self.ctrl.running:
+                raise ProfileError(f"{step.name}: controller stopped")
+
+    def _run_step(self, cycle: int, index: int, step: Step) -> StepRecord:
+        from dcdc_app.protocol import PCSState
+
+        started = time.time()
+        sent = self._apply(step)
+        ctx = _StepContext(self.counter)
+        fresh = _FreshTelemetry(self._device(), active=step.mode is not None) if sent else None
+        reason = self._wait(step, ctx, fresh)
+        duration = ctx.time
+        ah, wh = ctx.ah, ctx.wh
+        s = self._device() or PCSState()
+        return StepRecord(
+            cycle=cycle, step=index, name=step.name,
+            mode=step.mode.name if step.mode is not None else "REST",
+            started=started, duration_s=duration, reason=reason, ah=ah, wh=wh,
+            voltage=SIGNALS["voltage"](s), current=SIGNALS["current"](s),
+        )
+
+    def run(self) -> List[StepRecord]:
+        """Run every step ``repeat`` times; returns the executed step records.
+
+        Ends early on an abort condition (``aborted`` is set) or stop().
+        The output is switched off when the run ends for any reason.
+
+        Raises:
+            ProfileError: If the PCS rejects a command.
+        """
+        profile = self.profile
+        total = len(profile.steps)
+        log_file = open(self.step_log, "w", newline="", encoding="utf-8") if self.step_log else None
+        writer = csv.writer(log_file) if log_file else None
+        if writer:
+            writer.writerow(STEP_LOG_FIELDS)
+        logger.info("Profile '%s': %d steps x %d", profile.name, total, profile.repeat)
+        try:
+            for cycle in range(1, profile.repeat + 1):
+                for index, step in enumerate(profile.steps, 1):
+                    rec = self._run_step(cycle, index, step)
+                    self.records.append(rec)
+                    logger.info(
+                        "Cycle %d step %d/%d '%s' ended after %.1f s: %s (%.3f Ah, %.1f Wh)",
+                        cycle, index, total, step.name, rec.duration_s, rec.reason, rec.ah, rec.wh,
+                    )
+                    if writer:
+                        writer.writerow([
+                            rec.cycle, rec.step, rec.name, rec.mode,
+                            time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(rec.started))
+                            + f".{int(rec.started % 1 * 1000):03d}",
+                            f"{rec.duration_s:.3f}", rec.reason, f"{rec.ah:.4f}", f"{rec.wh:.2f}",
+                            f"{rec.voltage:.3f}", f"{rec.current:.3f}",
+                        ])
+                        log_file.flush()
+                    if rec.reason.startswith("abort"):
+                        self.aborted = rec.reason
+                        logger.warning("Profile aborted: %s", rec.reason)
+                        return self.records
+                    if rec.reason == "stopped":
+                        return self.records
+            return self.records
+        finally:
+            if self._output_on or self._mode is not None:
+                if not self.ctrl.disable():
+                    logger.error("Could not switch the PCS off after the profile")
+                self._output_on = False
+            if log_file:
+                log_file.close()
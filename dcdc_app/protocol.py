@@ -24,22 +24,26 @@ Data encoding: Big-endian (high byte first) for all multi-byte fields.
 from __future__ import annotations
 
 import struct
-from dataclasses import dataclass, field
-from enum import IntEnum
+from dataclasses import dataclass, field, fields
 from typing import Any, Dict, List, Optional, Tuple
 
-
-# ---------------------------------------------------------------------------
-# Constants
-# ---------------------------------------------------------------------------
-
-CAN_BITRATE = 250_000  # 250 kbps
-CAN_PRIORITY = 6
-CONTROLLER_ADDR = 0xB4  # "Other devices" (our address)
-PCS_DEFAULT_ADDR = 0xFA  # PCS default CAN address
-BROADCAST_ADDR = 0x00
-HEARTBEAT_INTERVAL_MS = 200  # Frame 26 must be sent every 200ms
-CAN_TIMEOUT_S = 5  # PCS reports fault after 5s without RX
+# Constants, working modes, running states and fault codes live in
+# constants.py (importable without the frame codecs) and are re-exported here.
+from dcdc_app.constants import (  # noqa: F401
+    ACTIVE_STATES,
+    BROADCAST_ADDR,
+    CAN_BITRATE,
+    CAN_PRIORITY,
+    CAN_TIMEOUT_S,
+    CONTROLLER_ADDR,
+    FAULT_CODES,
+    HEARTBEAT_INTERVAL_MS,
+    MODE_PARAMS,
+    PCS_DEFAULT_ADDR,
+    RunningState,
+    WorkingMode,
+    fault_description,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -83,169 +87,6 @@ def make_rx_id(pf: int, pcs_addr: int = PCS_DEFAULT_ADDR) -> int:
     return build_can_id(pf, CONTROLLER_ADDR, pcs_addr)
 
 
-# ---------------------------------------------------------------------------
-# Working modes (Appendix 1)
-# ---------------------------------------------------------------------------
-
-class WorkingMode(IntEnum):
-    DC_CONSTANT_VOLTAGE = 0x02
-    DC_CONSTANT_VOLTAGE_CURRENT_LIMITING = 0x08
-    DC_CONSTANT_CURRENT = 0x21
-    DC_CONSTANT_POWER = 0x22
-    DC_CONSTANT_RESISTANCE = 0x23
-    DC_RAMP_CURRENT = 0x24
-    DC_RAMP_POWER = 0x25
-    DC_CONSTANT_MAGNIFICATION = 0x26
-    DC_RAMP_VOLTAGE = 0x27
-    DC_PULSE_CURRENT = 0x28
-    DC_CC_CV = 0x29
-    DC_PULSE_RESISTANCE = 0x2A
-    DC_PULSE_POWER = 0x2B
-    DC_INTERNAL_RESISTANCE_TEST = 0x2C
-    AC_CONSTANT_POWER = 0x40
-    INDEPENDENT_INVERTER = 0x41
-    DC_PULSE_VOLTAGE = 0x61
-    IDLE = 0x91
-    STANDBY = 0x94
-
-
-# Parameter descriptions per mode: (name, unit, resolution) for params 1-4
-MODE_PARAMS: Dict[int, List[Tuple[str, str, float]]] = {
-    0x02: [("voltage_setpoint", "V", 0.001)],
-    0x08: [
-        ("voltage_setpoint", "V", 0.001),
-        ("max_charge_current", "A", 0.001),
-        ("max_discharge_current", "A", 0.001),
-    ],
-    0x21: [("current_setpoint", "A", 0.001)],
-    0x22: [("power_setpoint", "W", 0.001)],
-    0x23: [("resistance_setpoint", "ohm", 0.001)],
-    0x24: [
-        ("start_current", "A", 0.001),
-        ("end_current", "A", 0.001),
-        ("cycle_time", "s", 0.001),
-    ],
-    0x25: [
-        ("start_power", "W", 0.001),
-        ("end_power", "W", 0.001),
-        ("cycle_time", "s", 0.001),
-    ],
-    0x26: [("magnification", "", 0.001)],
-    0x27: [
-        ("start_voltage", "V", 0.001),
-        ("end_voltage", "V", 0.001),
-        ("cycle_time", "s", 0.001),
-    ],
-    0x28: [
-        ("current_1", "A", 0.001),
-        ("current_2", "A", 0.001),
-        ("cycle_time", "s", 0.01),
-        ("duty_cycle", "%", 0.01),
-    ],
-    0x29: [
-        ("voltage_setpoint", "V", 0.001),
-        ("current_setpoint", "A", 0.001),
-        ("end_current", "A", 0.001),
-    ],
-    0x2A: [
-        ("resistance_1", "ohm", 0.001),
-        ("resistance_2", "ohm", 0.001),
-        ("cycle_time", "s", 0.01),
-        ("duty_cycle", "%", 0.01),
-    ],
-    0x2B: [
-        ("power_1", "W", 0.001),
-        ("power_2", "W", 0.001),
-        ("cycle_time", "s", 0.01),
-        ("duty_cycle", "%", 0.01),
-    ],
-    0x2C: [
-        ("current_setpoint", "A", 0.001),
-        ("time_1", "s", 0.001),
-        ("time_2", "s", 0.001),
-        ("time_3", "s", 0.001),
-    ],
-    0x40: [
-        ("active_power", "W", 0.001),
-        ("reactive_power", "Var", 0.001),
-    ],
-    0x41: [
-        ("inverter_voltage", "V", 0.001),
-        ("inverter_frequency", "Hz", 0.001),
-    ],
-    0x61: [
-        ("voltage_1", "V", 0.001),
-        ("voltage_2", "V", 0.001),
-        ("cycle_time", "s", 0.01),
-        ("duty_cycle", "%", 0.01),
-    ],
-    0x91: [],
-    0x94: [],
-}
-
-
-# ---------------------------------------------------------------------------
-# Running states (from frame 19 documentation)
-# ---------------------------------------------------------------------------
-
-class RunningState(IntEnum):
-    LONG_PAUSE = 1
-    SHORT_STOP = 2
-    LONG_IDLE = 3
-    SHORT_IDLE = 4
-    STOP = 5
-    FAULT = 6
-    AC_CONSTANT_POWER = 7
-    POWER_FAILURE = 8
-    SELF_CHECK = 9
-    SOFT_START = 10
-    CONSTANT_VOLTAGE = 11
-    CONSTANT_CURRENT = 12
-    STANDBY = 13
-    OFF_GRID_INVERTER = 14
-
-
-# ---------------------------------------------------------------------------
-# Fault codes (Appendix 2)
-# ---------------------------------------------------------------------------
-
-FAULT_CODES: Dict[int, str] = {
-    0x800D: "CAN1 equipment failure",
-    0x800E: "CAN2 equipment failure",
-    0x800F: "485-1 communication failure",
-    0x8010: "485-2 communication failure",
-    0x8011: "DSP soft start timeout",
-    0x8012: "Emergency stop button pressed",
-    0x8013: "Gun head temperature exceeds limit",
-    0x8014: "Detection point 1 voltage abnormality",
-    0x8015: "Network disconnection",
-    # Battery / DC side faults
-    1: "Battery voltage too high / over limit",
-    2: "Battery voltage low / over limit",
-    3: "Battery reverse connection",
-    4: "Current over limit",
-    5: "Overtemperature fault (>90C)",
-    6: "Soft start timeout (>10s)",
-    15: "Overcurrent count exceeds limit",
-    16: "Overvoltage count exceeds limit",
-    17: "Power limit exceeded",
-    18: "Emergency stop button pressed",
-    26: "Slave failure",
-    # AC / grid side faults
-    257: "High grid voltage fault (>264V)",
-    258: "Low grid voltage fault (<176V)",
-    265: "Input voltage negative phase sequence",
-    280: "Radiator temperature high fault (>90C)",
-}
-
-
-def fault_description(code: int) -> str:
-    """Return human-readable fault description for a code."""
-    if code == 0:
-        return "No fault"
-    return FAULT_CODES.get(code, f"Internal failure (code 0x{code:04X}) - contact factory")
-
-
 # ---------------------------------------------------------------------------
 # Data structures for decoded messages
 # ---------------------------------------------------------------------------
@@ -423,6 +264,21 @@ class PCSState:
     io_ad: IOAndAD = field(default_factory=IOAndAD)
 
 
+def state_fields() -> List[Tuple[str, str, type]]:
+    """Numeric PCSState fields as (section, field, type) in declaration order.
+
+    Non-numeric fields (e.g. PhasePower.phase) are skipped.
+    """
+    result = []
+    for section in fields(PCSState):
+        default = section.default_factory()
+        for f in fields(default):
+            value = getattr(default, f.name)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                result.append((section.name, f.name, type(value)))
+    return result
+
+
 # ---------------------------------------------------------------------------
 # Encoding helpers (controller -> PCS)
 # ---------------------------------------------------------------------------
@@ -957,8 +813,7 @@ def decode_rx_message(can_id: int, data: bytes) -> Tuple[Optional[str], Any]:
         Tuple of (pf_name_string, decoded_data_object).
         Returns (None, None) if PF is not recognized.
     """
-    fields = parse_can_id(can_id)
-    pf = fields["pf"]
+    pf = (can_id >> 16) & 0xFF  # parse_can_id()["pf"] without building the dict
 
     # Phase power frames
     if pf == 0x23:
@@ -983,6 +838,19 @@ def decode_rx_message(can_id: int, data: bytes) -> Tuple[Optional[str], Any]:
     return name, decoded
 
 
+# Periodic status PF code -> PCSState section it updates (sent every 200ms)
+STATE_PFS: Dict[int, str] = {
+    **{pf: state_field for pf, (_, state_field) in _RX_DECODERS.items() if state_field},
+    0x23: "phase_a_power",
+    0x24: "phase_b_power",
+    0x25: "phase_c_power",
+}
+
+# Status frames every PCS sends each cycle (DC, capacity/energy, state/fault,
+# grid V/I, system power): once all have arrived, PCSState is fully populated
+STATUS_CYCLE_PFS: Tuple[int, ...] = (0x11, 0x12, 0x13, 0x14, 0x15, 0x16)
+
+
 # PF code -> human readable name
 PF_NAMES: Dict[int, str] = {
     0x01: "ReadProtectionParams",
@@ -0,0 +1,296 @@
+"""Online rolling statistics for every numeric PCSState field.
+
+RollingStats is fed decoded frames from the RX pipeline and keeps, per source
+address and signal ("dc.current", "grid_voltage.u_voltage", ...), running
+aggregates over several windows (default: last minute, last hour, session):
+
+    count, min, max, mean, std, rms, integral
+
+``integral`` is the trapezoidal time integral of the signal in value-seconds
+(kW fields: divide by 3600 for kWh). Samples further apart than ``max_gap``
+are not integrated across.
+
+Each sliding window is a ring of sub-buckets (span / 60 wide). A sample
+updates the open bucket in O(1) (Welford); when a bucket closes it is merged
+into the window totals (Chan et al.) and pushed onto monotonic min/max deques,
+and buckets older than the span are subtracted again. Updates and queries are
+O(1) amortized and memory is bounded by the bucket count, independent of the
+frame rate. Window edges therefore move in bucket-sized steps.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from dcdc_app.protocol import state_fields
+
+DEFAULT_WINDOWS: Tuple[Tuple[str, float], ...] = (("1m", 60.0), ("1h", 3600.0))
+SESSION = "session"
+DEFAULT_WINDOW = "1m"   # used by the controller API, the daemon RPC and `status --stats`
+
+# section -> ((field, "section.field"), ...)
+_SECTION_FIELDS: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+for _section, _name, _ in state_fields():
+    _SECTION_FIELDS[_section] = _SECTION_FIELDS.get(_section, ()) + ((_name, f"{_section}.{_name}"),)
+SIGNALS: List[str] = [key for items in _SECTION_FIELDS.values() for _, key in items]
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """Aggregates of one signal over one window."""
+    count: int = 0
+    min: float = math.nan
+    max: float = math.nan
+    mean: float = math.nan
+    std: float = math.nan     # population standard deviation
+    rms: float = math.nan
+    integral: float = 0.0     # value-seconds (trapezoidal)
+
+
+class _Acc:
+    """Welford accumulator with min/max and integral; mergeable (Chan)."""
+    __slots__ = ("n", "mean", "m2", "min", "max", "area", "end")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.area = 0.0
+        self.end = 0.0
+
+    def add(self, x: float, area: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        self.area += area
+
+    def merge(self, other: _Acc) -> None:
+        if other.n == 0:
+            self.area += other.area
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.area += other.area
+
+    def unmerge(self, other: _Acc) -> None:
+        self.area -= other.area
+        n = self.n - other.n
+        if n <= 0:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = (self.n * self.mean - other.n * other.mean) / n
+        delta = other.mean - mean
+        self.m2 = max(0.0, self.m2 - other.m2 - delta * delta * n * other.n / self.n)
+        self.n, self.mean = n, mean
+
+    def stats(self, lo: float, hi: float) -> WindowStats:
+        if self.n == 0:
+            return WindowStats(integral=self.area)
+        var = self.m2 / self.n
+        return WindowStats(
+            count=self.n,
+            min=lo,
+            max=hi,
+            mean=self.mean,
+            std=math.sqrt(var),
+            rms=math.sqrt(var + self.mean * self.mean),
+            integral=self.area,
+        )
+
+
+class RollingWindow:
+    """Time-based sliding window built from closed sub-buckets."""
+
+    def __init__(self, span: float, buckets: int = 60):
+        self.span = span
+        self.width = span / buckets
+        self._open = _Acc()
+        self._open_end = -math.inf
+        self._closed: Deque[_Acc] = deque()
+        self._total = _Acc()
+        self._mins: Deque[Tuple[float, float]] = deque()   # (bucket end, min), increasing
+        self._maxs: Deque[Tuple[float, float]] = deque()   # (bucket end, max), decreasing
+
+    def add(self, t: float, x: float, area: float = 0.0) -> None:
+        if t >= self._open_end:
+            self._roll(t)
+        self._open.add(x, area)
+
+    def _roll(self, t: float) -> None:
+        acc = self._open
+        if acc.n:
+            acc.end = self._open_end
+            self._closed.append(acc)
+            self._total.merge(acc)
+            mins, maxs = self._mins, self._maxs
+            while mins and mins[-1][1] >= acc.min:
+                mins.pop()
+            mins.append((acc.end, acc.min))
+            while maxs and maxs[-1][1] <= acc.max:
+                maxs.pop()
+            maxs.append((acc.end, acc.max))
+        self._open = _Acc()
+        self._open_end = (math.floor(t / self.width) + 1) * self.width
+        self._expire(t)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.span
+        closed = self._closed
+        while closed and closed[0].end <= cutoff:
+            self._total.unmerge(closed.popleft())
+        while self._mins and self._mins[0][0] <= cutoff:
+            self._mins.popleft()
+        while self._maxs and self._maxs[0][0] <= cutoff:
+            self._maxs.popleft()
+
+    def stats(self, now: Optional[float] = None) -> WindowStats:
+        """Aggregates over the window ending at ``now`` (default: last sample)."""
+        if now is not None:
+            if now >= self._open_end:
+                self._roll(now)
+            else:
+                self._expire(now)
+        acc = _Acc()
+        acc.merge(self._total)
+        acc.merge(self._open)
+        lo = min(self._mins[0][1] if self._mins else math.inf, self._open.min)
+        hi = max(self._maxs[0][1] if self._maxs else -math.inf, self._open.max)
+        return acc.stats(lo, hi)
+
+
+class _Signal:
+    __slots__ = ("windows", "session", "last_t", "last_x")
+
+    def __init__(self, spans: List[float]):
+        self.windows = [RollingWindow(span) for span in spans]
+        self.session = _Acc()
+        self.last_t: Optional[float] = None
+        self.last_x = 0.0
+
+
+class RollingStats:
+    """Per-device, per-signal rolling statistics fed from decoded frames."""
+
+    def __init__(
+        self,
+        windows: Tuple[Tuple[str, float], ...] = DEFAULT_WINDOWS,
+        max_gap: float = 1.0,
+    ):
+        """Initialize the engine.
+
+        Args:
+            windows: (name, span seconds) of the sliding windows; the unbounded
+                "session" window is always kept as well.
+            max_gap: Longest sample spacing (seconds) integrated across.
+        """
+        self.window_names = [name for name, _ in windows] + [SESSION]
+        self._spans = [span for _, span in windows]
+        self.max_gap = max_gap
+        self._signals: Dict[Tuple[int, str], _Signal] = {}
+        self._lock = threading.Lock()
+
+    def update(self, sa: int, name: str, decoded: Any, timestamp: float) -> None:
+        """Add every numeric field of a decoded status frame."""
+        items = _SECTION_FIELDS.get(name)
+        if items is None:
+            return
+        signals = self._signals
+        with self._lock:
+            for attr, key in items:
+                x = getattr(decoded, attr)
+                sig = signals.get((sa, key))
+                if sig is None:
+                    sig = signals[(sa, key)] = _Signal(self._spans)
+                area = 0.0
+                if sig.last_t is not None:
+                    dt = timestamp - sig.last_t
+                    if 0.0 < dt <= self.max_gap:
+                        area = 0.5 * (x + sig.last_x) * dt
+                sig.last_t, sig.last_x = timestamp, x
+                for win in sig.windows:
+                    win.add(timestamp, x, area)
+                sig.session.add(x, area)
+
+    def on_frame(self, sa: int, pf: int, name: str, decoded: Any, timestamp: float) -> None:
+        """PCSController frame-callback adapter."""
+        self.update(sa, name, decoded, timestamp)
+
+    def get(
+        self,
+        signal: str,
+        window: str = DEFAULT_WINDOW,
+        sa: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> WindowStats:
+        """Statistics of one signal ("section.field") over a named window.
+
+        Args:
+            sa: Source address (default: the first device seen).
+            now: Window end for the sliding windows (default: latest sample).
+
+        Raises:
+            KeyError: If ``window`` is not configured.
+        """
+        if window not in self.window_names:
+            raise KeyError(f"Unknown window '{window}' (have {', '.join(self.window_names)})")
+        with self._lock:
+            sig = self._signals.get((self._default_sa() if sa is None else sa, signal))
+            if sig is None:
+                return WindowStats()
+            if window == SESSION:
+                s = sig.session
+                return s.stats(s.min, s.max)
+            return sig.windows[self.window_names.index(window)].stats(now)
+
+    def snapshot(
+        self,
+        window: str = DEFAULT_WINDOW,
+        sa: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, WindowStats]:
+        """Statistics of every signal seen, keyed by "section.field"."""
+        with self._lock:
+            sa = self._default_sa() if sa is None else sa
+            keys = [key for (addr, key) in self._signals if addr == sa]
+        return {key: self.get(key, window, sa, now) for key in keys}
+
+    def addresses(self) -> List[int]:
+        """Source addresses with statistics."""
+        with self._lock:
+            return sorted({sa for sa, _ in self._signals})
+
+    def reset(self) -> None:
+        """Drop all statistics (starts a new session)."""
+        with self._lock:
+            self._signals.clear()
+
+    def _default_sa(self) -> Optional[int]:
+        return next(iter(self._signals))[0] if self._signals else None
+
+
+def format_stats(stats: Dict[str, WindowStats], signals: Optional[List[str]] = None) -> str:
+    """Plain-text table of WindowStats keyed by signal."""
+    lines = [f"  {'Signal':<34} {'n':>6} {'min':>10} {'max':>10} {'mean':>10} {'std':>9} {'rms':>10}"]
+    for key in signals or list(stats):
+        st = stats.get(key)
+        if st is None or st.count == 0:
+            continue
+        lines.append(
+            f"  {key:<34} {st.count:>6d} {st.min:>10.2f} {st.max:>10.2f} "
+            f"{st.mean:>10.2f} {st.std:>9.3f} {st.rms:>10.2f}"
+        )
+    return "\n".join(lines)
@@ -54,6 +54,7 @@ class SimulatedPCS:
         self.working_mode = WorkingMode.IDLE
         self.fault_code = 0
         self.started = False
+        self.answer_commands = True   # False: ignore commands (a PCS that stopped replying)
 
         # Simulated measurements
         self.dc_voltage = 400.0   # V
@@ -190,6 +191,8 @@ class SimulatedPCS:
 
     def _handle_command(self, pf: int, data: bytes) -> None:
         """Handle an incoming command frame from the controller."""
+        if not self.answer_commands:
+            return
         if pf == 0x01:
             # Read protection params
             param_type = data[0]
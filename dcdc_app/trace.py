@@ -0,0 +1,256 @@
+"""Low-overhead, fixed-memory ring buffer of raw CAN frames.
+
+CANInterface records every frame it sends and receives here instead of
+formatting a debug log line per frame. The ring is a set of preallocated
+arrays (timestamp, CAN ID, direction/DLC, 8 data bytes: 21 bytes per frame),
+so memory use is fixed at construction and recording is a handful of slot
+stores. PF names, hex dumps and decoded values are produced only when the
+trace is read.
+
+The trace is the buffer behind the flight recorder (``flight_recorder.py``),
+which dumps the last N seconds on faults, command timeouts or operator
+request, and can be dumped directly with ``PCSController.dump_trace``.
+
+Dump formats, chosen by extension:
+  .csv / other  FrameLogger CSV layout (readable by replay, integrate, export)
+  .jsonl        FrameLogger JSONL layout
+  .bin          compact binary: a 16-byte header (magic, version, count)
+                followed by 22-byte little-endian records
+                (f64 timestamp, u32 CAN ID, u8 flags, u8 DLC, 8 data bytes);
+                ``iter_frame_log`` reads these too
+"""
+
+from __future__ import annotations
+
+import csv
+import itertools
+import logging
+import struct
+import threading
+import time
+from array import array
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+from dcdc_app.logging_utils import CSV_HEADER, FrameRecord
+from dcdc_app.protocol import PF_NAMES, decode_rx_message
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_SIZE = 16384   # ~340 KiB; several minutes at the normal PCS frame rate
+
+_TX_FLAG = 0x80
+
+BINARY_MAGIC = b"PCSTRACE"
+BINARY_VERSION = 1
+_BIN_HEADER = struct.Struct("<8sII")        # magic, version, record count
+_BIN_RECORD = struct.Struct("<dIBB8s")      # timestamp, can_id, flags, dlc, data
+
+
+class TraceRecord(NamedTuple):
+    """One raw frame as captured on the TX/RX path."""
+    timestamp: float
+    direction: str   # "TX" or "RX"
+    can_id: int
+    data: bytes
+
+
+class FrameTrace:
+    """Fixed-size ring of the most recent frames (oldest overwritten first)."""
+
+    def __init__(self, capacity: int = DEFAULT_TRACE_SIZE):
+        """Initialize the trace.
+
+        Args:
+            capacity: Number of frames kept.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._ids = array("I", [0]) * capacity
+        self._meta = bytearray(capacity)        # TX flag | DLC
+        self._data = bytearray(8 * capacity)
+        self._seq = itertools.count()           # slot claims (next() is atomic)
+        self._count = 0                         # frames recorded since creation/clear
+        self._lock = threading.Lock()           # count publication, snapshot, clear
+
+    def record(self, timestamp: float, direction: str, can_id: int, data: bytes) -> None:
+        """Capture a frame.
+
+        Each call claims its own slot from an atomic counter and writes it
+        without locking; only publishing the count takes the lock, and the
+        count never moves backwards when the TX and RX threads finish out of
+        order. A snapshot taken while one thread is still writing a lower slot
+        than another has already published may hold that slot's previous or
+        partly written contents.
+        """
+        seq = self._seq
+        k = next(seq)
+        i = k % self.capacity
+        n = len(data)
+        if n > 8:
+            data, n = data[:8], 8
+        self._ts[i] = timestamp
+        self._ids[i] = can_id
+        self._meta[i] = (_TX_FLAG if direction == "TX" else 0) | n
+        o = i * 8
+        self._data[o:o + n] = data
+        with self._lock:
+            if k >= self._count and seq is self._seq:   # not cleared meanwhile
+                self._count = k + 1
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Frames recorded since creation, including those already overwritten."""
+        return self._count
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the preallocated buffers."""
+        return (self._ts.itemsize + self._ids.itemsize + 1 + 8) * self.capacity
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seq = itertools.count()
+            self._count = 0
+
+    def snapshot(self) -> tuple:
+        """Raw copy of the ring (cheap: four buffer copies, no per-frame work)."""
+        with self._lock:
+            return (self._count, self._ts[:], self._ids[:], bytes(self._meta), bytes(self._data))
+
+    def records(self, last: Optional[int] = None, seconds: Optional[float] = None,
+                now: Optional[float] = None, snapshot: Optional[tuple] = None) -> List[TraceRecord]:
+        """Copy of the buffered frames, oldest first.
+
+        Args:
+            last: Only the most recent ``last`` frames (None = all).
+            seconds: Only frames newer than ``now - seconds``.
+            now: Reference time for ``seconds`` (default: time.time()).
+            snapshot: Decode this earlier snapshot() instead of the live ring.
+        """
+        count, ts, ids, meta, data = snapshot or self.snapshot()
+        n = min(count, self.capacity)
+        if last is not None:
+            n = min(n, max(0, last))
+        start = count - n
+        cutoff = None if seconds is None else (time.time() if now is None else now) - seconds
+        out = []
+        cap = self.capacity
+        for k in range(start, count):
+            i = k % cap
+            t = ts[i]
+            if cutoff is not None and t < cutoff:
+                continue
+            m = meta[i]
+            o = i * 8
+            out.append(TraceRecord(t, "TX" if m & _TX_FLAG else "RX", ids[i],
+                                   data[o:o + (m & 0x0F)]))
+        return out
+
+    def format(self, last: Optional[int] = None) -> Iterator[str]:
+        """Yield one human-readable line per frame, decoding as it goes."""
+        yield from format_records(self.records(last))
+
+    def dump(self, path: str, last: Optional[int] = None, seconds: Optional[float] = None) -> int:
+        """Write the buffered frames to ``path`` (see write_records)."""
+        return write_records(path, self.records(last, seconds))
+
+
+def format_records(records: List[TraceRecord]) -> Iterator[str]:
+    """Yield one human-readable line per frame, with the decoded payload."""
+    for rec in records:
+        pf = (rec.can_id >> 16) & 0xFF
+        dt = datetime.fromtimestamp(rec.timestamp).strftime("%H:%M:%S.%f")
+        line = (
+            f"[{dt}] {rec.direction}  ID=0x{rec.can_id:08X}  "
+            f"PF={PF_NAMES.get(pf, f'Unknown_0x{pf:02X}'):<25s}  Data={bytes(rec.data).hex(' ')}"
+        )
+        if rec.direction == "RX":
+            try:
+                _, decoded = decode_rx_message(rec.can_id, bytes(rec.data))
+            except Exception:
+                decoded = None
+            if decoded is not None:
+                line += f"  | {decoded}"
+        yield line
+
+
+def write_records(path: str, records: List[TraceRecord]) -> int:
+    """Write frames as binary (``.bin``), JSONL (``.jsonl``) or FrameLogger CSV.
+
+    Returns:
+        Number of frames written.
+    """
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    suffix = out.suffix.lower()
+    if suffix == ".bin":
+        with open(out, "wb") as f:
+            f.write(_BIN_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(records)))
+            pack = _BIN_RECORD.pack
+            f.write(b"".join(
+                pack(r.timestamp, r.can_id, _TX_FLAG if r.direction == "TX" else 0,
+                     len(r.data), bytes(r.data))
+                for r in records
+            ))
+        return len(records)
+
+    jsonl = suffix == ".jsonl"
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        writer = None if jsonl else csv.writer(f)
+        if writer:
+            writer.writerow(CSV_HEADER)
+        for rec in records:
+            pf = (rec.can_id >> 16) & 0xFF
+            data = bytes(rec.data)
+            decoded = None
+            if rec.direction == "RX":
+                try:
+                    _, obj = decode_rx_message(rec.can_id, data)
+                except Exception:
+                    obj = None
+                if hasattr(obj, "__dataclass_fields__"):
+                    decoded = asdict(obj)
+            row = FrameRecord(
+                timestamp=rec.timestamp,
+                direction=rec.direction,
+                can_id=rec.can_id,
+                dlc=len(data),
+                data_hex=data.hex(" "),
+                pf=pf,
+                pf_name=PF_NAMES.get(pf, f"Unknown_0x{pf:02X}"),
+                decoded=decoded,
+            )
+            if writer:
+                writer.writerow(row.to_csv_row())
+            else:
+                f.write(row.to_jsonl() + "\n")
+    return len(records)
+
+
+def read_binary(path: str) -> Iterator[TraceRecord]:
+    """Read frames back from a ``.bin`` dump written by write_records."""
+    with open(path, "rb") as f:
+        header = f.read(_BIN_HEADER.size)
+        if len(header) < _BIN_HEADER.size:
+            raise ValueError(f"{path}: truncated trace header")
+        magic, version, count = _BIN_HEADER.unpack(header)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"{path}: not a version {BINARY_VERSION} binary frame trace")
+        body = f.read(count * _BIN_RECORD.size)
+    for ts, can_id, flags, dlc, data in _BIN_RECORD.iter_unpack(
+        body[:len(body) - len(body) % _BIN_RECORD.size]
+    ):
+        yield TraceRecord(ts, "TX" if flags & _TX_FLAG else "RX", can_id, data[:dlc])
+
+
+def default_dump_name(reason: str, ext: str = "csv") -> str:
+    """File name for an automatic dump, e.g. ``trace-20240115-123045-fault_800D.csv``."""
+    return f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{reason}.{ext}"
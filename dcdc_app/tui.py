@@ -0,0 +1,301 @@
+"""Full-screen terminal dashboard for ``monitor --tui``.
+
+Renders a fixed layout of PCSState fields, one column per device, on a
+timer instead of per frame. Each refresh formats the current state into a
+grid of cells and writes only the cells whose text or style changed since
+the previous refresh (ANSI cursor positioning, no curses dependency), so the
+CPU time and terminal bandwidth depend on the refresh rate and on how much
+of the screen actually changed, not on the bus frame rate.
+
+Log records are shown in an events area at the bottom while the dashboard
+owns the screen, instead of being written to stderr across the layout.
+
+Example:
+    dash = Dashboard(ctrl, refresh_hz=4.0)
+    dash.run(lambda: stop_requested)
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import os
+import shutil
+import sys
+import time
+from typing import Callable, Deque, Dict, List, Optional, TextIO, Tuple
+
+from dcdc_app.constants import ACTIVE_STATES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_HZ = 4.0
+LABEL_WIDTH = 16
+COLUMN_WIDTH = 24
+EVENT_LINES = 5
+
+# ANSI sequences
+CSI = "\x1b["
+RESET = CSI + "0m"
+BOLD = CSI + "1m"
+DIM = CSI + "2m"
+RED = CSI + "31;1m"
+GREEN = CSI + "32m"
+YELLOW = CSI + "33m"
+CLEAR = CSI + "2J"
+ALT_SCREEN_ON = CSI + "?1049h" + CSI + "?25l"
+ALT_SCREEN_OFF = CSI + "?25h" + CSI + "?1049l"
+
+# (label, PCSState section, format) - None section is a spacer row
+LAYOUT: List[Tuple[str, Optional[str], str]] = [
+    ("Running State", "status", "{0.state_name}"),
+    ("Fault", "status", "0x{0.fault_code:04X} {0.fault_description}"),
+    ("", None, ""),
+    ("DC Voltage", "dc", "{0.voltage:.1f} V"),
+    ("DC Current", "dc", "{0.current:.1f} A"),
+    ("DC Power", "dc", "{0.power:.1f} kW"),
+    ("Hi-Res DC V", "dc_hires", "{0.voltage:.3f} V"),
+    ("Hi-Res DC I", "dc_hires", "{0.current:.3f} A"),
+    ("Inlet Temp", "dc", "{0.inlet_temperature:.1f} °C"),
+    ("Outlet Temp", "capacity_energy", "{0.outlet_temperature:.1f} °C"),
+    ("", None, ""),
+    ("Grid U/V/W", "grid_voltage", "{0.u_voltage:.1f}/{0.v_voltage:.1f}/{0.w_voltage:.1f} V"),
+    ("Grid I U/V/W", "grid_current", "{0.u_current:.1f}/{0.v_current:.1f}/{0.w_current:.1f} A"),
+    ("Power Factor", "grid_current", "{0.power_factor:.2f}"),
+    ("Frequency", "system_power", "{0.frequency:.1f} Hz"),
+    ("", None, ""),
+    ("Active Power", "system_power", "{0.active_power:.1f} kW"),
+    ("Reactive Power", "system_power", "{0.reactive_power:.1f} kVar"),
+    ("Apparent Power", "system_power", "{0.apparent_power:.1f} kVA"),
+    ("Capacity", "capacity_energy", "{0.capacity:.1f} Ah"),
+    ("Energy", "capacity_energy", "{0.energy:.1f} Wh"),
+]
+
+Cell = Tuple[str, str]   # (padded text, style prefix)
+
+
+class Screen:
+    """Cell buffer that writes only what changed since the last flush."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self._shown: Dict[Tuple[int, int], Cell] = {}
+        self._next: Dict[Tuple[int, int], Cell] = {}
+        self._full = True   # clear the screen on the next flush
+
+    def put(self, row: int, col: int, text: str, width: int, style: str = "") -> None:
+        """Place text at (row, col), clipped/padded to width (0-based)."""
+        self._next[(row, col)] = (text[:width].ljust(width), style)
+
+    def invalidate(self) -> None:
+        """Forget what is on screen so the next flush clears and redraws all."""
+        self._shown = {}
+        self._full = True
+
+    def flush(self) -> int:
+        """Write changed cells and blank cells no longer drawn.
+
+        Returns:
+            Characters written to the terminal.
+        """
+        parts: List[str] = []
+        if self._full:
+            parts.append(CLEAR)
+            self._full = False
+        shown = self._shown
+        for (row, col), cell in self._next.items():
+            if shown.get((row, col)) != cell:
+                text, style = cell
+                parts.append(f"{CSI}{row + 1};{col + 1}H")
+                parts.append(f"{style}{text}{RESET}" if style else text)
+        for (row, col), (text, _) in shown.items():
+            if (row, col) not in self._next:
+                parts.append(f"{CSI}{row + 1};{col + 1}H{' ' * len(text)}")
+        self._shown, self._next = self._next, {}
+        if not parts:
+            return 0
+        data = "".join(parts)
+        self.out.write(data)
+        self.out.flush()
+        return len(data)
+
+
+class _LogTail(logging.Handler):
+    """Keeps the last few log records for the dashboard's events area."""
+
+    def __init__(self, lines: int = EVENT_LINES):
+        super().__init__()
+        self.records: Deque[str] = collections.deque(maxlen=lines)
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(message)s", "%H:%M:%S"))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.records.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+def enable_vt_mode() -> bool:
+    """Turn on ANSI escape handling for the Windows console (no-op elsewhere)."""
+    if os.name != "nt":
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)   # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))   # VT processing
+    except Exception:
+        return False
+
+
+class Dashboard:
+    """Rate-limited full-screen view of every device's PCSState."""
+
+    def __init__(
+        self,
+        ctrl,
+        out: Optional[TextIO] = None,
+        refresh_hz: float = DEFAULT_REFRESH_HZ,
+        size: Optional[Tuple[int, int]] = None,
+    ):
+        """
+        Args:
+            ctrl: PCSController (or anything with device_states, bus_health,
+                config.pcs_addr and can.stats).
+            out: Terminal stream (default: sys.stdout).
+            refresh_hz: Screen refreshes per second.
+            size: Fixed (columns, lines); default follows the terminal size.
+        """
+        if refresh_hz <= 0:
+            raise ValueError("refresh_hz must be positive")
+        self.ctrl = ctrl
+        self.out = out or sys.stdout
+        self.period = 1.0 / refresh_hz
+        self._fixed_size = size
+        self._size: Optional[Tuple[int, int]] = None
+        self.screen = Screen(self.out)
+        self.events = _LogTail()
+        # Formatted text per (sa, row), reused while the section object is unchanged
+        self._cache: Dict[Tuple[int, int], Tuple[object, str]] = {}
+        self._last_rx: Optional[Tuple[float, int]] = None
+        self._rx_rate = 0.0
+        self.frames = 0
+        self.bytes_written = 0
+
+    def _terminal_size(self) -> Tuple[int, int]:
+        if self._fixed_size:
+            return self._fixed_size
+        size = shutil.get_terminal_size((80, 30))
+        return size.columns, size.lines
+
+    def _update_rx_rate(self, now: float) -> None:
+        rx = self.ctrl.can.stats["rx_count"]
+        if self._last_rx is not None:
+            t0, rx0 = self._last_rx
+            if now > t0:
+                self._rx_rate = (rx - rx0) / (now - t0)
+        self._last_rx = (now, rx)
+
+    def _value(self, sa: int, index: int, section: object, fmt: str) -> str:
+        # Decoded sections are replaced, never mutated, so identity means unchanged
+        cached = self._cache.get((sa, index))
+        if cached is not None and cached[0] is section:
+            return cached[1]
+        text = fmt.format(section)
+        self._cache[(sa, index)] = (section, text)
+        return text
+
+    def render(self, now: Optional[float] = None) -> int:
+        """Draw one refresh and return the characters written."""
+        now = time.monotonic() if now is None else now
+        cols, lines = self._terminal_size()
+        if (cols, lines) != self._size:
+            self._size = (cols, lines)
+            self.screen.invalidate()
+        self._update_rx_rate(now)
+
+        states = sorted(list(self.ctrl.device_states.items()))
+        fit = max(1, (cols - LABEL_WIDTH) // COLUMN_WIDTH)
+        shown, hidden = states[:fit], len(states) - fit
+        put = self.screen.put
+
+        header = (
+            f"YSTECH PCS monitor  {time.strftime('%H:%M:%S')}  "
+            f"RX {self._rx_rate:6.0f} fr/s  devices {len(states)}"
+            + (f" (+{hidden} not shown)" if hidden > 0 else "")
+        )
+        put(0, 0, header, cols, BOLD)
+
+        body_rows = max(0, lines - 3 - EVENT_LINES - 1)   # header, blank, device row, events
+        put(2, 0, "Device", LABEL_WIDTH, BOLD)
+        for row, (label, _, _) in enumerate(LAYOUT[:body_rows]):
+            put(3 + row, 0, label, LABEL_WIDTH)
+
+        pcs_addr = self.ctrl.config.pcs_addr
+        for n, (sa, state) in enumerate(shown):
+            col = LABEL_WIDTH + n * COLUMN_WIDTH
+            stale = self.ctrl.bus_health.stale_sections(sa)
+            marker = " *" if sa == pcs_addr else ""
+            put(2, col, f"0x{sa:02X}{marker}" + ("  STALE" if stale else ""),
+                COLUMN_WIDTH - 1, YELLOW if stale else BOLD)
+            for row, (label, name, fmt) in enumerate(LAYOUT[:body_rows]):
+                if name is None:
+                    continue
+                section = getattr(state, name)
+                style = DIM if name in stale else ""
+                if name == "status":
+                    if section.is_fault:
+                        style = RED
+                    elif not style and section.running_state in ACTIVE_STATES:
+                        style = GREEN
+                put(3 + row, col, self._value(sa, row, section, fmt), COLUMN_WIDTH - 1, style)
+        if not states:
+            put(3, LABEL_WIDTH, "waiting for status frames...", cols - LABEL_WIDTH, DIM)
+
+        top = lines - EVENT_LINES - 1
+        if top > 3:
+            put(top, 0, "Events (Ctrl+C to quit)", cols, BOLD)
+            for i, text in enumerate(list(self.events.records)):
+                put(top + 1 + i, 0, text, cols)
+
+        written = self.screen.flush()
+        self.frames += 1
+        self.bytes_written += written
+        return written
+
+    def run(self, should_stop: Callable[[], bool]) -> None:
+        """Own the terminal and refresh until should_stop() returns True.
+
+        Console log handlers on the root logger are swapped for the events
+        area while running and restored afterwards.
+        """
+        enable_vt_mode()
+        root = logging.getLogger()
+        console = [
+            h for h in root.handlers
+            if isinstance(h, logging.StreamHandler) and not isinstance(h, logging.FileHandler)
+        ]
+        for h in console:
+            root.removeHandler(h)
+        root.addHandler(self.events)
+        self.out.write(ALT_SCREEN_ON)
+        self.screen.invalidate()
+        try:
+            next_tick = time.monotonic()
+            while not should_stop():
+                self.render()
+                next_tick += self.period
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.monotonic()   # fell behind: don't burst to catch up
+        finally:
+            self.out.write(ALT_SCREEN_OFF)
+            self.out.flush()
+            root.removeHandler(self.events)
+            for h in console:
+                root.addHandler(h)
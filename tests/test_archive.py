@@ -0,0 +1,122 @@
+"""Tests for the SQLite telemetry archive."""
+
+import argparse
+import sqlite3
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.archive import (
+    TelemetryArchive,
+    parse_duration,
+    parse_time,
+    query_aggregate,
+    query_range,
+)
+from dcdc_app.export import COLUMN_NAMES, CycleAssembler, CycleWriter, open_writer
+from dcdc_app.protocol import DCData, StatusData
+
+
+def _fill(path, hours=3, per_hour=4, devices=(0xFA, 0xFB)):
+    with TelemetryArchive(path, batch_rows=5, flush_interval=0.05) as archive:
+        asm = CycleAssembler(archive.write_row)
+        for h in range(hours):
+            for k in range(per_hour):
+                t = h * 3600.0 + k * 600.0
+                for n, sa in enumerate(devices):
+                    asm.feed(sa, "dc", DCData(voltage=400.0 + n, inlet_temperature=20.0 + h * 10 + k), t)
+                    asm.feed(sa, "status", StatusData(running_state=13), t + 0.001)
+        asm.flush()
+    return archive
+
+
+class TestParsing:
+    def test_durations(self):
+        assert parse_duration("90") == 90.0
+        assert parse_duration("15m") == 900.0
+        assert parse_duration("1.5h") == 5400.0
+
+    def test_times(self):
+        assert parse_time("1700000000.5") == 1700000000.5
+        assert parse_time("1h", now=10000.0) == 6400.0
+        assert parse_time("-30s", now=100.0) == 70.0
+        assert parse_time("now", now=5.0) == 5.0
+
+
+class TestArchive:
+    def test_wal_and_clustered_schema(self, tmp_path):
+        path = str(tmp_path / "t.db")
+        archive = _fill(path)
+        assert archive.rows_written == 3 * 4 * 2
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE name='cycles'").fetchone()[0]
+            assert "WITHOUT ROWID" in sql
+            cols = [r[1] for r in conn.execute("PRAGMA table_info(cycles)")]
+            assert cols == COLUMN_NAMES
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM cycles WHERE timestamp > 0"
+            ).fetchall()
+            assert "cycles_time" in plan[0][-1]
+        finally:
+            conn.close()
+
+    def test_flush_makes_rows_visible(self, tmp_path):
+        path = str(tmp_path / "t.db")
+        archive = TelemetryArchive(path, batch_rows=1000, flush_interval=60.0)
+        try:
+            row = [1.0, 0xFA] + [0.0] * (len(COLUMN_NAMES) - 2)
+            archive.write_row(row)
+            assert archive.flush()
+            _, rows = query_range(path, ["dc_voltage"])
+            assert len(rows) == 1
+        finally:
+            archive.close()
+
+    def test_range_by_device(self, tmp_path):
+        path = str(tmp_path / "t.db")
+        _fill(path)
+        cols, rows = query_range(path, ["dc_voltage"], start=3600.0, end=7200.0, addr=0xFB)
+        assert cols == ["timestamp", "addr", "dc_voltage"]
+        assert len(rows) == 4
+        assert all(r[1] == 0xFB and r[2] == 401.0 for r in rows)
+        with pytest.raises(ValueError):
+            query_range(path, ["no_such_column"])
+
+    def test_hourly_max(self, tmp_path):
+        path = str(tmp_path / "t.db")
+        _fill(path)
+        _, rows = query_aggregate(path, "dc_inlet_temperature", "max", bucket=3600, addr=0xFA)
+        assert [(r[0], r[2], r[3]) for r in rows] == [
+            (0.0, 23.0, 4), (3600.0, 33.0, 4), (7200.0, 43.0, 4),
+        ]
+        _, rows = query_aggregate(path, "dc_inlet_temperature", "min")
+        assert [(r[1], r[2]) for r in rows] == [(0xFA, 20.0), (0xFB, 20.0)]
+
+    def test_export_writer_format(self, tmp_path):
+        path = str(tmp_path / "t.sqlite")
+        writer = open_writer(path)
+        assert isinstance(writer, TelemetryArchive) and isinstance(writer, CycleWriter)
+        writer.close()
+
+    @pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+    def test_cli_archive_sees_filtered_frames(self, tmp_path):
+        # Rows must sample every cycle, not only frames that passed the deadband
+        from dcdc_app import cli
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import PCSController
+
+        ctrl = PCSController(CANInterface(simulated=True))
+        sink = cli._start_archive(argparse.Namespace(archive=str(tmp_path / "t.db")), ctrl)
+        try:
+            archive, assembler = sink
+            assert assembler.on_frame in ctrl._unfiltered_callbacks
+            assert assembler.on_frame not in ctrl._frame_callbacks
+        finally:
+            cli._close_archive(sink)
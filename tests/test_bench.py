@@ -0,0 +1,169 @@
+"""Tests for the benchmark harness (measurement, baselines, regression check)."""
+
+import json
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+try:
+    import PySide6  # noqa: F401
+    import pyqtgraph  # noqa: F401
+    GUI_AVAILABLE = True
+except ImportError:
+    GUI_AVAILABLE = False
+
+from dcdc_app.bench import (
+    BenchResult,
+    compare_to_baseline,
+    load_baseline,
+    measure,
+    protocol_cases,
+    run_protocol_benchmarks,
+    save_baseline,
+)
+from dcdc_app.protocol import build_can_id
+
+
+class TestMeasure:
+    def test_measure_reports_positive_figures(self):
+        res = measure("build_can_id", build_can_id, (0x11, 0xB4, 0xFA), min_time=0.001, repeat=1)
+        assert res.ops > 0
+        assert res.ns_per_op > 0
+        assert res.ops_per_sec > 0
+        assert res.allocs_per_op >= 0
+
+    def test_batch_divides_per_op_figures(self):
+        single = measure("x", build_can_id, (1, 2, 3), batch=1, min_time=0.001, repeat=1)
+        batched = measure("x", build_can_id, (1, 2, 3), batch=10, min_time=0.001, repeat=1)
+        assert batched.ops == batched.ops // 10 * 10
+        assert batched.ns_per_op < single.ns_per_op * 5
+
+    def test_cases_cover_all_encoders_and_decoders(self):
+        import dcdc_app.protocol as protocol
+        names = {name for name, *_ in protocol_cases()}
+        public = [n for n in dir(protocol) if n.startswith(("encode_", "decode_"))]
+        for fn in public:
+            assert any(name.startswith(fn) for name in names), f"No benchmark for {fn}"
+
+    def test_run_filtered(self):
+        results = run_protocol_benchmarks(min_time=0.001, repeat=1, name_filter="log_frame")
+        assert {r.name for r in results} == {"log_frame[csv]", "log_frame[jsonl]", "log_frame[console]"}
+
+
+class TestBaseline:
+    def _result(self, name, ops_per_sec):
+        return BenchResult(name=name, ops=int(ops_per_sec), seconds=1.0,
+                           allocs_per_op=1.0, peak_bytes_per_op=64.0)
+
+    def test_save_load_roundtrip(self, tmp_path):
+        path = str(tmp_path / "baseline.json")
+        save_baseline(path, [self._result("a", 1000)])
+        loaded = load_baseline(path)
+        assert loaded["a"]["ops_per_sec"] == 1000.0
+        assert json.loads((tmp_path / "baseline.json").read_text())["version"] == 1
+
+    def test_regression_detected(self):
+        baseline = {"a": {"ops_per_sec": 1000.0}, "b": {"ops_per_sec": 1000.0}}
+        current = [self._result("a", 700), self._result("b", 900), self._result("c", 1)]
+        regs = compare_to_baseline(current, baseline, threshold=0.2)
+        assert [r.name for r in regs] == ["a"]
+        assert abs(regs[0].change + 0.3) < 1e-9
+
+
+class TestLatency:
+    def test_percentile_nearest_rank(self):
+        from dcdc_app.bench import percentile
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile(samples, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    def test_latency_stats(self):
+        from dcdc_app.bench import LatencyStats
+        st = LatencyStats.from_samples("x", [0.003, 0.001, 0.002])
+        assert st.count == 3
+        assert st.p50 == 0.002
+        assert st.max == 0.003
+        assert st.to_dict()["p50_ms"] == 2.0
+
+    @pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+    def test_latency_benchmark_with_simulator(self):
+        from dcdc_app.bench import run_latency_benchmark
+        stats = {st.name: st for st in run_latency_benchmark(iterations=2)}
+        assert stats["enable"].count == 2
+        assert stats["read_protection_params"].count == 2
+        assert stats["rx->callback"].count > 0
+
+    @pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+    def test_estop_benchmark_with_simulator(self):
+        from dcdc_app.bench import run_estop_benchmark
+        stats = {st.name: st for st in run_estop_benchmark(iterations=2)}
+        assert stats["estop (idle)"].count == 2
+        assert stats["disable (command pending)"].count == 2
+        assert stats["estop (command pending)"].max < stats["disable (command pending)"].p50
+
+    @pytest.mark.skipif(not (CAN_AVAILABLE and GUI_AVAILABLE), reason="python-can/PySide6 not installed")
+    def test_gui_commands_do_not_block_event_loop(self):
+        from dcdc_app.bench import run_gui_benchmark
+        stats = {st.name: st for st in run_gui_benchmark(storm=2, idle_s=0.3)}
+        assert stats["click->result"].count == 2
+        assert stats["click->result"].max > 2.5          # both waited out the timeout
+        assert stats["click handler"].max < 0.1          # ...without holding the UI thread
+        assert stats["ui frame gap (command storm)"].max < 2.5
+        assert stats["ui cpu per s (minimized)"].p50 < stats["ui cpu per s (active)"].p50
+
+    @pytest.mark.skipif(not GUI_AVAILABLE, reason="PySide6/pyqtgraph not installed")
+    def test_gui_first_paint_startup_case(self):
+        from dcdc_app.bench import run_startup_benchmark
+        stats = run_startup_benchmark(iterations=1, name_filter="first paint")
+        assert [st.name for st in stats] == ["gui launch->first paint"]
+        assert 0 < stats[0].p50 < 30
+
+
+class TestStartup:
+    def test_offline_commands_skip_heavy_imports(self):
+        from dcdc_app.bench import loaded_modules
+        assert loaded_modules(["dump-faults"]) == []
+        assert loaded_modules(["--help"]) == []
+        if CAN_AVAILABLE:
+            assert "can" in loaded_modules(["bench", "protocol", "--filter", "build_can_id",
+                                            "--min-time", "0.001"])
+
+    def test_startup_benchmark(self):
+        from dcdc_app.bench import run_startup_benchmark
+        stats = run_startup_benchmark(iterations=2, name_filter="dump-faults")
+        assert [st.name for st in stats] == ["cli dump-faults"]
+        assert stats[0].count == 2 and stats[0].p50 > 0
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestSoak:
+    def test_soak_processes_generated_frames(self):
+        from dcdc_app.bench import run_soak
+        res = run_soak(rate=500, duration=0.5)
+        assert res.generated > 0
+        assert res.processed == res.generated
+        assert res.backlog == 0 and res.dropped == 0
+        assert res.rx_cpu_per_frame > 0
+
+    def test_soak_replay(self, tmp_path):
+        from dcdc_app.bench import RX_MIX_FRAMES, load_replay_frames, run_soak
+        from dcdc_app.logging_utils import FrameLogger
+        log_file = str(tmp_path / "rec.csv")
+        fl = FrameLogger(filepath=log_file, fmt="csv", console=False)
+        fl.open()
+        for can_id, data in RX_MIX_FRAMES[:3]:
+            fl.log_frame(can_id, data, "RX")
+        fl.log_frame(0x181AFAB4, b"\x00" * 8, "TX")
+        fl.close()
+
+        frames = load_replay_frames(log_file)
+        assert frames == RX_MIX_FRAMES[:3]
+        res = run_soak(rate=300, duration=0.3, frames=frames, with_logger=False)
+        assert res.processed > 0
@@ -0,0 +1,112 @@
+"""Tests for the per-(SA, PF) bus health monitor."""
+
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.bus_health import BusHealthMonitor, format_health
+
+
+def _feed(mon, sa, pf, start, period, n):
+    t = start
+    for _ in range(n):
+        mon.update(sa, pf, t)
+        t += period
+    return t - period
+
+
+class TestBusHealthMonitor:
+    def test_rate_and_jitter(self):
+        mon = BusHealthMonitor()
+        last = _feed(mon, 0xFA, 0x11, 100.0, 0.2, 50)
+        (row,) = mon.snapshot(last)
+        assert row.count == 50
+        assert row.rate_hz == pytest.approx(5.0)
+        assert row.jitter == pytest.approx(0.0, abs=1e-9)
+        assert row.gaps == 0
+        assert not row.stale
+
+    def test_gaps_counted(self):
+        mon = BusHealthMonitor()
+        last = _feed(mon, 0xFA, 0x13, 0.0, 0.2, 5)
+        mon.update(0xFA, 0x13, last + 0.6)  # two frames missed
+        mon.update(0xFA, 0x13, last + 0.8)
+        (row,) = mon.snapshot(last + 0.8)
+        assert row.gaps == 1
+
+    def test_stale_only_for_missing_pf(self):
+        mon = BusHealthMonitor(stale_periods=5)
+        events = []
+        mon.add_listener(events.append)
+        t = 0.0
+        for _ in range(20):
+            mon.update(0xFA, 0x11, t)
+            mon.update(0xFA, 0x13, t)
+            t += 0.2
+        # 0x13 stops, 0x11 keeps arriving
+        for _ in range(10):
+            mon.update(0xFA, 0x11, t)
+            mon.check(t)
+            t += 0.2
+        assert [e.pf for e in events] == [0x13]
+        assert events[0].stale and events[0].section == "status"
+        assert mon.is_stale(0xFA, 0x13)
+        assert not mon.is_stale(0xFA, 0x11)
+        assert mon.stale_sections() == {"status"}
+        assert mon.stale_sections(sa=0x10) == set()
+
+        # Recovery raises a fresh event and the check does not re-flag it
+        mon.update(0xFA, 0x13, t)
+        mon.check(t)
+        assert len(events) == 2 and not events[1].stale
+        assert mon.stale_sections() == set()
+
+    def test_non_periodic_pf_never_stale(self):
+        mon = BusHealthMonitor()
+        mon.update(0xFA, 0x10, 0.0)  # StartStopReply
+        mon.update(0xFA, 0x10, 0.1)
+        assert mon.check(100.0) == []
+
+    def test_sources_are_independent(self):
+        mon = BusHealthMonitor()
+        _feed(mon, 0xFA, 0x11, 0.0, 0.2, 3)
+        _feed(mon, 0xFB, 0x11, 0.0, 0.2, 3)
+        mon.check(10.0)
+        assert mon.is_stale(0xFA, 0x11) and mon.is_stale(0xFB, 0x11)
+        mon.update(0xFB, 0x11, 10.0)
+        assert mon.is_stale(0xFA, 0x11) and not mon.is_stale(0xFB, 0x11)
+        text = format_health(mon.snapshot(10.0), mon.expected_period)
+        assert "STALE" in text and "0xFB" in text
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestControllerStaleDetection:
+    def test_stale_event_when_device_goes_quiet(self):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        time.sleep(0.3)
+        ctrl = PCSController(CANInterface(simulated=True), ControllerConfig(auto_heartbeat=False))
+        events = []
+        ctrl.add_stale_callback(events.append)
+        try:
+            ctrl.start()
+            time.sleep(0.8)
+            assert ctrl.stale_sections == set()
+            sim.stop()
+            time.sleep(2.5)
+            assert "dc" in ctrl.stale_sections
+            assert any(e.stale and e.pf == 0x11 for e in events)
+        finally:
+            ctrl.stop()
+            ctrl.can.disconnect()
+            sim.stop()
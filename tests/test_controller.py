@@ -63,6 +63,84 @@ class TestCANInterface:
             assert iface.connected
         assert not iface.connected
 
+    def test_interrupt_releases_blocked_recv(self):
+        with CANInterface(simulated=True) as iface:
+            result = []
+            t = threading.Thread(target=lambda: result.append(iface.recv(timeout=None)))
+            t.start()
+            time.sleep(0.05)
+            t0 = time.monotonic()
+            iface.interrupt()
+            t.join(timeout=1.0)
+            assert not t.is_alive()
+            assert result == [None]
+            assert time.monotonic() - t0 < 0.1
+
+    def test_recv_batch_drains_queue(self):
+        with CANInterface(simulated=True, receive_own_messages=True) as iface:
+            for i in range(5):
+                iface.send(0x18010AB4, bytes([i]) * 8)
+            deadline = time.monotonic() + 1.0
+            while iface.rx_queue_depth < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            first = iface.recv_batch(max_frames=3, timeout=1.0)
+            rest = iface.recv_batch(max_frames=10, timeout=1.0)
+            assert [m.data[0] for m in first] == [0, 1, 2]
+            assert [m.data[0] for m in rest] == [3, 4]
+            assert iface.recv_batch(timeout=0.01) == []
+
+    def test_full_inbox_drops_and_counts(self):
+        from dcdc_app.metrics import MetricsRegistry
+
+        reg = MetricsRegistry()
+        with CANInterface(simulated=True, receive_own_messages=True, metrics=reg,
+                          inbox_size=3) as iface:
+            for i in range(5):
+                iface.send(0x18010AB4, bytes([i]) * 8)
+            deadline = time.monotonic() + 1.0
+            while iface.stats["rx_count"] < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert [m.data[0] for m in iface.recv_batch(timeout=1.0)] == [0, 1, 2]
+            assert iface.rx_dropped == 2 and iface.stats["rx_dropped"] == 2
+            assert reg.counter("can_rx_dropped_total").value == 2
+
+    def test_fd_reader_path(self, monkeypatch):
+        """Backends with a file descriptor are read via select()."""
+        import socket
+
+        class FdBus:
+            def __init__(self):
+                self.rx, self.tx = socket.socketpair()
+                self.rx.setblocking(False)
+
+            def fileno(self):
+                return self.rx.fileno()
+
+            def recv(self, timeout=None):
+                try:
+                    data = self.rx.recv(8)
+                except BlockingIOError:
+                    return None
+                return can.Message(arbitration_id=0x1801FAB4, data=data)
+
+            def shutdown(self):
+                self.rx.close()
+                self.tx.close()
+
+        bus = FdBus()
+        iface = CANInterface(simulated=True)
+        monkeypatch.setattr(iface, "_open_bus", lambda: bus)
+        iface.connect()
+        try:
+            assert iface._wake_pair is not None
+            bus.tx.send(b"\x01\x02\x03\x04\x05\x06\x07\x08")
+            msg = iface.recv(timeout=1.0)
+            assert msg is not None and msg.data[0] == 1
+        finally:
+            t0 = time.monotonic()
+            iface.disconnect()
+            assert time.monotonic() - t0 < 0.2
+
 
 class TestSimulatedPCS:
     def test_start_stop(self):
@@ -239,6 +317,105 @@ class TestPCSController:
             can_if.disconnect()
             sim.stop()
 
+    def test_batch_callback(self):
+        """A burst is processed as one batch: one callback call with every frame."""
+        tx_bus = can.Bus(interface="virtual", channel="virtual_pcs")
+        can_if = CANInterface(simulated=True)
+        ctrl = PCSController(can_if, ControllerConfig(auto_heartbeat=False))
+        batches = []
+        ctrl.add_batch_callback(batches.append)
+        try:
+            can_if.connect()
+            # Queue the burst before the RX thread starts so it arrives together
+            for _ in range(20):
+                tx_bus.send(can.Message(arbitration_id=make_rx_id(0x11),
+                                        data=b"\x00" * 8, is_extended_id=True))
+            time.sleep(0.1)
+            ctrl.start()
+            deadline = time.monotonic() + 1.0
+            while sum(map(len, batches)) < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            ctrl.stop()
+            can_if.disconnect()
+            tx_bus.shutdown()
+        assert sum(map(len, batches)) == 20
+        assert len(batches) < 20
+        assert batches[0][0][2] == "dc"
+
+    def test_batch_frames_keep_own_timestamps(self):
+        """A drained backlog keeps each frame's spacing for bus health and the filter."""
+        from dcdc_app.deadband import ChangeFilter
+
+        cf = ChangeFilter(max_silence=0.5)
+        ctrl = PCSController(CANInterface(simulated=True), ControllerConfig(auto_heartbeat=False),
+                             change_filter=cf)
+        seen = []
+        ctrl.add_frame_callback(lambda sa, pf, name, decoded, ts: seen.append(ts))
+        batch = [
+            can.Message(arbitration_id=make_rx_id(0x11), data=b"\x00" * 8,
+                        is_extended_id=True, timestamp=100.0 + 0.2 * k)
+            for k in range(4)
+        ]
+        ctrl._process_batch(batch)
+        (health,) = ctrl.bus_health.snapshot(101.0)
+        assert health.count == 4 and health.interval == pytest.approx(0.2)
+        assert health.gaps == 0
+        # Unchanged frames: the first is reported, then a keepalive once 0.5 s passed
+        assert seen == [100.0, pytest.approx(100.6)]
+
+    def test_stop_is_immediate(self):
+        """stop() wakes the RX, heartbeat and watchdog threads instead of waiting out timeouts."""
+        can_if = CANInterface(simulated=True)
+        ctrl = PCSController(can_if, ControllerConfig())
+        ctrl.start()
+        time.sleep(0.2)
+        t0 = time.monotonic()
+        ctrl.stop()
+        elapsed = time.monotonic() - t0
+        can_if.disconnect()
+        assert elapsed < 0.2
+
+    def test_readiness_waits(self):
+        """Readiness waits return as soon as the data is there, not after a fixed delay."""
+        sim = SimulatedPCS()
+        sim.start()
+        can_if = CANInterface(simulated=True)
+        ctrl = PCSController(can_if, ControllerConfig())
+        try:
+            t0 = time.monotonic()
+            ctrl.start()
+            assert ctrl.wait_for_cycle(timeout=2.0)
+            assert time.monotonic() - t0 < 0.6   # one 200 ms cycle plus scheduling
+            assert ctrl.state.grid_voltage.u_voltage > 0
+            assert ctrl.wait_for_pf(0x39, timeout=1.0)
+            assert ctrl.wait_for_pf(0x13, timeout=1.0, fresh=True)
+            assert ctrl.wait_for_state(RunningState.STANDBY, timeout=1.0)
+            assert ctrl.enable()
+            assert ctrl.wait_for_state(
+                [RunningState.CONSTANT_VOLTAGE, RunningState.CONSTANT_CURRENT], timeout=1.0,
+            )
+            assert not ctrl.wait_for_pf(0x77, timeout=0.1)
+        finally:
+            ctrl.stop()
+            can_if.disconnect()
+            sim.stop()
+
+    def test_stop_releases_readiness_wait(self):
+        can_if = CANInterface(simulated=True)
+        ctrl = PCSController(can_if, ControllerConfig())
+        ctrl.start()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(ctrl.wait_for_cycle(timeout=5.0)))
+        waiter.start()
+        time.sleep(0.1)
+        t0 = time.monotonic()
+        ctrl.stop()
+        waiter.join(1.0)
+        can_if.disconnect()
+        assert result == [False]
+        assert time.monotonic() - t0 < 0.5
+
 
 class TestFrameLogger:
     def test_csv_logging(self, tmp_path):
@@ -266,3 +443,36 @@ class TestFrameLogger:
         record = json.loads(line)
         assert record["direction"] == "RX"
         assert "can_id" in record
+
+    def test_log_frames_batch(self, tmp_path):
+        from dcdc_app.logging_utils import iter_frame_log
+        log_file = str(tmp_path / "batch.csv")
+        with FrameLogger(filepath=log_file, fmt="csv", console=False) as fl:
+            fl.log_frames([
+                (0x18110AB4, b"\x01" * 8, "RX", None, 100.0),
+                (0x18110AB4, b"\x01" * 8, "RX", None, 100.2),   # batch keeps bus times
+                (0x181AFAB4, b"\x02" * 8, "TX", None, None),
+            ])
+            fl.log_frames([])
+        records = list(iter_frame_log(log_file))
+        assert [(r[1], r[2]) for r in records] == [
+            ("RX", 0x18110AB4), ("RX", 0x18110AB4), ("TX", 0x181AFAB4),
+        ]
+        assert [r[0] for r in records[:2]] == [100.0, pytest.approx(100.2)]
+        assert records[2][0] > 1e9                            # no bus time: logged now
+
+    def test_iter_frame_log_roundtrip(self, tmp_path):
+        from dcdc_app.logging_utils import iter_frame_log
+        for fmt in ("csv", "jsonl"):
+            log_file = str(tmp_path / f"test.{fmt}")
+            fl = FrameLogger(filepath=log_file, fmt=fmt, console=False)
+            fl.open()
+            fl.log_frame(0x18110AB4, b"\x01\x02\x03\x04\x05\x06\x07\x08", "RX")
+            fl.log_frame(0x181AFAB4, b"\x00" * 8, "TX")
+            fl.close()
+
+            records = list(iter_frame_log(log_file))
+            assert [r[1] for r in records] == ["RX", "TX"]
+            assert records[0][2] == 0x18110AB4
+            assert records[0][3] == b"\x01\x02\x03\x04\x05\x06\x07\x08"
+            assert records[0][0] > 0
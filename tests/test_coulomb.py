@@ -0,0 +1,159 @@
+"""Tests for the host-side coulomb/energy integrator."""
+
+import threading
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.coulomb import CoulombCounter, format_report, integrate_log
+from dcdc_app.logging_utils import FrameLogger
+from dcdc_app.protocol import CapacityEnergy, HighResDC, make_rx_id
+
+
+def _run(counter, current, seconds, t0=0.0, voltage=400.0, period=0.2, sa=0xFA):
+    n = int(round(seconds / period))
+    for k in range(n + 1):
+        counter.feed(sa, "dc_hires", HighResDC(voltage=voltage, current=current), t0 + k * period)
+    return t0 + n * period
+
+
+class TestIntegration:
+    def test_constant_current(self):
+        c = CoulombCounter()
+        _run(c, 10.0, 360.0)
+        rep = c.report()
+        assert rep.ah_in == pytest.approx(1.0)
+        assert rep.wh_in == pytest.approx(400.0)
+        assert rep.ah_out == 0.0
+        assert rep.integrated_s == pytest.approx(360.0)
+
+    def test_zero_crossing_split(self):
+        c = CoulombCounter(max_gap=1000.0)
+        c.feed(0xFA, "dc_hires", HighResDC(voltage=1.0, current=36.0), 0.0)
+        c.feed(0xFA, "dc_hires", HighResDC(voltage=1.0, current=-36.0), 200.0)
+        rep = c.report()
+        # two triangles of 36 A * 100 s / 2 = 1800 As = 0.5 Ah each
+        assert rep.ah_in == pytest.approx(0.5)
+        assert rep.ah_out == pytest.approx(0.5)
+        assert rep.ah_net == pytest.approx(0.0)
+        assert rep.ah_throughput == pytest.approx(1.0)
+
+    def test_gap_not_integrated(self):
+        c = CoulombCounter(max_gap=1.0)
+        t = _run(c, 36.0, 100.0)
+        _run(c, 36.0, 100.0, t0=t + 30.0)   # 30 s outage
+        rep = c.report()
+        assert rep.gaps == 1
+        assert rep.gap_s == pytest.approx(30.0)
+        assert rep.ah_in == pytest.approx(2.0)
+
+    def test_other_devices_ignored(self):
+        c = CoulombCounter(sa=0xFA)
+        _run(c, 10.0, 10.0, sa=0xFB)
+        assert c.report().samples == 0
+
+
+class TestDeviceCounters:
+    def test_drift_and_reset(self):
+        c = CoulombCounter()
+        c.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=5.0, energy=2000.0), 0.0)
+        _run(c, 36.0, 100.0)   # 1 Ah, 400 Wh
+        c.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=5.6, energy=2240.0), 50.0)
+        # PCS reset: counters restart from zero
+        c.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=0.3, energy=150.0), 100.0)
+        rep = c.report()
+        assert rep.device_resets == 1
+        assert rep.device_ah == pytest.approx(0.9)
+        assert rep.device_wh == pytest.approx(390.0)
+        assert rep.drift_ah == pytest.approx(0.1)
+        assert rep.drift_wh == pytest.approx(10.0)
+        assert "Drift" in format_report(rep)
+
+
+class TestCheckpoint:
+    def test_totals_survive_restart(self, tmp_path):
+        path = str(tmp_path / "coulomb.json")
+        c = CoulombCounter(path)
+        c.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=1.0), 0.0)
+        _run(c, 36.0, 100.0)
+        c.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=2.0), 100.0)
+        c.save()
+
+        # Restart 1 h later: the downtime counts on neither side
+        c2 = CoulombCounter(path)
+        c2.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=7.0), 3700.0)
+        _run(c2, 36.0, 100.0, t0=3700.0)
+        c2.feed(0xFA, "capacity_energy", CapacityEnergy(capacity=8.0), 3800.0)
+        rep = c2.report()
+        assert rep.ah_in == pytest.approx(2.0)
+        assert rep.device_ah == pytest.approx(2.0)
+        assert rep.gaps == 0
+        assert rep.drift_ah == pytest.approx(0.0, abs=1e-9)
+
+    def test_periodic_save(self, tmp_path):
+        path = tmp_path / "coulomb.json"
+        c = CoulombCounter(str(path), checkpoint_interval=0.0)
+        _run(c, 10.0, 1.0)
+        c.close()
+        assert path.exists()
+
+    def test_periodic_save_off_the_feeding_thread(self, tmp_path, monkeypatch):
+        path = tmp_path / "coulomb.json"
+        c = CoulombCounter(str(path), checkpoint_interval=0.0)
+        writers = []
+        write = c._write
+
+        def recording_write(p, data):
+            writers.append(threading.current_thread())
+            write(p, data)
+
+        monkeypatch.setattr(c, "_write", recording_write)
+        _run(c, 10.0, 1.0)
+        c.close()
+        assert writers and threading.current_thread() not in writers
+        assert CoulombCounter(str(path)).report().samples == c.report().samples
+
+
+class TestLog:
+    def test_integrate_frame_log(self, tmp_path):
+        log = tmp_path / "frames.csv"
+        with FrameLogger(str(log), console=False) as flog:
+            for _ in range(3):
+                # 400.000 V, 36.000 A (offset -1000 A)
+                flog.log_frame(make_rx_id(0x39), bytes.fromhex("00061A80000FCEE0"))
+        rep = integrate_log(str(log), CoulombCounter())
+        assert rep.samples == 3
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestControllerFeed:
+    def test_unfiltered_callback_sees_suppressed_frames(self):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.deadband import ChangeFilter, DeadbandRule
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        time.sleep(0.3)
+        cf = ChangeFilter({"": DeadbandRule(rel_threshold=0.5)}, max_silence=60.0)
+        ctrl = PCSController(CANInterface(simulated=True), ControllerConfig(), change_filter=cf)
+        counter = CoulombCounter(sa=ctrl.config.pcs_addr)
+        ctrl.add_frame_callback(counter.on_frame, unfiltered=True)
+        try:
+            ctrl.start()
+            time.sleep(1.5)
+        finally:
+            ctrl.stop()
+            ctrl.can.disconnect()
+            sim.stop()
+        rep = counter.report()
+        assert rep.samples >= 4
+        assert rep.gaps == 0
+        assert rep.integrated_s > 0.5
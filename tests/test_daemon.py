@@ -0,0 +1,194 @@
+"""Tests for the controller daemon and its Unix-socket RPC."""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.constants import ACTIVE_STATES
+from dcdc_app.daemon import UNIX_SOCKETS, state_from_dict
+from dcdc_app.protocol import PCS_DEFAULT_ADDR, PCSState
+
+pytestmark = pytest.mark.skipif(not UNIX_SOCKETS, reason="no Unix domain sockets")
+
+# What the CLI passes by default (--interface, --channel, --bitrate)
+BUS = {"interface": "pcan", "channel": "PCAN_USBBUS1", "bitrate": 250000}
+
+
+@pytest.fixture
+def sock_path(tmp_path):
+    # AF_UNIX paths are limited to ~100 bytes; pytest tmp paths can be longer
+    path = os.path.join("/tmp", f"dcdc-test-{os.getpid()}-{id(tmp_path)}.sock")
+    yield path
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+class TestStateRoundTrip:
+    def test_state_from_dict(self):
+        from dataclasses import asdict
+
+        state = PCSState()
+        state.dc.voltage = 400.0
+        state.status.fault_code = 0x800D
+        state.phase_b_power.active_power = 1.5
+        back = state_from_dict(asdict(state))
+        assert back == state
+        assert back.phase_b_power.phase == "B"
+
+
+class TestSocketPath:
+    def test_one_daemon_per_bus(self):
+        from dcdc_app.daemon import default_socket_path
+
+        bus1 = default_socket_path(PCS_DEFAULT_ADDR, "pcan", "PCAN_USBBUS1")
+        bus2 = default_socket_path(PCS_DEFAULT_ADDR, "pcan", "PCAN_USBBUS2")
+        assert bus1 != bus2
+        dev = default_socket_path(PCS_DEFAULT_ADDR, "socketcan", "/dev/can0")
+        assert os.path.dirname(dev) == os.path.dirname(bus1)   # channel path flattened
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestDaemon:
+    @pytest.fixture
+    def daemon(self, sock_path):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.daemon import ControllerDaemon
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        ctrl = PCSController(CANInterface(simulated=True), ControllerConfig())
+        ctrl.start()
+        d = ControllerDaemon(ctrl, sock_path, info=dict(BUS, dry_run=True))
+        d.start()
+        assert ctrl.wait_for_cycle(2.0)   # first full status cycle
+        yield d
+        d.stop()
+        ctrl.stop()
+        ctrl.can.disconnect()
+        sim.stop()
+
+    def test_commands_and_status(self, daemon, sock_path):
+        from dcdc_app.daemon import DaemonClient, DaemonError, connect
+
+        assert oct(os.stat(sock_path).st_mode & 0o777) == oct(0o600)
+        remote = connect(sock_path, PCS_DEFAULT_ADDR, True, **BUS)
+        assert remote is not None
+        try:
+            assert remote.info["dry_run"] is True
+            assert remote.enable()
+            assert remote.wait_for_state(ACTIVE_STATES, timeout=2.0)
+            assert remote.read_version() is not None
+            stats = remote.stats_snapshot("session")
+            assert stats["dc.voltage"].count > 0
+        finally:
+            remote.close()
+
+        with DaemonClient(sock_path) as client:
+            with pytest.raises(DaemonError, match="Unknown method"):
+                client.call("no_such_method")
+            assert client.call("status")["connected"] is True
+
+    def test_mismatched_daemon_not_used(self, daemon, sock_path):
+        from dcdc_app.daemon import connect
+
+        assert connect(sock_path, 0x10, True, **BUS) is None
+        assert connect(sock_path, PCS_DEFAULT_ADDR, False, **BUS) is None
+        # Same address on the other bus of a two-unit bench
+        assert connect(sock_path, PCS_DEFAULT_ADDR, True, **dict(BUS, channel="PCAN_USBBUS2")) is None
+        assert connect(sock_path, PCS_DEFAULT_ADDR, True, **dict(BUS, bitrate=500000)) is None
+
+    def test_concurrent_clients(self, daemon, sock_path):
+        from dcdc_app.daemon import DaemonClient
+
+        results = []
+
+        def worker():
+            with DaemonClient(sock_path) as client:
+                results.append(client.call("read_version") is not None)
+                results.append(client.call("status")["state"]["dc"]["voltage"] > 0)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+        assert results == [True] * 8
+
+    def test_cli_uses_daemon(self, daemon, sock_path, capsys, monkeypatch):
+        from dcdc_app import cli
+
+        def no_local_controller(*args, **kwargs):
+            raise AssertionError("opened the bus instead of using the daemon")
+
+        monkeypatch.setattr(cli, "_make_controller", no_local_controller)
+        rc = cli.main(["--dry-run", "--socket", sock_path, "status"])
+        assert rc == 0
+        assert "DC Voltage" in capsys.readouterr().out
+
+    def test_second_daemon_refused(self, daemon, sock_path):
+        from dcdc_app.daemon import ControllerDaemon
+
+        with pytest.raises(RuntimeError, match="already listening"):
+            ControllerDaemon(daemon.ctrl, sock_path).start()
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestStaleSocket:
+    def test_leftover_socket_replaced(self, sock_path):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import PCSController
+        from dcdc_app.daemon import ControllerDaemon, DaemonClient, connect
+
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.bind(sock_path)   # bound but never listening: what a killed daemon leaves behind
+        s.close()
+        assert connect(sock_path, PCS_DEFAULT_ADDR, True, **BUS) is None
+
+        d = ControllerDaemon(PCSController(CANInterface(simulated=True)), sock_path)
+        d.start()
+        try:
+            with DaemonClient(sock_path) as client:
+                assert client.call("ping")["pcs_addr"] == PCS_DEFAULT_ADDR
+                assert client.call("shutdown") is True
+            assert d.shutdown_requested.is_set()
+        finally:
+            d.stop()
+        assert not os.path.exists(sock_path)
+
+
+class TestUnresponsiveDaemon:
+    @pytest.mark.parametrize("reply", [None, b"not json\n"])
+    def test_falls_back_quickly(self, sock_path, reply):
+        from dcdc_app.daemon import PROBE_TIMEOUT, connect
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(sock_path)
+        server.listen(1)
+
+        def serve():
+            conn, _ = server.accept()
+            conn.recv(4096)
+            if reply is not None:
+                conn.sendall(reply)
+            time.sleep(PROBE_TIMEOUT * 3)   # hung: never answers the ping
+            conn.close()
+
+        t = threading.Thread(target=serve, daemon=True)
+        t.start()
+        try:
+            start = time.monotonic()
+            assert connect(sock_path, PCS_DEFAULT_ADDR, True, **BUS) is None
+            assert time.monotonic() - start < PROBE_TIMEOUT * 2
+        finally:
+            server.close()
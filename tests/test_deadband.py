@@ -0,0 +1,102 @@
+"""Tests for the change-detection / deadband filter."""
+
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.deadband import ChangeFilter, DeadbandRule, parse_rule
+from dcdc_app.protocol import DCData, StatusData
+
+
+def _dc(v, i=10.0):
+    return DCData(voltage=v, current=i, power=4.0, inlet_temperature=30.0)
+
+
+class TestParseRule:
+    @pytest.mark.parametrize("spec,key,abs_t,rel_t", [
+        ("0.5", "", 0.5, 0.0),
+        ("2%", "", 0.0, 0.02),
+        ("dc.current=1%", "dc.current", 0.0, 0.01),
+        ("grid_voltage=0.5,0.2%", "grid_voltage", 0.5, 0.002),
+    ])
+    def test_specs(self, spec, key, abs_t, rel_t):
+        k, rule = parse_rule(spec)
+        assert k == key
+        assert rule.abs_threshold == pytest.approx(abs_t)
+        assert rule.rel_threshold == pytest.approx(rel_t)
+
+
+class TestChangeFilter:
+    def test_identical_frames_suppressed_until_keepalive(self):
+        cf = ChangeFilter(max_silence=1.0)
+        assert cf.should_report(0xFA, 0x11, "dc", _dc(400.0), 0.0)
+        for k in range(1, 5):
+            assert not cf.should_report(0xFA, 0x11, "dc", _dc(400.0), k * 0.2)
+        assert cf.should_report(0xFA, 0x11, "dc", _dc(400.0), 1.0)
+        assert cf.keepalives == 1
+        assert cf.suppressed == 4
+
+    def test_deadband_against_last_reported_value(self):
+        cf = ChangeFilter({"dc.voltage": DeadbandRule(abs_threshold=1.0)}, max_silence=0)
+        assert cf.should_report(0xFA, 0x11, "dc", _dc(400.0), 0.0)
+        # Slow drift: each step within the band, but the sum crosses it
+        assert not cf.should_report(0xFA, 0x11, "dc", _dc(400.4), 0.2)
+        assert not cf.should_report(0xFA, 0x11, "dc", _dc(400.8), 0.4)
+        assert cf.should_report(0xFA, 0x11, "dc", _dc(401.2), 0.6)
+        # Fields without a rule fall back to exact change detection
+        assert cf.should_report(0xFA, 0x11, "dc", _dc(401.2, i=10.1), 0.8)
+
+    def test_transient_spike_reported_both_ways(self):
+        cf = ChangeFilter({"": DeadbandRule(rel_threshold=0.05)}, max_silence=0)
+        seq = [100.0, 100.5, 99.7, 150.0, 100.2, 100.1]
+        reported = [v for k, v in enumerate(seq)
+                    if cf.should_report(0xFA, 0x11, "dc", _dc(v), k * 0.2)]
+        assert reported == [100.0, 150.0, 100.2]
+
+    def test_status_and_replies_always_exact(self):
+        cf = ChangeFilter({"": DeadbandRule(abs_threshold=1000.0)}, max_silence=0)
+        assert cf.should_report(0xFA, 0x13, "status", StatusData(13, 0), 0.0)
+        assert not cf.should_report(0xFA, 0x13, "status", StatusData(13, 0), 0.2)
+        assert cf.should_report(0xFA, 0x13, "status", StatusData(6, 0x800D), 0.4)
+        # Command replies are never filtered
+        assert cf.should_report(0xFA, 0x10, "pf_0x10", True, 0.6)
+        assert cf.should_report(0xFA, 0x10, "pf_0x10", True, 0.8)
+
+    def test_devices_tracked_separately(self):
+        cf = ChangeFilter(max_silence=0)
+        assert cf.should_report(0xFA, 0x11, "dc", _dc(400.0), 0.0)
+        assert cf.should_report(0xFB, 0x11, "dc", _dc(400.0), 0.0)
+        assert not cf.should_report(0xFB, 0x11, "dc", _dc(400.0), 0.2)
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestControllerChangeFilter:
+    def test_filter_cuts_callbacks_but_keeps_state(self):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        time.sleep(0.3)
+        cf = ChangeFilter({"": DeadbandRule(rel_threshold=0.02)}, max_silence=60.0)
+        ctrl = PCSController(CANInterface(simulated=True), ControllerConfig(), change_filter=cf)
+        seen = []
+        ctrl.add_callback(lambda name, decoded: seen.append(name))
+        try:
+            ctrl.start()
+            time.sleep(1.5)
+            assert ctrl.state.dc.voltage > 0
+            assert ctrl.enable()  # replies still reach the waiter
+        finally:
+            ctrl.stop()
+            ctrl.can.disconnect()
+            sim.stop()
+        assert cf.suppressed > 0
+        assert len(seen) == cf.passed
@@ -0,0 +1,141 @@
+"""Tests for the emergency-stop path."""
+
+import threading
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.constants import BROADCAST_ADDR
+from dcdc_app.protocol import RunningState, StatusData, make_tx_id, parse_can_id
+
+
+class _FakeBus:
+    """Records the frames handed to send_messages()."""
+
+    def __init__(self, accept=True):
+        self.bursts = []
+        self.accept = accept
+
+    def send_messages(self, msgs):
+        self.bursts.append([parse_can_id(m.arbitration_id)["ps"] for m in msgs])
+        return len(msgs) if self.accept else 0
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestEmergencyStop:
+    def test_first_burst_covers_fleet_and_broadcast(self):
+        from dcdc_app.estop import EmergencyStop
+
+        bus = _FakeBus()
+        estop = EmergencyStop(bus, 0xFA, retry_interval=0.01, timeout=0.5)
+        estop.on_frame(0xF1, 0x11, "dc_data", None, time.time())   # learn another device
+        assert estop.devices == [0xF1, 0xFA]
+
+        result = estop.trigger()
+        assert sorted(bus.bursts[0]) == [BROADCAST_ADDR, 0xF1, 0xFA]
+        assert result.attempts == 1 and result.first_tx_s < 0.1
+        assert result.on_bus and result.first_sent == 3
+
+        # A StartStop ack may answer a start still in flight: not a confirmation
+        estop.on_frame(0xFA, 0x10, "pf_0x10", True, time.time())
+        assert estop.active and result.stopped == []
+
+        stopped = StatusData(running_state=RunningState.STANDBY)
+        estop.on_frame(0xFA, 0x13, "status", stopped, time.time() - 5)   # pre-trigger status
+        assert result.stopped == []
+        estop.on_frame(0xFA, 0x13, "status", stopped, time.time())
+        estop.on_frame(0xF1, 0x13, "status", stopped, time.time())
+        assert estop.wait(1.0).complete
+        assert result.stopped == [0xFA, 0xF1] and result.confirm_s is not None
+        assert not estop.active
+
+    def test_confirmation_uses_bus_clock(self):
+        from dcdc_app.estop import EmergencyStop
+
+        # PCAN stamps frames with time since driver start, far from time.time()
+        bus_t = 1234.5
+        estop = EmergencyStop(_FakeBus(), 0xFA, retry_interval=0.01, timeout=0.5)
+        stopped = StatusData(running_state=RunningState.STANDBY)
+        estop.on_frame(0xFA, 0x11, "dc_data", None, bus_t)
+        result = estop.trigger()
+        estop.on_frame(0xFA, 0x13, "status", stopped, bus_t)   # on the bus before the trigger
+        assert result.stopped == [] and estop.active
+        estop.on_frame(0xFA, 0x13, "status", stopped, bus_t + 0.1)
+        assert estop.wait(1.0).complete and result.stopped == [0xFA]
+
+    def test_retransmits_until_timeout(self):
+        from dcdc_app.estop import EmergencyStop
+
+        bus = _FakeBus()
+        estop = EmergencyStop(bus, 0xFA, retry_interval=0.01, timeout=0.1)
+        done = []
+        called = threading.Event()
+        estop.trigger(on_done=lambda r: (done.append(r), called.set()))
+        # A running status does not confirm the stop
+        running = StatusData(running_state=RunningState.CONSTANT_VOLTAGE)
+        estop.on_frame(0xFA, 0x13, "status", running, time.time())
+        result = estop.wait(1.0)
+        assert not result.complete and result.attempts > 2
+        assert len(bus.bursts) == result.attempts
+        assert called.wait(1.0)       # callbacks run after wait() is released
+        assert done == [result]
+
+    def test_nothing_on_bus_is_reported(self, caplog):
+        from dcdc_app.estop import EmergencyStop
+
+        bus = _FakeBus(accept=False)
+        estop = EmergencyStop(bus, 0xFA, retry_interval=0.01, timeout=0.1)
+        with caplog.at_level("ERROR", logger="dcdc_app.estop"):
+            result = estop.trigger()
+        assert not result.on_bus and result.first_sent == 0
+        assert "NOT SENT" in caplog.text
+        # Retransmission keeps trying while the bus refuses frames
+        result = estop.wait(1.0)
+        assert result.attempts > 1 and result.frames_sent == 0
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestWithSimulator:
+    @pytest.fixture
+    def setup(self):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import PCSController
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        ctrl = PCSController(CANInterface(simulated=True))
+        ctrl.start()
+        assert ctrl.wait_for_cycle(2.0)
+        yield sim, ctrl
+        ctrl.stop()
+        ctrl.can.disconnect()
+        sim.stop()
+
+    def test_stop_confirmed(self, setup):
+        sim, ctrl = setup
+        assert ctrl.enable() and sim.started
+        result = ctrl.emergency_stop(wait=2.0)
+        assert result.complete and not sim.started
+        assert result.stopped == [0xFA]
+        assert ctrl.can.stats["tx_count"] >= 3   # enable + stop + broadcast stop
+
+    def test_stop_frame_layout(self, setup):
+        _, ctrl = setup
+        frames = ctrl.estop._frames
+        assert frames[0xFA].arbitration_id == make_tx_id(0x0F, 0xFA)
+        assert bytes(frames[0xFA].data[:2]) == b"\x00\x00"
+
+    def test_cli_estop(self, capsys):
+        from dcdc_app.cli import main
+
+        rc = main(["--dry-run", "estop"])
+        out = capsys.readouterr().out
+        assert rc == 0
+        assert "Emergency stop sent to 0xFA" in out and "Confirmed" in out
@@ -0,0 +1,139 @@
+"""Tests for the wide-table (one row per cycle) exporter."""
+
+import csv
+
+import pytest
+
+from dcdc_app.export import (
+    COLUMN_NAMES,
+    CsvCycleWriter,
+    CycleAssembler,
+    CycleWriter,
+    export_log,
+    iter_npz_chunks,
+    open_writer,
+    resolve_format,
+)
+from dcdc_app.logging_utils import FrameLogger
+from dcdc_app.protocol import DCData, HighResDC, StatusData, make_rx_id
+
+
+def _cycle(asm, t, v, sa=0xFA):
+    asm.feed(sa, "dc", DCData(voltage=v), t)
+    asm.feed(sa, "status", StatusData(running_state=13), t + 0.001)
+    asm.feed(sa, "dc_hires", HighResDC(voltage=v + 0.001), t + 0.002)
+
+
+class TestCycleAssembler:
+    def test_one_row_per_cycle(self):
+        rows = []
+        asm = CycleAssembler(rows.append)
+        for k in range(5):
+            _cycle(asm, 100.0 + k * 0.2, 400.0 + k)
+        asm.flush()
+        assert len(rows) == 5
+        idx = COLUMN_NAMES.index("dc_voltage")
+        assert [r[idx] for r in rows] == [400.0, 401.0, 402.0, 403.0, 404.0]
+        assert rows[0][0] == pytest.approx(100.0)
+        assert rows[0][1] == 0xFA
+        assert len(rows[0]) == len(COLUMN_NAMES)
+
+    def test_missing_section_holds_last_value(self):
+        rows = []
+        asm = CycleAssembler(rows.append)
+        _cycle(asm, 0.0, 400.0)
+        # next cycle: only DC arrives (status and hi-res frames missing)
+        asm.feed(0xFA, "dc", DCData(voltage=401.0), 0.2)
+        asm.feed(0xFA, "dc", DCData(voltage=402.0), 0.4)
+        asm.flush()
+        assert len(rows) == 3
+        state_idx = COLUMN_NAMES.index("status_running_state")
+        assert [r[state_idx] for r in rows] == [13, 13, 13]
+
+    def test_devices_interleaved(self):
+        rows = []
+        asm = CycleAssembler(rows.append)
+        for k in range(3):
+            _cycle(asm, k * 0.2, 400.0, sa=0xFA)
+            _cycle(asm, k * 0.2 + 0.05, 300.0, sa=0xFB)
+        asm.flush()
+        assert sorted(r[1] for r in rows) == [0xFA] * 3 + [0xFB] * 3
+
+    def test_non_status_frames_ignored(self):
+        rows = []
+        asm = CycleAssembler(rows.append)
+        asm.feed(0xFA, "pf_0x10", True, 0.0)
+        asm.flush()
+        assert rows == []
+
+
+class TestWriters:
+    def test_csv_batches_and_types(self, tmp_path):
+        path = tmp_path / "wide.csv"
+        writer = CsvCycleWriter(str(path), batch_rows=2)
+        asm = CycleAssembler(writer.write_row)
+        for k in range(5):
+            _cycle(asm, 1000.0 + k * 0.2, 400.123456789)
+        asm.flush()
+        assert writer.rows_written == 4  # one row still buffered
+        writer.close()
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 5
+        assert list(rows[0].keys()) == COLUMN_NAMES
+        assert rows[0]["dc_voltage"] == "400.123457"
+        assert rows[0]["status_running_state"] == "13"
+
+    def test_base_writer_is_abstract(self, tmp_path):
+        with pytest.raises(TypeError):
+            CycleWriter(str(tmp_path / "x"))
+
+    def test_resolve_format(self):
+        assert resolve_format("x.csv") == "csv"
+        assert resolve_format("x.unknown") == "csv"
+        assert resolve_format("x.csv", "csv") == "csv"
+
+    def test_npz_chunks(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        path = str(tmp_path / "wide.npz")
+        writer = open_writer(path, "npz", batch_rows=3)
+        asm = CycleAssembler(writer.write_row)
+        for k in range(7):
+            _cycle(asm, k * 0.2, 400.0 + k)
+        asm.flush()
+        writer.close()
+        chunks = list(iter_npz_chunks(path))
+        assert [len(c["timestamp"]) for c in chunks] == [3, 3, 1]
+        assert chunks[0]["status_running_state"].dtype == np.int64
+
+    def test_parquet(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = str(tmp_path / "wide.parquet")
+        writer = open_writer(path, batch_rows=2)
+        asm = CycleAssembler(writer.write_row)
+        for k in range(5):
+            _cycle(asm, k * 0.2, 400.0 + k)
+        asm.flush()
+        writer.close()
+        table = pq.read_table(path)
+        assert table.num_rows == 5
+        assert table.column("dc_voltage").to_pylist() == [400.0, 401.0, 402.0, 403.0, 404.0]
+
+
+class TestExportLog:
+    def test_frame_log_to_wide_csv(self, tmp_path):
+        log = tmp_path / "frames.csv"
+        with FrameLogger(str(log), console=False) as flog:
+            for _ in range(3):
+                flog.log_frame(make_rx_id(0x11), bytes.fromhex("0FA0271000000320"))
+                flog.log_frame(make_rx_id(0x13), bytes.fromhex("0D00000000000000"))
+        out = tmp_path / "wide.csv"
+        writer = CsvCycleWriter(str(out))
+        rows = export_log(str(log), writer)
+        writer.close()
+        # frames were logged back-to-back: each repeated section starts a new cycle
+        assert rows == 3
+        with open(out, newline="") as f:
+            data = list(csv.DictReader(f))
+        assert float(data[0]["dc_voltage"]) == pytest.approx(400.0)
+        assert data[0]["status_running_state"] == "13"
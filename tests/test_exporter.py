@@ -0,0 +1,88 @@
+"""Tests for the OpenMetrics exporter."""
+
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from dcdc_app.exporter import CONTENT_TYPE, OpenMetricsExporter
+from dcdc_app.metrics import MetricsRegistry
+from dcdc_app.protocol import DCData, PCSState, StatusData
+
+
+def _fake_controller():
+    state = PCSState()
+    state.dc = DCData(voltage=400.5, current=-12.0, power=4.8, inlet_temperature=30.0)
+    state.status = StatusData(running_state=6, fault_code=0x800D)
+    return SimpleNamespace(
+        device_states={0xFA: state, 0x10: PCSState()},
+        connected=True,
+        seconds_since_last_rx=0.25,
+    )
+
+
+class TestRender:
+    def test_device_values_and_registry(self):
+        reg = MetricsRegistry()
+        reg.counter("can_rx_frames_total", "Frames").inc(7)
+        reg.gauge("can_rx_queue_depth").set(3)
+        h = reg.histogram("controller_decode_seconds", pf="0x11")
+        h.observe(20e-6)
+        h.observe(2e-3)
+        exp = OpenMetricsExporter(_fake_controller(), registry=reg)
+        text = exp.render().decode()
+
+        assert text.endswith("# EOF\n")
+        assert 'pcs_dc_voltage{addr="0xFA"} 400.5' in text
+        assert 'pcs_dc_current{addr="0xFA"} -12.0' in text
+        assert 'pcs_status_fault_code{addr="0xFA"} 32781' in text
+        assert 'pcs_status_fault{addr="0xFA"} 1' in text
+        assert 'pcs_dc_voltage{addr="0x10"} 0.0' in text
+        assert "# TYPE can_rx_frames counter" in text
+        assert "can_rx_frames_total 7" in text
+        assert "can_rx_queue_depth 3" in text
+        assert "dcdc_connected 1" in text
+        assert 'controller_decode_seconds_bucket{pf="0x11",le="2.5e-05"} 1' in text
+        assert 'controller_decode_seconds_bucket{pf="0x11",le="+Inf"} 2' in text
+        assert 'controller_decode_seconds_count{pf="0x11"} 2' in text
+        assert 'dcdc_rx_frame_rate_hz{pf="0x11"}' in text
+
+    def test_families_are_contiguous(self):
+        exp = OpenMetricsExporter(_fake_controller(), registry=MetricsRegistry())
+        seen = set()
+        current = None
+        for line in exp.render().decode().splitlines():
+            if line.startswith("# TYPE "):
+                current = line.split()[2]
+                assert current not in seen
+                seen.add(current)
+            elif not line.startswith("#"):
+                assert line.startswith(current)
+
+    def test_unchanged_sections_reuse_cache(self):
+        ctrl = _fake_controller()
+        exp = OpenMetricsExporter(ctrl, registry=MetricsRegistry())
+        exp.render()
+        cached = exp._value_cache[(0xFA, "dc")][1]
+        exp.render()
+        assert exp._value_cache[(0xFA, "dc")][1] is cached
+        ctrl.device_states[0xFA].dc = DCData(voltage=1.0)
+        text = exp.render().decode()
+        assert exp._value_cache[(0xFA, "dc")][1] is not cached
+        assert 'pcs_dc_voltage{addr="0xFA"} 1.0' in text
+
+
+class TestServer:
+    def test_http_scrape(self):
+        exp = OpenMetricsExporter(_fake_controller(), registry=MetricsRegistry(), port=0)
+        exp.start()
+        try:
+            with urllib.request.urlopen(exp.url, timeout=5) as resp:
+                assert resp.headers["Content-Type"] == CONTENT_TYPE
+                body = resp.read().decode()
+            assert 'pcs_dc_voltage{addr="0xFA"} 400.5' in body
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(exp.url.replace("/metrics", "/other"), timeout=5)
+        finally:
+            exp.stop()
@@ -0,0 +1,105 @@
+"""Tests for the flight recorder (fault/timeout/operator dumps of the frame trace)."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.flight_recorder import FlightRecorder
+from dcdc_app.logging_utils import iter_frame_log
+from dcdc_app.protocol import make_rx_id
+from dcdc_app.trace import FrameTrace
+
+
+class TestFlightRecorder:
+    def test_dumps_lead_up_in_background(self, tmp_path):
+        tr = FrameTrace(capacity=1000)
+        now = time.time()
+        for i in range(100):   # 100 frames over the last ~10 s
+            tr.record(now - 10.0 + i * 0.1, "RX", make_rx_id(0x11), bytes([i]) * 8)
+        rec = FlightRecorder(tr, str(tmp_path), seconds=5.0, fmt="bin")
+        path = rec.trigger("operator")
+        tr.record(now + 1.0, "RX", make_rx_id(0x11), b"\xFF" * 8)   # after the trigger
+        assert rec.flush(timeout=5.0)
+        frames = list(iter_frame_log(path))
+        assert 48 <= len(frames) <= 51
+        assert frames[-1][3] == bytes([99]) * 8
+        assert rec.dumps == [path]
+        rec.close()
+
+    def test_repeats_coalesced(self, tmp_path):
+        rec = FlightRecorder(FrameTrace(capacity=10), str(tmp_path), fmt="csv", min_interval=60.0)
+        assert rec.trigger("fault_800D") is not None
+        assert rec.trigger("fault_800D") is None
+        assert rec.trigger("timeout_10") is not None
+        rec.close()
+        assert len(list(tmp_path.glob("*.csv"))) == 2
+
+    def test_close_writes_queued_dumps_and_refuses_later_ones(self, tmp_path):
+        rec = FlightRecorder(FrameTrace(capacity=10), str(tmp_path), fmt="csv")
+        paths = [rec.trigger(f"reason_{i}") for i in range(5)]
+        rec.close()
+        assert all(Path(p).exists() for p in paths)
+        assert rec.trigger("late") is None
+        rec.open()
+        path = rec.trigger("reopened")
+        rec.close()
+        assert Path(path).exists()
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            FlightRecorder(FrameTrace(capacity=10), str(tmp_path), fmt="xml")
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestControllerTriggers:
+    def test_fault_and_operator_dumps(self, tmp_path):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        time.sleep(0.3)
+        config = ControllerConfig(trace_dir=str(tmp_path), trace_format="csv")
+        ctrl = PCSController(CANInterface(simulated=True), config)
+        try:
+            ctrl.start()
+            time.sleep(0.5)
+            sim.fault_code = 0x800D
+            deadline = time.monotonic() + 2.0
+            while not ctrl.recorder.dumps and time.monotonic() < deadline:
+                time.sleep(0.05)
+            operator = ctrl.trigger_dump()
+        finally:
+            ctrl.stop()
+            ctrl.can.disconnect()
+            sim.stop()
+        fault = list(tmp_path.glob("*fault_800D.csv"))
+        assert len(fault) == 1
+        frames = list(iter_frame_log(str(fault[0])))
+        assert {d for _, d, _, _ in frames} == {"RX", "TX"}   # heartbeats and status frames
+        assert operator is not None and operator in ctrl.recorder.dumps
+
+    def test_command_timeout_dump(self, tmp_path):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+
+        # No simulator: the enable command gets no reply
+        config = ControllerConfig(trace_dir=str(tmp_path), command_timeout=0.2, auto_heartbeat=False)
+        ctrl = PCSController(CANInterface(simulated=True), config)
+        try:
+            ctrl.start()
+            assert not ctrl.enable(clear_faults=False)
+        finally:
+            ctrl.stop()
+            ctrl.can.disconnect()
+        dumps = list(tmp_path.glob("*timeout_*.bin"))
+        assert len(dumps) == 1
+        assert [d for _, d, _, _ in iter_frame_log(str(dumps[0]))] == ["TX"]
@@ -0,0 +1,164 @@
+"""Tests for the GUI backend's telemetry diff and the main window (needs PySide6, no display)."""
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from dcdc_app.gui.backend import SNAPSHOT_FIELDS, BackendWorker, TelemetrySnapshot
+    GUI_AVAILABLE = True
+except ImportError:
+    GUI_AVAILABLE = False
+
+from dcdc_app.protocol import DCData, PCSState, RunningState, StatusData
+
+
+class _FakeController:
+    def __init__(self):
+        self.state = PCSState()
+        self.seconds_since_last_rx = 0.1
+        self.stale_sections = set()
+        self.can = SimpleNamespace(stats={"tx_count": 1, "rx_count": 10, "error_count": 0})
+        self.stats = SimpleNamespace(window_names=["1m"])
+
+    def stats_snapshot(self, window):
+        return {}
+
+
+@pytest.mark.skipif(not GUI_AVAILABLE, reason="PySide6 not installed")
+class TestTelemetryChanges:
+    @pytest.fixture
+    def worker(self):
+        worker = BackendWorker()
+        worker._ctrl = _FakeController()
+        worker._connected = True
+        return worker
+
+    def test_first_call_sends_every_field(self, worker):
+        changes = worker.telemetry_changes(new_cycle=True)
+        mapped = {key for pairs in SNAPSHOT_FIELDS.values() for key, _ in pairs}
+        assert mapped <= set(changes)
+        assert set(changes) <= {f for f in TelemetrySnapshot.__dataclass_fields__}
+
+    def test_only_changed_fields_follow(self, worker):
+        worker.telemetry_changes(new_cycle=True)
+        ctrl = worker._ctrl
+        ctrl.can.stats["rx_count"] = 17
+        ctrl.state.dc = DCData(voltage=401.0)            # only the voltage differs
+        changes = worker.telemetry_changes(new_cycle=True)
+        assert set(changes) == {"dc_voltage", "rx_count", "timestamp"}
+
+        # A replaced section with equal values sends nothing
+        ctrl.state.status = StatusData(running_state=0)
+        assert set(worker.telemetry_changes(new_cycle=True)) == {"timestamp"}
+
+        ctrl.state.status = StatusData(running_state=RunningState.FAULT)
+        changes = worker.telemetry_changes(new_cycle=True)
+        assert changes["is_fault"] is True and changes["running_state_name"] == "FAULT"
+
+    def test_housekeeping_tick(self, worker):
+        worker.telemetry_changes(new_cycle=True)
+        ctrl = worker._ctrl
+        ctrl.seconds_since_last_rx = 2.5
+        ctrl.stale_sections = {"dc"}
+        ctrl.can.stats["rx_count"] = 99                  # counters go with cycles only
+        changes = worker.telemetry_changes(new_cycle=False)
+        assert set(changes) == {"seconds_since_rx", "stale_sections", "stats"}
+        assert changes["stale_sections"] == frozenset({"dc"})
+
+    def test_not_connected(self, worker):
+        worker._connected = False
+        assert worker.telemetry_changes(new_cycle=True) is None
+
+
+@pytest.fixture
+def window():
+    pytest.importorskip("pyqtgraph")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QEvent
+    from PySide6.QtWidgets import QApplication
+    from dcdc_app.gui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    win = MainWindow()
+    yield win
+    win.close()
+    # Delete now, not when the garbage collector reaches it mid-event loop
+    win.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+
+@pytest.mark.skipif(not GUI_AVAILABLE, reason="PySide6 not installed")
+class TestLazyTabs:
+    def test_tabs_built_on_first_view(self, window):
+        assert window._tab_curves == {} and window._trend_bufs == {}
+        assert window._btn_apply is None and window._tbl_raw is None
+
+        window._tabs.setCurrentIndex(4)                   # Thermal
+        assert [key for _, key in window._tab_curves[4]] == ["inlet_temp", "outlet_temp"]
+        assert set(window._trend_bufs) == {"inlet_temp", "outlet_temp"}
+
+        window._tabs.setCurrentIndex(5)                   # Setpoints: no curves
+        assert window._btn_apply is not None and not window._btn_apply.isEnabled()
+        assert set(window._tab_curves) == {4}
+
+    def test_late_buffer_aligns_with_newest_samples(self, window):
+        window._ensure_tab(0)                             # Trends (current, not yet painted)
+        for v in (1.0, 2.0, 3.0):
+            window._on_telemetry({"dc_voltage": v, "timestamp": time.time()}, True)
+        window._tabs.setCurrentIndex(1)                   # DC Side adds dc_voltage_hr
+        window._on_telemetry({"dc_voltage_hr": 9.0, "timestamp": time.time()}, True)
+        window._update_plots()
+
+        curves = {key: curve for curve, key in window._tab_curves[1]}
+        x_std, y_std = curves["dc_voltage"].getData()
+        x_hr, y_hr = curves["dc_voltage_hr"].getData()
+        assert list(y_std) == [1.0, 2.0, 3.0, 3.0] and list(y_hr) == [9.0]
+        assert x_hr[0] == x_std[-1]
+
+
+@pytest.mark.skipif(not GUI_AVAILABLE, reason="PySide6 not installed")
+class TestRenderState:
+    def test_minimized_defers_cards_and_keeps_history(self, window):
+        from PySide6.QtWidgets import QApplication
+        app = QApplication.instance()
+        window.show()
+        app.processEvents()
+        window._on_connection_state("online")
+        assert window._render_state == "foreground" and window._plot_timer.interval() == 250
+
+        window.showMinimized()
+        app.processEvents()
+        assert window._render_state == "hidden"
+        assert not window._plot_timer.isActive() and not window._poll_timer.isActive()
+        samples = len(window._trend_time)
+        window._on_telemetry({"dc_voltage": 512.5, "timestamp": time.time()}, True)
+        assert window._card_dc_voltage.value != 512.5     # not drawn...
+        assert len(window._trend_time) == samples + 1     # ...but recorded
+
+        window.showNormal()
+        window.activateWindow()
+        app.processEvents()
+        assert window._card_dc_voltage.value == 512.5 and not window._dirty
+        assert window._plot_timer.isActive()
+
+    def test_background_refresh_rate(self, window):
+        from PySide6.QtWidgets import QApplication, QWidget
+        app = QApplication.instance()
+        window.show()
+        app.processEvents()
+        window._on_connection_state("online")
+
+        other = QWidget()
+        other.show()
+        other.activateWindow()
+        app.processEvents()
+        assert window._render_state == "background"
+        assert window._plot_timer.interval() == 1000      # default 1 Hz low-power refresh
+        window._on_telemetry({"dc_current": 3.5, "timestamp": time.time()}, True)
+        assert window._card_dc_current.value != 3.5
+        window._refresh()                                  # what the timer does
+        assert window._card_dc_current.value == 3.5
+        other.close()
@@ -0,0 +1,148 @@
+"""Tests for the metrics registry and its instrumentation of the controller."""
+
+import threading
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    _bucket_index,
+    _bucket_upper,
+    format_snapshot,
+)
+
+
+class TestHistogram:
+    def test_bucket_bounds_are_consistent(self):
+        for v in list(range(0, 200)) + [1000, 12345, 10**6, 2**39 + 7]:
+            idx = _bucket_index(v)
+            assert v <= _bucket_upper(idx)
+            if idx > 0:
+                assert v > _bucket_upper(idx - 1)
+
+    def test_relative_precision(self):
+        for v in (100, 5000, 250_000, 3_000_000):
+            upper = _bucket_upper(_bucket_index(v))
+            assert (upper - v) / v < 0.04
+
+    def test_percentiles(self):
+        h = Histogram("x")
+        for i in range(1, 1001):
+            h.observe(i * 1e-6)
+        assert h.count == 1000
+        assert h.min == pytest.approx(1e-6)
+        assert h.max == pytest.approx(1e-3)
+        assert h.percentile(50) == pytest.approx(500e-6, rel=0.04)
+        assert h.percentile(99) == pytest.approx(990e-6, rel=0.04)
+        assert h.percentile(100) == pytest.approx(1e-3)
+        assert h.mean == pytest.approx(500.5e-6)
+
+    def test_empty_and_reset(self):
+        h = Histogram("x")
+        assert h.percentile(99) == 0.0
+        assert h.snapshot()["min"] == 0.0
+        h.observe(0.5)
+        h.observe(-1.0)
+        assert h.count == 2
+        assert h.min == 0.0
+        h.reset()
+        assert h.count == 0
+        assert list(h.buckets()) == []
+
+
+class TestRegistry:
+    def test_get_or_create_and_labels(self):
+        reg = MetricsRegistry()
+        a = reg.counter("frames_total", pf="0x11")
+        b = reg.counter("frames_total", pf="0x11")
+        c = reg.counter("frames_total", pf="0x12")
+        assert a is b
+        assert a is not c
+        a.inc(3)
+        snap = reg.snapshot()
+        assert snap['frames_total{pf="0x11"}'] == {"value": 3}
+        assert snap['frames_total{pf="0x12"}'] == {"value": 0}
+
+    def test_kind_conflict(self):
+        reg = MetricsRegistry()
+        reg.counter("x")
+        with pytest.raises(TypeError):
+            reg.histogram("x")
+
+    def test_shared_instruments_take_concurrent_writers(self):
+        reg = MetricsRegistry()
+        assert reg.counter("c")._lock is None
+        c = reg.counter("c", shared=True)          # upgrades the existing instrument
+        h = reg.histogram("h", shared=True)
+        assert c is reg.counter("c") and c._lock is not None
+
+        def write():
+            for _ in range(20000):
+                c.inc()
+                h.observe(1e-6)
+
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert c.value == 80000
+        assert h.count == 80000 and sum(h.counts) == 80000
+
+    def test_reset_keeps_instruments(self):
+        reg = MetricsRegistry()
+        c = reg.counter("c")
+        g = reg.gauge("g")
+        h = reg.histogram("h")
+        c.inc()
+        g.set(4)
+        h.observe(0.001)
+        reg.reset()
+        assert isinstance(reg.get("c"), Counter)
+        assert c.value == 0 and g.value == 0 and h.count == 0
+        assert "c" in format_snapshot(reg)
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestControllerMetrics:
+    def test_controller_records_metrics(self, tmp_path):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.logging_utils import FrameLogger
+        from dcdc_app.simulator import SimulatedPCS
+
+        reg = MetricsRegistry()
+        sim = SimulatedPCS()
+        sim.start()
+        time.sleep(0.3)
+        can_if = CANInterface(simulated=True, metrics=reg)
+        flog = FrameLogger(str(tmp_path / "f.csv"), console=False, metrics=reg)
+        flog.open()
+        ctrl = PCSController(can_if, ControllerConfig(), flog, metrics=reg)
+        ctrl.add_callback(lambda name, decoded: None)
+        try:
+            ctrl.start()
+            time.sleep(0.7)
+            assert ctrl.enable()
+        finally:
+            ctrl.stop()
+            can_if.disconnect()
+            sim.stop()
+            flog.close()
+
+        assert reg.get("can_rx_frames_total").value > 0
+        assert reg.get("can_tx_frames_total").value > 0
+        assert reg.get("controller_decode_seconds", pf="0x11").count > 0
+        assert reg.get("controller_reply_seconds", pf="0x10").count == 1
+        assert reg.get("controller_callback_seconds").count > 0
+        assert reg.get("controller_heartbeat_lateness_seconds").count > 0
+        assert reg.get("logger_write_seconds", format="csv").count > 0
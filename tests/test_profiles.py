@@ -0,0 +1,180 @@
+"""Tests for the battery test-profile runner."""
+
+import json
+import threading
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.profiles import ProfileError, load_profile, parse_condition, parse_profile
+from dcdc_app.protocol import DCData, HighResDC, PCSState, WorkingMode
+
+
+class TestParsing:
+    def test_conditions(self):
+        state = PCSState()
+        state.dc = DCData(voltage=399.0, current=-20.0)
+        cond = parse_condition("voltage >= 400")
+        assert str(cond) == "voltage >= 400"
+        assert cond.check(state, None) == (False, 399.0)
+        state.dc_hires = HighResDC(voltage=400.002, current=-19.5)   # hi-res wins
+        assert cond.check(state, None)[0]
+        assert parse_condition("abs_current<=19.5").check(state, None)[0]
+        assert parse_condition("grid_voltage.u_voltage < 1e3").check(state, None)[0]
+
+        for bad in ("voltage = 3", "volts > 3", "dc.nope > 1", "time >="):
+            with pytest.raises(ProfileError):
+                parse_condition(bad)
+
+    def test_profile_file(self, tmp_path):
+        path = tmp_path / "p.json"
+        path.write_text(json.dumps({
+            "name": "cycle", "repeat": 2, "abort": ["temperature >= 60"],
+            "steps": [
+                {"name": "charge", "mode": "cc", "params": [50], "until": ["voltage >= 420"]},
+                {"mode": "0x29", "params": [420, 50, 2.5], "until": ["time >= 5"]},
+                {"name": "rest", "until": ["time >= 1"]},
+            ],
+        }))
+        profile = load_profile(str(path))
+        assert profile.repeat == 2 and len(profile.abort) == 1
+        assert [s.mode for s in profile.steps] == [
+            WorkingMode.DC_CONSTANT_CURRENT, WorkingMode.DC_CC_CV, None,
+        ]
+        assert profile.steps[1].name == "step 2"
+
+    @pytest.mark.parametrize("step", [
+        {"mode": "cv", "params": [400]},                       # no until
+        {"mode": "warp", "until": ["time > 1"]},
+        {"mode": "cv", "params": [1, 2], "until": ["time > 1"]},   # CV takes one param
+        {"params": [1], "until": ["time > 1"]},                # rest with params
+    ])
+    def test_invalid_steps(self, step):
+        with pytest.raises(ProfileError):
+            parse_profile({"steps": [step]})
+
+    def test_modes_without_params_reject_them(self):
+        ok = parse_profile({"steps": [{"mode": "standby", "until": ["time >= 1"]}]})
+        assert ok.steps[0].mode == WorkingMode.STANDBY and ok.steps[0].params == []
+        with pytest.raises(ProfileError, match="STANDBY takes no params"):
+            parse_profile({"steps": [{"mode": "standby", "params": [1], "until": ["time >= 1"]}]})
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestRunner:
+    @pytest.fixture
+    def setup(self):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import PCSController
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        ctrl = PCSController(CANInterface(simulated=True))
+        ctrl.start()
+        assert ctrl.wait_for_cycle(2.0)
+        yield sim, ctrl
+        ctrl.stop()
+        ctrl.can.disconnect()
+        sim.stop()
+
+    def test_steps_follow_telemetry(self, setup, tmp_path):
+        from dcdc_app.profiles import ProfileRunner
+
+        sim, ctrl = setup
+        profile = parse_profile({"repeat": 2, "steps": [
+            {"name": "charge", "mode": "cc", "params": [50], "until": ["voltage >= 410"]},
+            {"name": "rest", "until": ["time >= 0.3"]},
+        ]})
+        log = tmp_path / "steps.csv"
+        runner = ProfileRunner(ctrl, profile, step_log=str(log))
+
+        def raise_voltage():
+            # The simulated PCS doesn't model a battery: drive its voltage by hand
+            for _ in range(2):
+                time.sleep(0.6)
+                sim.dc_voltage = 420.0
+                while sim.started:        # until the runner ends the charge step
+                    time.sleep(0.01)
+                sim.dc_voltage = 400.0
+
+        t = threading.Thread(target=raise_voltage)
+        t.start()
+        records = runner.run()
+        t.join(5)
+
+        assert [(r.cycle, r.name, r.mode) for r in records] == [
+            (1, "charge", "DC_CONSTANT_CURRENT"), (1, "rest", "REST"),
+            (2, "charge", "DC_CONSTANT_CURRENT"), (2, "rest", "REST"),
+        ]
+        assert records[0].reason.startswith("voltage >= 410")
+        assert records[0].ah > 0                 # 50 A while charging
+        assert 0.3 <= records[1].duration_s < 0.45
+        assert not sim.started                   # output left off
+        rows = log.read_text().splitlines()
+        assert len(rows) == 5 and rows[0].startswith("cycle,step,name")
+
+    def test_abort_switches_output_off(self, setup):
+        from dcdc_app.profiles import ProfileRunner
+
+        sim, ctrl = setup
+        profile = parse_profile({"abort": ["voltage >= 450"], "steps": [
+            {"mode": "cc", "params": [50], "until": ["time >= 10"]},
+        ]})
+        runner = ProfileRunner(ctrl, profile)
+        threading.Timer(0.5, lambda: setattr(sim, "dc_voltage", 500.0)).start()
+        start = time.monotonic()
+        records = runner.run()
+        assert runner.aborted and runner.aborted.startswith("abort: voltage >= 450")
+        assert time.monotonic() - start < 2.0
+        assert len(records) == 1 and not sim.started
+
+    def test_cv_step_waits_for_fresh_telemetry(self, setup):
+        from dcdc_app.profiles import ProfileRunner
+
+        _, ctrl = setup
+        # The disable between CC and CV reports 0 A; the CV step must not end on
+        # it. A slow mode change makes sure such a frame arrives before the enable.
+        set_params = ctrl.set_mode_parameters
+
+        def slow_set_params(*args):
+            time.sleep(0.3)
+            return set_params(*args)
+
+        ctrl.set_mode_parameters = slow_set_params
+        profile = parse_profile({"steps": [
+            {"name": "CC charge", "mode": "cc", "params": [50], "until": ["time >= 0.6"]},
+            {"name": "CV hold", "mode": "cv", "params": [420],
+             "until": ["abs_current <= 2.5", "time >= 1.0"]},
+        ]})
+        records = ProfileRunner(ctrl, profile).run()
+        assert [r.name for r in records] == ["CC charge", "CV hold"]
+        assert records[1].reason.startswith("time >= 1")
+        assert records[1].duration_s >= 1.0
+
+    def test_conditions_ignore_other_units(self, setup):
+        from dcdc_app.profiles import ProfileRunner
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim, ctrl = setup
+        other = SimulatedPCS(pcs_addr=0xF1)
+        other.dc_voltage = 900.0          # over the abort limit, but not our unit
+        other.start()
+        try:
+            assert ctrl.wait_until(lambda: 0xF1 in ctrl.device_states, 2.0)
+            profile = parse_profile({"abort": ["voltage >= 850"], "steps": [
+                {"mode": "cc", "params": [50], "until": ["time >= 0.5"]},
+            ]})
+            runner = ProfileRunner(ctrl, profile)
+            records = runner.run()
+        finally:
+            other.stop()
+        assert runner.aborted is None
+        assert records[0].reason.startswith("time >= 0.5")
+        assert records[0].voltage < 850
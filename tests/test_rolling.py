@@ -0,0 +1,111 @@
+"""Tests for the rolling statistics engine."""
+
+import math
+import random
+import statistics
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.protocol import DCData, StatusData
+from dcdc_app.rolling import SESSION, SIGNALS, RollingStats, RollingWindow
+
+
+class TestRollingWindow:
+    def test_matches_brute_force_over_window(self):
+        rng = random.Random(1)
+        win = RollingWindow(span=60.0, buckets=60)
+        samples = []
+        t = 0.0
+        for _ in range(2000):  # 400 s at 5 Hz: many buckets expire
+            t += 0.2
+            x = 400.0 + rng.gauss(0, 5)
+            win.add(t, x)
+            samples.append((t, x))
+        st = win.stats()
+        # the window covers whole buckets: everything newer than the oldest kept bucket start
+        start = (math.floor(t) + 1) - 61.0
+        kept = [x for ts, x in samples if ts >= start]
+        assert st.count == len(kept)
+        assert st.mean == pytest.approx(statistics.fmean(kept))
+        assert st.std == pytest.approx(statistics.pstdev(kept), rel=1e-6)
+        assert st.min == min(kept) and st.max == max(kept)
+        assert st.rms == pytest.approx(math.sqrt(sum(x * x for x in kept) / len(kept)))
+
+    def test_old_extremes_expire(self):
+        win = RollingWindow(span=10.0, buckets=10)
+        win.add(0.0, 1000.0)
+        for k in range(1, 60):
+            win.add(k * 0.5, 5.0)
+        st = win.stats()
+        assert st.max == 5.0 and st.min == 5.0
+        assert st.std == pytest.approx(0.0, abs=1e-9)
+
+    def test_idle_window_empties(self):
+        win = RollingWindow(span=10.0)
+        win.add(0.0, 3.0)
+        assert win.stats(now=5.0).count == 1
+        assert win.stats(now=100.0).count == 0
+
+
+class TestRollingStats:
+    def test_fields_windows_and_integral(self):
+        rs = RollingStats(windows=(("1m", 60.0),), max_gap=1.0)
+        for k in range(11):  # 2 s of constant 10 kW
+            rs.update(0xFA, "dc", DCData(voltage=400.0, current=25.0, power=10.0), k * 0.2)
+        assert rs.window_names == ["1m", SESSION]
+        st = rs.get("dc.power", "1m")
+        assert st.count == 11
+        assert st.mean == pytest.approx(10.0)
+        assert st.integral == pytest.approx(20.0)  # kW * s
+        assert rs.get("dc.power", SESSION).integral == pytest.approx(20.0)
+        assert set(rs.snapshot("1m")) == {"dc.voltage", "dc.current", "dc.power", "dc.inlet_temperature"}
+        assert "grid_voltage.u_voltage" in SIGNALS
+
+    def test_gap_not_integrated(self):
+        rs = RollingStats(max_gap=1.0)
+        rs.update(0xFA, "dc", DCData(power=10.0), 0.0)
+        rs.update(0xFA, "dc", DCData(power=10.0), 5.0)   # 5 s gap: skipped
+        rs.update(0xFA, "dc", DCData(power=10.0), 5.5)
+        assert rs.get("dc.power", SESSION).integral == pytest.approx(5.0)
+
+    def test_devices_separate_and_unknown(self):
+        rs = RollingStats()
+        rs.update(0xFA, "status", StatusData(running_state=13), 0.0)
+        rs.update(0xFB, "status", StatusData(running_state=6), 0.0)
+        rs.update(0xFA, "pf_0x10", True, 0.0)  # replies are ignored
+        assert rs.addresses() == [0xFA, 0xFB]
+        assert rs.get("status.running_state", sa=0xFB).mean == 6.0
+        assert rs.get("dc.voltage").count == 0
+        with pytest.raises(KeyError):
+            rs.get("dc.voltage", "1d")
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestControllerStats:
+    def test_controller_exposes_stats(self):
+        from dcdc_app.can_iface import CANInterface
+        from dcdc_app.controller import ControllerConfig, PCSController
+        from dcdc_app.simulator import SimulatedPCS
+
+        sim = SimulatedPCS()
+        sim.start()
+        time.sleep(0.3)
+        ctrl = PCSController(CANInterface(simulated=True), ControllerConfig())
+        try:
+            ctrl.start()
+            time.sleep(1.5)
+        finally:
+            ctrl.stop()
+            ctrl.can.disconnect()
+            sim.stop()
+        st = ctrl.signal_stats("dc.voltage", "1m")
+        assert st.count >= 3
+        assert 390.0 < st.min <= st.mean <= st.max < 410.0
+        assert "grid_voltage.u_voltage" in ctrl.stats_snapshot("session")
@@ -0,0 +1,80 @@
+"""Tests for the TX/RX frame trace ring."""
+
+import time
+
+import pytest
+
+try:
+    import can  # noqa: F401
+    CAN_AVAILABLE = True
+except ImportError:
+    CAN_AVAILABLE = False
+
+from dcdc_app.logging_utils import iter_frame_log
+from dcdc_app.protocol import make_rx_id, make_tx_id
+from dcdc_app.trace import FrameTrace
+
+DC_FRAME = bytes.fromhex("0FA0290400C80352")  # 400.0 V
+
+
+class TestFrameTrace:
+    def test_ring_keeps_newest(self):
+        tr = FrameTrace(capacity=3)
+        for i in range(5):
+            tr.record(float(i), "RX", make_rx_id(0x11), bytes([i]) * 8)
+        recs = tr.records()
+        assert len(tr) == 3
+        assert [r.timestamp for r in recs] == [2.0, 3.0, 4.0]
+        assert [r.timestamp for r in tr.records(last=1)] == [4.0]
+
+    def test_format_decodes_on_read(self):
+        tr = FrameTrace()
+        tr.record(time.time(), "RX", make_rx_id(0x11), DC_FRAME)
+        tr.record(time.time(), "TX", make_tx_id(0x0F), b"\x01" + b"\x00" * 7)
+        lines = list(tr.format())
+        assert "0F A0 29 04" in lines[0].upper()
+        assert "voltage=400.0" in lines[0]
+        assert lines[1].split("]")[1].strip().startswith("TX")
+
+    def test_seconds_window_and_short_frames(self):
+        tr = FrameTrace(capacity=100)
+        for i in range(10):
+            tr.record(100.0 + i, "RX", make_rx_id(0x11), b"\xAA" * (i % 9))
+        recs = tr.records(seconds=3.5, now=109.0)
+        assert [r.timestamp for r in recs] == [106.0, 107.0, 108.0, 109.0]
+        assert [len(r.data) for r in recs] == [6, 7, 8, 0]
+        assert tr.memory_bytes == 21 * 100
+
+    def test_out_of_order_writers_keep_count(self):
+        # Slot 1 finishes before slot 0 (TX and RX threads racing)
+        tr = FrameTrace(capacity=4)
+        tr._seq = iter([1, 0])
+        tr.record(2.0, "RX", make_rx_id(0x11), b"\x02" * 8)
+        tr.record(1.0, "TX", make_tx_id(0x0F), b"\x01" * 8)
+        assert tr.total == 2
+        assert [r.timestamp for r in tr.records()] == [1.0, 2.0]
+
+    def test_dump_is_a_frame_log(self, tmp_path):
+        tr = FrameTrace()
+        tr.record(time.time(), "RX", make_rx_id(0x11), DC_FRAME)
+        tr.record(time.time(), "TX", make_tx_id(0x0F), b"\x01" + b"\x00" * 7)
+        for name in ("trace.csv", "trace.jsonl", "trace.bin"):
+            path = tmp_path / name
+            assert tr.dump(str(path)) == 2
+            records = list(iter_frame_log(str(path)))
+            assert [(r[1], r[2], r[3]) for r in records] == [
+                ("RX", make_rx_id(0x11), DC_FRAME),
+                ("TX", make_tx_id(0x0F), b"\x01" + b"\x00" * 7),
+            ]
+
+
+@pytest.mark.skipif(not CAN_AVAILABLE, reason="python-can not installed")
+class TestTraceIntegration:
+    def test_interface_records_tx_and_rx(self):
+        from dcdc_app.can_iface import CANInterface
+
+        with CANInterface(simulated=True, receive_own_messages=True, trace_size=16) as iface:
+            iface.send(0x18010AB4, b"\x02" * 8)
+            assert iface.recv(timeout=1.0) is not None
+            assert [r.direction for r in iface.trace.records()] == ["TX", "RX"]
+        assert CANInterface(simulated=True, trace_size=0).trace is None
@@ -0,0 +1,104 @@
+"""Tests for the full-screen monitor dashboard."""
+
+import io
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from dcdc_app.protocol import DCData, PCSState, StatusData
+from dcdc_app.tui import CLEAR, Dashboard, Screen
+
+CURSOR = re.compile(r"\x1b\[(\d+);(\d+)H")
+
+
+class _Health:
+    def __init__(self):
+        self.stale = {}
+
+    def stale_sections(self, sa=None):
+        return self.stale.get(sa, set())
+
+
+def _ctrl(*addrs):
+    return SimpleNamespace(
+        device_states={sa: PCSState() for sa in addrs},
+        bus_health=_Health(),
+        config=SimpleNamespace(pcs_addr=addrs[0] if addrs else 0xFA),
+        can=SimpleNamespace(stats={"rx_count": 0}),
+    )
+
+
+def _rows(output):
+    return {int(m.group(1)) for m in CURSOR.finditer(output)}
+
+
+class TestScreen:
+    def test_only_changed_cells_written(self):
+        out = io.StringIO()
+        scr = Screen(out)
+        scr.put(0, 0, "a", 5)
+        scr.put(1, 0, "b", 5)
+        scr.flush()
+        assert out.getvalue().startswith(CLEAR)
+
+        out.truncate(0)
+        out.seek(0)
+        scr.put(0, 0, "a", 5)
+        scr.put(1, 0, "c", 5)
+        scr.flush()
+        assert _rows(out.getvalue()) == {2}
+
+        out.truncate(0)
+        out.seek(0)
+        scr.put(0, 0, "a", 5)
+        assert scr.flush() > 0   # row 1 no longer drawn: blanked
+        assert out.getvalue() == "\x1b[2;1H     "
+        scr.put(0, 0, "a", 5)
+        assert scr.flush() == 0
+
+
+class TestDashboard:
+    def test_unchanged_state_writes_nothing_but_header(self):
+        ctrl = _ctrl(0xFA)
+        out = io.StringIO()
+        dash = Dashboard(ctrl, out=out, size=(80, 30))
+        first = dash.render(now=1.0)
+        out.truncate(0)
+        out.seek(0)
+        dash.render(now=1.0)
+        assert _rows(out.getvalue()) <= {1}   # clock may tick between renders
+        assert dash.frames == 2 and first > 500
+
+    def test_changed_field_redraws_one_cell(self):
+        ctrl = _ctrl(0xFA)
+        out = io.StringIO()
+        dash = Dashboard(ctrl, out=out, size=(80, 30))
+        dash.render(now=1.0)
+        out.truncate(0)
+        out.seek(0)
+        ctrl.device_states[0xFA].dc = DCData(voltage=400.0)
+        dash.render(now=1.0)
+        text = out.getvalue()
+        assert "400.0 V" in text
+        assert _rows(text) - {1} == {7}   # DC Voltage row only
+
+    def test_multiple_devices_and_styles(self):
+        ctrl = _ctrl(0xFA, 0xFB, 0xFC, 0xFD)
+        ctrl.device_states[0xFB].status = StatusData(running_state=5, fault_code=0x800D)
+        ctrl.bus_health.stale[0xFC] = {"dc"}
+        out = io.StringIO()
+        dash = Dashboard(ctrl, out=out, size=(80, 30))   # room for 2 device columns
+        dash.render(now=1.0)
+        text = out.getvalue()
+        assert "0xFA *" in text and "0xFB" in text and "0xFC" not in text
+        assert "+2 not shown" in text
+        assert "\x1b[31;1m0x800D" in text
+
+        wide = Dashboard(ctrl, out=io.StringIO(), size=(120, 30))
+        wide.render(now=1.0)
+        assert "0xFC  STALE" in wide.out.getvalue()
+
+    def test_rejects_bad_refresh(self):
+        with pytest.raises(ValueError):
+            Dashboard(_ctrl(), out=io.StringIO(), refresh_hz=0)